@@ -13,6 +13,7 @@ import json
 
 sys.path.append(str(Path(__file__).parent))
 from .tools.core.registry import ToolRegistry
+from .tools.core.rate_limiter import langchain_rate_limiter
 
 # Imports de LLMs
 try:
@@ -102,7 +103,8 @@ class FunctionCallingAgent:
             return ChatOpenAI(
                 model=self.llm_model,
                 temperature=self.temperature,
-                openai_api_key=self.llm_api_key
+                openai_api_key=self.llm_api_key,
+                rate_limiter=langchain_rate_limiter('openai', self.llm_api_key)
             )
 
         elif self.llm_provider == 'google':
@@ -114,7 +116,8 @@ class FunctionCallingAgent:
             return ChatGoogleGenerativeAI(
                 model=model_name,
                 temperature=self.temperature,
-                google_api_key=self.llm_api_key
+                google_api_key=self.llm_api_key,
+                rate_limiter=langchain_rate_limiter('google', self.llm_api_key)
             )
 
     def query(
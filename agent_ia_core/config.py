@@ -70,6 +70,122 @@ LINKEDIN_API_URL = "https://api.linkedin.com/v2"
 # Límite de resultados por búsqueda
 MAX_JOB_RESULTS = 20
 
+# Número máximo de puestos del ranking que se buscan en paralelo
+RANKING_SEARCH_MAX_WORKERS = int(os.getenv('RANKING_SEARCH_MAX_WORKERS', '4'))
+
+# Número máximo de empresas investigadas en paralelo en recommend_companies
+COMPANY_RESEARCH_MAX_WORKERS = int(os.getenv('COMPANY_RESEARCH_MAX_WORKERS', '5'))
+
+# Base de conocimiento de empresas (modelos Company/CompanyRecruiter)
+COMPANY_STORE_ENABLED = os.getenv('COMPANY_STORE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+# Segundos durante los que los datos de una empresa se sirven sin refrescar (7 días)
+COMPANY_STORE_TTL = int(os.getenv('COMPANY_STORE_TTL', str(7 * 24 * 3600)))
+# Hilos para refrescar en segundo plano las empresas caducadas
+COMPANY_STORE_REFRESH_WORKERS = int(os.getenv('COMPANY_STORE_REFRESH_WORKERS', '2'))
+# Segundos tras los que cada proceso vuelve a leer el índice de alias de empresa
+COMPANY_NAMES_RELOAD_INTERVAL = int(os.getenv('COMPANY_NAMES_RELOAD_INTERVAL', '300'))
+
+# Límites de peticiones por (proveedor, API key): por minuto, ráfaga y cuota diaria (0 = sin cuota).
+# quota_timezone: zona en la que el proveedor reinicia la cuota diaria (Google: medianoche del Pacífico)
+RATE_LIMITS = {
+    'google_search': {
+        'per_minute': int(os.getenv('GOOGLE_SEARCH_PER_MINUTE', '60')),
+        'burst': int(os.getenv('GOOGLE_SEARCH_BURST', '10')),
+        # La cuota gratuita de Custom Search es de 100 consultas al día
+        'daily_quota': int(os.getenv('GOOGLE_SEARCH_DAILY_QUOTA', '100')),
+        'quota_timezone': 'America/Los_Angeles',
+    },
+    'openai': {
+        'per_minute': int(os.getenv('OPENAI_PER_MINUTE', '60')),
+        'burst': int(os.getenv('OPENAI_BURST', '10')),
+        'daily_quota': int(os.getenv('OPENAI_DAILY_QUOTA', '0')),
+    },
+    'google': {
+        'per_minute': int(os.getenv('GEMINI_PER_MINUTE', '15')),
+        'burst': int(os.getenv('GEMINI_BURST', '5')),
+        'daily_quota': int(os.getenv('GEMINI_DAILY_QUOTA', '0')),
+        'quota_timezone': 'America/Los_Angeles',
+    },
+    # Portales de empleo (clave = host), para no saturarlos desde varios usuarios a la vez
+    'portal': {
+        'per_minute': int(os.getenv('PORTAL_PER_MINUTE', '120')),
+        'burst': int(os.getenv('PORTAL_BURST', '20')),
+        'daily_quota': 0,
+    },
+}
+# Fracción de ráfaga y cuota diaria reservada a las peticiones interactivas
+RATE_LIMIT_BACKGROUND_RESERVE = float(os.getenv('RATE_LIMIT_BACKGROUND_RESERVE', '0.2'))
+# Segundos máximos de espera por un token antes de rendirse
+RATE_LIMIT_WAIT_TIMEOUT = int(os.getenv('RATE_LIMIT_WAIT_TIMEOUT', '30'))
+
+# ================================================
+# CONFIGURACIÓN DE NAVEGACIÓN WEB
+# ================================================
+# Timeout por descarga de página (segundos)
+BROWSE_TIMEOUT = int(os.getenv('BROWSE_TIMEOUT', '15'))
+
+# Descargas simultáneas permitidas contra un mismo host
+BROWSE_MAX_CONNECTIONS_PER_HOST = int(os.getenv('BROWSE_MAX_CONNECTIONS_PER_HOST', '4'))
+
+# Páginas verificadas en paralelo al comprobar si las ofertas siguen activas
+VERIFY_JOBS_MAX_WORKERS = int(os.getenv('VERIFY_JOBS_MAX_WORKERS', '6'))
+
+# Circuit breaker por host: fallos seguidos (timeout, 403, 429, 5xx) que lo abren
+HOST_BREAKER_FAILURES = int(os.getenv('HOST_BREAKER_FAILURES', '3'))
+# Segundos que se deja de llamar a un host abierto antes de probar de nuevo
+HOST_BREAKER_COOLDOWN = int(os.getenv('HOST_BREAKER_COOLDOWN', '120'))
+# Latencias recientes por host usadas para calcular el p95
+HOST_LATENCY_WINDOW = int(os.getenv('HOST_LATENCY_WINDOW', '50'))
+# Peticiones de respaldo cuando una descarga supera el p95 de su host
+HOST_HEDGE_ENABLED = os.getenv('HOST_HEDGE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+# Muestras mínimas de un host antes de hacer hedging
+HOST_HEDGE_MIN_SAMPLES = int(os.getenv('HOST_HEDGE_MIN_SAMPLES', '5'))
+# Hilos para las descargas con petición de respaldo
+HOST_HEDGE_WORKERS = int(os.getenv('HOST_HEDGE_WORKERS', '16'))
+
+# Backend de extracción HTML → texto: 'lxml' (rápido) o 'bs4' (BeautifulSoup)
+BROWSE_EXTRACTOR = os.getenv('BROWSE_EXTRACTOR', 'lxml')
+
+# Extracción de respuestas en browse_webpage: 'retrieval' (BM25 + una llamada al LLM)
+# o 'sequential' (una llamada por fragmento)
+BROWSE_EXTRACTION_MODE = os.getenv('BROWSE_EXTRACTION_MODE', 'retrieval')
+# Fragmentos más relevantes que se envían al LLM en modo retrieval
+BROWSE_RETRIEVAL_TOP_N = int(os.getenv('BROWSE_RETRIEVAL_TOP_N', '3'))
+# Score BM25 mínimo del mejor fragmento; por debajo se recorre secuencialmente
+BROWSE_RETRIEVAL_MIN_SCORE = float(os.getenv('BROWSE_RETRIEVAL_MIN_SCORE', '0.5'))
+# Contexto reenviado en el recorrido secuencial: 'window' (últimos intercambios),
+# 'summary' (notas breves del LLM) o 'full' (todo el historial, crece cuadráticamente)
+BROWSE_HISTORY_MODE = os.getenv('BROWSE_HISTORY_MODE', 'window')
+# Tokens máximos de contexto previo en los modos 'window' y 'summary'
+BROWSE_HISTORY_BUDGET_TOKENS = int(os.getenv('BROWSE_HISTORY_BUDGET_TOKENS', '1200'))
+
+# Cache en disco de páginas extraídas (por defecto DATA_DIR/page_cache)
+BROWSE_CACHE_ENABLED = os.getenv('BROWSE_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+BROWSE_CACHE_DIR = Path(os.getenv('BROWSE_CACHE_DIR', str(DATA_DIR / 'page_cache')))
+# Segundos durante los que una página cacheada se sirve sin revalidar
+BROWSE_CACHE_MAX_AGE = int(os.getenv('BROWSE_CACHE_MAX_AGE', '3600'))
+# Tamaño máximo de la cache en disco (bytes)
+BROWSE_CACHE_MAX_BYTES = int(os.getenv('BROWSE_CACHE_MAX_BYTES', str(100 * 1024 * 1024)))
+
+# Pool de navegadores Playwright de browse_interactive
+# Navegadores Chromium que se mantienen abiertos
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+# Páginas abiertas a la vez en todo el pool
+BROWSER_POOL_MAX_PAGES = int(os.getenv('BROWSER_POOL_MAX_PAGES', '6'))
+# Contextos servidos por un navegador antes de reciclarlo
+BROWSER_POOL_MAX_USES = int(os.getenv('BROWSER_POOL_MAX_USES', '50'))
+# Memoria total de Chromium (MB) a partir de la cual se recicla (0 = sin límite; requiere psutil)
+BROWSER_POOL_MAX_MEMORY_MB = int(os.getenv('BROWSER_POOL_MAX_MEMORY_MB', '0'))
+
+# Perfil de carga de páginas en browse_interactive: 'light' (sin imágenes/fuentes/media
+# ni trackers), 'minimal' (además sin CSS) o 'full' (todo, esperando networkidle)
+BROWSE_LOADING_PROFILE = os.getenv('BROWSE_LOADING_PROFILE', 'light')
+
+# Navegación guiada por LLM: elementos interactivos numerados que se envían por paso
+BROWSE_SNAPSHOT_MAX_ELEMENTS = int(os.getenv('BROWSE_SNAPSHOT_MAX_ELEMENTS', '60'))
+# Caracteres de texto visible que acompañan al snapshot
+BROWSE_SNAPSHOT_CONTENT_CHARS = int(os.getenv('BROWSE_SNAPSHOT_CONTENT_CHARS', '2000'))
+
 # Regiones de España (para autocompletado)
 SPANISH_REGIONS = [
     "Alicante", "Barcelona", "Madrid", "Valencia", "Sevilla",
@@ -2,11 +2,20 @@
 """
 Interactive Web Browser Tool usando Playwright
 Permite navegar sitios con JavaScript, hacer clicks, llenar formularios, etc.
+Los navegadores se reutilizan desde un pool compartido (ver core/browser_pool.py).
 """
 
 from typing import Dict, Any, List, Optional
+import asyncio
+import importlib.util
 import logging
+import re
 from ..core.base import BaseTool
+from ..core.browser_pool import BrowserPool, get_shared_browser_pool
+from ..core.loading_profiles import apply_loading_profile, get_loading_profile, wait_until_ready
+from ..core.page_snapshot import (
+    element_selector, format_snapshot, parse_element_index, snapshot_interactive_elements
+)
 
 logger = logging.getLogger(__name__)
 
@@ -55,14 +64,22 @@ Example queries:
 - "Get details from the 'Documentación' tab of tender XYZ"
 """
 
-    def __init__(self, llm=None):
+    def __init__(self, llm=None, pool: BrowserPool = None, loading_profile: str = None):
         """
         Inicializa la tool con un LLM opcional para extracción inteligente.
 
         Args:
             llm: Instancia de LLM para análisis de contenido (opcional)
+            pool: Pool de navegadores (por defecto el compartido del proceso)
+            loading_profile: 'full', 'light' o 'minimal' (por defecto BROWSE_LOADING_PROFILE)
         """
         self.llm = llm
+        self.pool = pool or get_shared_browser_pool()
+        self.loading_profile = get_loading_profile(loading_profile)
+
+        from ...config import BROWSE_SNAPSHOT_CONTENT_CHARS, BROWSE_SNAPSHOT_MAX_ELEMENTS
+        self.snapshot_max_elements = BROWSE_SNAPSHOT_MAX_ELEMENTS
+        self.snapshot_content_chars = BROWSE_SNAPSHOT_CONTENT_CHARS
         super().__init__()
 
     def run(
@@ -97,123 +114,187 @@ Example queries:
             }
         """
         try:
-            # Validar parámetros
-            if not url or not url.strip():
-                return {
-                    'success': False,
-                    'error': 'URL cannot be empty'
-                }
+            error, url = self._validate(url, query)
+            if error:
+                return error
+            return self.pool.run(self._navigate(url, query, max_steps, timeout), self._total_timeout(max_steps, timeout))
 
-            if not query or not query.strip():
-                return {
-                    'success': False,
-                    'error': 'Query cannot be empty'
-                }
+        except TimeoutError:
+            return self._timeout_error(max_steps, timeout)
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"[BROWSE_INTERACTIVE] Error: {error_msg}", exc_info=True)
 
-            # Validar que sea HTTPS
-            if url.startswith('http://'):
-                url = url.replace('http://', 'https://', 1)
-                logger.info(f"[BROWSE_INTERACTIVE] Upgraded to HTTPS: {url}")
+            return {
+                'success': False,
+                'error': f'Interactive browsing error: {error_msg}'
+            }
 
-            logger.info(f"[BROWSE_INTERACTIVE] Navegando: {url}")
-            logger.info(f"[BROWSE_INTERACTIVE] Query: {query}")
+    async def arun(
+        self,
+        url: str,
+        query: str,
+        max_steps: int = 10,
+        timeout: int = 30000
+    ) -> Dict[str, Any]:
+        """
+        Versión async de run(): puede llamarse desde cualquier event loop.
 
-            # Importar Playwright
-            try:
-                from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-            except ImportError:
-                return {
-                    'success': False,
-                    'error': 'Playwright not installed. Run: pip install playwright && playwright install chromium'
-                }
+        La navegación se ejecuta en el loop del pool de navegadores.
+        """
+        try:
+            error, url = self._validate(url, query)
+            if error:
+                return error
+            return await self.pool.arun(
+                self._navigate(url, query, max_steps, timeout), self._total_timeout(max_steps, timeout)
+            )
+
+        except TimeoutError:
+            return self._timeout_error(max_steps, timeout)
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"[BROWSE_INTERACTIVE] Error: {error_msg}", exc_info=True)
 
-            actions_taken = []
+            return {
+                'success': False,
+                'error': f'Interactive browsing error: {error_msg}'
+            }
 
-            with sync_playwright() as p:
-                # Lanzar navegador (headless para producción)
-                browser = p.chromium.launch(headless=True)
+    @staticmethod
+    def _total_timeout(max_steps: int, timeout: int) -> float:
+        """Tiempo máximo de la navegación completa (segundos): un timeout por paso más la carga inicial."""
+        return timeout / 1000 * (max_steps + 1)
 
-                try:
-                    # Crear contexto con user agent realista
-                    context = browser.new_context(
-                        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                        viewport={'width': 1920, 'height': 1080},
-                        locale='es-ES'
-                    )
+    def _timeout_error(self, max_steps: int, timeout: int) -> Dict[str, Any]:
+        total = self._total_timeout(max_steps, timeout)
+        logger.warning(f"[BROWSE_INTERACTIVE] Navegación cancelada tras {total:.0f}s")
+        return {
+            'success': False,
+            'error': f'Interactive browsing timed out after {total:.0f}s'
+        }
 
-                    page = context.new_page()
+    def _validate(self, url: str, query: str):
+        """
+        Valida los parámetros y comprueba que Playwright esté instalado.
 
-                    # Navegar a la página
-                    logger.info(f"[BROWSE_INTERACTIVE] Cargando página...")
-                    page.goto(url, wait_until='domcontentloaded', timeout=timeout)
-                    actions_taken.append(f"Navigated to {url}")
+        Returns:
+            Tupla (dict de error o None, url normalizada)
+        """
+        # Validar parámetros
+        if not url or not url.strip():
+            return {
+                'success': False,
+                'error': 'URL cannot be empty'
+            }, url
 
-                    # Esperar a que la página se estabilice
-                    page.wait_for_load_state('networkidle', timeout=timeout)
-                    actions_taken.append("Waited for page to stabilize")
+        if not query or not query.strip():
+            return {
+                'success': False,
+                'error': 'Query cannot be empty'
+            }, url
 
-                    # Analizar la página y ejecutar acciones inteligentes
-                    logger.info(f"[BROWSE_INTERACTIVE] Analizando página para: '{query}'")
+        # Validar que sea HTTPS
+        if url.startswith('http://'):
+            url = url.replace('http://', 'https://', 1)
+            logger.info(f"[BROWSE_INTERACTIVE] Upgraded to HTTPS: {url}")
 
-                    # Extraer contenido inicial
-                    initial_content = self._extract_page_content(page)
+        # Comprobar Playwright
+        if importlib.util.find_spec('playwright') is None:
+            return {
+                'success': False,
+                'error': 'Playwright not installed. Run: pip install playwright && playwright install chromium'
+            }, url
 
-                    # Si el LLM está disponible, usarlo para navegación inteligente
-                    if self.llm:
-                        result = self._smart_navigation(
-                            page=page,
-                            query=query,
-                            initial_content=initial_content,
-                            max_steps=max_steps,
-                            actions_taken=actions_taken,
-                            timeout=timeout
-                        )
-                    else:
-                        # Navegación básica sin LLM
-                        result = self._basic_extraction(
-                            page=page,
-                            query=query,
-                            initial_content=initial_content
-                        )
+        return None, url
 
-                    final_url = page.url
+    async def _navigate(self, url: str, query: str, max_steps: int, timeout: int) -> Dict[str, Any]:
+        """
+        Navegación completa en una página del pool (se ejecuta en el loop del pool).
+        """
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
-                    browser.close()
+        logger.info(f"[BROWSE_INTERACTIVE] Navegando: {url}")
+        logger.info(f"[BROWSE_INTERACTIVE] Query: {query}")
 
-                    logger.info(f"[BROWSE_INTERACTIVE] Navegación completada. {len(actions_taken)} acciones ejecutadas")
+        actions_taken = []
+        profile = self.loading_profile
 
-                    return {
-                        'success': True,
-                        'data': {
-                            'url': url,
-                            'query': query,
-                            'answer': result['answer'],
-                            'content': result['content'],
-                            'actions_taken': actions_taken,
-                            'final_url': final_url
-                        }
-                    }
+        try:
+            # Contexto aislado con user agent realista sobre un navegador ya lanzado
+            async with self.pool.page(
+                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+                viewport=profile['viewport'],
+                locale='es-ES'
+            ) as page:
+                # Abortar recursos pesados y trackers según el perfil de carga
+                request_stats = await apply_loading_profile(page, profile)
+
+                # Navegar a la página
+                logger.info(f"[BROWSE_INTERACTIVE] Cargando página (perfil {profile['name']})...")
+                await page.goto(url, wait_until=profile['wait_until'], timeout=timeout)
+                actions_taken.append(f"Navigated to {url}")
+
+                # Esperar a que la página esté lista
+                await wait_until_ready(page, profile, timeout)
+                actions_taken.append("Waited for page to stabilize")
+
+                # Analizar la página y ejecutar acciones inteligentes
+                logger.info(f"[BROWSE_INTERACTIVE] Analizando página para: '{query}'")
+
+                # Numerar los elementos interactivos antes de extraer el texto
+                # (la extracción elimina nav/header/footer del DOM)
+                elements = await snapshot_interactive_elements(page, self.snapshot_max_elements) if self.llm else []
+
+                # Extraer contenido inicial
+                initial_content = await self._extract_page_content(page)
+
+                # Si el LLM está disponible, usarlo para navegación inteligente
+                if self.llm:
+                    result = await self._smart_navigation(
+                        page=page,
+                        query=query,
+                        initial_content=initial_content,
+                        max_steps=max_steps,
+                        actions_taken=actions_taken,
+                        timeout=timeout,
+                        elements=elements
+                    )
+                else:
+                    # Navegación básica sin LLM
+                    result = self._basic_extraction(
+                        page=page,
+                        query=query,
+                        initial_content=initial_content
+                    )
 
-                except PlaywrightTimeoutError as e:
-                    browser.close()
-                    return {
-                        'success': False,
-                        'error': f'Navigation timeout: {str(e)}. The page took too long to load or respond.'
-                    }
-                except Exception as e:
-                    browser.close()
-                    raise e
+                final_url = page.url
 
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"[BROWSE_INTERACTIVE] Error: {error_msg}", exc_info=True)
+            logger.info(
+                f"[BROWSE_INTERACTIVE] Navegación completada. {len(actions_taken)} acciones ejecutadas, "
+                f"{request_stats['blocked']} peticiones bloqueadas"
+            )
+
+            return {
+                'success': True,
+                'data': {
+                    'url': url,
+                    'query': query,
+                    'answer': result['answer'],
+                    'content': result['content'],
+                    'actions_taken': actions_taken,
+                    'final_url': final_url,
+                    'blocked_requests': request_stats['blocked']
+                }
+            }
 
+        except PlaywrightTimeoutError as e:
             return {
                 'success': False,
-                'error': f'Interactive browsing error: {error_msg}'
+                'error': f'Navigation timeout: {str(e)}. The page took too long to load or respond.'
             }
 
-    def _extract_page_content(self, page) -> str:
+    async def _extract_page_content(self, page) -> str:
         """
         Extrae el contenido textual relevante de la página.
 
@@ -224,14 +305,24 @@ Example queries:
             Contenido textual limpio
         """
         try:
-            # Extraer texto del body, excluyendo scripts y estilos
-            content = page.evaluate('''() => {
-                // Remover elementos no deseados
-                const unwanted = document.querySelectorAll('script, style, nav, header, footer, .cookie-banner, .advertisement');
-                unwanted.forEach(el => el.remove());
-
-                // Obtener texto del body
-                return document.body.innerText;
+            # Extraer texto del body, excluyendo scripts y estilos. Se trabaja sobre una
+            # copia: los elementos numerados del snapshot (botón de aceptar cookies, buscador
+            # de la cabecera...) tienen que seguir en el DOM para poder hacer clic en ellos
+            content = await page.evaluate('''() => {
+                const clone = document.body.cloneNode(true);
+                clone.querySelectorAll('script, style, nav, header, footer, .cookie-banner, .advertisement')
+                    .forEach(el => el.remove());
+                clone.querySelectorAll('[data-agent-idx]').forEach(el => el.removeAttribute('data-agent-idx'));
+
+                // innerText solo conserva los saltos de línea en nodos renderizados
+                const box = document.createElement('div');
+                box.setAttribute('aria-hidden', 'true');
+                box.style.cssText = 'position:absolute;left:-100000px;top:0;width:1280px;';
+                box.appendChild(clone);
+                document.documentElement.appendChild(box);
+                const text = box.innerText;
+                box.remove();
+                return text;
             }''')
 
             # Limpiar contenido
@@ -270,20 +361,22 @@ Example queries:
             'content': initial_content
         }
 
-    def _smart_navigation(
+    async def _smart_navigation(
         self,
         page,
         query: str,
         initial_content: str,
         max_steps: int,
         actions_taken: List[str],
-        timeout: int
+        timeout: int,
+        elements: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, str]:
         """
         Navegación inteligente guiada por LLM.
 
         Analiza la página y decide qué acciones tomar (clicks, búsquedas, etc.)
-        para encontrar la información solicitada.
+        para encontrar la información solicitada. El LLM recibe los elementos
+        interactivos numerados y responde con el número del elemento a usar.
 
         Args:
             page: Playwright Page
@@ -292,6 +385,7 @@ Example queries:
             max_steps: Máximo de pasos
             actions_taken: Lista de acciones para logging
             timeout: Timeout por acción
+            elements: Snapshot de elementos interactivos (ver core/page_snapshot.py)
 
         Returns:
             Dict con 'answer' y 'content'
@@ -305,7 +399,10 @@ Example queries:
 URL: {page.url}
 
 **CONTENIDO VISIBLE:**
-{initial_content[:3000]}
+{initial_content[:self.snapshot_content_chars]}
+
+**ELEMENTOS INTERACTIVOS ([número] rol "nombre"):**
+{format_snapshot(elements or [])}
 
 **QUERY DEL USUARIO:**
 "{query}"
@@ -325,19 +422,19 @@ REASONING: [Explica por qué]
 ANSWER: [Respuesta directa a la query del usuario basada en el contenido]
 
 [Si ACTION = CLICK]
-SELECTOR: [Descripción del elemento a clickear, ej: "botón de Documentación", "tab de Detalles"]
+ELEMENT: [Número del elemento a clickear de la lista, ej: 3]
 
 [Si ACTION = SEARCH]
+ELEMENT: [Número del campo de búsqueda de la lista]
 SEARCH_TERM: [Término a buscar]
-SEARCH_FIELD_SELECTOR: [Descripción del campo de búsqueda]
 
 [Si ACTION = NOT_FOUND]
 ANSWER: No se pudo encontrar la información solicitada en esta página.
 """
 
         try:
-            # Llamar al LLM
-            response = self.llm.invoke(navigation_prompt)
+            # Llamar al LLM en un hilo para no bloquear el loop del pool
+            response = await asyncio.to_thread(self.llm.invoke, navigation_prompt)
             llm_decision = response.content
 
             logger.info(f"[BROWSE_INTERACTIVE] LLM Decision:\n{llm_decision[:500]}")
@@ -353,29 +450,47 @@ ANSWER: No se pudo encontrar la información solicitada en esta página.
                 }
 
             elif 'ACTION: CLICK' in llm_decision and len(actions_taken) < max_steps:
-                # Necesita hacer click en algo
-                selector_desc = self._extract_selector_from_llm_response(llm_decision)
-
-                # Intentar encontrar y clickear el elemento
-                clicked = self._smart_click(page, selector_desc, timeout)
+                # Necesita hacer click en algo: por número de elemento o, si el número no
+                # existe o el LLM dio un nombre ("ELEMENT: Ver ofertas"), por ese nombre
+                element_ref = self._extract_element_from_llm_response(llm_decision)
+                element = (self._find_element(elements, parse_element_index(llm_decision))
+                           or self._find_element_by_name(elements, element_ref))
+                if element:
+                    selector_desc = f'[{element["index"]}] {element["role"]} "{element["name"]}"'
+                    clicked = await self._click_element(page, element['index'], timeout)
+                    if not clicked:
+                        # El elemento pudo quedar obsoleto: buscarlo por su nombre
+                        clicked = await self._smart_click(page, element['name'], timeout)
+                elif element_ref and parse_element_index(llm_decision) is None:
+                    selector_desc = element_ref
+                    clicked = await self._smart_click(page, selector_desc, timeout)
+                else:
+                    # Sin número válido ni nombre: no hay nada razonable que clickear
+                    actions_taken.append(f"LLM chose no valid element: {element_ref or '(vacío)'}")
+                    return {
+                        'answer': "Information not found: no valid element to click on this page.",
+                        'content': initial_content
+                    }
 
                 if clicked:
                     actions_taken.append(f"Clicked on: {selector_desc}")
 
                     # Esperar a que se cargue el nuevo contenido
-                    page.wait_for_load_state('networkidle', timeout=timeout)
+                    await wait_until_ready(page, self.loading_profile, timeout)
 
-                    # Extraer nuevo contenido
-                    new_content = self._extract_page_content(page)
+                    # Nuevo snapshot y contenido
+                    new_elements = await snapshot_interactive_elements(page, self.snapshot_max_elements)
+                    new_content = await self._extract_page_content(page)
 
                     # Recursión con el nuevo contenido (limitado por max_steps)
-                    return self._smart_navigation(
+                    return await self._smart_navigation(
                         page=page,
                         query=query,
                         initial_content=new_content,
                         max_steps=max_steps - 1,
                         actions_taken=actions_taken,
-                        timeout=timeout
+                        timeout=timeout,
+                        elements=new_elements
                     )
                 else:
                     # No se pudo clickear, retornar contenido actual
@@ -389,25 +504,32 @@ ANSWER: No se pudo encontrar la información solicitada en esta página.
                 # Necesita buscar en un formulario
                 search_term = self._extract_search_term_from_llm_response(llm_decision)
 
-                # Intentar buscar
-                searched = self._smart_search(page, search_term, timeout)
+                # Intentar buscar en el campo indicado o, si no lo hay, en uno típico de búsqueda
+                element = self._find_element(elements, parse_element_index(llm_decision))
+                searched = False
+                if element:
+                    searched = await self._search_in_element(page, element['index'], search_term, timeout)
+                if not searched:
+                    searched = await self._smart_search(page, search_term, timeout)
 
                 if searched:
                     actions_taken.append(f"Searched for: {search_term}")
 
                     # Esperar resultados
-                    page.wait_for_load_state('networkidle', timeout=timeout)
+                    await wait_until_ready(page, self.loading_profile, timeout)
 
                     # Extraer resultados
-                    new_content = self._extract_page_content(page)
+                    new_elements = await snapshot_interactive_elements(page, self.snapshot_max_elements)
+                    new_content = await self._extract_page_content(page)
 
-                    return self._smart_navigation(
+                    return await self._smart_navigation(
                         page=page,
                         query=query,
                         initial_content=new_content,
                         max_steps=max_steps - 1,
                         actions_taken=actions_taken,
-                        timeout=timeout
+                        timeout=timeout,
+                        elements=new_elements
                     )
                 else:
                     actions_taken.append(f"Failed to search for: {search_term}")
@@ -429,7 +551,64 @@ ANSWER: No se pudo encontrar la información solicitada en esta página.
             # Fallback a extracción básica
             return self._basic_extraction(page, query, initial_content)
 
-    def _smart_click(self, page, selector_description: str, timeout: int) -> bool:
+    @staticmethod
+    def _find_element(elements: Optional[List[Dict[str, Any]]], index: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Devuelve el elemento del snapshot con ese número (o None)."""
+        if index is None:
+            return None
+        return next((element for element in elements or [] if element['index'] == index), None)
+
+    @staticmethod
+    def _find_element_by_name(elements: Optional[List[Dict[str, Any]]], name: str) -> Optional[Dict[str, Any]]:
+        """Elemento del snapshot cuyo nombre coincide con el que dio el LLM (exacto o contenido)."""
+        # 'ELEMENT: [7] link "Ver ofertas"' -> 'Ver ofertas'
+        quoted = re.search(r'"([^"]+)"', name or '')
+        wanted = ' '.join((quoted.group(1) if quoted else name or '').lower().split())
+        if not wanted or wanted.isdigit():
+            return None
+
+        candidates = [element for element in elements or [] if element.get('name')]
+        for matches in (lambda n: n == wanted, lambda n: wanted in n):
+            for element in candidates:
+                if matches(' '.join(element['name'].lower().split())):
+                    return element
+        return None
+
+    async def _click_element(self, page, index: int, timeout: int) -> bool:
+        """
+        Hace click en el elemento numerado del snapshot.
+
+        Returns:
+            True si tuvo éxito, False si no
+        """
+        try:
+            await page.locator(element_selector(index)).first.click(timeout=timeout)
+            logger.info(f"[BROWSE_INTERACTIVE] Click exitoso en elemento [{index}]")
+            return True
+        except Exception as e:
+            logger.warning(f"[BROWSE_INTERACTIVE] No se pudo clickear el elemento [{index}]: {e}")
+            return False
+
+    async def _search_in_element(self, page, index: int, search_term: str, timeout: int) -> bool:
+        """
+        Escribe el término en el campo numerado del snapshot y envía con Enter.
+
+        Returns:
+            True si tuvo éxito, False si no
+        """
+        if not search_term:
+            return False
+        try:
+            search_field = page.locator(element_selector(index)).first
+            await search_field.fill(search_term, timeout=timeout)
+            await search_field.press('Enter', timeout=timeout)
+            logger.info(f"[BROWSE_INTERACTIVE] Búsqueda exitosa en elemento [{index}]: {search_term}")
+            return True
+        except Exception as e:
+            logger.warning(f"[BROWSE_INTERACTIVE] No se pudo buscar en el elemento [{index}]: {e}")
+            return False
+
+    async def _smart_click(self, page, selector_description: str, timeout: int) -> bool:
         """
         Intenta hacer click en un elemento basándose en una descripción.
 
@@ -465,8 +644,8 @@ ANSWER: No se pudo encontrar la información solicitada en esta página.
             for selector in selectors:
                 try:
                     element = page.locator(selector).first
-                    if element.is_visible(timeout=5000):
-                        element.click(timeout=timeout)
+                    if await element.is_visible(timeout=5000):
+                        await element.click(timeout=timeout)
                         logger.info(f"[BROWSE_INTERACTIVE] Click exitoso con selector: {selector}")
                         return True
                 except Exception:
@@ -479,7 +658,7 @@ ANSWER: No se pudo encontrar la información solicitada en esta página.
             logger.error(f"[BROWSE_INTERACTIVE] Error en click: {e}")
             return False
 
-    def _smart_search(self, page, search_term: str, timeout: int) -> bool:
+    async def _smart_search(self, page, search_term: str, timeout: int) -> bool:
         """
         Intenta realizar una búsqueda en la página.
 
@@ -506,17 +685,17 @@ ANSWER: No se pudo encontrar la información solicitada en esta página.
             for selector in search_selectors:
                 try:
                     search_field = page.locator(selector).first
-                    if search_field.is_visible(timeout=5000):
+                    if await search_field.is_visible(timeout=5000):
                         # Llenar campo
-                        search_field.fill(search_term)
+                        await search_field.fill(search_term)
 
                         # Presionar Enter o buscar botón submit
                         try:
-                            search_field.press('Enter')
+                            await search_field.press('Enter')
                         except Exception:
                             # Buscar botón de búsqueda
                             submit_btn = page.locator('button[type="submit"]').first
-                            submit_btn.click(timeout=timeout)
+                            await submit_btn.click(timeout=timeout)
 
                         logger.info(f"[BROWSE_INTERACTIVE] Búsqueda exitosa: {search_term}")
                         return True
@@ -536,7 +715,7 @@ ANSWER: No se pudo encontrar la información solicitada en esta página.
             if 'ANSWER:' in llm_response:
                 answer_part = llm_response.split('ANSWER:')[1]
                 # Tomar hasta el próximo campo o final
-                for delimiter in ['\n\n[', '\nSELECTOR:', '\nSEARCH_TERM:']:
+                for delimiter in ['\n\n[', '\nELEMENT:', '\nSEARCH_TERM:']:
                     if delimiter in answer_part:
                         answer_part = answer_part.split(delimiter)[0]
                 return answer_part.strip()
@@ -544,15 +723,15 @@ ANSWER: No se pudo encontrar la información solicitada en esta página.
         except Exception:
             return llm_response.strip()
 
-    def _extract_selector_from_llm_response(self, llm_response: str) -> str:
-        """Extrae el selector del LLM."""
+    def _extract_element_from_llm_response(self, llm_response: str) -> str:
+        """Extrae el valor de 'ELEMENT:' tal cual lo escribió el LLM ('' si no lo hay)."""
         try:
-            if 'SELECTOR:' in llm_response:
-                selector = llm_response.split('SELECTOR:')[1].split('\n')[0]
-                return selector.strip()
-            return "link or button"
+            if 'ELEMENT:' in llm_response:
+                element = llm_response.split('ELEMENT:')[1].split('\n')[0]
+                return element.strip().strip('[]').strip()
+            return ""
         except Exception:
-            return "link or button"
+            return ""
 
     def _extract_search_term_from_llm_response(self, llm_response: str) -> str:
         """Extrae el término de búsqueda del LLM."""
@@ -1,19 +1,32 @@
 # -*- coding: utf-8 -*-
 """
 Tool para navegar y extraer contenido de páginas web.
-Utiliza BeautifulSoup + Requests para scraping.
+Utiliza Requests + lxml (BeautifulSoup como fallback) para scraping.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 import logging
+import re
 from ..core.base import BaseTool
+from ..core.host_health import HostUnavailable
+from ..core.http_fetcher import PageFetcher, get_shared_fetcher
+from ..core.page_cache import PageCache, get_shared_page_cache
+from ..core.html_extractors import BaseExtractor, BeautifulSoupExtractor, get_extractor
+from ..core.text_ranking import rank_chunks
 import requests
-from bs4 import BeautifulSoup
-import re
 
 logger = logging.getLogger(__name__)
 
 
+# Respuesta negativa del LLM: 'NO' o, en modo summary, 'NO | notas parciales'
+NEGATIVE_ANSWER_PATTERN = re.compile(r'^NO\s*(?:\|\s*(.*))?$', re.IGNORECASE | re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación rápida de tokens (~3.5 caracteres por token en texto técnico/español)."""
+    return int(len(text) / 3.5)
+
+
 class BrowseWebpageTool(BaseTool):
     """
     Tool para extraer y leer el contenido de una página web con extracción progresiva inteligente.
@@ -66,20 +79,44 @@ Output:
   - If found: The extracted answer to the user_query
   - If not found: A message indicating the information was not found"""
 
-    def __init__(self, default_max_chars: int = 10000, default_chunk_size: int = 1250):
+    def __init__(self, default_max_chars: int = 10000, default_chunk_size: int = 1250,
+                 fetcher: PageFetcher = None, page_cache: PageCache = None,
+                 extractor: BaseExtractor = None, extraction_mode: str = None,
+                 history_mode: str = None, history_budget: int = None):
         """
         Inicializa la tool.
 
         Args:
             default_max_chars: Número máximo de caracteres por defecto (configurable por usuario)
             default_chunk_size: Tamaño de cada fragmento para extracción progresiva
+            fetcher: Cliente HTTP a usar (por defecto el pool compartido del proceso)
+            page_cache: Cache en disco de páginas extraídas (por defecto la compartida en DATA_DIR)
+            extractor: Backend HTML → texto (por defecto BROWSE_EXTRACTOR)
+            extraction_mode: 'retrieval' o 'sequential' (por defecto BROWSE_EXTRACTION_MODE)
+            history_mode: Contexto del recorrido secuencial: 'full', 'window' o 'summary'
+                          (por defecto BROWSE_HISTORY_MODE)
+            history_budget: Tokens máximos de contexto previo en 'window'/'summary'
+                            (por defecto BROWSE_HISTORY_BUDGET_TOKENS)
         """
+        from ...config import (
+            BROWSE_EXTRACTION_MODE, BROWSE_HISTORY_BUDGET_TOKENS, BROWSE_HISTORY_MODE,
+            BROWSE_RETRIEVAL_MIN_SCORE, BROWSE_RETRIEVAL_TOP_N
+        )
+
         self.default_max_chars = default_max_chars
         self.default_chunk_size = default_chunk_size
+        self.fetcher = fetcher or get_shared_fetcher()
+        self.page_cache = page_cache if page_cache is not None else get_shared_page_cache()
+        self.extractor = extractor or get_extractor()
+        self.extraction_mode = extraction_mode or BROWSE_EXTRACTION_MODE
+        self.retrieval_top_n = BROWSE_RETRIEVAL_TOP_N
+        self.retrieval_min_score = BROWSE_RETRIEVAL_MIN_SCORE
+        self.history_mode = history_mode or BROWSE_HISTORY_MODE
+        self.history_budget = history_budget if history_budget is not None else BROWSE_HISTORY_BUDGET_TOKENS
         super().__init__()
 
     def run(self, url: str, user_query: str = None, max_chars: int = None,
-            chunk_size: int = None, llm = None) -> Dict[str, Any]:
+            chunk_size: int = None, llm = None, max_age: int = None) -> Dict[str, Any]:
         """
         Navega a una URL y extrae información específica usando extracción progresiva.
 
@@ -89,6 +126,8 @@ Output:
             max_chars: Número máximo de caracteres a procesar (si es None, usa default_max_chars)
             chunk_size: Tamaño de cada fragmento para análisis (si es None, usa default_chunk_size)
             llm: Instancia del LLM para verificación de chunks (ChatOpenAI, ChatGemini, etc.)
+            max_age: Segundos durante los que se acepta la copia cacheada sin revalidar
+                     (si es None, usa BROWSE_CACHE_MAX_AGE; 0 fuerza la revalidación)
 
         Returns:
             Dict con formato:
@@ -101,7 +140,9 @@ Output:
                     'found': bool (si encontró la respuesta),
                     'chunks_processed': int,
                     'chars_analyzed': int,
-                    'chars_saved': int
+                    'chars_saved': int,
+                    'strategy': str, 'llm_calls': int, 'llm_calls_saved': int,
+                    'cache': 'hit' | 'revalidated' | 'miss'
                 },
                 'error': str (si success=False)
             }
@@ -129,66 +170,15 @@ Output:
 
             logger.info(f"[BROWSE] Navegando a: {url}")
 
-            # Configurar headers para simular un navegador
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-            }
-
-            # Realizar request con timeout
-            response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-            response.raise_for_status()
-
-            # Detectar encoding
-            if response.encoding is None or response.encoding == 'ISO-8859-1':
-                # Intentar detectar desde content-type o meta tags
-                response.encoding = response.apparent_encoding
-
-            # Parsear HTML con BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Extraer título
-            title = ''
-            if soup.title:
-                title = soup.title.string.strip() if soup.title.string else ''
-
-            # Si no hay title tag, buscar h1
-            if not title and soup.h1:
-                title = soup.h1.get_text().strip()
-
-            # Eliminar scripts, styles, y otros elementos no deseados
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript']):
-                element.decompose()
-
-            # Intentar encontrar el contenido principal
-            # Priorizar elementos semánticos HTML5
-            main_content = None
-            for tag in ['main', 'article', 'div[role="main"]', '.content', '.main-content', '#content', '#main']:
-                main_content = soup.select_one(tag)
-                if main_content:
-                    break
-
-            # Si no se encuentra contenido principal, usar body
-            if not main_content:
-                main_content = soup.body if soup.body else soup
-
-            # Extraer texto
-            text = main_content.get_text(separator='\n', strip=True)
-
-            # Limpiar texto
-            # Eliminar líneas vacías múltiples
-            text = re.sub(r'\n\s*\n', '\n\n', text)
-            # Eliminar espacios múltiples
-            text = re.sub(r' +', ' ', text)
-            # Eliminar tabulaciones
-            text = re.sub(r'\t+', ' ', text)
+            # Descargar (o servir desde la cache en disco) y extraer el texto limpio
+            title, text, complete, cache_status = self._fetch_page_text(url, max_chars, max_age)
 
             # Limitar longitud
             if len(text) > max_chars:
-                text = text[:max_chars] + f"\n\n[Content truncated. Total length: {len(text)} chars, showing first {max_chars} chars]"
+                if complete:
+                    text = text[:max_chars] + f"\n\n[Content truncated. Total length: {len(text)} chars, showing first {max_chars} chars]"
+                else:
+                    text = text[:max_chars] + f"\n\n[Content truncated. Showing first {max_chars} chars]"
 
             if not text.strip():
                 return {
@@ -201,7 +191,7 @@ Output:
             # Si se proporciona user_query y LLM, usar extracción progresiva
             if user_query and llm:
                 logger.info(f"[BROWSE] Iniciando extracción progresiva con user_query: {user_query}")
-                return self._progressive_extraction(
+                result = self._progressive_extraction(
                     url=url,
                     title=title,
                     full_text=text.strip(),
@@ -210,6 +200,9 @@ Output:
                     chunk_size=chunk_size,
                     llm=llm
                 )
+                if result.get('success'):
+                    result['data']['cache'] = cache_status
+                return result
 
             # Si no hay user_query, retornar contenido completo (modo legacy)
             return {
@@ -218,15 +211,26 @@ Output:
                     'url': url,
                     'title': title,
                     'content': text.strip(),
-                    'length': len(text.strip())
+                    'length': len(text.strip()),
+                    'cache': cache_status
                 }
             }
 
+        except HostUnavailable as e:
+            logger.warning(f"[BROWSE] Host en cooldown, no se descarga {url}")
+            return {
+                'success': False,
+                'error': (
+                    f'The website {url} has been failing repeatedly (timeouts or blocked access). '
+                    f'Skipping it for {e.retry_after:.0f} more seconds.'
+                )
+            }
+
         except requests.exceptions.Timeout:
             logger.error(f"[BROWSE] Timeout navegando a {url}")
             return {
                 'success': False,
-                'error': f'Request timeout after 15 seconds. The webpage {url} took too long to respond.'
+                'error': f'Request timeout after {self.fetcher.timeout:g} seconds. The webpage {url} took too long to respond.'
             }
 
         except requests.exceptions.HTTPError as e:
@@ -269,11 +273,127 @@ Output:
                 'error': f'Error browsing webpage: {error_msg}'
             }
 
+    def _fetch_page_text(self, url: str, max_chars: int = None, max_age: int = None):
+        """
+        Obtiene título y texto limpio de la URL, usando la cache en disco si está activa.
+
+        La extracción se detiene al superar max_chars; una copia cacheada incompleta
+        más corta que el max_chars pedido se descarga de nuevo.
+
+        - Copia cacheada dentro de max_age → se sirve sin red ('hit')
+        - Copia antigua → GET condicional (If-None-Match / If-Modified-Since);
+          un 304 la renueva sin descargar el cuerpo ('revalidated')
+        - Sin copia o contenido cambiado → descarga y extracción completas ('miss')
+
+        Returns:
+            Tupla (title, text, complete, cache_status). Lanza las excepciones de requests.
+        """
+        cache = self.page_cache
+        entry = cache.get(url) if cache else None
+
+        if entry and not entry.get('complete', True) and max_chars is not None and len(entry['text']) <= max_chars:
+            entry = None
+
+        if entry and cache.is_fresh(entry, max_age):
+            logger.info(f"[BROWSE] Cache hit: {url}")
+            cache.record('hits')
+            return entry['title'], entry['text'], entry.get('complete', True), 'hit'
+
+        headers = cache.conditional_headers(entry) if entry else {}
+
+        # Realizar request sobre el pool compartido (keep-alive, límite por host)
+        response = self.fetcher.get(url, headers=headers)
+
+        if entry and response.status_code == 304:
+            logger.info(f"[BROWSE] Página sin cambios (304): {url}")
+            cache.touch(url, entry)
+            cache.record('revalidated')
+            return entry['title'], entry['text'], entry.get('complete', True), 'revalidated'
+
+        response.raise_for_status()
+
+        # Detectar encoding
+        if response.encoding is None or response.encoding == 'ISO-8859-1':
+            # Intentar detectar desde content-type o meta tags
+            response.encoding = response.apparent_encoding
+
+        title, text, complete = self._extract_text(response.text, max_chars)
+
+        if cache:
+            cache.record('misses', len(response.content))
+            if text.strip():
+                cache.set(
+                    url, title, text,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                    complete=complete
+                )
+
+        return title, text, complete, 'miss'
+
+    def _extract_text(self, html: str, max_chars: int = None):
+        """
+        Extrae el título y el texto principal limpio de un HTML.
+
+        Usa el extractor configurado y, si falla o no obtiene texto, la
+        implementación con BeautifulSoup.
+
+        Returns:
+            Tupla (title, text, complete)
+        """
+        try:
+            title, text, complete = self.extractor.extract(html, max_chars=max_chars)
+            if text.strip():
+                return title, text, complete
+        except Exception as e:
+            logger.warning(f"[BROWSE] Extractor '{self.extractor.name}' falló, usando BeautifulSoup: {e}")
+
+        if isinstance(self.extractor, BeautifulSoupExtractor):
+            return '', '', True
+        return BeautifulSoupExtractor().extract(html, max_chars=max_chars)
+
+    def run_many(self, urls: List[str], max_workers: int = 8, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Ejecuta run() sobre varias URLs en paralelo, reutilizando las conexiones del pool.
+
+        Args:
+            urls: URLs a navegar
+            max_workers: Hilos simultáneos (el límite por host lo aplica el fetcher)
+            **kwargs: Parámetros de run() comunes a todas las URLs
+
+        Returns:
+            Lista de resultados de run() en el mismo orden que urls
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if not urls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as executor:
+            return list(executor.map(lambda url: self.run(url=url, **kwargs), urls))
+
+    # Instrucciones comunes a los dos modos de extracción
+    VERIFICATION_SYSTEM_PROMPT = (
+        "Eres un asistente que analiza fragmentos de páginas web para extraer información específica.\n\n"
+        "INSTRUCCIONES:\n"
+        "- Si el fragmento actual NO contiene suficiente información para responder la pregunta → Responde EXACTAMENTE: 'NO'\n"
+        "- Si el fragmento actual SÍ contiene suficiente información → Responde DIRECTAMENTE con la respuesta completa y precisa\n"
+        "- No uses frases como 'Según el fragmento' o 'El texto dice'. Responde directamente.\n"
+        "- Se conciso pero completo. Da la respuesta exacta que el usuario necesita.\n"
+        "- Puedes usar información de fragmentos anteriores que ya has visto para construir una respuesta completa."
+    )
+
     def _progressive_extraction(self, url: str, title: str, full_text: str,
                                 user_query: str, max_chars: int, chunk_size: int,
-                                llm) -> Dict[str, Any]:
+                                llm, mode: str = None) -> Dict[str, Any]:
         """
-        Extrae información progresivamente, chunk por chunk, usando contexto conversacional.
+        Extrae la respuesta a user_query del texto de la página.
+
+        Modos:
+        - 'retrieval': ordena los fragmentos localmente con BM25 frente a user_query y
+          envía solo los top-N en una única llamada al LLM. Si ningún fragmento es
+          relevante o el LLM responde 'NO', recorre secuencialmente el resto.
+        - 'sequential': recorre los fragmentos uno a uno con contexto conversacional.
 
         Args:
             url: URL de la página
@@ -283,6 +403,7 @@ Output:
             max_chars: Límite máximo de caracteres a procesar
             chunk_size: Tamaño de cada fragmento
             llm: Instancia del LLM para verificación
+            mode: 'retrieval' o 'sequential' (si es None, usa el de la tool)
 
         Returns:
             Dict con la respuesta extraída o mensaje de no encontrado
@@ -290,104 +411,27 @@ Output:
         try:
             # Limitar el texto al max_chars
             text_to_process = full_text[:max_chars] if len(full_text) > max_chars else full_text
+            chunks = [text_to_process[i:i + chunk_size] for i in range(0, len(text_to_process), chunk_size)]
+
+            mode = mode or self.extraction_mode
+            logger.info(
+                f"[BROWSE] Extracción ({mode}): {len(text_to_process)} chars totales, "
+                f"{len(chunks)} chunks de {chunk_size} chars"
+            )
+
+            if mode == 'retrieval' and len(chunks) > 1:
+                result, seen = self._retrieval_extraction(url, title, chunks, user_query, llm)
+                if result is not None:
+                    return result
+
+                # Baja confianza: recorrer secuencialmente los fragmentos no enviados aún
+                logger.info("[BROWSE] Retrieval sin respuesta, recorriendo el resto secuencialmente")
+                return self._sequential_extraction(
+                    url, title, chunks, user_query, llm,
+                    skip=seen, previous_calls=1 if seen else 0, strategy='retrieval+sequential'
+                )
 
-            # Inicializar contexto conversacional
-            verification_messages = [
-                {
-                    "role": "system",
-                    "content": (
-                        "Eres un asistente que analiza fragmentos de páginas web para extraer información específica.\n\n"
-                        "INSTRUCCIONES:\n"
-                        "- Si el fragmento actual NO contiene suficiente información para responder la pregunta → Responde EXACTAMENTE: 'NO'\n"
-                        "- Si el fragmento actual SÍ contiene suficiente información → Responde DIRECTAMENTE con la respuesta completa y precisa\n"
-                        "- No uses frases como 'Según el fragmento' o 'El texto dice'. Responde directamente.\n"
-                        "- Se conciso pero completo. Da la respuesta exacta que el usuario necesita.\n"
-                        "- Puedes usar información de fragmentos anteriores que ya has visto para construir una respuesta completa."
-                    )
-                }
-            ]
-
-            chunks_processed = 0
-            chars_analyzed = 0
-            total_chars = len(text_to_process)
-
-            logger.info(f"[BROWSE] Extracción progresiva: {total_chars} chars totales, chunks de {chunk_size} chars")
-
-            # Procesar chunks secuencialmente
-            for i in range(0, len(text_to_process), chunk_size):
-                chunk = text_to_process[i:i + chunk_size]
-                chunks_processed += 1
-                chars_analyzed += len(chunk)
-
-                # Agregar chunk al contexto conversacional
-                verification_messages.append({
-                    "role": "user",
-                    "content": (
-                        f"Pregunta del usuario: \"{user_query}\"\n\n"
-                        f"Fragmento {chunks_processed}/{(total_chars + chunk_size - 1) // chunk_size}:\n"
-                        f"{chunk}\n\n"
-                        f"¿Puedes responder a la pregunta con la información disponible hasta ahora?\n"
-                        f"Si NO → Responde 'NO'\n"
-                        f"Si SÍ → Responde directamente con la respuesta completa"
-                    )
-                })
-
-                # Llamar al LLM para verificar
-                logger.info(f"[BROWSE] Procesando chunk {chunks_processed} ({len(chunk)} chars)")
-
-                response = llm.invoke(verification_messages)
-                answer = response.content.strip()
-
-                # Agregar respuesta al historial conversacional
-                verification_messages.append({
-                    "role": "assistant",
-                    "content": answer
-                })
-
-                # Verificar si encontró la respuesta
-                if answer.upper() != "NO":
-                    # ¡Encontró la respuesta! Early stopping
-                    chars_saved = total_chars - chars_analyzed
-
-                    logger.info(
-                        f"[BROWSE] ✓ Respuesta encontrada en chunk {chunks_processed}/{(total_chars + chunk_size - 1) // chunk_size}. "
-                        f"Ahorro: {chars_saved} chars ({(chars_saved/total_chars)*100:.1f}%)"
-                    )
-
-                    return {
-                        'success': True,
-                        'data': {
-                            'url': url,
-                            'title': title,
-                            'answer': answer,
-                            'found': True,
-                            'chunks_processed': chunks_processed,
-                            'total_chunks': (total_chars + chunk_size - 1) // chunk_size,
-                            'chars_analyzed': chars_analyzed,
-                            'total_chars': total_chars,
-                            'chars_saved': chars_saved,
-                            'efficiency': f"{(chars_saved/total_chars)*100:.1f}%"
-                        }
-                    }
-
-            # Si llegó aquí, no encontró la respuesta en ningún chunk
-            logger.warning(f"[BROWSE] ✗ No se encontró respuesta después de {chunks_processed} chunks ({chars_analyzed} chars)")
-
-            return {
-                'success': True,
-                'data': {
-                    'url': url,
-                    'title': title,
-                    'answer': f"No se encontró información específica para responder: '{user_query}' en la página {url}",
-                    'found': False,
-                    'chunks_processed': chunks_processed,
-                    'total_chunks': (total_chars + chunk_size - 1) // chunk_size,
-                    'chars_analyzed': chars_analyzed,
-                    'total_chars': total_chars,
-                    'chars_saved': 0,
-                    'efficiency': '0%'
-                }
-            }
+            return self._sequential_extraction(url, title, chunks, user_query, llm)
 
         except Exception as e:
             error_msg = str(e)
@@ -397,6 +441,196 @@ Output:
                 'error': f'Error during progressive extraction: {error_msg}'
             }
 
+    def _retrieval_extraction(self, url: str, title: str, chunks: List[str],
+                              user_query: str, llm):
+        """
+        Envía al LLM solo los fragmentos más relevantes según BM25, en una llamada.
+
+        Returns:
+            Tupla (resultado o None si hay que recurrir al recorrido secuencial,
+                   set de índices de fragmentos ya enviados al LLM)
+        """
+        ranked = rank_chunks(user_query, chunks, top_n=self.retrieval_top_n)
+        if not ranked or ranked[0][1] < self.retrieval_min_score:
+            logger.info(f"[BROWSE] Ningún fragmento relevante para '{user_query}' (BM25)")
+            return None, set()
+
+        # Enviar en orden de aparición para conservar el hilo del texto
+        selected = sorted(index for index, _ in ranked)
+        fragments = '\n\n'.join(
+            f"Fragmento {index + 1}/{len(chunks)}:\n{chunks[index]}" for index in selected
+        )
+
+        logger.info(f"[BROWSE] Retrieval: enviando fragmentos {[i + 1 for i in selected]} de {len(chunks)}")
+
+        response = llm.invoke([
+            {"role": "system", "content": self.VERIFICATION_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": (
+                    f"Pregunta del usuario: \"{user_query}\"\n\n"
+                    f"{fragments}\n\n"
+                    f"¿Puedes responder a la pregunta con estos fragmentos?\n"
+                    f"Si NO → Responde 'NO'\n"
+                    f"Si SÍ → Responde directamente con la respuesta completa"
+                )
+            }
+        ])
+        answer = response.content.strip()
+
+        if NEGATIVE_ANSWER_PATTERN.match(answer):
+            return None, set(selected)
+
+        chars_analyzed = sum(len(chunks[index]) for index in selected)
+        return self._extraction_result(
+            url, title, user_query, answer=answer, chunks=chunks,
+            chunks_processed=len(selected), chars_analyzed=chars_analyzed,
+            llm_calls=1, strategy='retrieval'
+        ), set(selected)
+
+    def _sequential_extraction(self, url: str, title: str, chunks: List[str], user_query: str,
+                               llm, skip=(), previous_calls: int = 0,
+                               strategy: str = 'sequential') -> Dict[str, Any]:
+        """
+        Procesa los fragmentos uno a uno usando contexto conversacional (early stopping).
+
+        El contexto que se reenvía en cada llamada depende de self.history_mode:
+        - 'full': todos los fragmentos y respuestas anteriores (crece cuadráticamente)
+        - 'window': solo los intercambios más recientes que caben en history_budget tokens
+        - 'summary': en lugar de los fragmentos, notas breves que el LLM devuelve junto a
+          cada 'NO', recortadas a history_budget tokens
+
+        Args:
+            skip: Índices de fragmentos ya analizados (se saltan)
+            previous_calls: Llamadas al LLM ya hechas antes de este recorrido
+            strategy: Nombre de la estrategia para el resultado
+        """
+        total_chunks = len(chunks)
+        system_message = {"role": "system", "content": self.VERIFICATION_SYSTEM_PROMPT}
+
+        # Historial conversacional: pares (mensaje user, mensaje assistant) de fragmentos anteriores
+        history = []
+        # Modo summary: notas acumuladas de los fragmentos anteriores
+        notes = []
+
+        chunks_processed = len(skip)
+        chars_analyzed = sum(len(chunks[index]) for index in skip)
+        llm_calls = previous_calls
+
+        # Procesar chunks secuencialmente
+        for index, chunk in enumerate(chunks):
+            if index in skip:
+                continue
+
+            chunks_processed += 1
+            chars_analyzed += len(chunk)
+
+            if self.history_mode == 'summary':
+                notes_text = '\n'.join(notes) if notes else '(ninguna)'
+                content = (
+                    f"Pregunta del usuario: \"{user_query}\"\n\n"
+                    f"Notas de fragmentos anteriores:\n{notes_text}\n\n"
+                    f"Fragmento {index + 1}/{total_chunks}:\n"
+                    f"{chunk}\n\n"
+                    f"¿Puedes responder a la pregunta con las notas y este fragmento?\n"
+                    f"Si NO → Responde 'NO | ' seguido de datos parciales útiles para la pregunta (o solo 'NO')\n"
+                    f"Si SÍ → Responde directamente con la respuesta completa"
+                )
+            else:
+                content = (
+                    f"Pregunta del usuario: \"{user_query}\"\n\n"
+                    f"Fragmento {index + 1}/{total_chunks}:\n"
+                    f"{chunk}\n\n"
+                    f"¿Puedes responder a la pregunta con la información disponible hasta ahora?\n"
+                    f"Si NO → Responde 'NO'\n"
+                    f"Si SÍ → Responde directamente con la respuesta completa"
+                )
+            user_message = {"role": "user", "content": content}
+
+            verification_messages = [system_message]
+            for previous_user, previous_assistant in history:
+                verification_messages.extend([previous_user, previous_assistant])
+            verification_messages.append(user_message)
+
+            # Llamar al LLM para verificar
+            logger.info(f"[BROWSE] Procesando chunk {index + 1} ({len(chunk)} chars)")
+
+            response = llm.invoke(verification_messages)
+            llm_calls += 1
+            answer = response.content.strip()
+
+            # Verificar si encontró la respuesta (early stopping)
+            negative = NEGATIVE_ANSWER_PATTERN.match(answer)
+            if not negative:
+                return self._extraction_result(
+                    url, title, user_query, answer=answer, chunks=chunks,
+                    chunks_processed=chunks_processed, chars_analyzed=chars_analyzed,
+                    llm_calls=llm_calls, strategy=strategy
+                )
+
+            # Actualizar el contexto para el siguiente fragmento
+            if self.history_mode == 'summary':
+                note = (negative.group(1) or '').strip()
+                if note:
+                    notes.append(f"- (fragmento {index + 1}) {note}")
+                while len(notes) > 1 and estimate_tokens('\n'.join(notes)) > self.history_budget:
+                    notes.pop(0)
+            else:
+                history.append((user_message, {"role": "assistant", "content": answer}))
+                if self.history_mode == 'window':
+                    while history and sum(
+                        estimate_tokens(u['content']) + estimate_tokens(a['content']) for u, a in history
+                    ) > self.history_budget:
+                        history.pop(0)
+
+        # Si llegó aquí, no encontró la respuesta en ningún chunk
+        logger.warning(f"[BROWSE] ✗ No se encontró respuesta después de {chunks_processed} chunks ({chars_analyzed} chars)")
+
+        return self._extraction_result(
+            url, title, user_query, answer=None, chunks=chunks,
+            chunks_processed=chunks_processed, chars_analyzed=chars_analyzed,
+            llm_calls=llm_calls, strategy=strategy
+        )
+
+    def _extraction_result(self, url: str, title: str, user_query: str, answer, chunks: List[str],
+                           chunks_processed: int, chars_analyzed: int, llm_calls: int,
+                           strategy: str) -> Dict[str, Any]:
+        """
+        Construye el resultado de la extracción.
+
+        llm_calls_saved se mide frente al recorrido secuencial completo (una llamada por fragmento).
+        """
+        total_chunks = len(chunks)
+        total_chars = sum(len(chunk) for chunk in chunks)
+        found = answer is not None
+        chars_saved = max(total_chars - chars_analyzed, 0) if found else 0
+        efficiency = (chars_saved / total_chars) * 100 if total_chars else 0
+
+        if found:
+            logger.info(
+                f"[BROWSE] ✓ Respuesta encontrada ({strategy}) tras {chunks_processed}/{total_chunks} chunks "
+                f"y {llm_calls} llamadas al LLM. Ahorro: {chars_saved} chars ({efficiency:.1f}%)"
+            )
+
+        return {
+            'success': True,
+            'data': {
+                'url': url,
+                'title': title,
+                'answer': answer if found else f"No se encontró información específica para responder: '{user_query}' en la página {url}",
+                'found': found,
+                'chunks_processed': chunks_processed,
+                'total_chunks': total_chunks,
+                'chars_analyzed': chars_analyzed,
+                'total_chars': total_chars,
+                'chars_saved': chars_saved,
+                'efficiency': f"{efficiency:.1f}%" if found else '0%',
+                'strategy': strategy,
+                'llm_calls': llm_calls,
+                'llm_calls_saved': max(total_chunks - llm_calls, 0)
+            }
+        }
+
     def get_schema(self) -> Dict[str, Any]:
         """
         Retorna el schema de la tool en formato OpenAI Function Calling.
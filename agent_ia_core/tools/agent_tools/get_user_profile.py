@@ -34,9 +34,11 @@ class GetUserProfileTool(BaseTool):
     def run(self, **kwargs) -> Dict[str, Any]:
         """Obtiene información del perfil del usuario."""
         try:
-            from apps.company.models import UserProfile
+            from apps.company.profile_cache import get_profile_snapshot
 
-            profile = UserProfile.objects.filter(user=self.user).first()
+            # Snapshot cacheado (se invalida al guardar el usuario o su perfil)
+            snapshot = get_profile_snapshot(self.user)
+            profile = snapshot['profile']
 
             if not profile:
                 return {
@@ -45,33 +47,26 @@ class GetUserProfileTool(BaseTool):
                     'error': 'El usuario no tiene un perfil configurado. Debe completar su CV primero.'
                 }
 
-            # Usar cv_summary como información principal para el LLM
-            if profile.cv_summary:
-                # El ranking de puestos es la info principal
-                profile_info = profile.cv_summary
-            else:
-                # Fallback al contexto tradicional si no hay cv_summary
-                profile_info = profile.get_chat_context()
-
             # Datos adicionales de preferencias
             preferences = {
-                'city': getattr(self.user, 'city', '') or profile.location,
-                'work_mode': getattr(self.user, 'work_mode', ''),
-                'preferred_locations': profile.preferred_locations,
-                'preferred_sectors': profile.preferred_sectors,
-                'salary_min': profile.salary_min,
-                'salary_max': profile.salary_max,
-                'availability': profile.availability,
+                'city': snapshot['user']['city'] or profile['location'],
+                'work_mode': snapshot['user']['work_mode'],
+                'preferred_locations': profile['preferred_locations'],
+                'preferred_sectors': profile['preferred_sectors'],
+                'salary_min': profile['salary_min'],
+                'salary_max': profile['salary_max'],
+                'availability': profile['availability'],
             }
 
             return {
                 'success': True,
                 'data': {
-                    'profile_summary': profile_info,
+                    # cv_summary (ranking de puestos) o, si no hay, el contexto tradicional
+                    'profile_summary': profile['summary'],
                     'preferences': preferences,
-                    'full_name': profile.full_name,
-                    'cv_analyzed': profile.cv_analyzed,
-                    'is_complete': profile.is_complete
+                    'full_name': profile['full_name'],
+                    'cv_analyzed': profile['cv_analyzed'],
+                    'is_complete': profile['is_complete']
                 }
             }
 
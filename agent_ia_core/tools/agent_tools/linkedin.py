@@ -7,6 +7,7 @@ import json
 import logging
 from typing import Any
 from ..core.base import BaseTool
+from ..core.company_store import INCOMPLETE, CompanyStore, get_shared_company_store
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +20,12 @@ class LinkedInRecruiterTool(BaseTool):
     Encuentra personas clave para networking y envío de candidaturas directas.
     Proporciona URLs de perfiles de LinkedIn y consejos para contactarlos."""
 
-    def __init__(self, llm=None, web_search_tool=None, browse_tool=None):
+    def __init__(self, llm=None, web_search_tool=None, browse_tool=None, company_store: CompanyStore = None):
         self.llm = llm
         self.web_search_tool = web_search_tool
         self.browse_tool = browse_tool
+        # Base de conocimiento de empresas (por defecto la compartida; None si está desactivada)
+        self.company_store = company_store if company_store is not None else get_shared_company_store()
         super().__init__()
 
     def run(self, company_name: str, location: str = "España",
@@ -48,35 +51,26 @@ class LinkedInRecruiterTool(BaseTool):
             }
 
         try:
-            # Búsquedas específicas para encontrar reclutadores
-            search_queries = [
-                f'site:linkedin.com/in "{company_name}" recruiter {location}',
-                f'site:linkedin.com/in "{company_name}" talent acquisition {location}',
-                f'site:linkedin.com/in "{company_name}" "recursos humanos" OR "HR" {location}',
-            ]
-
-            all_recruiters = []
-            for query in search_queries:
-                search_result = self.web_search_tool.run(query=query, limit=5)
-                if search_result.get('success') and search_result.get('data', {}).get('results'):
-                    for item in search_result['data']['results']:
-                        # Filtrar solo perfiles de LinkedIn
-                        url = item.get('url', '')
-                        if 'linkedin.com/in/' in url:
-                            all_recruiters.append({
-                                'name': item.get('title', '').replace(' | LinkedIn', '').replace(' - LinkedIn', ''),
-                                'description': item.get('snippet', ''),
-                                'profile_url': url,
-                                'search_query': query
-                            })
-
-            # Eliminar duplicados por URL
-            seen_urls = set()
-            unique_recruiters = []
-            for r in all_recruiters:
-                if r['profile_url'] not in seen_urls:
-                    seen_urls.add(r['profile_url'])
-                    unique_recruiters.append(r)
+            # Reclutadores de la base de conocimiento (o de Google si la empresa es nueva)
+            if self.company_store:
+                entry = self.company_store.lookup(
+                    company_name, 'recruiters',
+                    lambda: self._search_recruiters(company_name, location)
+                )
+                unique_recruiters = [
+                    {
+                        'name': r['name'],
+                        'description': r['role'],
+                        'profile_url': r['linkedin_url'],
+                        'verified': r['verified']
+                    }
+                    for r in (entry or {}).get('recruiters', [])
+                ]
+            else:
+                unique_recruiters = [
+                    {'name': r['name'], 'description': r['role'], 'profile_url': r['linkedin_url']}
+                    for r in self._search_recruiters(company_name, location)['recruiters']
+                ]
 
             results['data']['recruiters'] = unique_recruiters[:10]  # Máximo 10
             results['data']['total_found'] = len(unique_recruiters)
@@ -123,6 +117,43 @@ Proporciona solo la plantilla, sin explicaciones adicionales."""
 
         return results
 
+    def _search_recruiters(self, company_name: str, location: str) -> dict:
+        """
+        Busca en Google perfiles de LinkedIn de reclutadores de la empresa (sin duplicados).
+
+        Returns:
+            Datos para la base de conocimiento: {'recruiters': [...]}, con INCOMPLETE si
+            alguna búsqueda falló
+        """
+
+        # Búsquedas específicas para encontrar reclutadores
+        search_queries = [
+            f'site:linkedin.com/in "{company_name}" recruiter {location}',
+            f'site:linkedin.com/in "{company_name}" talent acquisition {location}',
+            f'site:linkedin.com/in "{company_name}" "recursos humanos" OR "HR" {location}',
+        ]
+
+        recruiters = []
+        seen_urls = set()
+        incomplete = False
+        for query in search_queries:
+            search_result = self.web_search_tool.run(query=query, limit=5)
+            if not search_result.get('success'):
+                incomplete = True
+            elif search_result.get('data', {}).get('results'):
+                for item in search_result['data']['results']:
+                    # Filtrar solo perfiles de LinkedIn, eliminando duplicados por URL
+                    url = item.get('url', '')
+                    if 'linkedin.com/in/' in url and url not in seen_urls:
+                        seen_urls.add(url)
+                        recruiters.append({
+                            'name': item.get('title', '').replace(' | LinkedIn', '').replace(' - LinkedIn', ''),
+                            'linkedin_url': url,
+                            'role': item.get('snippet', '')
+                        })
+
+        return {'recruiters': recruiters, INCOMPLETE: incomplete}
+
     def get_schema(self) -> dict:
         return {
             'name': self.name,
@@ -156,10 +187,12 @@ class LinkedInCompanyTool(BaseTool):
     Incluye datos sobre la empresa, cultura, número de empleados y ofertas abiertas.
     Útil para investigar una empresa antes de aplicar."""
 
-    def __init__(self, llm=None, web_search_tool=None, browse_tool=None):
+    def __init__(self, llm=None, web_search_tool=None, browse_tool=None, company_store: CompanyStore = None):
         self.llm = llm
         self.web_search_tool = web_search_tool
         self.browse_tool = browse_tool
+        # Base de conocimiento de empresas (por defecto la compartida; None si está desactivada)
+        self.company_store = company_store if company_store is not None else get_shared_company_store()
         super().__init__()
 
     def run(self, company_name: str) -> dict:
@@ -182,24 +215,24 @@ class LinkedInCompanyTool(BaseTool):
             }
 
         try:
-            # Buscar página de empresa en LinkedIn
-            company_query = f'site:linkedin.com/company "{company_name}"'
-            company_result = self.web_search_tool.run(query=company_query, limit=3)
-            if company_result.get('success') and company_result.get('data', {}).get('results'):
-                results['data']['company_info'] = company_result['data']['results']
-
-            # Buscar ofertas de empleo de la empresa
+            # Página de LinkedIn y opiniones: de la base de conocimiento o de Google
+            if self.company_store:
+                entry = self.company_store.lookup(company_name, 'linkedin', lambda: self._search_company(company_name))
+                company = entry['info'] if entry else {}
+            else:
+                company = self._search_company(company_name)['info']
+
+            if company.get('linkedin_results'):
+                results['data']['company_info'] = company['linkedin_results']
+            if company.get('employee_reviews'):
+                results['data']['employee_reviews'] = company['employee_reviews']
+
+            # Buscar ofertas de empleo de la empresa (siempre en vivo: cambian a diario)
             jobs_query = f'site:linkedin.com/jobs "{company_name}"'
             jobs_result = self.web_search_tool.run(query=jobs_query, limit=5)
             if jobs_result.get('success') and jobs_result.get('data', {}).get('results'):
                 results['data']['job_openings'] = jobs_result['data']['results']
 
-            # Buscar información adicional (glassdoor, reviews)
-            reviews_query = f'{company_name} opiniones empleados glassdoor'
-            reviews_result = self.web_search_tool.run(query=reviews_query, limit=3)
-            if reviews_result.get('success') and reviews_result.get('data', {}).get('results'):
-                results['data']['employee_reviews'] = reviews_result['data']['results']
-
             # Generar insights con LLM
             if self.llm:
                 insight_prompt = f"""Para la empresa {company_name}, proporciona:
@@ -224,6 +257,39 @@ Sé práctico y específico. Máximo 200 palabras."""
 
         return results
 
+    def _search_company(self, company_name: str) -> dict:
+        """
+        Busca en Google la página de LinkedIn de la empresa y opiniones de empleados.
+
+        Returns:
+            Datos para la base de conocimiento: {'linkedin_url', 'info': {'linkedin_results', 'employee_reviews'}},
+            con INCOMPLETE si alguna búsqueda falló
+        """
+        data = {'info': {}}
+
+        # Buscar página de empresa en LinkedIn
+        company_query = f'site:linkedin.com/company "{company_name}"'
+        company_result = self.web_search_tool.run(query=company_query, limit=3)
+        if not company_result.get('success'):
+            data[INCOMPLETE] = True
+        elif company_result.get('data', {}).get('results'):
+            data['info']['linkedin_results'] = company_result['data']['results']
+            data['linkedin_url'] = next(
+                (item['url'] for item in company_result['data']['results']
+                 if 'linkedin.com/company/' in item.get('url', '')),
+                ''
+            )
+
+        # Buscar información adicional (glassdoor, reviews)
+        reviews_query = f'{company_name} opiniones empleados glassdoor'
+        reviews_result = self.web_search_tool.run(query=reviews_query, limit=3)
+        if not reviews_result.get('success'):
+            data[INCOMPLETE] = True
+        elif reviews_result.get('data', {}).get('results'):
+            data['info']['employee_reviews'] = reviews_result['data']['results']
+
+        return data
+
     def get_schema(self) -> dict:
         return {
             'name': self.name,
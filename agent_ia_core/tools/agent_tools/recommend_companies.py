@@ -4,8 +4,12 @@ Tool para recomendar empresas ideales al usuario con contactos de reclutadores.
 """
 
 import logging
-from typing import Any, Dict, List
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 from ..core.base import BaseTool
+from ..core.company_names import get_shared_company_names
+from ..core.company_store import INCOMPLETE, CompanyStore, get_shared_company_store
 
 logger = logging.getLogger(__name__)
 
@@ -27,11 +31,19 @@ class CompanyRecommendationTool(BaseTool):
     - Estrategia específica para conseguir trabajo en cada empresa
     - Ofertas actuales de cada empresa"""
 
-    def __init__(self, llm=None, web_search_tool=None, browse_tool=None, user_profile=None):
+    def __init__(self, llm=None, web_search_tool=None, browse_tool=None, user_profile=None,
+                 max_workers: int = None, company_store: CompanyStore = None):
         self.llm = llm
         self.web_search_tool = web_search_tool
         self.browse_tool = browse_tool
         self.user_profile = user_profile
+        # Base de conocimiento de empresas (por defecto la compartida; None si está desactivada)
+        self.company_store = company_store if company_store is not None else get_shared_company_store()
+        # Límite de empresas investigadas en paralelo (por defecto desde config)
+        if max_workers is None:
+            from ...config import COMPANY_RESEARCH_MAX_WORKERS
+            max_workers = COMPANY_RESEARCH_MAX_WORKERS
+        self.max_workers = max(1, max_workers)
         super().__init__()
 
     def run(self, sector: str = "", location: str = "",
@@ -76,17 +88,15 @@ class CompanyRecommendationTool(BaseTool):
                 # Buscar empresas por sector/ubicación
                 companies_to_search = self._find_relevant_companies(sector, location, company_size)
 
+            # Una sola vez por empresa ("Telefónica" y "Telefonica S.A." son la misma)
+            companies_to_search = self._unique_companies(companies_to_search)
+
             if not companies_to_search:
                 results['data']['message'] = f"No se encontraron empresas para {sector or 'el sector especificado'} en {location or 'España'}"
                 return results
 
-            # Para cada empresa, obtener info completa
-            for company_name in companies_to_search[:5]:  # Máximo 5 empresas
-                company_data = self._get_company_recommendation(
-                    company_name=company_name,
-                    sector=sector,
-                    location=location
-                )
+            # Para cada empresa, obtener info completa (en paralelo, resultados en orden)
+            for company_data in self._research_companies(companies_to_search[:5], sector, location):  # Máximo 5 empresas
                 if company_data:
                     results['data']['recommendations'].append(company_data)
 
@@ -104,6 +114,123 @@ class CompanyRecommendationTool(BaseTool):
 
         return results
 
+    @staticmethod
+    def _unique_companies(companies: List[str]) -> List[str]:
+        """Elimina empresas repetidas comparando su nombre canónico (conserva el orden)."""
+        company_names = get_shared_company_names()
+        unique, seen = [], set()
+        for company in companies:
+            key = company_names.resolve(company)
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(company)
+        return unique
+
+    def _research_companies(self, companies: List[str], sector: str, location: str) -> List[Dict[str, Any]]:
+        """
+        Ejecuta el pipeline de cada empresa en paralelo (hasta max_workers a la vez).
+
+        Los resultados se devuelven en el mismo orden que la lista de empresas, así
+        que la latencia total es la de la empresa más lenta y no la suma de todas.
+        """
+        if not companies:
+            return []
+
+        if len(companies) == 1:
+            return [self._get_company_recommendation(company_name=companies[0], sector=sector, location=location)]
+
+        max_workers = min(self.max_workers, len(companies))
+        logger.info(f"[RECOMMEND_COMPANIES] Investigando {len(companies)} empresas con {max_workers} workers")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda company_name: self._get_company_recommendation(
+                    company_name=company_name,
+                    sector=sector,
+                    location=location
+                ),
+                companies
+            ))
+
+    def _run_searches(self, searches: Dict[str, Tuple[str, int]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Lanza en paralelo las búsquedas web de una empresa.
+
+        Args:
+            searches: {clave: (query, limit)}
+
+        Returns:
+            {clave: resultados} (lista vacía si no hay resultados, None si la búsqueda falla)
+        """
+        def search(item):
+            key, (query, limit) = item
+            try:
+                result = self.web_search_tool.run(query=query, limit=limit)
+            except Exception as e:
+                logger.warning(f"[RECOMMEND_COMPANIES] Error en búsqueda '{query}': {e}")
+                return key, None
+            if not result.get('success'):
+                return key, None
+            return key, result.get('data', {}).get('results') or []
+
+        with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+            return dict(executor.map(search, searches.items()))
+
+    def _get_company_profile(self, company_name: str, sector: str, location: str) -> Dict[str, Any]:
+        """
+        Información general, reclutadores y emails de contacto de la empresa.
+
+        Se lee de la base de conocimiento y solo se busca en Google (4 búsquedas en
+        paralelo) si la empresa no se ha investigado antes.
+
+        Returns:
+            {'info': {'search_results': [...], 'contact_emails': [...]}, 'recruiters': [...]}
+        """
+        def fetch():
+            search_results = self._run_searches({
+                'company': (f'"{company_name}" empresa about careers trabaja con nosotros', 3),
+                'recruiters_ta': (f'site:linkedin.com/in "{company_name}" recruiter talent acquisition {location}', 5),
+                'recruiters_hr': (f'site:linkedin.com/in "{company_name}" "recursos humanos" HR {location}', 5),
+                'email': (f'"{company_name}" careers empleo contacto email @', 3),
+            })
+
+            # Una búsqueda fallida (cuota, error HTTP) no debe guardarse como "sin datos"
+            incomplete = any(results is None for results in search_results.values())
+            search_results = {key: results or [] for key, results in search_results.items()}
+
+            info = {}
+            if search_results['company']:
+                info['search_results'] = search_results['company']
+
+            recruiters = []
+            seen_urls = set()
+            for item in search_results['recruiters_ta'] + search_results['recruiters_hr']:
+                url = item.get('url', '')
+                if 'linkedin.com/in/' in url and url not in seen_urls:
+                    seen_urls.add(url)
+
+                    # Intentar extraer email del snippet
+                    email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', item.get('snippet', ''))
+
+                    recruiters.append({
+                        'name': item.get('title', '').replace(' | LinkedIn', '').replace(' - LinkedIn', ''),
+                        'linkedin_url': url,
+                        'role': item.get('snippet', ''),
+                        'email': email_match.group() if email_match else None
+                    })
+
+            for item in search_results['email']:
+                emails = re.findall(r'[\w\.-]+@[\w\.-]+\.\w+', item.get('snippet', ''))
+                if emails:
+                    info['contact_emails'] = list(set(emails))[:3]
+
+            return {'sector': sector, 'info': info, 'recruiters': recruiters, INCOMPLETE: incomplete}
+
+        if not self.company_store:
+            return fetch()
+
+        return self.company_store.lookup(company_name, 'profile', fetch) or {'info': {}, 'recruiters': []}
+
     def _find_relevant_companies(self, sector: str, location: str, company_size: str) -> List[str]:
         """Encuentra empresas relevantes por sector y ubicación."""
 
@@ -167,64 +294,39 @@ class CompanyRecommendationTool(BaseTool):
         }
 
         try:
-            # 1. Buscar información general de la empresa
-            company_query = f'"{company_name}" empresa about careers trabaja con nosotros'
-            company_result = self.web_search_tool.run(query=company_query, limit=3)
-            if company_result.get('success') and company_result.get('data', {}).get('results'):
-                company_data['company_info']['search_results'] = company_result['data']['results']
-
-            # 2. Buscar ofertas de empleo actuales
-            jobs_query = f'site:linkedin.com/jobs OR site:infojobs.net "{company_name}" empleo'
-            jobs_result = self.web_search_tool.run(query=jobs_query, limit=5)
-            if jobs_result.get('success') and jobs_result.get('data', {}).get('results'):
-                for job in jobs_result['data']['results']:
-                    company_data['job_openings'].append({
-                        'title': job.get('title', ''),
-                        'url': job.get('url', ''),
-                        'snippet': job.get('snippet', '')
-                    })
-
-            # 3. Buscar reclutadores en LinkedIn
-            recruiter_queries = [
-                f'site:linkedin.com/in "{company_name}" recruiter talent acquisition {location}',
-                f'site:linkedin.com/in "{company_name}" "recursos humanos" HR {location}',
-            ]
-
-            seen_urls = set()
-            for query in recruiter_queries:
-                recruiter_result = self.web_search_tool.run(query=query, limit=5)
-                if recruiter_result.get('success') and recruiter_result.get('data', {}).get('results'):
-                    for item in recruiter_result['data']['results']:
-                        url = item.get('url', '')
-                        if 'linkedin.com/in/' in url and url not in seen_urls:
-                            seen_urls.add(url)
-
-                            recruiter_info = {
-                                'name': item.get('title', '').replace(' | LinkedIn', '').replace(' - LinkedIn', ''),
-                                'profile_url': url,
-                                'description': item.get('snippet', ''),
-                                'email': None  # Intentar extraer después
-                            }
-
-                            # Intentar extraer email del snippet
-                            snippet = item.get('snippet', '')
-                            import re
-                            email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', snippet)
-                            if email_match:
-                                recruiter_info['email'] = email_match.group()
-
-                            company_data['recruiters'].append(recruiter_info)
-
-            # 4. Buscar emails de contacto de la empresa
-            email_query = f'"{company_name}" careers empleo contacto email @'
-            email_result = self.web_search_tool.run(query=email_query, limit=3)
-            if email_result.get('success') and email_result.get('data', {}).get('results'):
-                import re
-                for item in email_result['data']['results']:
-                    snippet = item.get('snippet', '')
-                    emails = re.findall(r'[\w\.-]+@[\w\.-]+\.\w+', snippet)
-                    if emails:
-                        company_data['company_info']['contact_emails'] = list(set(emails))[:3]
+            # 1-4. Ofertas actuales (siempre en vivo) en paralelo con la información general,
+            # reclutadores y emails (de la base de conocimiento si ya se investigó la empresa)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                jobs_future = executor.submit(self._run_searches, {
+                    'jobs': (f'site:linkedin.com/jobs OR site:infojobs.net "{company_name}" empleo', 5),
+                })
+                profile = self._get_company_profile(company_name, sector, location)
+                jobs = jobs_future.result()['jobs'] or []
+
+            # 1. Información general de la empresa
+            if profile['info'].get('search_results'):
+                company_data['company_info']['search_results'] = profile['info']['search_results']
+
+            # 2. Ofertas de empleo actuales
+            for job in jobs:
+                company_data['job_openings'].append({
+                    'title': job.get('title', ''),
+                    'url': job.get('url', ''),
+                    'snippet': job.get('snippet', '')
+                })
+
+            # 3. Reclutadores en LinkedIn
+            for recruiter in profile['recruiters'][:10]:
+                company_data['recruiters'].append({
+                    'name': recruiter['name'],
+                    'profile_url': recruiter['linkedin_url'],
+                    'description': recruiter['role'],
+                    'email': recruiter.get('email')
+                })
+
+            # 4. Emails de contacto de la empresa
+            if profile['info'].get('contact_emails'):
+                company_data['company_info']['contact_emails'] = profile['info']['contact_emails']
 
             # 5. Links directos útiles
             company_data['direct_links'] = {
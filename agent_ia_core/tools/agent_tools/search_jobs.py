@@ -7,6 +7,9 @@ import json
 import logging
 from typing import Any
 from ..core.base import BaseTool
+from ..core.company_names import extract_company_name, get_shared_company_names, mentions_company
+from ..core.company_store import INCOMPLETE, CompanyStore, get_shared_company_store
+from ..core.host_health import HostHealth
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +23,14 @@ class JobSearchTool(BaseTool):
     Incluye contacto del reclutador de cada oferta para contacto directo.
     Devuelve enlaces a ofertas reales verificadas con análisis de por qué son buenas opciones."""
 
-    def __init__(self, llm=None, web_search_tool=None, browse_tool=None, user_profile=None):
+    def __init__(self, llm=None, web_search_tool=None, browse_tool=None, user_profile=None,
+                 company_store: CompanyStore = None):
         self.llm = llm
         self.web_search_tool = web_search_tool
         self.browse_tool = browse_tool
         self.user_profile = user_profile
+        # Base de conocimiento de empresas (por defecto la compartida; None si está desactivada)
+        self.company_store = company_store if company_store is not None else get_shared_company_store()
         super().__init__()
 
     def run(self, query: str, location: str = "", sector: str = "",
@@ -273,20 +279,11 @@ class JobSearchTool(BaseTool):
             words = [w for w in text.split() if w not in stopwords]
             return ' '.join(words)
 
+        company_names = get_shared_company_names()
+
         def extract_company(job: dict) -> str:
-            """Extrae nombre de empresa del job."""
-            title = job.get('title', '')
-            # Patrones comunes: "Puesto at Empresa", "Puesto - Empresa", "Empresa | Puesto"
-            patterns = [
-                r'\bat\s+([A-Za-z0-9\s&]+?)(?:\s*[-|]|$)',
-                r'[-|]\s*([A-Za-z0-9\s&]+?)$',
-                r'^([A-Za-z0-9\s&]+?)\s*[-|]',
-            ]
-            for pattern in patterns:
-                match = re.search(pattern, title, re.IGNORECASE)
-                if match:
-                    return normalize(match.group(1))
-            return ""
+            """Clave canónica de la empresa del job ("Telefónica S.A." y "Telefonica" coinciden)."""
+            return company_names.resolve(self._extract_company_name(job))
 
         def similarity(a: str, b: str) -> float:
             """Calcula similaridad entre dos strings."""
@@ -307,7 +304,8 @@ class JobSearchTool(BaseTool):
                 # Si títulos muy similares
                 if title_sim > 0.8:
                     # Y misma empresa o empresa no detectada
-                    if not company or not seen_company or similarity(company, seen_company) > 0.7:
+                    if not company or not seen_company or company == seen_company \
+                            or similarity(company, seen_company) > 0.7:
                         is_duplicate = True
                         break
 
@@ -539,6 +537,12 @@ SELECCIÓN (15 números ordenados por puntuación):"""
         used_urls = set()
         backup_jobs = [j for j in all_jobs if j not in top_jobs]
         backup_index = 0
+        health = getattr(getattr(self.browse_tool, 'fetcher', None), 'health', None)
+        if not isinstance(health, HostHealth):
+            health = None
+
+        # Verificar las ofertas principales en paralelo (conexiones del pool compartido)
+        check_results = self._check_jobs_active([job.get('url', '') for job in top_jobs])
 
         for job in top_jobs:
             url = job.get('url', '')
@@ -546,7 +550,7 @@ SELECCIÓN (15 números ordenados por puntuación):"""
                 continue
 
             # Verificar si la oferta está activa (ahora retorna dict)
-            check_result = self._check_job_active(url)
+            check_result = check_results.get(url) or self._check_job_active(url)
 
             if check_result.get('is_active', True):
                 # Enriquecer job con datos del análisis
@@ -573,6 +577,10 @@ SELECCIÓN (15 números ordenados por puntuación):"""
                     backup_url = backup_job.get('url', '')
                     backup_index += 1
 
+                    # Un portal con el circuito abierto fallaría al instante: mejor otra oferta
+                    if health and health.is_open(backup_url):
+                        continue
+
                     if backup_url and backup_url not in used_urls:
                         backup_check = self._check_job_active(backup_url)
                         if backup_check.get('is_active', True):
@@ -600,6 +608,26 @@ SELECCIÓN (15 números ordenados por puntuación):"""
 
         return verified_jobs
 
+    def _check_jobs_active(self, urls: list) -> dict:
+        """
+        Ejecuta _check_job_active sobre varias URLs en paralelo.
+
+        Returns:
+            Dict url -> resultado de _check_job_active
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from ...config import VERIFY_JOBS_MAX_WORKERS
+
+        unique_urls = list(dict.fromkeys(url for url in urls if url))
+        if not unique_urls:
+            return {}
+
+        max_workers = max(1, min(VERIFY_JOBS_MAX_WORKERS, len(unique_urls)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self._check_job_active, unique_urls))
+
+        return dict(zip(unique_urls, results))
+
     def _check_job_active(self, url: str) -> dict:
         """
         Verifica si una oferta sigue activa usando LLM para análisis inteligente.
@@ -618,7 +646,6 @@ SELECCIÓN (15 números ordenados por puntuación):"""
             # Obtener contenido de la página
             result = self.browse_tool.run(
                 url=url,
-                extract_type="text",
                 max_chars=4000  # Más contenido para mejor análisis
             )
 
@@ -830,63 +857,50 @@ Responde SOLO con el JSON, sin explicaciones adicionales."""
         if job.get('verified_details', {}).get('company'):
             return job['verified_details']['company']
 
-        title = job.get('title', '')
-        description = job.get('description', '')
-
-        # Patrones comunes en títulos de ofertas
-        import re
-
-        # Patrón "at Company" - común en LinkedIn
-        at_match = re.search(r'\bat\s+([A-Z][A-Za-z0-9\s&\-\.]+?)(?:\s*[-|]|$)', title)
-        if at_match:
-            return at_match.group(1).strip()
-
-        # Patrón "- Company" o "| Company" al final
-        end_match = re.search(r'[-|]\s*([A-Z][A-Za-z0-9\s&\-\.]+?)$', title)
-        if end_match:
-            return end_match.group(1).strip()
-
-        # Patrón "Company -" o "Company |" al inicio
-        dash_match = re.search(r'^([A-Z][A-Za-z0-9\s&\-\.]+?)\s*[-|]', title)
-        if dash_match:
-            return dash_match.group(1).strip()
-
-        # Buscar en descripción con patrones más amplios
-        company_patterns = [
-            r'empresa[:\s]+([A-Za-z0-9\s&\-\.]+)',
-            r'company[:\s]+([A-Za-z0-9\s&\-\.]+)',
-            r'en\s+([A-Z][A-Za-z0-9\s&\-\.]+?)\s+buscamos',
-            r'([A-Z][A-Za-z0-9\s&\-\.]+?)\s+está buscando',
-        ]
-
-        for pattern in company_patterns:
-            match = re.search(pattern, description, re.IGNORECASE)
-            if match:
-                company = match.group(1).strip()
-                # Filtrar palabras genéricas
-                if company.lower() not in ['la', 'una', 'nuestra', 'esta']:
-                    return company
-
-        return ""
+        return extract_company_name(job.get('title', ''), job.get('description', ''))
 
     def _find_verified_recruiter(self, company_name: str, location: str) -> dict:
         """
-        Busca un reclutador VERIFICADO de la empresa.
-        Solo devuelve resultados si el snippet confirma que trabaja en esa empresa.
+        Devuelve un reclutador VERIFICADO de la empresa.
+
+        Se lee primero de la base de conocimiento de empresas; solo se busca en Google
+        si la empresa no se ha comprobado antes (también se guarda cuando no hay ninguno).
         """
 
         if not self.web_search_tool or not company_name:
             return None
 
-        # Normalizar nombre de empresa para comparación
-        company_lower = company_name.lower().strip()
-        # Variantes comunes del nombre
-        company_variants = [
-            company_lower,
-            company_lower.replace(' ', ''),
-            company_lower.split()[0] if company_lower else ''  # Primera palabra
-        ]
+        if not self.company_store:
+            found = self._search_verified_recruiter(company_name, location)['recruiters']
+            return found[0] if found else None
+
+        entry = self.company_store.lookup(
+            company_name, 'verified_recruiter',
+            lambda: self._search_verified_recruiter(company_name, location)
+        )
+        recruiter = next((r for r in (entry or {}).get('recruiters', []) if r['verified']), None)
+        if not recruiter:
+            return None
+
+        return {
+            'name': recruiter['name'],
+            'linkedin_url': recruiter['linkedin_url'],
+            'role': recruiter['role'],
+            'company': company_name,
+            'verified': True
+        }
+
+    def _search_verified_recruiter(self, company_name: str, location: str) -> dict:
+        """
+        Busca en Google un reclutador VERIFICADO de la empresa.
+        Solo devuelve resultados si el snippet confirma que trabaja en esa empresa.
+
+        Returns:
+            Datos para la base de conocimiento: {'recruiters': [reclutador] o []}, con
+            INCOMPLETE si no se encontró ninguno y alguna búsqueda falló
+        """
 
+        incomplete = False
         try:
             # Búsquedas más específicas
             recruiter_queries = [
@@ -896,7 +910,9 @@ Responde SOLO con el JSON, sin explicaciones adicionales."""
 
             for query in recruiter_queries:
                 result = self.web_search_tool.run(query=query, limit=5)
-                if result.get('success') and result.get('data', {}).get('results'):
+                if not result.get('success'):
+                    incomplete = True
+                elif result.get('data', {}).get('results'):
                     for item in result['data']['results']:
                         url = item.get('url', '')
                         title = item.get('title', '')
@@ -910,11 +926,8 @@ Responde SOLO con el JSON, sin explicaciones adicionales."""
                         snippet_lower = snippet.lower()
                         title_lower = title.lower()
 
-                        # Buscar variantes del nombre de empresa en el snippet o título
-                        company_confirmed = any(
-                            variant in snippet_lower or variant in title_lower
-                            for variant in company_variants if variant
-                        )
+                        # Buscar el nombre de empresa (sin acentos ni forma jurídica) en el snippet o título
+                        company_confirmed = mentions_company(f'{title} {snippet}', company_name)
 
                         if not company_confirmed:
                             continue
@@ -937,18 +950,19 @@ Responde SOLO con el JSON, sin explicaciones adicionales."""
                         # Extraer rol del snippet
                         role = snippet[:200] if snippet else ''
 
-                        return {
+                        return {'recruiters': [{
                             'name': name,
                             'linkedin_url': url,
                             'role': role,
                             'company': company_name,
                             'verified': True
-                        }
+                        }]}
 
         except Exception as e:
             logger.warning(f"Error buscando reclutador verificado para {company_name}: {e}")
+            incomplete = True
 
-        return None
+        return {'recruiters': [], INCOMPLETE: incomplete}
 
     def _find_job_recruiter(self, company_name: str, job_title: str, location: str) -> dict:
         """Método legacy - redirige a _find_verified_recruiter."""
@@ -996,12 +1010,18 @@ class SearchJobsByRankingTool(BaseTool):
     **USA ESTA TOOL cuando el usuario pida:** búsqueda basada en su perfil, ofertas para sus puestos recomendados,
     o una búsqueda completa según su ranking."""
 
-    def __init__(self, llm=None, web_search_tool=None, browse_tool=None, user_profile=None, user=None):
+    def __init__(self, llm=None, web_search_tool=None, browse_tool=None, user_profile=None, user=None,
+                 max_workers: int = None):
         self.llm = llm
         self.web_search_tool = web_search_tool
         self.browse_tool = browse_tool
         self.user_profile = user_profile
         self.user = user
+        # Límite de puestos buscados en paralelo (por defecto desde config)
+        if max_workers is None:
+            from ...config import RANKING_SEARCH_MAX_WORKERS
+            max_workers = RANKING_SEARCH_MAX_WORKERS
+        self.max_workers = max(1, max_workers)
         super().__init__()
 
     def run(self, location: str = "", top_n: int = 3) -> dict:
@@ -1049,9 +1069,8 @@ class SearchJobsByRankingTool(BaseTool):
             if not location and self.user_profile:
                 location = self.user_profile.get('city', '')
 
-            # Buscar ofertas para cada puesto del ranking
-            for position in ranking_positions:
-                position_results = self._search_for_position(position, location, top_n)
+            # Buscar ofertas para cada puesto del ranking (en paralelo, resultados en orden del ranking)
+            for position_results in self._search_all_positions(ranking_positions, location, top_n):
                 if position_results:
                     results['data']['ranking_jobs'].append(position_results)
                     results['data']['total_analyzed'] += position_results.get('analyzed', 0)
@@ -1069,54 +1088,84 @@ class SearchJobsByRankingTool(BaseTool):
 
         return results
 
+    def _search_all_positions(self, positions: list, location: str, top_n: int = 3) -> list:
+        """
+        Ejecuta el pipeline de cada puesto en paralelo (hasta max_workers a la vez).
+
+        Si el proveedor lo permite, la selección de las mejores ofertas de todos los
+        puestos se hace en una única llamada al LLM al final. Los resultados se
+        devuelven en el mismo orden que el ranking.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if not positions:
+            return []
+
+        batch_selection = self._supports_batched_selection()
+        max_workers = min(self.max_workers, len(positions))
+
+        logger.info(
+            f"[RANKING_SEARCH] Buscando {len(positions)} puestos con {max_workers} workers "
+            f"(selección {'agrupada' if batch_selection else 'por puesto'})"
+        )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            position_results = list(executor.map(
+                lambda position: self._search_for_position(
+                    position, location, top_n, select=not batch_selection
+                ),
+                positions
+            ))
+
+        if batch_selection:
+            self._select_top_jobs_batch(position_results, location, top_n)
+
+        return position_results
+
+    def _supports_batched_selection(self) -> bool:
+        """
+        Indica si la selección de ofertas de todos los puestos puede ir en un solo prompt.
+
+        Ollama trabaja con un contexto reducido (OLLAMA_CONTEXT_LENGTH), así que con él
+        se mantiene una llamada por puesto.
+        """
+        if not self.llm:
+            return False
+
+        try:
+            from langchain_ollama import ChatOllama
+        except ImportError:
+            ChatOllama = None
+
+        return not (ChatOllama and isinstance(self.llm, ChatOllama))
+
     def _extract_ranking_positions(self) -> list:
-        """Extrae los puestos del ranking del perfil del usuario desde cv_summary."""
+        """
+        Obtiene los puestos del ranking del perfil del usuario.
+
+        Usa los puestos cacheados en UserProfile.ranking_positions (extraídos al generar
+        el cv_summary). Solo se vuelven a extraer si el cv_summary ha cambiado.
+        """
 
         try:
             from apps.company.models import UserProfile
+            from apps.company.services import extract_ranking_positions
             import re
 
             # Acceso directo al cv_summary del usuario
             if self.user:
                 profile = UserProfile.objects.filter(user=self.user).first()
                 if profile and profile.cv_summary:
-                    cv_summary = profile.cv_summary
-
-                    # Extraer puestos del ranking del cv_summary
-                    # Buscar sección de ranking de puestos
-                    ranking_section = re.search(
-                        r'(?:ranking|puestos recomendados|posiciones recomendadas)[:\s]*(.+?)(?:\n\n|\Z)',
-                        cv_summary,
-                        re.IGNORECASE | re.DOTALL
-                    )
-
-                    if ranking_section:
-                        # Extraer nombres de puestos (líneas con números o bullets)
-                        positions_text = ranking_section.group(1)
-                        positions = re.findall(
-                            r'(?:\d+[\.\)]\s*|\-\s*|\*\s*)([A-Za-záéíóúñÁÉÍÓÚÑ\s]+?)(?:\n|$|:|\()',
-                            positions_text
-                        )
-                        if positions:
-                            return [p.strip() for p in positions if p.strip()]
-
-                    # Fallback: usar LLM para extraer del cv_summary
-                    if self.llm:
-                        prompt = f"""Extrae los nombres de los puestos del ranking de puestos recomendados de este CV summary:
-
-{cv_summary[:2000]}
-
-Devuelve SOLO una lista JSON con los nombres de los puestos.
-Formato: ["Puesto 1", "Puesto 2", "Puesto 3"]
+                    cached_positions = profile.get_ranking_positions()
+                    if cached_positions:
+                        logger.info(f"[RANKING_SEARCH] {len(cached_positions)} puestos leídos de la cache del perfil")
+                        return cached_positions
 
-Si no hay ranking, devuelve: []"""
-
-                        response = self.llm.invoke(prompt)
-                        response_text = response.content if hasattr(response, 'content') else str(response)
-
-                        json_match = re.search(r'\[.*?\]', response_text, re.DOTALL)
-                        if json_match:
-                            return json.loads(json_match.group())
+                    positions = extract_ranking_positions(profile.cv_summary, llm=self.llm)
+                    if positions:
+                        profile.set_ranking_positions(positions)
+                        profile.save(update_fields=['ranking_positions', 'ranking_positions_hash'])
+                        return positions
 
             # Fallback si no hay user: usar LLM con contexto de conversación
             if self.llm:
@@ -1141,8 +1190,14 @@ Si no hay ranking disponible, devuelve: []"""
             logger.warning(f"Error extrayendo puestos del ranking: {e}")
             return []
 
-    def _search_for_position(self, position: str, location: str, top_n: int = 3) -> dict:
-        """Busca ofertas para un puesto específico y devuelve las top_n mejores."""
+    def _search_for_position(self, position: str, location: str, top_n: int = 3,
+                             select: bool = True) -> dict:
+        """
+        Busca ofertas para un puesto específico y devuelve las top_n mejores.
+
+        Con select=False no se llama al LLM: las ofertas filtradas quedan en
+        'candidates' para que _select_top_jobs_batch haga la selección agrupada.
+        """
 
         try:
             all_jobs = []
@@ -1195,6 +1250,14 @@ Si no hay ranking disponible, devuelve: []"""
                     'message': f'No se encontraron ofertas individuales para {position} (todas eran listados)'
                 }
 
+            if not select:
+                return {
+                    'position': position,
+                    'jobs': [],
+                    'candidates': filtered_jobs,
+                    'analyzed': len(all_jobs)
+                }
+
             # Seleccionar las top_n mejores usando LLM
             top_jobs = self._select_top_jobs(filtered_jobs, position, location, top_n)
 
@@ -1245,28 +1308,107 @@ SELECCIÓN:"""
 
             import re
             numbers = re.findall(r'\d+', selection)
-            selected = []
+            return self._pick_jobs(jobs, numbers, top_n)
 
-            for num in numbers:
-                idx = int(num) - 1
-                if 0 <= idx < len(jobs) and jobs[idx] not in selected:
-                    selected.append(jobs[idx])
-                if len(selected) >= top_n:
-                    break
+        except Exception as e:
+            logger.warning(f"Error seleccionando ofertas: {e}")
+            return jobs[:top_n]
 
-            # Completar si faltan
-            if len(selected) < top_n:
-                for job in jobs:
-                    if job not in selected:
-                        selected.append(job)
-                        if len(selected) >= top_n:
-                            break
+    def _pick_jobs(self, jobs: list, numbers: list, top_n: int) -> list:
+        """Convierte los números (1-based) elegidos por el LLM en ofertas, completando si faltan."""
 
-            return selected
+        selected = []
+
+        for num in numbers:
+            idx = int(num) - 1
+            if 0 <= idx < len(jobs) and jobs[idx] not in selected:
+                selected.append(jobs[idx])
+            if len(selected) >= top_n:
+                break
+
+        # Completar si faltan
+        if len(selected) < top_n:
+            for job in jobs:
+                if job not in selected:
+                    selected.append(job)
+                    if len(selected) >= top_n:
+                        break
+
+        return selected
+
+    def _select_top_jobs_batch(self, position_results: list, location: str, top_n: int = 3):
+        """
+        Selecciona las top_n mejores ofertas de todos los puestos en una sola llamada al LLM.
+
+        Modifica position_results in-place: mueve 'candidates' a 'jobs'. Si la respuesta
+        agrupada no se puede interpretar, recurre a _select_top_jobs por puesto.
+        """
+        pending = []
+
+        for position_result in position_results:
+            candidates = position_result.pop('candidates', None)
+            if candidates is None:
+                continue
+            if len(candidates) <= top_n:
+                position_result['jobs'] = candidates
+                position_result['selected'] = len(candidates)
+            else:
+                pending.append((position_result, candidates))
+
+        if not pending:
+            return
+
+        if len(pending) == 1:
+            position_result, candidates = pending[0]
+            position_result['jobs'] = self._select_top_jobs(candidates, position_result['position'], location, top_n)
+            position_result['selected'] = len(position_result['jobs'])
+            return
+
+        sections = ""
+        for p_idx, (position_result, candidates) in enumerate(pending, start=1):
+            sections += f"\nPUESTO {p_idx}: \"{position_result['position']}\"\n"
+            for i, job in enumerate(candidates):
+                sections += f"[{i+1}] {job['title']}\n    {job['description'][:150]}\n    URL: {job['url']}\n"
+
+        prompt = f"""Para CADA puesto, selecciona las {top_n} MEJORES ofertas en {location or 'España'}.
+{sections}
+CRITERIOS:
+1. Relevancia con el puesto buscado
+2. Calidad de la descripción
+3. Empresa reconocida
+
+Devuelve SOLO un JSON que asocie el número de cada PUESTO con los {top_n} números de sus mejores ofertas.
+Ejemplo: {{"1": [2, 5, 1], "2": [3, 1, 4]}}
+
+SELECCIÓN:"""
+
+        selections = {}
+        try:
+            import re
+            response = self.llm.invoke(prompt)
+            response_text = response.content if hasattr(response, 'content') else str(response)
+
+            json_match = re.search(r'\{[\s\S]*\}', response_text)
+            if json_match:
+                selections = json.loads(json_match.group())
 
         except Exception as e:
-            logger.warning(f"Error seleccionando ofertas: {e}")
-            return jobs[:top_n]
+            logger.warning(f"Error en selección agrupada de ofertas: {e}")
+
+        fallback = []
+        for p_idx, (position_result, candidates) in enumerate(pending, start=1):
+            numbers = selections.get(str(p_idx)) if isinstance(selections, dict) else None
+            if isinstance(numbers, list) and numbers:
+                position_result['jobs'] = self._pick_jobs(candidates, [n for n in numbers if str(n).isdigit()], top_n)
+                position_result['selected'] = len(position_result['jobs'])
+            else:
+                fallback.append((position_result, candidates))
+
+        if fallback:
+            logger.info(f"[RANKING_SEARCH] Selección agrupada incompleta, {len(fallback)} puestos por separado")
+            for position_result, candidates in fallback:
+                position_result['jobs'] = self._select_top_jobs(candidates, position_result['position'], location, top_n)
+                position_result['selected'] = len(position_result['jobs'])
 
     def get_schema(self) -> dict:
         return {
@@ -1378,24 +1520,6 @@ class SearchRecentJobsTool(BaseTool):
                 results['data']['message'] = f"No se encontraron ofertas recientes para '{query}'"
                 return results
 
-            # Deduplicar
-            from difflib import SequenceMatcher
-            import re
-
-            def normalize(text):
-                text = text.lower().strip()
-                text = re.sub(r'[^\w\s]', ' ', text)
-                return re.sub(r'\s+', ' ', text)
-
-            unique_jobs = []
-            seen_titles = []
-            for job in all_jobs:
-                title_norm = normalize(job.get('title', ''))
-                is_dup = any(SequenceMatcher(None, title_norm, seen).ratio() > 0.8 for seen in seen_titles)
-                if not is_dup:
-                    seen_titles.append(title_norm)
-                    unique_jobs.append(job)
-
             # Reutilizar métodos de JobSearchTool
             job_search_tool = JobSearchTool(
                 llm=self.llm,
@@ -1404,6 +1528,9 @@ class SearchRecentJobsTool(BaseTool):
                 user_profile=self.user_profile
             )
 
+            # Deduplicar (título similar y misma empresa canónica)
+            unique_jobs = job_search_tool._deduplicate_jobs(all_jobs)
+
             # Filtrar URLs de listados
             individual_jobs = job_search_tool._filter_individual_jobs(unique_jobs)
 
@@ -7,9 +7,14 @@ Permite al agente buscar información actualizada en internet.
 from typing import Dict, Any, List
 import logging
 from ..core.base import BaseTool
+from ..core.rate_limiter import get_shared_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Motivos de error de Google que indican la cuota DIARIA agotada (se reinicia a medianoche
+# del Pacífico). rateLimitExceeded/429 sin ellos es el límite por minuto: pasa enseguida.
+DAILY_QUOTA_REASONS = ('dailylimitexceeded', 'quotaexceeded', 'queries per day')
+
 
 class GoogleWebSearchTool(BaseTool):
     """
@@ -37,16 +42,18 @@ Use it whenever you need information that is current, recent, or not in the tend
 Input: A search query string and optional limit for number of results.
 Output: List of search results with titles, snippets, and URLs."""
 
-    def __init__(self, api_key: str, engine_id: str):
+    def __init__(self, api_key: str, engine_id: str, rate_limiter=None):
         """
         Inicializa la tool con credenciales de Google Search API.
 
         Args:
             api_key: Google Custom Search API Key
             engine_id: Custom Search Engine ID (cx parameter)
+            rate_limiter: RateLimiter para ritmo y cuota diaria (por defecto el compartido)
         """
         self.api_key = api_key
         self.engine_id = engine_id
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
         super().__init__()
 
     def run(self, query: str, limit: int = 5) -> Dict[str, Any]:
@@ -96,6 +103,21 @@ Output: List of search results with titles, snippets, and URLs."""
                     'error': 'google-api-python-client not installed. Run: pip install google-api-python-client'
                 }
 
+            # Ritmo y cuota diaria compartidos por todas las tools que usan esta key
+            if not self.rate_limiter.acquire('google_search', self.api_key):
+                usage = self.rate_limiter.usage('google_search', self.api_key)
+                logger.warning(f"[WEB_SEARCH] Límite de Google Search alcanzado: {usage}")
+                return {
+                    'success': False,
+                    'error': (
+                        f"Google Search API daily budget reached ({usage['used']}/{usage['daily_quota']} "
+                        f"searches used). It resets at {usage['resets_at']}."
+                        if usage['daily_quota'] and not usage['remaining'] else
+                        'Too many Google Search requests right now. Try again in a minute.'
+                    ),
+                    'quota': usage
+                }
+
             logger.info(f"[WEB_SEARCH] Buscando: '{query}' (limit={limit})")
 
             # Crear servicio de búsqueda
@@ -149,10 +171,19 @@ Output: List of search results with titles, snippets, and URLs."""
             logger.error(f"[WEB_SEARCH] Error: {error_msg}", exc_info=True)
 
             # Detectar errores específicos
-            if 'quota' in error_msg.lower() or 'limit' in error_msg.lower():
+            if any(reason in error_msg.lower() for reason in DAILY_QUOTA_REASONS):
+                # Google manda: las siguientes búsquedas del día no llegan a la API
+                self.rate_limiter.record_exhausted('google_search', self.api_key)
+                usage = self.rate_limiter.usage('google_search', self.api_key)
+                return {
+                    'success': False,
+                    'error': f"Google Search API daily quota exceeded. It resets at {usage['resets_at']}.",
+                    'quota': usage
+                }
+            elif 'ratelimitexceeded' in error_msg.lower() or '429' in error_msg or 'rate limit' in error_msg.lower():
                 return {
                     'success': False,
-                    'error': 'Google Search API quota exceeded. You have used your free 100 searches/day. Wait 24 hours or upgrade your plan.'
+                    'error': 'Too many Google Search requests right now. Try again in a minute.'
                 }
             elif 'invalid' in error_msg.lower() and 'key' in error_msg.lower():
                 return {
@@ -2,6 +2,14 @@
 
 from .base import BaseTool
 from .registry import ToolRegistry
+from .http_fetcher import PageFetcher, get_shared_fetcher
+from .host_health import HostHealth, HostUnavailable, get_shared_host_health
+from .page_cache import PageCache, get_shared_page_cache
+from .html_extractors import BeautifulSoupExtractor, LxmlExtractor, get_extractor
+from .browser_pool import BrowserPool, get_shared_browser_pool
+from .company_names import CompanyNameIndex, company_key, get_shared_company_names
+from .company_store import CompanyStore, get_shared_company_store
+from .rate_limiter import RateLimiter, RateLimitExceeded, get_shared_rate_limiter, request_priority
 from .schema_converters import (
     SchemaConverter,
     ToolCallConverter,
@@ -11,6 +19,27 @@ from .schema_converters import (
 __all__ = [
     'BaseTool',
     'ToolRegistry',
+    'PageFetcher',
+    'get_shared_fetcher',
+    'HostHealth',
+    'HostUnavailable',
+    'get_shared_host_health',
+    'PageCache',
+    'get_shared_page_cache',
+    'BeautifulSoupExtractor',
+    'LxmlExtractor',
+    'get_extractor',
+    'BrowserPool',
+    'get_shared_browser_pool',
+    'CompanyNameIndex',
+    'company_key',
+    'get_shared_company_names',
+    'CompanyStore',
+    'get_shared_company_store',
+    'RateLimiter',
+    'RateLimitExceeded',
+    'get_shared_rate_limiter',
+    'request_priority',
     'SchemaConverter',
     'ToolCallConverter',
     'convert_tools_for_provider',
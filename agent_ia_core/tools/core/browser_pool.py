@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de navegadores Playwright reutilizables.
+
+Lanzar Chromium cuesta 1-3 s; el pool mantiene unos pocos navegadores calientes y da
+a cada llamada un contexto aislado (cookies, storage y caché propios) que se cierra al
+terminar. Limita las páginas abiertas a la vez y recicla cada navegador tras N usos o
+si la memoria de Chromium supera un umbral.
+
+Playwright async está ligado a un event loop, así que el pool corre en un hilo propio
+con su loop. Desde código síncrono se usa run() y desde código async arun(); en ambos
+casos la corrutina se ejecuta en el loop del pool.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledBrowser:
+    """Navegador del pool con sus contadores de uso."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retiring = False
+
+    @property
+    def available(self) -> bool:
+        return not self.retiring and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Pool de navegadores Chromium con contextos aislados por llamada.
+
+    Uso (dentro de una corrutina enviada con run()/arun()):
+
+        async with pool.page(locale='es-ES') as page:
+            await page.goto(url)
+    """
+
+    def __init__(self, size: int = 2, max_pages: int = 6, max_uses: int = 50,
+                 max_memory_mb: int = 0, launch_options: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            size: Navegadores que se mantienen abiertos como máximo
+            max_pages: Páginas (contextos) abiertas a la vez en todo el pool
+            max_uses: Contextos servidos por un navegador antes de reciclarlo
+            max_memory_mb: Memoria total de Chromium a partir de la cual se recicla el
+                           navegador más usado (0 = sin límite; requiere psutil)
+            launch_options: Opciones de chromium.launch() (por defecto headless)
+        """
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.max_uses = max(1, max_uses)
+        self.max_memory_mb = max_memory_mb
+        self.launch_options = launch_options or {'headless': True}
+
+        self._thread_lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+
+        # Objetos del loop del pool (se crean dentro de él)
+        self._playwright = None
+        self._browsers = []
+        self._lock = None
+        self._semaphore = None
+
+        self.stats = {'launched': 0, 'recycled': 0, 'contexts': 0}
+
+    # ------------------------------------------------------------------
+    # Puente síncrono / async
+    # ------------------------------------------------------------------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._thread_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name='browser-pool', daemon=True)
+                    thread.start()
+                    self._thread = thread
+                    self._loop = loop
+        return self._loop
+
+    def submit(self, coro):
+        """Programa la corrutina en el loop del pool y devuelve un concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """
+        Ejecuta la corrutina en el loop del pool y espera su resultado (código síncrono).
+
+        Si pasan timeout segundos se cancela la corrutina (libera su página) y se lanza TimeoutError.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def arun(self, coro, timeout: Optional[float] = None):
+        """Ejecuta la corrutina en el loop del pool desde cualquier otro event loop (mismo timeout que run)."""
+        # wait_for cancela el future envuelto y la cancelación llega a la tarea del pool
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(coro)), timeout)
+
+    # ------------------------------------------------------------------
+    # Navegadores (solo dentro del loop del pool)
+    # ------------------------------------------------------------------
+    async def _launch_browser(self):
+        """Lanza un Chromium nuevo (arranca Playwright la primera vez)."""
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(**self.launch_options)
+
+    async def _acquire_browser(self) -> _PooledBrowser:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            # Descartar navegadores caídos
+            for pooled in [b for b in self._browsers if not b.browser.is_connected()]:
+                logger.warning("[BROWSER_POOL] Navegador desconectado, descartándolo")
+                self._browsers.remove(pooled)
+
+            available = [b for b in self._browsers if b.available]
+            idle = [b for b in available if b.active == 0]
+
+            if not idle and len(self._browsers) < self.size:
+                pooled = _PooledBrowser(await self._launch_browser())
+                self._browsers.append(pooled)
+                self.stats['launched'] += 1
+                logger.info(f"[BROWSER_POOL] Navegador lanzado ({len(self._browsers)}/{self.size})")
+            elif available:
+                pooled = min(available, key=lambda b: b.active)
+            else:
+                # Todos se están reciclando y no cabe otro: lanzar uno nuevo igualmente
+                pooled = _PooledBrowser(await self._launch_browser())
+                self._browsers.append(pooled)
+                self.stats['launched'] += 1
+
+            pooled.active += 1
+            pooled.uses += 1
+            if pooled.uses >= self.max_uses:
+                pooled.retiring = True
+            return pooled
+
+    async def _release_browser(self, pooled: _PooledBrowser):
+        async with self._lock:
+            pooled.active -= 1
+
+            if self.max_memory_mb and not pooled.retiring:
+                memory_mb = chromium_memory_mb()
+                if memory_mb is not None and memory_mb > self.max_memory_mb:
+                    logger.info(f"[BROWSER_POOL] Chromium usa {memory_mb:.0f} MB (> {self.max_memory_mb}), reciclando")
+                    max(self._browsers, key=lambda b: b.uses).retiring = True
+
+            retired = [b for b in self._browsers if b.retiring and b.active == 0]
+            for browser in retired:
+                self._browsers.remove(browser)
+
+        for browser in retired:
+            self.stats['recycled'] += 1
+            logger.info(f"[BROWSER_POOL] Reciclando navegador tras {browser.uses} usos")
+            try:
+                await browser.browser.close()
+            except Exception as e:
+                logger.warning(f"[BROWSER_POOL] Error cerrando navegador: {e}")
+
+    @asynccontextmanager
+    async def page(self, **context_options):
+        """
+        Página nueva en un contexto aislado; el contexto se cierra al salir.
+
+        Args:
+            **context_options: Opciones de browser.new_context() (user_agent, viewport, locale...)
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pages)
+
+        async with self._semaphore:
+            pooled = await self._acquire_browser()
+            context = None
+            try:
+                context = await pooled.browser.new_context(**context_options)
+                self.stats['contexts'] += 1
+                yield await context.new_page()
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"[BROWSER_POOL] Error cerrando contexto: {e}")
+                await self._release_browser(pooled)
+
+    # ------------------------------------------------------------------
+    # Cierre
+    # ------------------------------------------------------------------
+    async def _aclose(self):
+        browsers, self._browsers = self._browsers, []
+        for pooled in browsers:
+            try:
+                await pooled.browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        """Cierra navegadores y Playwright y detiene el loop del pool."""
+        with self._thread_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(), loop).result(30)
+        except Exception as e:
+            logger.warning(f"[BROWSER_POOL] Error cerrando el pool: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._lock = None
+        self._semaphore = None
+
+
+def chromium_memory_mb() -> Optional[float]:
+    """
+    Memoria residente (MB) de los procesos Chromium hijos de este proceso, o None si
+    psutil no está instalado.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            if 'chrom' in child.name().lower():
+                total += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_browser_pool() -> BrowserPool:
+    """
+    Devuelve el BrowserPool del proceso, compartido por todas las llamadas y usuarios.
+    """
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                import atexit
+                from ...config import (
+                    BROWSER_POOL_MAX_MEMORY_MB, BROWSER_POOL_MAX_PAGES, BROWSER_POOL_MAX_USES, BROWSER_POOL_SIZE
+                )
+                _shared_pool = BrowserPool(
+                    size=BROWSER_POOL_SIZE,
+                    max_pages=BROWSER_POOL_MAX_PAGES,
+                    max_uses=BROWSER_POOL_MAX_USES,
+                    max_memory_mb=BROWSER_POOL_MAX_MEMORY_MB
+                )
+                atexit.register(_shared_pool.close)
+    return _shared_pool
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Canonicalización de nombres de empresa compartida por todas las tools.
+
+company_key() reduce un nombre a su clave canónica (sin acentos, mayúsculas,
+puntuación, forma jurídica ni calificativos como "España" o "Grupo"):
+
+    "Telefónica", "Telefonica S.A.", "TELEFÓNICA ESPAÑA"  ->  "telefonica"
+
+CompanyNameIndex añade un índice persistente alias -> clave canónica (modelo
+CompanyAlias) con una copia en memoria para búsquedas O(1), recargada cada
+COMPANY_NAMES_RELOAD_INTERVAL segundos. Cuando aparece una
+unidad de negocio de una empresa ya conocida ("Telefónica Tech") se registra como
+alias suyo, de modo que caches y deduplicación usan la misma clave.
+"""
+
+from typing import Dict, List, Optional, Set
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+
+# Formas jurídicas (ya sin acentos ni puntuación)
+LEGAL_SUFFIXES = {
+    'sa', 'sl', 'slu', 'sau', 'sll', 'slp', 'scoop', 'sccl', 'coop', 'cb', 'sc', 'srl', 'spa',
+    'inc', 'incorporated', 'ltd', 'limited', 'llc', 'llp', 'plc', 'gmbh', 'ag', 'bv', 'nv', 'sas',
+    'corp', 'corporation', 'co', 'company', 'cia', 'compania',
+}
+
+# Calificativos que no distinguen una empresa de otra
+QUALIFIER_WORDS = {
+    'espana', 'spain', 'iberia', 'iberica', 'europe', 'europa', 'emea', 'international',
+    'internacional', 'global', 'group', 'grupo', 'holding', 'holdings',
+}
+
+# Unidades de negocio: "<empresa conocida> Tech" se considera alias de la empresa
+BUSINESS_UNIT_WORDS = {
+    'tech', 'technology', 'technologies', 'tecnologia', 'digital', 'solutions', 'soluciones',
+    'consulting', 'consultoria', 'services', 'servicios', 'labs', 'software', 'it',
+}
+
+# Partículas que pueden quedar sueltas al final al quitar sufijos ("Pérez y Cía" -> "perez")
+TRAILING_PARTICLES = {'de', 'del', 'y', 'and', '&'}
+
+
+def strip_accents(text: str) -> str:
+    """Quita tildes y diacríticos ("Telefónica" -> "Telefonica")."""
+    return ''.join(c for c in unicodedata.normalize('NFKD', text or '') if not unicodedata.combining(c))
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sin acentos, sin puntuación y con los espacios colapsados."""
+    text = strip_accents(text).lower()
+    # "S.A." / "S.L.U." -> "sa" / "slu" antes de sustituir la puntuación por espacios
+    text = re.sub(r'\b((?:[a-z]\.){1,3}[a-z]?)(?=\s|$|,)', lambda m: m.group(1).replace('.', ''), text)
+    text = re.sub(r'[^\w\s&]', ' ', text)
+    return ' '.join(text.split())
+
+
+def company_key(name: str) -> str:
+    """
+    Clave canónica de un nombre de empresa (sin consultar el índice de alias).
+
+    Nunca devuelve una clave vacía si el nombre tenía palabras: "Grupo SA" -> "grupo".
+    """
+    words = normalize_text(name).split()
+    if not words:
+        return ''
+
+    key_words = list(words)
+    while len(key_words) > 1:
+        last = key_words[-1]
+        if last in LEGAL_SUFFIXES or last in TRAILING_PARTICLES:
+            key_words.pop()
+        # "Accenture España" -> "accenture", pero "Banco de España" se mantiene
+        elif last in QUALIFIER_WORDS and key_words[-2] not in TRAILING_PARTICLES:
+            key_words.pop()
+        else:
+            break
+    while len(key_words) > 1 and key_words[0] in QUALIFIER_WORDS:
+        key_words.pop(0)
+
+    return ' '.join(key_words)
+
+
+def mentions_company(text: str, name: str) -> bool:
+    """
+    True si el texto menciona la empresa (comparando sin acentos ni forma jurídica).
+
+    Acepta la clave completa, la clave sin espacios ("el corte ingles" -> "elcorteingles")
+    y, para claves de varias palabras, la primera palabra si es distintiva (> 3 letras).
+    """
+    key = company_key(name)
+    if not key:
+        return False
+
+    normalized = f' {normalize_text(text)} '
+    variants = {key, key.replace(' ', '')}
+    first_word = key.split()[0]
+    if len(first_word) > 3:
+        variants.add(first_word)
+
+    return any(f' {variant} ' in normalized for variant in variants)
+
+
+# Patrones de empresa en títulos de ofertas: "Puesto at Empresa", "Puesto - Empresa", "Empresa | Puesto"
+_TITLE_PATTERNS = [
+    re.compile(r'\bat\s+([A-ZÀ-Ý][\w\s&\-\.]+?)(?:\s*[-|]|$)'),
+    re.compile(r'[-|]\s*([A-ZÀ-Ý][\w\s&\-\.]+?)$'),
+    re.compile(r'^([A-ZÀ-Ý][\w\s&\-\.]+?)\s*[-|]'),
+]
+
+_DESCRIPTION_PATTERNS = [
+    re.compile(r'empresa[:\s]+([\w\s&\-\.]+)', re.IGNORECASE),
+    re.compile(r'company[:\s]+([\w\s&\-\.]+)', re.IGNORECASE),
+    re.compile(r'en\s+([A-ZÀ-Ý][\w\s&\-\.]+?)\s+buscamos', re.IGNORECASE),
+    re.compile(r'([A-ZÀ-Ý][\w\s&\-\.]+?)\s+está buscando', re.IGNORECASE),
+]
+
+# Sufijos de portal que no son la empresa ("... | LinkedIn")
+_PORTAL_NAMES = {'linkedin', 'infojobs', 'indeed', 'glassdoor', 'tecnoempleo', 'jobfluent', 'computrabajo'}
+
+
+def extract_company_name(title: str, description: str = '') -> str:
+    """Extrae el nombre de la empresa del título o descripción de una oferta ('' si no se detecta)."""
+    title = (title or '').strip()
+    for pattern in _TITLE_PATTERNS:
+        match = pattern.search(title)
+        if match:
+            company = match.group(1).strip(' -.')
+            if company and normalize_text(company) not in _PORTAL_NAMES:
+                return company
+
+    for pattern in _DESCRIPTION_PATTERNS:
+        match = pattern.search(description or '')
+        if match:
+            company = match.group(1).strip(' -.')
+            # Filtrar palabras genéricas
+            if company and company.lower() not in ['la', 'una', 'nuestra', 'esta']:
+                return company
+
+    return ''
+
+
+class CompanyNameIndex:
+    """
+    Índice alias -> clave canónica persistido en CompanyAlias y cacheado en memoria.
+
+    resolve() no toca la base de datos salvo al cargar el índice y cuando aprende un
+    alias nuevo. La copia en memoria se recarga cada reload_interval segundos para ver
+    los alias y empresas que registran otros procesos (gunicorn, run_chat_worker).
+    """
+
+    def __init__(self, persist: bool = True, reload_interval: float = 300):
+        """
+        Args:
+            persist: Guardar/leer los alias en la base de datos (False = solo memoria)
+            reload_interval: Segundos tras los que se vuelve a leer el índice de la base de datos
+        """
+        self.persist = persist
+        self.reload_interval = reload_interval
+        self._aliases: Dict[str, str] = {}
+        # Índice inverso clave canónica -> alias, para aliases_of()
+        self._by_canonical: Dict[str, Set[str]] = {}
+        self._canonical = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _is_stale(self) -> bool:
+        return self.persist and (
+            self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_interval
+        )
+
+    def _load(self):
+        if not self._is_stale():
+            return
+        with self._lock:
+            if not self._is_stale():
+                return
+            try:
+                from apps.company.models import Company, CompanyAlias
+                aliases = dict(CompanyAlias.objects.values_list('alias', 'canonical'))
+                canonical = set(Company.objects.values_list('normalized_name', flat=True))
+            except Exception as e:
+                # Se sigue con la copia anterior y se reintenta en el siguiente intervalo
+                logger.warning(f"[COMPANY_NAMES] No se pudo cargar el índice de alias: {e}")
+            else:
+                by_canonical = {}
+                for alias, target in aliases.items():
+                    by_canonical.setdefault(target, set()).add(alias)
+                self._aliases = aliases
+                self._by_canonical = by_canonical
+                self._canonical = canonical | set(aliases.values())
+            self._loaded_at = time.monotonic()
+
+    def resolve(self, name: str) -> str:
+        """
+        Clave canónica del nombre teniendo en cuenta los alias conocidos.
+
+        "Telefónica Tech" se resuelve a "telefonica" si "telefonica" ya es una empresa
+        conocida, y se guarda como alias.
+        """
+        key = company_key(name)
+        if not key:
+            return ''
+
+        self._load()
+        if key in self._aliases:
+            return self._aliases[key]
+        if key in self._canonical:
+            return key
+
+        # Unidad de negocio de una empresa conocida
+        words = key.split()
+        while len(words) > 1 and words[-1] in BUSINESS_UNIT_WORDS:
+            words.pop()
+            parent = ' '.join(words)
+            parent = self._aliases.get(parent, parent)
+            if parent in self._canonical:
+                self.add_alias(key, parent)
+                return parent
+
+        return key
+
+    def register(self, name: str) -> str:
+        """
+        Marca el nombre como empresa conocida y devuelve su clave canónica.
+
+        Se llama después de guardar la empresa: la copia en memoria nunca conoce una
+        empresa que la base de datos no tenga.
+        """
+        canonical = self.resolve(name)
+        if canonical:
+            with self._lock:
+                self._canonical.add(canonical)
+            # El nombre tal cual (p. ej. "Telefónica S.A.") también sirve de alias
+            key = company_key(name)
+            if key != canonical:
+                self.add_alias(key, canonical)
+        return canonical
+
+    def add_alias(self, alias: str, canonical: str):
+        """Registra alias -> canonical (ambos se canonicalizan con company_key)."""
+        self._load()
+        alias_key = company_key(alias)
+        canonical_key = self._aliases.get(company_key(canonical), company_key(canonical))
+        if not alias_key or not canonical_key or alias_key == canonical_key:
+            return
+        if self._aliases.get(alias_key) == canonical_key:
+            return
+
+        # Primero la base de datos: si falla, la memoria no se desvía de lo persistido
+        if self.persist:
+            try:
+                from apps.company.models import CompanyAlias
+                CompanyAlias.objects.update_or_create(alias=alias_key, defaults={'canonical': canonical_key})
+            except Exception as e:
+                logger.warning(f"[COMPANY_NAMES] No se pudo guardar el alias {alias_key}: {e}")
+                return
+
+        with self._lock:
+            previous = self._aliases.get(alias_key)
+            if previous is not None:
+                self._by_canonical.get(previous, set()).discard(alias_key)
+            self._aliases[alias_key] = canonical_key
+            self._by_canonical.setdefault(canonical_key, set()).add(alias_key)
+            self._canonical.add(canonical_key)
+
+        logger.info(f"[COMPANY_NAMES] Alias '{alias_key}' -> '{canonical_key}'")
+
+    def aliases_of(self, canonical: str) -> List[str]:
+        """Alias conocidos de una clave canónica."""
+        self._load()
+        return sorted(self._by_canonical.get(canonical, ()))
+
+    def same_company(self, a: str, b: str) -> bool:
+        """True si ambos nombres se resuelven a la misma empresa."""
+        key_a, key_b = self.resolve(a), self.resolve(b)
+        return bool(key_a) and key_a == key_b
+
+    def clear(self):
+        """Vacía la copia en memoria (se recarga de la base de datos en el siguiente uso)."""
+        with self._lock:
+            self._aliases = {}
+            self._by_canonical = {}
+            self._canonical = set()
+            self._loaded_at = None
+
+
+_shared_index: Optional[CompanyNameIndex] = None
+_shared_index_lock = threading.Lock()
+
+
+def get_shared_company_names() -> CompanyNameIndex:
+    """
+    Devuelve el CompanyNameIndex del proceso, compartido por todas las tools.
+    """
+    global _shared_index
+    if _shared_index is None:
+        with _shared_index_lock:
+            if _shared_index is None:
+                from ...config import COMPANY_NAMES_RELOAD_INTERVAL
+                _shared_index = CompanyNameIndex(reload_interval=COMPANY_NAMES_RELOAD_INTERVAL)
+    return _shared_index
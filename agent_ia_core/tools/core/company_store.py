@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Base de conocimiento de empresas (modelos Company/CompanyRecruiter de apps.company).
+
+Las tools leen primero de la base de datos y solo buscan en Google cuando la empresa
+(o la sección que necesitan) no se ha comprobado nunca:
+
+- Sección fresca (menos de COMPANY_STORE_TTL segundos): se sirve desde la base de datos.
+- Sección caducada: se sirve lo guardado y se refresca en segundo plano.
+- Sección ausente: se busca en el momento y se guarda.
+
+Cada tool usa su propia sección ('recruiters', 'verified_recruiter', 'linkedin', ...)
+porque las consultas que lanza son distintas; los datos se acumulan en la misma empresa.
+
+Si alguna búsqueda de fetch falla (cuota agotada, error HTTP), fetch marca el resultado
+con INCOMPLETE: se devuelve lo encontrado pero no se guarda como comprobado, para no
+servir una empresa vacía durante todo el TTL.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import threading
+
+from .company_names import CompanyNameIndex, get_shared_company_names
+from .rate_limiter import PRIORITY_BACKGROUND, request_priority
+
+logger = logging.getLogger(__name__)
+
+# Clave que fetch añade a sus datos cuando alguna búsqueda falló
+INCOMPLETE = 'incomplete'
+
+
+class CompanyStore:
+    """
+    Lectura/escritura de la base de conocimiento con refresco asíncrono por TTL.
+
+    Uso:
+        entry = store.lookup('Indra', 'recruiters', fetch=lambda: {'recruiters': [...]})
+    """
+
+    def __init__(self, ttl: int = 7 * 24 * 3600, refresh_workers: int = 2, names: CompanyNameIndex = None):
+        """
+        Args:
+            ttl: Segundos durante los que una sección se considera fresca
+            refresh_workers: Hilos dedicados a los refrescos en segundo plano
+            names: Índice de alias de empresa (por defecto el compartido)
+        """
+        self.ttl = ttl
+        self.names = names if names is not None else get_shared_company_names()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, refresh_workers), thread_name_prefix='company-store')
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Devuelve la empresa guardada (por su clave canónica, resolviendo alias) o None."""
+        from apps.company.models import Company
+
+        normalized = self.names.resolve(name)
+        if not normalized:
+            return None
+
+        try:
+            company = Company.objects.filter(normalized_name=normalized).prefetch_related('recruiters').first()
+        except Exception as e:
+            logger.warning(f"[COMPANY_STORE] Error leyendo {name}: {e}")
+            return None
+
+        return self._to_dict(company) if company else None
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]], section: str) -> bool:
+        """True si la sección se comprobó hace menos de ttl segundos."""
+        checked_at = self._checked_at(entry, section)
+        return checked_at is not None and self._now() - checked_at < timedelta(seconds=self.ttl)
+
+    def lookup(self, name: str, section: str, fetch: Callable[[], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Lectura a través de la base de conocimiento.
+
+        Args:
+            name: Nombre de la empresa
+            section: Sección que necesita la tool
+            fetch: Función sin argumentos que busca los datos (devuelve kwargs de save(),
+                más INCOMPLETE=True si alguna búsqueda falló)
+
+        Returns:
+            La empresa con la sección disponible, o None si fetch lanza una excepción
+        """
+        entry = self.get(name)
+
+        if self._checked_at(entry, section) is not None:
+            if not self.is_fresh(entry, section):
+                self.refresh_async(name, section, fetch)
+            logger.info(f"[COMPANY_STORE] {name}/{section} servido desde la base de conocimiento")
+            return entry
+
+        try:
+            data = dict(fetch() or {})
+        except Exception as e:
+            logger.warning(f"[COMPANY_STORE] Error buscando {name}/{section}: {e}")
+            return None
+
+        if data.pop(INCOMPLETE, False):
+            logger.warning(f"[COMPANY_STORE] Búsquedas fallidas para {name}/{section}: no se guarda")
+            return self._entry_from_data(name, section, data, checked=False)
+
+        # Si no se puede guardar, se devuelven igualmente los datos recién buscados
+        return self.save(name, section, **data) or self._entry_from_data(name, section, data)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def save(self, name: str, section: str, website: str = '', linkedin_url: str = '', sector: str = '',
+             info: Optional[Dict[str, Any]] = None,
+             recruiters: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Guarda (o actualiza) la empresa y marca la sección como comprobada ahora.
+
+        Los campos vacíos no sobrescriben lo ya guardado, info se fusiona por claves y
+        los reclutadores se insertan o actualizan por URL de LinkedIn.
+        """
+        from django.db import transaction
+        from apps.company.models import Company, CompanyRecruiter
+
+        normalized = self.names.resolve(name)
+        if not normalized:
+            return None
+
+        now = self._now()
+        try:
+            with transaction.atomic():
+                company = Company.objects.select_for_update().filter(normalized_name=normalized).first()
+                if company is None:
+                    company = Company(name=name.strip(), normalized_name=normalized)
+
+                company.website = website or company.website
+                company.linkedin_url = linkedin_url or company.linkedin_url
+                company.sector = sector or company.sector
+                company.info = {**(company.info or {}), **(info or {})}
+                company.checked_sections = {**(company.checked_sections or {}), section: now.isoformat()}
+                company.last_checked_at = now
+                company.save()
+
+                for recruiter in recruiters or []:
+                    if not recruiter.get('linkedin_url'):
+                        continue
+                    existing, _ = CompanyRecruiter.objects.select_for_update().get_or_create(
+                        company=company,
+                        linkedin_url=recruiter['linkedin_url'][:500]
+                    )
+                    # Otras tools guardan el mismo perfil sin verificar ni email: nunca
+                    # se pierde una verificación ni se borra un email ya conocido
+                    existing.name = (recruiter.get('name') or '')[:200] or existing.name
+                    existing.role = recruiter.get('role') or existing.role
+                    existing.email = recruiter.get('email') or existing.email
+                    existing.verified = existing.verified or bool(recruiter.get('verified'))
+                    existing.save()
+        except Exception as e:
+            logger.warning(f"[COMPANY_STORE] Error guardando {name}/{section}: {e}")
+            return None
+
+        # El índice de nombres solo aprende la empresa una vez guardada
+        self.names.register(name)
+        return self.get(company.normalized_name)
+
+    def refresh_async(self, name: str, section: str, fetch: Callable[[], Dict[str, Any]]):
+        """Refresca la sección en segundo plano (una sola vez a la vez por empresa y sección)."""
+        key = (self.names.resolve(name), section)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        logger.info(f"[COMPANY_STORE] Refrescando {name}/{section} en segundo plano")
+        self._executor.submit(self._refresh, key, name, section, fetch)
+
+    def _refresh(self, key, name: str, section: str, fetch: Callable[[], Dict[str, Any]]):
+        from django.db import connection
+
+        try:
+            # Los refrescos ceden la cuota de las APIs a las peticiones del chat
+            with request_priority(PRIORITY_BACKGROUND):
+                data = dict(fetch() or {})
+            if data.pop(INCOMPLETE, False):
+                logger.warning(f"[COMPANY_STORE] Refresco incompleto de {name}/{section}: se mantiene lo guardado")
+            else:
+                self.save(name, section, **data)
+        except Exception as e:
+            logger.warning(f"[COMPANY_STORE] Error refrescando {name}/{section}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+            # Los hilos del executor no pasan por el ciclo de petición de Django
+            connection.close()
+
+    # ------------------------------------------------------------------
+    # Utilidades
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _now() -> datetime:
+        from django.utils import timezone
+        return timezone.now()
+
+    @staticmethod
+    def _checked_at(entry: Optional[Dict[str, Any]], section: str) -> Optional[datetime]:
+        if not entry or section not in entry['checked_sections']:
+            return None
+        try:
+            return datetime.fromisoformat(entry['checked_sections'][section])
+        except (TypeError, ValueError):
+            return None
+
+    def _entry_from_data(self, name: str, section: str, data: Dict[str, Any],
+                         checked: bool = True) -> Dict[str, Any]:
+        """Entrada con el mismo formato que get() construida sin pasar por la base de datos."""
+        now = self._now()
+        return {
+            'name': name,
+            'normalized_name': self.names.resolve(name),
+            'aliases': [],
+            'website': data.get('website', ''),
+            'linkedin_url': data.get('linkedin_url', ''),
+            'sector': data.get('sector', ''),
+            'info': dict(data.get('info') or {}),
+            'checked_sections': {section: now.isoformat()} if checked else {},
+            'last_checked_at': now if checked else None,
+            'recruiters': [
+                {
+                    'name': recruiter.get('name', ''),
+                    'linkedin_url': recruiter['linkedin_url'],
+                    'role': recruiter.get('role', ''),
+                    'email': recruiter.get('email') or None,
+                    'verified': bool(recruiter.get('verified')),
+                }
+                for recruiter in data.get('recruiters') or [] if recruiter.get('linkedin_url')
+            ],
+        }
+
+    def _to_dict(self, company) -> Dict[str, Any]:
+        return {
+            'name': company.name,
+            'normalized_name': company.normalized_name,
+            'aliases': self.names.aliases_of(company.normalized_name),
+            'website': company.website,
+            'linkedin_url': company.linkedin_url,
+            'sector': company.sector,
+            'info': dict(company.info or {}),
+            'checked_sections': dict(company.checked_sections or {}),
+            'last_checked_at': company.last_checked_at,
+            'recruiters': [
+                {
+                    'name': recruiter.name,
+                    'linkedin_url': recruiter.linkedin_url,
+                    'role': recruiter.role,
+                    'email': recruiter.email or None,
+                    'verified': recruiter.verified,
+                }
+                for recruiter in company.recruiters.all()
+            ],
+        }
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_shared_company_store() -> Optional[CompanyStore]:
+    """
+    Devuelve la CompanyStore del proceso, o None si la base de conocimiento está desactivada.
+    """
+    global _shared_store
+    from ...config import COMPANY_STORE_ENABLED, COMPANY_STORE_REFRESH_WORKERS, COMPANY_STORE_TTL
+
+    if not COMPANY_STORE_ENABLED:
+        return None
+
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                _shared_store = CompanyStore(ttl=COMPANY_STORE_TTL, refresh_workers=COMPANY_STORE_REFRESH_WORKERS)
+    return _shared_store
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Salud por host de los portales que descarga el PageFetcher.
+
+Para cada host se guardan las últimas latencias y los fallos consecutivos:
+
+- Circuit breaker: tras failure_threshold fallos seguidos (timeout, error de conexión,
+  403/429/5xx) el host queda 'abierto' durante cooldown segundos y las descargas fallan
+  al instante en lugar de esperar el timeout. Pasado el cooldown se deja pasar una sola
+  petición de prueba ('half_open'): si va bien el circuito se cierra, si falla se vuelve
+  a abrir. Si la prueba no informa de su resultado (excepción inesperada, tarea
+  cancelada), pasado otro cooldown se deja pasar una prueba nueva.
+- Latencia p95: a partir de min_samples descargas, hedge_delay() devuelve el p95 del
+  host, que el fetcher usa para lanzar una petición de respaldo (hedged request)
+  cuando la primera tarda más de lo normal.
+"""
+
+from collections import deque
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+import logging
+import math
+import threading
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Respuestas que indican que el portal está bloqueando o caído (un 404 no cuenta)
+FAILURE_STATUS_CODES = {403, 429}
+
+
+class HostUnavailable(requests.exceptions.ConnectionError):
+    """El circuito del host está abierto: no se envía la petición."""
+
+    def __init__(self, url: str, retry_after: float = 0):
+        self.url = url
+        self.retry_after = retry_after
+        super().__init__(f"{host_of(url)} está fallando; se reintentará en {retry_after:.0f}s")
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def is_failure_status(status_code: int) -> bool:
+    return status_code in FAILURE_STATUS_CODES or status_code >= 500
+
+
+class _HostState:
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self.probe_started_at = 0.0
+
+
+class HostHealth:
+    """
+    Registro thread-safe de latencias y fallos por host con circuit breaker.
+
+    Uso:
+        if health.allow(url):
+            ... descargar ...
+            health.record_success(url, latency)  # o record_failure(url)
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 120, window: int = 50,
+                 min_samples: int = 5, min_hedge_delay: float = 0.5):
+        """
+        Args:
+            failure_threshold: Fallos consecutivos que abren el circuito de un host
+            cooldown: Segundos que el circuito permanece abierto antes de probar de nuevo
+            window: Latencias recientes que se conservan por host
+            min_samples: Muestras necesarias para calcular el p95 (y hacer hedging)
+            min_hedge_delay: Espera mínima antes de lanzar una petición de respaldo (segundos)
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.window = window
+        self.min_samples = max(1, min_samples)
+        self.min_hedge_delay = min_hedge_delay
+
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> _HostState:
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.window)
+        return self._hosts[host]
+
+    # ------------------------------------------------------------------
+    # Circuit breaker
+    # ------------------------------------------------------------------
+    def allow(self, url: str) -> bool:
+        """True si se puede enviar una petición al host de la URL."""
+        with self._lock:
+            state = self._state(host_of(url))
+            if state.state == CLOSED:
+                return True
+
+            if state.state == OPEN and time.monotonic() - state.opened_at >= self.cooldown:
+                state.state = HALF_OPEN
+                state.probing = False
+
+            # En half_open solo pasa una petición de prueba a la vez (salvo que la anterior
+            # lleve un cooldown entero sin informar: se da por perdida)
+            now = time.monotonic()
+            if state.state == HALF_OPEN and (not state.probing or now - state.probe_started_at >= self.cooldown):
+                state.probing = True
+                state.probe_started_at = now
+                return True
+            return False
+
+    def is_open(self, url: str) -> bool:
+        """True si el host está en cooldown (no modifica el estado, a diferencia de allow())."""
+        return self.retry_after(url) > 0
+
+    def record_success(self, url: str, latency: float):
+        host = host_of(url)
+        with self._lock:
+            state = self._state(host)
+            state.latencies.append(latency)
+            if state.state != CLOSED:
+                logger.info(f"[HOST_HEALTH] {host} responde de nuevo, circuito cerrado")
+            state.failures = 0
+            state.state = CLOSED
+            state.probing = False
+
+    def record_failure(self, url: str, latency: Optional[float] = None):
+        host = host_of(url)
+        with self._lock:
+            state = self._state(host)
+            if latency is not None:
+                state.latencies.append(latency)
+            state.failures += 1
+            state.probing = False
+
+            if state.state == HALF_OPEN or state.failures >= self.failure_threshold:
+                if state.state != OPEN:
+                    logger.warning(
+                        f"[HOST_HEALTH] {host} abierto durante {self.cooldown:g}s "
+                        f"tras {state.failures} fallos seguidos"
+                    )
+                state.state = OPEN
+                state.opened_at = time.monotonic()
+
+    def retry_after(self, url: str) -> float:
+        """Segundos que faltan para volver a probar un host abierto (0 si no está abierto)."""
+        with self._lock:
+            state = self._hosts.get(host_of(url))
+            if not state or state.state != OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - state.opened_at))
+
+    # ------------------------------------------------------------------
+    # Latencia
+    # ------------------------------------------------------------------
+    def p95(self, url: str) -> Optional[float]:
+        """Latencia p95 reciente del host (None si hay menos de min_samples muestras)."""
+        with self._lock:
+            state = self._hosts.get(host_of(url))
+            if not state or len(state.latencies) < self.min_samples:
+                return None
+            ordered = sorted(state.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def hedge_delay(self, url: str) -> Optional[float]:
+        """Espera antes de lanzar una petición de respaldo (None = sin datos para hedging)."""
+        p95 = self.p95(url)
+        return None if p95 is None else max(self.min_hedge_delay, p95)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Estado de todos los hosts conocidos (para logs y diagnóstico)."""
+        with self._lock:
+            hosts = list(self._hosts.items())
+        return {
+            host: {
+                'state': state.state,
+                'consecutive_failures': state.failures,
+                'samples': len(state.latencies),
+                'p95': self.p95(f'//{host}'),
+            }
+            for host, state in hosts
+        }
+
+    def reset(self, url: Optional[str] = None):
+        """Olvida el historial de un host (o de todos)."""
+        with self._lock:
+            if url is None:
+                self._hosts.clear()
+            else:
+                self._hosts.pop(host_of(url), None)
+
+
+_shared_health = None
+_shared_health_lock = threading.Lock()
+
+
+def get_shared_host_health() -> HostHealth:
+    """
+    Devuelve el HostHealth del proceso, compartido por todas las tools y usuarios.
+    """
+    global _shared_health
+    if _shared_health is None:
+        with _shared_health_lock:
+            if _shared_health is None:
+                from ...config import (
+                    HOST_BREAKER_COOLDOWN, HOST_BREAKER_FAILURES, HOST_HEDGE_MIN_SAMPLES, HOST_LATENCY_WINDOW
+                )
+                _shared_health = HostHealth(
+                    failure_threshold=HOST_BREAKER_FAILURES,
+                    cooldown=HOST_BREAKER_COOLDOWN,
+                    window=HOST_LATENCY_WINDOW,
+                    min_samples=HOST_HEDGE_MIN_SAMPLES
+                )
+    return _shared_health
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Extractores HTML → texto para las tools que leen páginas web.
+
+- LxmlExtractor: parser en C de lxml y recorrido iterativo del árbol que se detiene
+  en cuanto se alcanza max_chars (backend por defecto)
+- BeautifulSoupExtractor: implementación original con html.parser (fallback)
+
+Ambos devuelven el mismo texto: nodos de texto sin espacios sobrantes unidos por
+saltos de línea, del contenido principal (main/article/...) o del body.
+"""
+
+from typing import Dict, Optional, Tuple, Type
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+# Elementos que no aportan contenido legible
+REMOVED_TAGS = ('script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript')
+
+# Selectores del contenido principal, por orden de prioridad (elementos semánticos HTML5 primero)
+MAIN_CONTENT_SELECTORS = ['main', 'article', 'div[role="main"]', '.content', '.main-content', '#content', '#main']
+
+
+def clean_text(text: str) -> str:
+    """Limpieza común del texto extraído."""
+    # Eliminar líneas vacías múltiples
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    # Eliminar espacios múltiples
+    text = re.sub(r' +', ' ', text)
+    # Eliminar tabulaciones
+    text = re.sub(r'\t+', ' ', text)
+    return text
+
+
+class BaseExtractor:
+    """
+    Interfaz de los extractores.
+
+    extract() devuelve (title, text, complete); complete=False indica que el recorrido
+    se detuvo al superar max_chars y el texto no contiene la página entera.
+    """
+
+    name = 'base'
+
+    def extract(self, html: str, max_chars: Optional[int] = None) -> Tuple[str, str, bool]:
+        raise NotImplementedError
+
+
+class BeautifulSoupExtractor(BaseExtractor):
+    """Extractor original basado en BeautifulSoup + html.parser (Python puro)."""
+
+    name = 'bs4'
+
+    def extract(self, html: str, max_chars: Optional[int] = None) -> Tuple[str, str, bool]:
+        from bs4 import BeautifulSoup
+
+        # Parsear HTML con BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Extraer título
+        title = ''
+        if soup.title:
+            title = soup.title.string.strip() if soup.title.string else ''
+
+        # Si no hay title tag, buscar h1
+        if not title and soup.h1:
+            title = soup.h1.get_text().strip()
+
+        # Eliminar scripts, styles, y otros elementos no deseados
+        for element in soup(list(REMOVED_TAGS)):
+            element.decompose()
+
+        # Intentar encontrar el contenido principal
+        main_content = None
+        for tag in MAIN_CONTENT_SELECTORS:
+            main_content = soup.select_one(tag)
+            if main_content:
+                break
+
+        # Si no se encuentra contenido principal, usar body
+        if not main_content:
+            main_content = soup.body if soup.body else soup
+
+        text = clean_text(main_content.get_text(separator='\n', strip=True))
+        return title, text, True
+
+
+class LxmlExtractor(BaseExtractor):
+    """
+    Extractor rápido sobre lxml.
+
+    Parsea con el parser HTML en C de lxml y recorre el contenido principal de forma
+    iterativa, saltando los subárboles de REMOVED_TAGS sin modificar el árbol. El
+    recorrido termina en cuanto el texto acumulado supera max_chars.
+    """
+
+    name = 'lxml'
+
+    # Un candidato no cuenta si está dentro (o es) un elemento que se descartaría
+    _NOT_REMOVED = '[not(' + ' or '.join(f'ancestor-or-self::{tag}' for tag in REMOVED_TAGS) + ')]'
+
+    # Equivalentes XPath de MAIN_CONTENT_SELECTORS (mismo orden)
+    _MAIN_CONTENT_XPATHS = [
+        '//main',
+        '//article',
+        "//div[@role='main']",
+        "//*[contains(concat(' ', normalize-space(@class), ' '), ' content ')]",
+        "//*[contains(concat(' ', normalize-space(@class), ' '), ' main-content ')]",
+        "//*[@id='content']",
+        "//*[@id='main']",
+    ]
+
+    def extract(self, html: str, max_chars: Optional[int] = None) -> Tuple[str, str, bool]:
+        import lxml.html
+
+        root = lxml.html.document_fromstring(html)
+
+        # Extraer título (o el primer h1 si no hay title)
+        title = ''
+        title_el = root.find('.//title')
+        if title_el is not None:
+            title = (title_el.text or '').strip()
+        if not title:
+            h1 = root.find('.//h1')
+            if h1 is not None:
+                title = h1.text_content().strip()
+
+        main_content = None
+        for xpath in self._MAIN_CONTENT_XPATHS:
+            matches = root.xpath(f'({xpath}{self._NOT_REMOVED})[1]')
+            if matches:
+                main_content = matches[0]
+                break
+
+        if main_content is None:
+            body = root.find('body')
+            main_content = body if body is not None else root
+
+        text, complete = self._collect_text(main_content, max_chars)
+        return title, text, complete
+
+    @staticmethod
+    def _collect_text(element, max_chars: Optional[int]) -> Tuple[str, bool]:
+        """
+        Recorre el subárbol en orden de documento acumulando sus nodos de texto.
+
+        Equivale a get_text(separator='\\n', strip=True) + clean_text(), pero se
+        detiene cuando el texto supera max_chars.
+        """
+        pieces = []
+        total = 0
+
+        # Pila de elementos pendientes y de textos "tail" (texto tras el cierre de un hijo)
+        stack = [element]
+        while stack:
+            item = stack.pop()
+
+            if isinstance(item, str):
+                piece = item.strip()
+                if piece:
+                    piece = clean_text(piece)
+                    pieces.append(piece)
+                    total += len(piece) + (1 if len(pieces) > 1 else 0)
+                    if max_chars is not None and total > max_chars:
+                        return '\n'.join(pieces), False
+                continue
+
+            # Comentarios e instrucciones de procesado: solo cuenta su tail (lo apila el padre)
+            if not isinstance(item.tag, str) or item.tag.lower() in REMOVED_TAGS:
+                continue
+
+            for child in reversed(item):
+                if child.tail:
+                    stack.append(child.tail)
+                stack.append(child)
+            if item.text:
+                stack.append(item.text)
+
+        return '\n'.join(pieces), True
+
+
+EXTRACTORS: Dict[str, Type[BaseExtractor]] = {
+    LxmlExtractor.name: LxmlExtractor,
+    BeautifulSoupExtractor.name: BeautifulSoupExtractor,
+}
+
+
+def get_extractor(name: Optional[str] = None) -> BaseExtractor:
+    """
+    Devuelve una instancia del extractor indicado (por defecto BROWSE_EXTRACTOR).
+    """
+    if name is None:
+        from ...config import BROWSE_EXTRACTOR
+        name = BROWSE_EXTRACTOR
+
+    extractor_class = EXTRACTORS.get(name)
+    if extractor_class is None:
+        logger.warning(f"[EXTRACTOR] Backend desconocido '{name}', usando lxml")
+        extractor_class = LxmlExtractor
+    return extractor_class()
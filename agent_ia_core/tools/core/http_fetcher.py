@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+"""
+Cliente HTTP compartido para las tools que descargan páginas web.
+
+Mantiene un pool de conexiones keep-alive por host (requests.Session) para no pagar
+DNS + TCP + TLS en cada descarga, limita las peticiones simultáneas a un mismo host
+y ofrece una variante async (httpx, con HTTP/2 si el paquete h2 está instalado).
+Con un RateLimiter, además reparte las peticiones a cada portal en el tiempo
+(proveedor 'portal', con el host como clave). Con un HostHealth, deja de llamar a
+los hosts que fallan seguidos (circuit breaker) y lanza una petición de respaldo
+cuando la primera supera el p95 de latencia del host (hedged request).
+"""
+
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlparse
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .host_health import HostHealth, HostUnavailable, host_of, is_failure_status
+
+logger = logging.getLogger(__name__)
+
+
+# Headers que simulan un navegador (los portales bloquean clientes sin User-Agent)
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+
+def _http2_available() -> bool:
+    """httpx solo negocia HTTP/2 si el paquete h2 está instalado."""
+    return importlib.util.find_spec('h2') is not None
+
+
+class PageFetcher:
+    """
+    Descargador de páginas con pool de conexiones compartido.
+
+    - get() / get_many(): síncrono, sobre una requests.Session con keep-alive por host
+    - aget() / aget_many(): async, sobre httpx.AsyncClient (HTTP/2 si está disponible)
+    - Como mucho max_per_host peticiones simultáneas contra el mismo host
+    - Con health: circuit breaker por host y, en get(), hedging según el p95 del host
+    """
+
+    def __init__(self, timeout: float = 15, max_per_host: int = 4, pool_maxsize: int = 10,
+                 headers: Optional[Dict[str, str]] = None, rate_limiter=None,
+                 health: Optional[HostHealth] = None, hedge: bool = True, hedge_workers: int = 16):
+        """
+        Args:
+            timeout: Timeout por petición (segundos)
+            max_per_host: Peticiones simultáneas permitidas contra un mismo host
+            pool_maxsize: Conexiones keep-alive que se conservan por host
+            headers: Headers por defecto (si es None, usa DEFAULT_HEADERS)
+            rate_limiter: RateLimiter para el ritmo de peticiones por host (None = sin límite)
+            health: Registro de salud por host (None = sin circuit breaker ni hedging)
+            hedge: Lanzar peticiones de respaldo cuando se supera el p95 del host
+            hedge_workers: Hilos para las peticiones con respaldo
+        """
+        self.timeout = timeout
+        self.max_per_host = max(1, max_per_host)
+        self.pool_maxsize = max(pool_maxsize, self.max_per_host)
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.http2 = _http2_available()
+        self.rate_limiter = rate_limiter
+        self.health = health
+        self.hedge = hedge
+        self.hedge_workers = max(2, hedge_workers)
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._hedge_executor = None
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+        # Los objetos async están ligados a un event loop concreto
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_semaphores = weakref.WeakKeyDictionary()
+
+    # ------------------------------------------------------------------
+    # Síncrono
+    # ------------------------------------------------------------------
+    @property
+    def session(self) -> requests.Session:
+        """Session compartida (se crea la primera vez que se usa)."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    session.headers.update(self.headers)
+                    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=self.pool_maxsize)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def _throttle(self, url: str):
+        """Espera un token del limitador para el host; lanza RateLimitExceeded si no llega."""
+        host = urlparse(url).netloc.lower()
+        if not self.rate_limiter.acquire('portal', host):
+            from .rate_limiter import RateLimitExceeded
+            raise RateLimitExceeded('portal', f"Demasiadas peticiones a {host}, inténtalo más tarde")
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_semaphores[host]
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        GET sobre la sesión compartida. Lanza las mismas excepciones que requests.get
+        (RateLimitExceeded si el host está saturado, HostUnavailable si su circuito está abierto).
+        """
+        if self.rate_limiter:
+            self._throttle(url)
+        if self.health and not self.health.allow(url):
+            raise HostUnavailable(url, self.health.retry_after(url))
+
+        timeout = timeout or self.timeout
+        kwargs['allow_redirects'] = kwargs.pop('allow_redirects', True)
+
+        delay = self.health.hedge_delay(url) if self.health and self.hedge else None
+        if delay is None or delay >= timeout:
+            return self._tracked_get(url, timeout, **kwargs)
+        return self._hedged_get(url, delay, timeout, **kwargs)
+
+    def _tracked_get(self, url: str, timeout: float, settled: Optional[threading.Event] = None,
+                     **kwargs) -> requests.Response:
+        """
+        GET que anota latencia y resultado en el registro de salud del host.
+
+        settled lo marca _hedged_get cuando otra petición de la pareja ya ha respondido:
+        el fallo de la perdedora no se cuenta, porque el host sí ha contestado.
+        """
+        with self._host_semaphore(url):
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, timeout=timeout, **kwargs)
+            except requests.exceptions.RequestException:
+                if self.health and not (settled and settled.is_set()):
+                    self.health.record_failure(url)
+                raise
+
+        if self.health:
+            latency = time.monotonic() - start
+            if not is_failure_status(response.status_code):
+                self.health.record_success(url, latency)
+            elif not (settled and settled.is_set()):
+                self.health.record_failure(url, latency)
+        return response
+
+    def _hedged_get(self, url: str, delay: float, timeout: float, **kwargs) -> requests.Response:
+        """
+        Lanza la petición y, si no ha respondido en delay segundos (p95 del host), una
+        segunda idéntica. Devuelve la primera respuesta que llegue.
+        """
+        from concurrent.futures import FIRST_COMPLETED, TimeoutError as FutureTimeout, wait
+
+        executor = self._get_hedge_executor()
+        settled = threading.Event()
+        primary = executor.submit(self._tracked_get, url, timeout, settled, **kwargs)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            if primary.done():
+                return primary.result()
+
+        # La petición de respaldo también consume ritmo del portal; sin token se espera a la primera
+        if self.rate_limiter and not self.rate_limiter.acquire('portal', host_of(url), timeout=0):
+            return primary.result()
+
+        logger.info(f"[FETCHER] {host_of(url)} supera su p95 ({delay:.1f}s), lanzando petición de respaldo")
+        pending = {primary, executor.submit(self._tracked_get, url, timeout, settled, **kwargs)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    settled.set()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _get_hedge_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        if self._hedge_executor is None:
+            with self._lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=self.hedge_workers, thread_name_prefix='fetch-hedge'
+                    )
+        return self._hedge_executor
+
+    def get_many(self, urls: List[str], max_workers: int = 8,
+                 **kwargs) -> List[Union[requests.Response, Exception]]:
+        """
+        Descarga varias URLs en paralelo (hilos) reutilizando las conexiones del pool.
+
+        Returns:
+            Lista en el mismo orden que urls: Response, o la excepción si falló
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        if not urls:
+            return []
+
+        def fetch(url):
+            try:
+                return self.get(url, **kwargs)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as executor:
+            return list(executor.map(fetch, urls))
+
+    # ------------------------------------------------------------------
+    # Async
+    # ------------------------------------------------------------------
+    def _get_async_client(self):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                http2=self.http2,
+                limits=httpx.Limits(max_keepalive_connections=self.pool_maxsize)
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def _async_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphores = self._async_semaphores.setdefault(loop, {})
+        host = urlparse(url).netloc.lower()
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return semaphores[host]
+
+    async def aget(self, url: str, timeout: Optional[float] = None, **kwargs):
+        """
+        GET async (httpx). Devuelve un httpx.Response; lanza las excepciones de httpx.
+        """
+        if self.rate_limiter:
+            host = urlparse(url).netloc.lower()
+            if not await self.rate_limiter.aacquire('portal', host):
+                from .rate_limiter import RateLimitExceeded
+                raise RateLimitExceeded('portal', f"Demasiadas peticiones a {host}, inténtalo más tarde")
+        if self.health and not self.health.allow(url):
+            raise HostUnavailable(url, self.health.retry_after(url))
+
+        import httpx
+
+        client = self._get_async_client()
+        async with self._async_host_semaphore(url):
+            start = time.monotonic()
+            try:
+                response = await client.get(url, timeout=timeout or self.timeout, **kwargs)
+            except httpx.HTTPError:
+                if self.health:
+                    self.health.record_failure(url)
+                raise
+
+        if self.health:
+            latency = time.monotonic() - start
+            if is_failure_status(response.status_code):
+                self.health.record_failure(url, latency)
+            else:
+                self.health.record_success(url, latency)
+        return response
+
+    async def aget_many(self, urls: List[str], **kwargs) -> list:
+        """
+        Descarga varias URLs concurrentemente respetando el límite por host.
+
+        Returns:
+            Lista en el mismo orden que urls: httpx.Response, o la excepción si falló
+        """
+        return await asyncio.gather(*(self.aget(url, **kwargs) for url in urls), return_exceptions=True)
+
+    async def aclose(self):
+        """Cierra el cliente async del event loop actual."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """Cierra la sesión síncrona y libera sus conexiones."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_shared_fetcher = None
+_shared_fetcher_lock = threading.Lock()
+
+
+def get_shared_fetcher() -> PageFetcher:
+    """
+    Devuelve el PageFetcher del proceso, compartido por todas las tools y usuarios.
+    """
+    global _shared_fetcher
+    if _shared_fetcher is None:
+        with _shared_fetcher_lock:
+            if _shared_fetcher is None:
+                from ...config import BROWSE_MAX_CONNECTIONS_PER_HOST, BROWSE_TIMEOUT
+                from ...config import HOST_HEDGE_ENABLED, HOST_HEDGE_WORKERS
+                from .host_health import get_shared_host_health
+                from .rate_limiter import get_shared_rate_limiter
+                _shared_fetcher = PageFetcher(
+                    timeout=BROWSE_TIMEOUT,
+                    max_per_host=BROWSE_MAX_CONNECTIONS_PER_HOST,
+                    rate_limiter=get_shared_rate_limiter(),
+                    health=get_shared_host_health(),
+                    hedge=HOST_HEDGE_ENABLED,
+                    hedge_workers=HOST_HEDGE_WORKERS
+                )
+    return _shared_fetcher
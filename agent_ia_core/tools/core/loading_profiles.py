@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Perfiles de carga de páginas para la navegación con Playwright.
+
+Un perfil decide qué peticiones se abortan (tipos de recurso pesados y dominios de
+tracking), cómo se espera a que la página esté lista (domcontentloaded + selector en
+lugar de networkidle) y el tamaño del viewport.
+
+- 'full': comportamiento clásico (todo se descarga, networkidle, 1920x1080)
+- 'light': sin imágenes, media ni fuentes, sin trackers, 1280x800 (por defecto)
+- 'minimal': como light y además sin hojas de estilo
+"""
+
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Dominios de analítica/publicidad que no aportan contenido (se bloquean también sus subdominios)
+TRACKER_DOMAINS = {
+    'google-analytics.com', 'googletagmanager.com', 'googletagservices.com', 'doubleclick.net',
+    'googlesyndication.com', 'googleadservices.com', 'adservice.google.com',
+    'facebook.net', 'connect.facebook.net', 'hotjar.com', 'clarity.ms', 'bat.bing.com',
+    'segment.io', 'segment.com', 'mixpanel.com', 'amplitude.com', 'fullstory.com',
+    'newrelic.com', 'nr-data.net', 'scorecardresearch.com', 'quantserve.com', 'criteo.com',
+    'criteo.net', 'taboola.com', 'outbrain.com', 'snap.licdn.com', 'ads.linkedin.com',
+    'analytics.tiktok.com', 'mc.yandex.ru', 'adnxs.com', 'rubiconproject.com', 'pubmatic.com',
+}
+
+# Selector que indica que el contenido principal ya está en el DOM
+READY_SELECTOR = 'main, article, [role="main"], h1, #content, .content'
+
+LOADING_PROFILES: Dict[str, Dict[str, Any]] = {
+    'full': {
+        'blocked_resource_types': set(),
+        'block_trackers': False,
+        'wait_until': 'domcontentloaded',
+        'wait_for_networkidle': True,
+        'ready_selector': None,
+        'viewport': {'width': 1920, 'height': 1080},
+    },
+    'light': {
+        'blocked_resource_types': {'image', 'media', 'font'},
+        'block_trackers': True,
+        'wait_until': 'domcontentloaded',
+        'wait_for_networkidle': False,
+        'ready_selector': READY_SELECTOR,
+        'viewport': {'width': 1280, 'height': 800},
+    },
+    'minimal': {
+        'blocked_resource_types': {'image', 'media', 'font', 'stylesheet'},
+        'block_trackers': True,
+        'wait_until': 'domcontentloaded',
+        'wait_for_networkidle': False,
+        'ready_selector': READY_SELECTOR,
+        'viewport': {'width': 1024, 'height': 768},
+    },
+}
+
+
+def get_loading_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """Devuelve el perfil indicado (por defecto BROWSE_LOADING_PROFILE)."""
+    if name is None:
+        from ...config import BROWSE_LOADING_PROFILE
+        name = BROWSE_LOADING_PROFILE
+
+    if name not in LOADING_PROFILES:
+        logger.warning(f"[LOADING_PROFILE] Perfil desconocido '{name}', usando 'light'")
+        name = 'light'
+    return {'name': name, **LOADING_PROFILES[name]}
+
+
+def is_tracker(url: str) -> bool:
+    """True si la URL pertenece a un dominio de TRACKER_DOMAINS (o a un subdominio suyo)."""
+    host = (urlparse(url).hostname or '').lower()
+    while host:
+        if host in TRACKER_DOMAINS:
+            return True
+        if '.' not in host:
+            return False
+        host = host.split('.', 1)[1]
+    return False
+
+
+def should_block(resource_type: str, url: str, profile: Dict[str, Any]) -> bool:
+    """Decide si una petición se aborta con el perfil dado. El documento nunca se bloquea."""
+    if resource_type == 'document':
+        return False
+    if resource_type in profile['blocked_resource_types']:
+        return True
+    return profile['block_trackers'] and is_tracker(url)
+
+
+async def apply_loading_profile(page, profile: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Instala en la página el filtrado de peticiones del perfil.
+
+    Returns:
+        Contadores {'blocked': n, 'allowed': n} que se actualizan durante la navegación
+    """
+    stats = {'blocked': 0, 'allowed': 0}
+
+    if not profile['blocked_resource_types'] and not profile['block_trackers']:
+        return stats
+
+    async def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url, profile):
+            stats['blocked'] += 1
+            await route.abort()
+        else:
+            stats['allowed'] += 1
+            await route.continue_()
+
+    await page.route('**/*', handle)
+    return stats
+
+
+async def wait_until_ready(page, profile: Dict[str, Any], timeout: int):
+    """
+    Espera a que la página esté lista según el perfil.
+
+    Con networkidle espera a que no haya tráfico; si no, al selector de contenido
+    principal (sin fallar si la página no lo tiene).
+    """
+    if profile['wait_for_networkidle']:
+        await page.wait_for_load_state('networkidle', timeout=timeout)
+        return
+
+    await page.wait_for_load_state(profile['wait_until'], timeout=timeout)
+    if profile['ready_selector']:
+        try:
+            await page.wait_for_selector(profile['ready_selector'], state='attached', timeout=min(timeout, 5000))
+        except Exception:
+            logger.debug(f"[LOADING_PROFILE] Selector de contenido no encontrado en {page.url}")
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Cache en disco de páginas web ya extraídas.
+
+Cada entrada guarda el texto extraído de una página junto con su ETag/Last-Modified,
+indexada por la URL canónica. Permite servir páginas recientes sin red, revalidar las
+antiguas con GETs condicionales (304 = sin descarga) y mantiene el tamaño total
+acotado expulsando las entradas menos usadas (LRU por mtime).
+"""
+
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Parámetros de tracking que no cambian el contenido de la página
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'trk', 'trackingid', 'refid'}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normaliza una URL para usarla como clave de cache.
+
+    - esquema y host en minúsculas, sin puertos por defecto
+    - sin fragmento (#...)
+    - sin parámetros de tracking (utm_*, gclid, ...) y con el resto ordenado
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and not ((scheme == 'http' and parts.port == 80) or (scheme == 'https' and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+class PageCache:
+    """
+    Cache de páginas extraídas en disco con revalidación condicional y expulsión LRU.
+
+    Las entradas son ficheros JSON (sha256 de la URL canónica) con:
+    url, title, text, complete, etag, last_modified, fetched_at
+
+    complete=False indica que el texto se extrajo solo hasta un límite de caracteres.
+    """
+
+    # Cada cuántas escrituras se vuelve a medir el directorio (recoge lo escrito por otros procesos)
+    RESCAN_EVERY = 200
+
+    def __init__(self, cache_dir, max_bytes: int = 100 * 1024 * 1024, default_max_age: int = 3600):
+        """
+        Args:
+            cache_dir: Directorio donde se guardan las entradas
+            max_bytes: Tamaño máximo total en disco; al superarlo se expulsan las menos usadas
+            default_max_age: Segundos durante los que una entrada se sirve sin revalidar
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.default_max_age = default_max_age
+        self._lock = threading.Lock()
+        # Tamaño aproximado en disco (None = sin medir); evita recorrer el directorio en cada set()
+        self._approx_bytes = None
+        self._writes_since_scan = 0
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'bytes_downloaded': 0}
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Devuelve la entrada de la URL (o None) y la marca como usada recientemente."""
+        path = self._path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path, None)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"[PAGE_CACHE] Entrada corrupta para {url}: {e}")
+            return None
+
+    def is_fresh(self, entry: Dict[str, Any], max_age: Optional[int] = None) -> bool:
+        """Indica si la entrada puede servirse sin revalidar."""
+        if max_age is None:
+            max_age = self.default_max_age
+        return time.time() - entry.get('fetched_at', 0) <= max_age
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Headers para un GET condicional a partir de una entrada cacheada."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def set(self, url: str, title: str, text: str, etag: str = None, last_modified: str = None,
+            complete: bool = True):
+        """Guarda (o reemplaza) la entrada de la URL."""
+        entry = {
+            'url': canonicalize_url(url),
+            'title': title,
+            'text': text,
+            'complete': complete,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+        }
+        self._evict(self._write(self._path(url), entry))
+
+    def touch(self, url: str, entry: Dict[str, Any]):
+        """Renueva una entrada revalidada con 304 (vuelve a contar su max-age)."""
+        entry['fetched_at'] = time.time()
+        self._write(self._path(url), entry)
+
+    def _write(self, path: Path, entry: Dict[str, Any]) -> int:
+        """Escribe la entrada y devuelve cuántos bytes ha crecido la cache."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Escritura atómica: varios hilos/procesos pueden escribir la misma entrada
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            size = os.path.getsize(tmp_path)
+            try:
+                size -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            return size
+        except OSError as e:
+            logger.warning(f"[PAGE_CACHE] No se pudo guardar {entry.get('url')}: {e}")
+            return 0
+
+    def _evict(self, added: int = 0):
+        """
+        Expulsa las entradas menos usadas hasta quedar por debajo de max_bytes.
+
+        Solo recorre el directorio cuando el tamaño aproximado supera max_bytes o cada
+        RESCAN_EVERY escrituras; los ficheros borrados mientras tanto se ignoran.
+        """
+        with self._lock:
+            self._writes_since_scan += 1
+            if self._approx_bytes is not None and self._writes_since_scan < self.RESCAN_EVERY:
+                self._approx_bytes += added
+                if self._approx_bytes <= self.max_bytes:
+                    return
+
+            entries = []
+            try:
+                paths = list(self.cache_dir.glob('*.json'))
+            except OSError:
+                return
+            for path in paths:
+                try:
+                    stat = path.stat()
+                except OSError:
+                    # Borrado por otro proceso (o clear()) entre el glob y el stat
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            self._writes_since_scan = 0
+            self._approx_bytes = total
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            evicted = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    evicted += 1
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    continue
+                total -= size
+
+            self._approx_bytes = total
+            logger.info(f"[PAGE_CACHE] Expulsadas {evicted} entradas (tamaño actual: {total} bytes)")
+
+    def record(self, status: str, bytes_downloaded: int = 0):
+        """Acumula estadísticas: status es 'hits', 'revalidated' o 'misses'."""
+        with self._lock:
+            self._stats[status] += 1
+            self._stats['bytes_downloaded'] += bytes_downloaded
+
+    def stats(self) -> Dict[str, int]:
+        """Estadísticas del proceso: aciertos, revalidaciones, fallos y bytes descargados."""
+        with self._lock:
+            return dict(self._stats)
+
+    def clear(self):
+        """Elimina todas las entradas."""
+        with self._lock:
+            self._approx_bytes = None
+        for path in self.cache_dir.glob('*.json'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_page_cache() -> Optional[PageCache]:
+    """
+    Devuelve la PageCache del proceso (en BROWSE_CACHE_DIR), o None si está desactivada.
+    """
+    global _shared_cache
+    from ...config import BROWSE_CACHE_DIR, BROWSE_CACHE_ENABLED, BROWSE_CACHE_MAX_AGE, BROWSE_CACHE_MAX_BYTES
+
+    if not BROWSE_CACHE_ENABLED:
+        return None
+
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = PageCache(
+                    cache_dir=BROWSE_CACHE_DIR,
+                    max_bytes=BROWSE_CACHE_MAX_BYTES,
+                    default_max_age=BROWSE_CACHE_MAX_AGE
+                )
+    return _shared_cache
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Snapshot compacto de los elementos interactivos de una página (Playwright).
+
+En lugar de describir al LLM la página con texto libre, se listan los elementos
+interactivos visibles numerados con su rol y nombre accesible:
+
+    [1] link "Ofertas de empleo"
+    [2] searchbox "Buscar puesto"
+    [3] tab "Documentación"
+
+El LLM responde con el número y la tool actúa sobre ese elemento exacto, marcado en
+el DOM con el atributo data-agent-idx.
+"""
+
+from typing import Any, Dict, List, Optional
+import re
+
+# Atributo con el que se marca cada elemento numerado
+INDEX_ATTRIBUTE = 'data-agent-idx'
+
+# Recoge los elementos interactivos visibles con su rol y nombre accesible (aproximado)
+SNAPSHOT_SCRIPT = '''(limit) => {
+    const selector = [
+        'a[href]', 'button', 'input:not([type="hidden"])', 'select', 'textarea', 'summary',
+        '[role="button"]', '[role="link"]', '[role="tab"]', '[role="menuitem"]', '[role="checkbox"]',
+        '[role="radio"]', '[role="option"]', '[role="combobox"]', '[role="searchbox"]', '[onclick]'
+    ].join(', ');
+
+    const implicitRole = (el) => {
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'a') return 'link';
+        if (tag === 'button' || tag === 'summary') return 'button';
+        if (tag === 'select') return 'combobox';
+        if (tag === 'textarea') return 'textbox';
+        if (tag === 'input') {
+            const type = (el.getAttribute('type') || 'text').toLowerCase();
+            if (['button', 'submit', 'reset', 'image'].includes(type)) return 'button';
+            if (type === 'checkbox' || type === 'radio') return type;
+            if (type === 'search') return 'searchbox';
+            return 'textbox';
+        }
+        return 'button';
+    };
+
+    const nameOf = (el) => {
+        let name = el.getAttribute('aria-label');
+        if (!name && el.getAttribute('aria-labelledby')) {
+            name = el.getAttribute('aria-labelledby').split(/\\s+/)
+                .map(id => (document.getElementById(id) || {}).innerText || '').join(' ');
+        }
+        if (!name && el.labels && el.labels.length) name = el.labels[0].innerText;
+        name = name || el.getAttribute('alt') || el.getAttribute('title') || el.getAttribute('placeholder')
+            || el.innerText || el.value || '';
+        return name.replace(/\\s+/g, ' ').trim().slice(0, 80);
+    };
+
+    document.querySelectorAll('[data-agent-idx]').forEach(el => el.removeAttribute('data-agent-idx'));
+
+    const elements = [];
+    for (const el of document.querySelectorAll(selector)) {
+        if (elements.length >= limit) break;
+        const rect = el.getBoundingClientRect();
+        const style = window.getComputedStyle(el);
+        if (!rect.width || !rect.height || style.visibility === 'hidden' || style.display === 'none') continue;
+
+        const name = nameOf(el);
+        if (!name) continue;
+
+        const index = elements.length + 1;
+        el.setAttribute('data-agent-idx', String(index));
+        elements.push({index: index, role: el.getAttribute('role') || implicitRole(el), name: name});
+    }
+    return elements;
+}'''
+
+ELEMENT_PATTERN = re.compile(r'ELEMENT:\s*\[?\s*(\d+)')
+
+
+async def snapshot_interactive_elements(page, limit: int = 60) -> List[Dict[str, Any]]:
+    """
+    Numera los elementos interactivos visibles de la página.
+
+    Returns:
+        Lista de {'index': int, 'role': str, 'name': str} (vacía si falla)
+    """
+    try:
+        return await page.evaluate(SNAPSHOT_SCRIPT, limit)
+    except Exception:
+        return []
+
+
+def format_snapshot(elements: List[Dict[str, Any]]) -> str:
+    """Una línea por elemento: [n] rol "nombre"."""
+    if not elements:
+        return '(ningún elemento interactivo visible)'
+    return '\n'.join(f'[{e["index"]}] {e["role"]} "{e["name"]}"' for e in elements)
+
+
+def element_selector(index: int) -> str:
+    """Selector CSS del elemento numerado."""
+    return f'[{INDEX_ATTRIBUTE}="{index}"]'
+
+
+def parse_element_index(llm_response: str) -> Optional[int]:
+    """Extrae el número de 'ELEMENT: n' de la respuesta del LLM (o None)."""
+    match = ELEMENT_PATTERN.search(llm_response)
+    return int(match.group(1)) if match else None
@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+Limitador de peticiones y cuotas diarias para APIs externas.
+
+Cada (proveedor, API key) tiene:
+- Un token bucket en memoria (peticiones por minuto con ráfaga), compartido por todas
+  las tools e hilos del proceso.
+- Una cuota diaria opcional contada en la cache de Django, de modo que con una cache
+  compartida (Redis, Memcached, base de datos) la cuota se respeta entre varios workers.
+  Con CACHE_ATOMIC_INCR=False (CACHE_BACKEND=file) incr() no es atómico entre procesos:
+  el conteo se serializa dentro del proceso, pero dos procesos pueden contar la misma
+  petición una sola vez. El día
+  de la cuota se cuenta en la zona horaria del proveedor ('quota_timezone'): Google
+  reinicia sus cuotas a medianoche del Pacífico, no a medianoche local.
+
+Las peticiones de fondo (refrescos, precalentado) tienen menos prioridad que las del
+chat: no pueden usar la última fracción RATE_LIMIT_BACKGROUND_RESERVE de la ráfaga
+ni de la cuota diaria. La prioridad se fija con request_priority() y se hereda dentro
+del mismo hilo (o contexto async).
+
+Proveedores: 'google_search' (Custom Search), 'openai', 'google' (Gemini) y 'portal'
+(portales de empleo, con el host como clave).
+"""
+
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+import asyncio
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+
+try:
+    from langchain_core.rate_limiters import BaseRateLimiter
+except ImportError:
+    BaseRateLimiter = object
+
+logger = logging.getLogger(__name__)
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+_current_priority = contextvars.ContextVar('rate_limit_priority', default=PRIORITY_INTERACTIVE)
+
+
+class RateLimitExceeded(Exception):
+    """No se pudo obtener permiso para la petición (cuota diaria agotada o espera excesiva)."""
+
+    def __init__(self, provider: str, message: str):
+        self.provider = provider
+        super().__init__(message)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Fija la prioridad de las peticiones hechas dentro del bloque."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    return _current_priority.get()
+
+
+def key_id(api_key: Optional[str]) -> str:
+    """Identificador no reversible de una API key (nunca se guarda la key)."""
+    if not api_key:
+        return 'default'
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]
+
+
+class TokenBucket:
+    """Token bucket clásico: rate tokens/segundo hasta un máximo de capacity."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_take(self, reserve: float = 0) -> float:
+        """
+        Intenta consumir un token dejando al menos reserve tokens en el bucket.
+
+        Returns:
+            0 si se consumió; si no, segundos a esperar antes de reintentar
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            needed = 1 + reserve
+            if self.tokens >= needed:
+                self.tokens -= 1
+                return 0.0
+            if self.rate <= 0:
+                return float('inf')
+            return (needed - self.tokens) / self.rate
+
+    def refund(self):
+        """Devuelve un token consumido para una petición que al final no se hizo."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class RateLimiter:
+    """
+    Token buckets por (proveedor, key) y cuotas diarias en la cache de Django.
+
+    limits: {proveedor: {'per_minute': n, 'burst': n, 'daily_quota': n (0 = sin cuota),
+                         'quota_timezone': zona IANA en la que se reinicia la cuota (opcional)}}
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, Any]], background_reserve: float = 0.2,
+                 wait_timeout: float = 30, cache_alias: str = 'default'):
+        """
+        Args:
+            limits: Límites por proveedor (los proveedores sin entrada no se limitan)
+            background_reserve: Fracción de ráfaga y cuota reservada a peticiones interactivas
+            wait_timeout: Espera máxima por defecto para obtener un token (segundos)
+            cache_alias: Cache de Django donde se cuentan las cuotas diarias
+        """
+        self.limits = limits
+        self.background_reserve = background_reserve
+        self.wait_timeout = wait_timeout
+        self.cache_alias = cache_alias
+
+        self._buckets: Dict[tuple, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._daily_lock = threading.Lock()
+        self._warned_non_atomic = False
+
+    # ------------------------------------------------------------------
+    # Adquisición
+    # ------------------------------------------------------------------
+    def acquire(self, provider: str, api_key: Optional[str] = None, priority: Optional[int] = None,
+                timeout: Optional[float] = None) -> bool:
+        """
+        Espera (como mucho timeout segundos) a tener permiso para una petición.
+
+        Returns:
+            True si la petición puede hacerse, False si la cuota diaria está agotada
+            o no hay token dentro del timeout
+        """
+        deadline = time.monotonic() + (self.wait_timeout if timeout is None else timeout)
+        while True:
+            wait = self._try_acquire(provider, api_key, priority)
+            if wait == 0:
+                return True
+            if wait is None or time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def aacquire(self, provider: str, api_key: Optional[str] = None, priority: Optional[int] = None,
+                       timeout: Optional[float] = None) -> bool:
+        """Como acquire() pero sin bloquear el event loop."""
+        deadline = time.monotonic() + (self.wait_timeout if timeout is None else timeout)
+        while True:
+            wait = self._try_acquire(provider, api_key, priority)
+            if wait == 0:
+                return True
+            if wait is None or time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def _try_acquire(self, provider: str, api_key: Optional[str], priority: Optional[int]) -> Optional[float]:
+        """
+        Returns:
+            0 si se concede, segundos de espera si falta token, None si la cuota está agotada
+        """
+        limits = self.limits.get(provider)
+        if not limits:
+            return 0
+
+        if priority is None:
+            priority = current_priority()
+        background = priority >= PRIORITY_BACKGROUND
+
+        # Con la cuota del día agotada no se gasta un token del bucket
+        if self._daily_exhausted(provider, api_key, limits, background):
+            logger.warning(f"[RATE_LIMIT] Cuota diaria de {provider} agotada ({key_id(api_key)})")
+            return None
+
+        bucket = self._bucket(provider, api_key, limits)
+        reserve = bucket.capacity * self.background_reserve if background else 0
+        wait = bucket.try_take(reserve)
+        if wait:
+            return wait
+
+        if not self._take_daily(provider, api_key, limits, background):
+            # Otro proceso agotó la cuota entre la comprobación y el incremento
+            bucket.refund()
+            logger.warning(f"[RATE_LIMIT] Cuota diaria de {provider} agotada ({key_id(api_key)})")
+            return None
+        return 0
+
+    def _bucket(self, provider: str, api_key: Optional[str], limits: Dict[str, Any]) -> TokenBucket:
+        key = (provider, key_id(api_key))
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(limits.get('per_minute', 60), limits.get('burst', 10))
+            return self._buckets[key]
+
+    # ------------------------------------------------------------------
+    # Cuota diaria
+    # ------------------------------------------------------------------
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.cache_alias]
+
+    def _quota_now(self, provider: str) -> datetime:
+        """Hora actual en la zona en la que el proveedor reinicia su cuota diaria."""
+        tz = (self.limits.get(provider) or {}).get('quota_timezone')
+        return datetime.now(ZoneInfo(tz)) if tz else datetime.now()
+
+    def _daily_key(self, provider: str, api_key: Optional[str]) -> str:
+        return f"rate_limit:{provider}:{key_id(api_key)}:{self._quota_now(provider).strftime('%Y%m%d')}"
+
+    def _allowed_daily(self, limits: Dict[str, Any], background: bool) -> int:
+        quota = limits.get('daily_quota') or 0
+        return int(quota * (1 - self.background_reserve)) if background else quota
+
+    def _daily_exhausted(self, provider: str, api_key: Optional[str], limits: Dict[str, Any],
+                         background: bool) -> bool:
+        if not limits.get('daily_quota'):
+            return False
+        try:
+            used = self._cache().get(self._daily_key(provider, api_key), 0)
+        except Exception:
+            return False
+        return used >= self._allowed_daily(limits, background)
+
+    def _take_daily(self, provider: str, api_key: Optional[str], limits: Dict[str, Any], background: bool) -> bool:
+        if not limits.get('daily_quota'):
+            return True
+
+        allowed = self._allowed_daily(limits, background)
+        key = self._daily_key(provider, api_key)
+        try:
+            with self._daily_counter_lock():
+                cache = self._cache()
+                cache.add(key, 0, timeout=2 * 24 * 3600)
+                used = cache.incr(key)
+                if used > allowed:
+                    cache.decr(key)
+                    return False
+        except Exception as e:
+            # Sin cache no se bloquean las peticiones
+            logger.warning(f"[RATE_LIMIT] No se pudo contar la cuota de {provider}: {e}")
+        return True
+
+    def _daily_counter_lock(self):
+        """Lock para el contador diario si la cache no tiene incr() atómico (nullcontext si lo tiene)."""
+        from django.conf import settings
+
+        if getattr(settings, 'CACHE_ATOMIC_INCR', True):
+            return nullcontext()
+        if not self._warned_non_atomic:
+            self._warned_non_atomic = True
+            logger.warning("[RATE_LIMIT] La cache no tiene incr() atómico: las cuotas diarias son aproximadas "
+                           "con varios procesos")
+        return self._daily_lock
+
+    def record_exhausted(self, provider: str, api_key: Optional[str] = None):
+        """Marca la cuota del día como agotada (p. ej. cuando la API devuelve un error de cuota)."""
+        quota = (self.limits.get(provider) or {}).get('daily_quota') or 0
+        if not quota:
+            return
+        try:
+            self._cache().set(self._daily_key(provider, api_key), quota, timeout=2 * 24 * 3600)
+        except Exception as e:
+            logger.warning(f"[RATE_LIMIT] No se pudo marcar la cuota de {provider}: {e}")
+
+    def usage(self, provider: str, api_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Uso del día de un (proveedor, key).
+
+        Returns:
+            {'provider', 'key_id', 'used', 'daily_quota', 'remaining', 'resets_at'}
+            (daily_quota y remaining son None si el proveedor no tiene cuota diaria)
+        """
+        quota = (self.limits.get(provider) or {}).get('daily_quota') or 0
+        try:
+            used = self._cache().get(self._daily_key(provider, api_key), 0)
+        except Exception:
+            used = 0
+
+        tomorrow = (self._quota_now(provider) + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            'provider': provider,
+            'key_id': key_id(api_key),
+            'used': used,
+            'daily_quota': quota or None,
+            'remaining': max(0, quota - used) if quota else None,
+            'resets_at': tomorrow.isoformat(),
+        }
+
+
+class LangChainRateLimiter(BaseRateLimiter):
+    """
+    Adaptador para el parámetro rate_limiter de los chat models de LangChain.
+
+    Lanza RateLimitExceeded si no hay permiso (LangChain ignora el valor devuelto).
+    """
+
+    def __init__(self, limiter: RateLimiter, provider: str, api_key: Optional[str] = None):
+        self.limiter = limiter
+        self.provider = provider
+        self.api_key = api_key
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        if self.limiter.acquire(self.provider, self.api_key, timeout=None if blocking else 0):
+            return True
+        if not blocking:
+            return False
+        raise RateLimitExceeded(self.provider, f"Límite de peticiones de {self.provider} alcanzado")
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        if await self.limiter.aacquire(self.provider, self.api_key, timeout=None if blocking else 0):
+            return True
+        if not blocking:
+            return False
+        raise RateLimitExceeded(self.provider, f"Límite de peticiones de {self.provider} alcanzado")
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """
+    Devuelve el RateLimiter del proceso, compartido por todas las tools y usuarios.
+    """
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_limiter_lock:
+            if _shared_limiter is None:
+                from ...config import RATE_LIMIT_BACKGROUND_RESERVE, RATE_LIMIT_WAIT_TIMEOUT, RATE_LIMITS
+                _shared_limiter = RateLimiter(
+                    limits=RATE_LIMITS,
+                    background_reserve=RATE_LIMIT_BACKGROUND_RESERVE,
+                    wait_timeout=RATE_LIMIT_WAIT_TIMEOUT
+                )
+    return _shared_limiter
+
+
+def langchain_rate_limiter(provider: str, api_key: Optional[str] = None) -> Optional[LangChainRateLimiter]:
+    """rate_limiter para un chat model de LangChain (None si LangChain no está instalado)."""
+    if BaseRateLimiter is object:
+        return None
+    return LangChainRateLimiter(get_shared_rate_limiter(), provider, api_key)
@@ -78,17 +78,22 @@ class ToolRegistry:
         user_profile = None
         if self.user:
             try:
-                user_profile = {}
+                from apps.company.profile_cache import get_profile_snapshot
 
-                # Solo datos esenciales para auto-fill de parámetros
-                if hasattr(self.user, 'city') and self.user.city:
-                    user_profile['city'] = self.user.city
-
-                if hasattr(self.user, 'work_mode') and self.user.work_mode:
-                    user_profile['work_mode'] = self.user.work_mode
+                # Solo datos esenciales para auto-fill de parámetros (del snapshot cacheado)
+                user_profile = {
+                    field: value
+                    for field, value in get_profile_snapshot(self.user)['user'].items()
+                    if value
+                }
 
             except Exception as e:
                 logger.warning(f"No se pudo obtener datos del usuario: {e}")
+                user_profile = {
+                    field: getattr(self.user, field)
+                    for field in ('city', 'work_mode')
+                    if getattr(self.user, field, None)
+                }
 
         # Tool de búsqueda de ofertas
         self.tools['search_jobs'] = JobSearchTool(
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Ranking local de fragmentos de texto frente a una consulta (BM25).
+
+Sin dependencias ni llamadas al LLM: sirve para elegir qué fragmentos de una página
+merece la pena enviar al modelo.
+"""
+
+from typing import List, Tuple
+from collections import Counter
+import math
+import re
+import unicodedata
+
+
+# Palabras vacías (es/en) que no aportan al ranking
+STOPWORDS = {
+    'a', 'al', 'algo', 'con', 'cual', 'cuales', 'cuando', 'cuanto', 'cuanta', 'cuantos', 'cuantas',
+    'de', 'del', 'donde', 'el', 'ella', 'en', 'es', 'esta', 'este', 'esto', 'hay', 'la', 'las',
+    'lo', 'los', 'me', 'mi', 'no', 'o', 'para', 'pero', 'por', 'que', 'quien', 'se', 'si', 'sin',
+    'sobre', 'son', 'su', 'sus', 'tiene', 'un', 'una', 'unos', 'unas', 'y', 'ya',
+    'an', 'and', 'are', 'does', 'for', 'from', 'how', 'in', 'is', 'it', 'of', 'on', 'or', 'the',
+    'this', 'to', 'what', 'when', 'where', 'which', 'who', 'with',
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Minúsculas, sin acentos y sin palabras vacías."""
+    normalized = unicodedata.normalize('NFKD', text.lower())
+    normalized = ''.join(c for c in normalized if not unicodedata.combining(c))
+    return [token for token in re.findall(r'\w+', normalized) if token not in STOPWORDS]
+
+
+def bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """
+    Puntuación BM25 de cada documento para la consulta (mismo orden que documents).
+    """
+    query_terms = set(tokenize(query))
+    tokenized = [tokenize(document) for document in documents]
+    if not query_terms or not tokenized:
+        return [0.0] * len(documents)
+
+    n_docs = len(tokenized)
+    avg_len = (sum(len(tokens) for tokens in tokenized) / n_docs) or 1
+    doc_freq = Counter(term for tokens in tokenized for term in set(tokens) if term in query_terms)
+
+    scores = []
+    for tokens in tokenized:
+        freqs = Counter(tokens)
+        score = 0.0
+        for term in query_terms:
+            tf = freqs.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def rank_chunks(query: str, chunks: List[str], top_n: int = 3) -> List[Tuple[int, float]]:
+    """
+    Devuelve los top_n fragmentos más relevantes como [(índice, score)], de mayor a menor
+    score. Los fragmentos sin ningún término de la consulta no se devuelven.
+    """
+    scores = bm25_scores(query, chunks)
+    ranked = sorted(
+        ((index, score) for index, score in enumerate(scores) if score > 0),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    return ranked[:top_n]
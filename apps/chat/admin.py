@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ChatSession, ChatMessage
+from .models import ChatSession, ChatMessage, ChatMessageDetail, ChatTurn
 
 
 class ChatMessageInline(admin.TabularInline):
@@ -32,6 +32,13 @@ class ChatSessionAdmin(admin.ModelAdmin):
     )
 
 
+class ChatMessageDetailInline(admin.StackedInline):
+    model = ChatMessageDetail
+    extra = 0
+    readonly_fields = ['payload']
+    can_delete = False
+
+
 @admin.register(ChatMessage)
 class ChatMessageAdmin(admin.ModelAdmin):
     list_display = ['session', 'role', 'content_preview', 'route_used', 'tokens_used', 'created_at']
@@ -39,6 +46,7 @@ class ChatMessageAdmin(admin.ModelAdmin):
     search_fields = ['session__title', 'session__user__email', 'content']
     readonly_fields = ['created_at']
     date_hierarchy = 'created_at'
+    inlines = [ChatMessageDetailInline]
 
     fieldsets = (
         ('Relaciones', {
@@ -56,3 +64,13 @@ class ChatMessageAdmin(admin.ModelAdmin):
         """Muestra una vista previa del contenido"""
         return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
     content_preview.short_description = 'Vista previa'
+
+
+@admin.register(ChatTurn)
+class ChatTurnAdmin(admin.ModelAdmin):
+    list_display = ['id', 'session', 'status', 'progress', 'attempts', 'worker', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['session__title', 'session__user__email', 'client_token']
+    readonly_fields = ['session', 'user_message', 'assistant_message', 'client_token',
+                       'created_at', 'started_at', 'heartbeat_at', 'finished_at']
+    date_hierarchy = 'created_at'
@@ -5,3 +5,7 @@ class ChatConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.chat"
     label = "apps_chat"
+
+    def ready(self):
+        # Borra el fichero en frío al eliminar una sesión archivada
+        from . import archive  # noqa: F401
@@ -0,0 +1,267 @@
+"""
+Almacenamiento en frío de sesiones de chat antiguas.
+
+`python manage.py archive_chat_sessions` mueve los mensajes de las sesiones inactivas
+(o archivadas) a un fichero JSONL comprimido por sesión bajo CHAT_ARCHIVE_DIR:
+
+    <CHAT_ARCHIVE_DIR>/user_<id>/session_<id>.jsonl.zst   (.jsonl.gz sin zstandard)
+
+La fila de ChatSession se conserva (título, contadores, vista previa) para que la
+lista de sesiones no cambie; los mensajes, sus detalles y sus turnos salen de las
+tablas calientes. Al abrir una sesión en frío, ensure_hot() la rehidrata de forma
+transparente con los mismos ids y fechas.
+"""
+from datetime import timedelta
+from pathlib import Path
+import gzip
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Q, When
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ChatMessage, ChatMessageDetail, ChatSession, ChatTurn
+
+try:
+    import zstandard
+except ImportError:  # Dependencia opcional: sin ella se usa gzip
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT_VERSION = 1
+
+
+def archive_root():
+    return Path(settings.CHAT_ARCHIVE_DIR)
+
+
+def _extension():
+    if settings.CHAT_ARCHIVE_COMPRESSION == 'zstd' and zstandard is not None:
+        return 'zst'
+    return 'gz'
+
+
+def _open_archive(path, mode, extension):
+    """Abre un fichero de archivo en modo texto ('rt'/'wt')."""
+    if extension == 'zst':
+        if zstandard is None:
+            raise RuntimeError(f"{path} está comprimido con zstd y zstandard no está instalado")
+        return zstandard.open(path, mode, encoding='utf-8')
+    return gzip.open(path, mode, encoding='utf-8')
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _message_record(message):
+    detail = message.detail if message.metadata.get('has_details') and hasattr(message, 'detail') else None
+    turn = getattr(message, 'turn', None) if message.role == 'user' else None
+    return {
+        'id': message.pk,
+        'role': message.role,
+        'content': message.content,
+        'metadata': message.metadata,
+        'details': detail.payload if detail else None,
+        'rendered_html': message.rendered_html,
+        'rendered_key': message.rendered_key,
+        'created_at': message.created_at.isoformat(),
+        'turn': {
+            'id': turn.pk,
+            'assistant_message': turn.assistant_message_id,
+            'client_token': turn.client_token,
+            'status': turn.status,
+            'attempts': turn.attempts,
+            'error': turn.error,
+            'worker': turn.worker,
+            'created_at': _iso(turn.created_at),
+            'started_at': _iso(turn.started_at),
+            'finished_at': _iso(turn.finished_at),
+        } if turn else None,
+    }
+
+
+def _has_active_turns(session_id):
+    return ChatTurn.objects.filter(
+        session_id=session_id,
+        status__in=[ChatTurn.STATUS_PENDING, ChatTurn.STATUS_RUNNING]
+    ).exists()
+
+
+def archive_session(session):
+    """
+    Escribe los mensajes de la sesión en su fichero comprimido y los borra de las
+    tablas calientes.
+
+    El fichero se escribe fuera de la transacción; antes de borrar se bloquea la
+    sesión y se comprueba que nadie ha escrito en ella mientras tanto. Si hay un
+    mensaje nuevo o un turno en curso, la sesión sigue en caliente.
+
+    Returns:
+        Número de mensajes archivados
+    """
+    if session.cold_archive:
+        return 0
+
+    messages = list(session.messages.select_related('detail', 'turn').order_by('created_at', 'pk'))
+    message_ids = [message.pk for message in messages]
+    extension = _extension()
+    relative = Path(f'user_{session.user_id}') / f'session_{session.pk}.jsonl.{extension}'
+    path = archive_root() / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Escritura atómica: si el proceso muere a mitad, los mensajes siguen en la base de datos
+    tmp_path = path.with_name(path.name + '.tmp')
+    with _open_archive(tmp_path, 'wt', extension) as fh:
+        fh.write(json.dumps({'format': ARCHIVE_FORMAT_VERSION, 'session': session.pk}) + '\n')
+        for message in messages:
+            fh.write(json.dumps(_message_record(message), ensure_ascii=False) + '\n')
+
+    with transaction.atomic():
+        locked = ChatSession.objects.select_for_update().get(pk=session.pk)
+        if (locked.cold_archive or _has_active_turns(session.pk)
+                or locked.messages.exclude(pk__in=message_ids).exists()):
+            tmp_path.unlink(missing_ok=True)
+            logger.info(f"[CHAT_ARCHIVE] Sesión {session.pk} modificada durante el archivado: se mantiene en caliente")
+            return 0
+
+        os.replace(tmp_path, path)
+        # Borrado en bloque (no pasa por ChatMessage.delete): los contadores de la sesión se conservan
+        ChatMessage.objects.filter(session_id=session.pk, pk__in=message_ids).delete()
+        session.cold_archive = relative.as_posix()
+        session.cold_archived_at = timezone.now()
+        ChatSession.objects.filter(pk=session.pk).update(
+            cold_archive=session.cold_archive,
+            cold_archived_at=session.cold_archived_at
+        )
+
+    logger.info(f"[CHAT_ARCHIVE] Sesión {session.pk}: {len(messages)} mensajes -> {relative}")
+    return len(messages)
+
+
+def _read_archive(path):
+    extension = path.suffix.lstrip('.')
+    with _open_archive(path, 'rt', extension) as fh:
+        header = json.loads(next(fh))
+        if header.get('format') != ARCHIVE_FORMAT_VERSION:
+            raise ValueError(f"Formato de archivo desconocido en {path}: {header}")
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def rehydrate_session(session):
+    """
+    Devuelve los mensajes del fichero a las tablas calientes (mismos ids y fechas)
+    y borra el fichero.
+
+    Returns:
+        Número de mensajes restaurados
+    """
+    if not session.cold_archive:
+        return 0
+
+    with transaction.atomic():
+        # Bloquea la sesión antes de leer el fichero: otra petición simultánea espera
+        # aquí y, al entrar, ve la sesión ya rehidratada (y el fichero ya borrado)
+        locked = ChatSession.objects.select_for_update().get(pk=session.pk)
+        if not locked.cold_archive:
+            session.cold_archive, session.cold_archived_at = '', None
+            return 0
+
+        path = archive_root() / locked.cold_archive
+        records = _read_archive(path)
+
+        # bulk_create no pasa por save(): el HTML renderizado y el resumen de metadatos vienen del archivo
+        ChatMessage.objects.bulk_create([
+            ChatMessage(
+                pk=record['id'],
+                session_id=session.pk,
+                role=record['role'],
+                content=record['content'],
+                metadata=record['metadata'],
+                rendered_html=record['rendered_html'],
+                rendered_key=record['rendered_key'],
+            )
+            for record in records
+        ])
+        # auto_now_add pisa created_at en el INSERT: se restaura la fecha original
+        if records:
+            ChatMessage.objects.filter(pk__in=[r['id'] for r in records]).update(created_at=Case(
+                *[When(pk=r['id'], then=parse_datetime(r['created_at'])) for r in records],
+                output_field=DateTimeField()
+            ))
+        ChatMessageDetail.objects.bulk_create([
+            ChatMessageDetail(message_id=record['id'], payload=record['details'])
+            for record in records if record['details']
+        ])
+        _restore_turns(session.pk, [(record['id'], record['turn']) for record in records if record.get('turn')])
+
+        ChatSession.objects.filter(pk=session.pk).update(cold_archive='', cold_archived_at=None)
+        session.cold_archive, session.cold_archived_at = '', None
+        transaction.on_commit(lambda: path.unlink(missing_ok=True))
+
+    logger.info(f"[CHAT_ARCHIVE] Sesión {session.pk}: {len(records)} mensajes rehidratados")
+    return len(records)
+
+
+def _restore_turns(session_id, turns):
+    """Recrea los turnos archivados para que sus URLs de estado sigan respondiendo."""
+    if not turns:
+        return
+    ChatTurn.objects.bulk_create([
+        ChatTurn(
+            pk=turn['id'],
+            session_id=session_id,
+            user_message_id=message_id,
+            assistant_message_id=turn['assistant_message'],
+            client_token=turn['client_token'],
+            status=turn['status'],
+            attempts=turn['attempts'],
+            error=turn['error'],
+            worker=turn['worker'],
+            started_at=parse_datetime(turn['started_at']) if turn['started_at'] else None,
+            finished_at=parse_datetime(turn['finished_at']) if turn['finished_at'] else None,
+        )
+        for message_id, turn in turns
+    ])
+    ChatTurn.objects.filter(pk__in=[turn['id'] for _, turn in turns]).update(created_at=Case(
+        *[When(pk=turn['id'], then=parse_datetime(turn['created_at'])) for _, turn in turns],
+        output_field=DateTimeField()
+    ))
+
+
+def ensure_hot(session):
+    """Rehidrata la sesión si está en frío (se llama al abrirla o escribir en ella)."""
+    if session.cold_archive:
+        rehydrate_session(session)
+    return session
+
+
+def sessions_to_archive(older_than_days=None, include_archived=False):
+    """Sesiones candidatas: sin actividad desde hace N días y/o marcadas como archivadas."""
+    conditions = Q()
+    if older_than_days is not None:
+        conditions |= Q(updated_at__lt=timezone.now() - timedelta(days=older_than_days))
+    if include_archived:
+        conditions |= Q(is_archived=True)
+    if not conditions:
+        return ChatSession.objects.none()
+
+    return ChatSession.objects.filter(
+        conditions, cold_archive='', message_count__gt=0
+    ).exclude(
+        # Sesiones con un turno en curso se quedan en caliente
+        turns__status__in=[ChatTurn.STATUS_PENDING, ChatTurn.STATUS_RUNNING]
+    ).order_by('updated_at')
+
+
+@receiver(post_delete, sender=ChatSession)
+def _delete_archive_file(sender, instance, **kwargs):
+    if instance.cold_archive:
+        (archive_root() / instance.cold_archive).unlink(missing_ok=True)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Comando de Django que mueve las sesiones de chat antiguas a almacenamiento en frío.
+Uso: python manage.py archive_chat_sessions [--days 90] [--archived] [--limit N] [--dry-run]
+
+Los mensajes se guardan comprimidos en CHAT_ARCHIVE_DIR y se rehidratan
+automáticamente cuando el usuario vuelve a abrir la sesión.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.chat.archive import archive_session, sessions_to_archive
+from apps.chat.turns import requeue_stale_turns
+
+
+class Command(BaseCommand):
+    help = 'Mueve las sesiones de chat inactivas (o archivadas) a almacenamiento en frío comprimido'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.CHAT_ARCHIVE_AFTER_DAYS,
+            help=f'Días sin actividad (por defecto {settings.CHAT_ARCHIVE_AFTER_DAYS})',
+        )
+        parser.add_argument(
+            '--archived',
+            action='store_true',
+            help='Incluye las sesiones marcadas como archivadas aunque sean recientes',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='Máximo de sesiones a mover (0 = sin límite)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo muestra las sesiones que se moverían',
+        )
+
+    def handle(self, *args, **options):
+        # Un turno abandonado (petición o worker caído) no debe retener su sesión en caliente
+        requeue_stale_turns()
+        sessions = sessions_to_archive(older_than_days=options['days'], include_archived=options['archived'])
+        if options['limit']:
+            sessions = sessions[:options['limit']]
+
+        archived_sessions = 0
+        archived_messages = 0
+        for session in sessions.iterator():
+            if options['dry_run']:
+                self.stdout.write(f'Sesión {session.pk} ({session.message_count} mensajes): {session.title}')
+                continue
+            try:
+                archived_messages += archive_session(session)
+                archived_sessions += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Sesión {session.pk}: {e}'))
+
+        if options['dry_run']:
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'{archived_sessions} sesiones ({archived_messages} mensajes) movidas a {settings.CHAT_ARCHIVE_DIR}'
+        ))
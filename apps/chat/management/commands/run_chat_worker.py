@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Comando de Django que procesa la cola de turnos del chat (CHAT_TURN_MODE='queue').
+Uso: python manage.py run_chat_worker [--once] [--sleep 1.0] [--max-turns N]
+
+Se pueden lanzar tantos procesos como capacidad de agente se quiera: cada turno
+lo reclama un único worker.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+import time
+
+from apps.chat.turns import claim_next_turn, default_worker_id, requeue_stale_turns, run_turn
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los turnos de chat en cola (worker sin broker externo, basado en la base de datos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesa los turnos pendientes y termina en lugar de esperar nuevos',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Segundos de espera cuando la cola está vacía (por defecto 1.0)',
+        )
+        parser.add_argument(
+            '--max-turns',
+            type=int,
+            default=0,
+            help='Termina tras procesar N turnos (0 = sin límite)',
+        )
+
+    def handle(self, *args, **options):
+        worker = default_worker_id()
+        max_turns = options['max_turns']
+        processed = 0
+
+        self.stdout.write(f'Worker de chat {worker} esperando turnos...')
+        try:
+            while not max_turns or processed < max_turns:
+                close_old_connections()
+                requeue_stale_turns()
+
+                turn = claim_next_turn(worker)
+                if turn is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                started = time.monotonic()
+                run_turn(turn)
+                processed += 1
+                self.stdout.write(
+                    f'Turno {turn.id} ({turn.get_status_display()}) en {time.monotonic() - started:.1f}s'
+                )
+        except KeyboardInterrupt:
+            self.stdout.write('Worker detenido')
+
+        self.stdout.write(self.style.SUCCESS(f'{processed} turnos procesados'))
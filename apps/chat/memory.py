@@ -0,0 +1,143 @@
+"""
+Memoria de conversación con resumen incremental.
+
+En lugar de enviar al agente solo los últimos MAX_CONVERSATION_HISTORY mensajes y
+olvidar el resto, cada sesión guarda un resumen (ChatSession.summary) de los
+mensajes antiguos:
+
+- build_history() devuelve el resumen como mensaje de sistema seguido de los
+  mensajes recientes literales (los del asistente recortados, para no reenviar
+  listados de ofertas completos).
+- update_summary() se llama tras cada turno: cuando hay CHAT_MEMORY_FOLD_BATCH
+  mensajes fuera de la ventana reciente, los incorpora al resumen con una llamada
+  al LLM y avanza ChatSession.summary_until. Si otro proceso avanzó el resumen
+  mientras tanto, el resultado se descarta.
+
+El coste por turno queda acotado por CHAT_MEMORY_SUMMARY_MAX_CHARS más la ventana
+reciente, sea cual sea la longitud de la conversación.
+"""
+import logging
+import os
+
+from django.conf import settings
+
+from .models import ChatSession
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """Eres el módulo de memoria de un asistente de búsqueda de empleo.
+Actualiza el resumen de la conversación incorporando los mensajes nuevos.
+
+Conserva: objetivos y preferencias del usuario (puestos, ubicaciones, modalidad, salario),
+búsquedas ya realizadas, ofertas o empresas que le interesaron o descartó (con nombre y
+enlace si lo hay), decisiones tomadas y preguntas pendientes.
+Descarta: saludos, formato, listados completos y detalles que no se volverán a usar.
+
+Escribe en español, en viñetas breves, con un máximo de {max_chars} caracteres.
+Devuelve solo el resumen actualizado.
+
+RESUMEN ACTUAL:
+{summary}
+
+MENSAJES NUEVOS:
+{messages}
+"""
+
+SUMMARY_HEADER = 'RESUMEN DE LA CONVERSACIÓN ANTERIOR (mensajes más antiguos que no se muestran):'
+
+
+def clip(content, max_chars=None):
+    """Recorta un mensaje largo conservando el principio."""
+    max_chars = max_chars or settings.CHAT_MEMORY_MESSAGE_MAX_CHARS
+    if len(content) <= max_chars:
+        return content
+    return content[:max_chars].rstrip() + '\n[…]'
+
+
+def build_history(session, before_message):
+    """
+    Historial que se envía al agente para responder a before_message.
+
+    Returns:
+        Lista de {'role', 'content'} en orden cronológico
+    """
+    queryset = session.messages.filter(created_at__lt=before_message.created_at)
+
+    if not settings.CHAT_MEMORY_ENABLED:
+        max_history = int(os.getenv('MAX_CONVERSATION_HISTORY', '10'))
+        previous = list(queryset.order_by('-created_at').values('role', 'content')[:max_history])
+        return [{'role': m['role'], 'content': m['content']} for m in reversed(previous)]
+
+    if session.summary_until:
+        queryset = queryset.filter(created_at__gt=session.summary_until)
+
+    # Los mensajes aún no resumidos (como mucho la ventana más un lote pendiente)
+    limit = settings.CHAT_MEMORY_RECENT_MESSAGES + settings.CHAT_MEMORY_FOLD_BATCH
+    previous = list(queryset.order_by('-created_at').values('role', 'content')[:limit])
+
+    history = []
+    if session.summary:
+        history.append({'role': 'system', 'content': f"{SUMMARY_HEADER}\n{session.summary}"})
+    history.extend(
+        {
+            'role': m['role'],
+            'content': clip(m['content']) if m['role'] == 'assistant' else m['content']
+        }
+        for m in reversed(previous)
+    )
+    return history
+
+
+def update_summary(session, summarize):
+    """
+    Incorpora al resumen los mensajes que han salido de la ventana reciente.
+
+    Args:
+        session: ChatSession
+        summarize: Callable(prompt) -> str que llama al LLM
+
+    Returns:
+        True si el resumen se ha actualizado
+    """
+    if not settings.CHAT_MEMORY_ENABLED:
+        return False
+
+    queryset = session.messages.all()
+    if session.summary_until:
+        queryset = queryset.filter(created_at__gt=session.summary_until)
+    pending = list(queryset.order_by('created_at', 'pk').values('role', 'content', 'created_at'))
+
+    overflow = len(pending) - settings.CHAT_MEMORY_RECENT_MESSAGES
+    if overflow < settings.CHAT_MEMORY_FOLD_BATCH:
+        return False
+
+    to_fold = pending[:overflow]
+    role_names = {'user': 'Usuario', 'assistant': 'Asistente', 'system': 'Sistema'}
+    max_chars = settings.CHAT_MEMORY_SUMMARY_MAX_CHARS
+    prompt = SUMMARY_PROMPT.format(
+        max_chars=max_chars,
+        summary=session.summary or '(vacío)',
+        messages='\n\n'.join(f"{role_names.get(m['role'], m['role'])}: {clip(m['content'])}" for m in to_fold)
+    )
+
+    summary = (summarize(prompt) or '').strip()
+    if not summary:
+        logger.warning(f"[CHAT_MEMORY] Resumen vacío para la sesión {session.pk}; se mantiene el anterior")
+        return False
+
+    # Solo si nadie ha avanzado el resumen desde que se leyó (otro turno resumiendo a la vez)
+    updated = ChatSession.objects.filter(pk=session.pk, summary_until=session.summary_until).update(
+        summary=summary[:max_chars],
+        summary_until=to_fold[-1]['created_at']
+    )
+    if not updated:
+        logger.info(f"[CHAT_MEMORY] El resumen de la sesión {session.pk} ya se actualizó en otro turno")
+        return False
+
+    session.summary = summary[:max_chars]
+    session.summary_until = to_fold[-1]['created_at']
+    logger.info(
+        f"[CHAT_MEMORY] Sesión {session.pk}: {len(to_fold)} mensajes resumidos "
+        f"({len(session.summary)} caracteres)"
+    )
+    return True
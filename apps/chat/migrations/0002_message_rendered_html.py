@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-19 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_chat", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatmessage",
+            name="rendered_html",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Contenido convertido a HTML (se regenera al cambiar el renderer)",
+                verbose_name="HTML renderizado",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatmessage",
+            name="rendered_key",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Versión del renderer + hash del contenido del HTML guardado",
+                max_length=64,
+                verbose_name="Clave del HTML",
+            ),
+        ),
+    ]
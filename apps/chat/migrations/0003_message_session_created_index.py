@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-19 01:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_chat", "0002_message_rendered_html"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["session", "created_at"], name="chat_message_session_time_idx"
+            ),
+        ),
+    ]
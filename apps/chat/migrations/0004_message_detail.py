@@ -0,0 +1,106 @@
+# Generated by Django 5.1.6 on 2026-10-19 01:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Copia congelada de apps.chat.models.split_metadata (las migraciones no deben
+# depender del código actual de los modelos)
+SUMMARY_METADATA_KEYS = {
+    "provider", "model", "route", "iterations", "tools_used", "improvement_applied",
+    "total_tokens", "input_tokens", "output_tokens", "cost_eur", "error", "error_type",
+}
+SUMMARY_REVIEW_KEYS = {"score", "status"}
+
+
+def split_metadata(metadata):
+    summary, details = {}, {}
+    for key, value in (metadata or {}).items():
+        if key == "review" and isinstance(value, dict):
+            summary["review"] = {k: v for k, v in value.items() if k in SUMMARY_REVIEW_KEYS}
+            heavy_review = {k: v for k, v in value.items() if k not in SUMMARY_REVIEW_KEYS}
+            if heavy_review:
+                details["review"] = heavy_review
+        elif key in SUMMARY_METADATA_KEYS or key == "has_details":
+            summary[key] = value
+        else:
+            details[key] = value
+    return summary, details
+
+
+def move_heavy_metadata(apps, schema_editor):
+    ChatMessage = apps.get_model("apps_chat", "ChatMessage")
+    ChatMessageDetail = apps.get_model("apps_chat", "ChatMessageDetail")
+
+    for message in ChatMessage.objects.exclude(metadata={}).iterator():
+        summary, details = split_metadata(message.metadata)
+        if not details:
+            continue
+        summary["has_details"] = True
+        ChatMessageDetail.objects.update_or_create(message=message, defaults={"payload": details})
+        ChatMessage.objects.filter(pk=message.pk).update(metadata=summary)
+
+
+def restore_heavy_metadata(apps, schema_editor):
+    ChatMessage = apps.get_model("apps_chat", "ChatMessage")
+    ChatMessageDetail = apps.get_model("apps_chat", "ChatMessageDetail")
+
+    for detail in ChatMessageDetail.objects.select_related("message").iterator():
+        metadata = dict(detail.message.metadata or {})
+        metadata.pop("has_details", None)
+        for key, value in (detail.payload or {}).items():
+            if isinstance(value, dict) and isinstance(metadata.get(key), dict):
+                metadata[key] = {**metadata[key], **value}
+            else:
+                metadata[key] = value
+        ChatMessage.objects.filter(pk=detail.message_id).update(metadata=metadata)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_chat", "0003_message_session_created_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatMessageDetail",
+            fields=[
+                (
+                    "message",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="detail",
+                        serialize=False,
+                        to="apps_chat.chatmessage",
+                        verbose_name="Mensaje",
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Metadatos que no se cargan con el mensaje; se piden bajo demanda",
+                        verbose_name="Detalles",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Detalle de mensaje",
+                "verbose_name_plural": "Detalles de mensajes",
+            },
+        ),
+        migrations.AlterField(
+            model_name="chatmessage",
+            name="metadata",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Resumen: proveedor, tools usadas, tokens, coste (el resto en ChatMessageDetail)",
+                verbose_name="Metadatos",
+            ),
+        ),
+        migrations.RunPython(move_heavy_metadata, restore_heavy_metadata),
+    ]
@@ -0,0 +1,136 @@
+# Generated by Django 5.1.6 on 2026-10-19 01:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_chat", "0004_message_detail"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatTurn",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "client_token",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Identificador del envío para que los reintentos no dupliquen el turno",
+                        max_length=64,
+                        verbose_name="Token del cliente",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pendiente"),
+                            ("running", "En ejecución"),
+                            ("done", "Completado"),
+                            ("failed", "Fallido"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.CharField(
+                        blank=True, default="", max_length=100, verbose_name="Progreso"
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Intentos"
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, default="", verbose_name="Error"),
+                ),
+                (
+                    "worker",
+                    models.CharField(
+                        blank=True, default="", max_length=100, verbose_name="Worker"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Creado en"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Iniciado en"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Terminado en"
+                    ),
+                ),
+                (
+                    "assistant_message",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="answered_turn",
+                        to="apps_chat.chatmessage",
+                        verbose_name="Respuesta",
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="turns",
+                        to="apps_chat.chatsession",
+                        verbose_name="Sesión",
+                    ),
+                ),
+                (
+                    "user_message",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="turn",
+                        to="apps_chat.chatmessage",
+                        verbose_name="Mensaje del usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Turno de chat",
+                "verbose_name_plural": "Turnos de chat",
+                "ordering": ["created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"], name="chat_turn_status_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("client_token", ""), _negated=True),
+                        fields=("session", "client_token"),
+                        name="unique_chat_turn_client_token",
+                    )
+                ],
+            },
+        ),
+    ]
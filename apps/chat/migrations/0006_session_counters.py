@@ -0,0 +1,68 @@
+# Generated by Django 5.1.6 on 2026-10-19 01:55
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Substr
+
+
+def backfill_counters(apps, schema_editor):
+    ChatSession = apps.get_model("apps_chat", "ChatSession")
+    ChatMessage = apps.get_model("apps_chat", "ChatMessage")
+
+    last_message = ChatMessage.objects.filter(session=OuterRef("pk")).order_by("-created_at", "-pk")
+    message_count = (
+        ChatMessage.objects.filter(session=OuterRef("pk"))
+        .order_by()
+        .values("session")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    ChatSession.objects.update(
+        message_count=Coalesce(Subquery(message_count), 0),
+        last_message_at=Subquery(last_message.values("created_at")[:1]),
+        last_message_preview=Coalesce(Subquery(last_message.annotate(
+            preview=Substr("content", 1, 200)
+        ).values("preview")[:1]), models.Value("")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_chat", "0005_chat_turn_queue"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatsession",
+            name="last_message_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Último mensaje"
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatsession",
+            name="last_message_preview",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=200,
+                verbose_name="Vista previa del último mensaje",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatsession",
+            name="message_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Mensajes"),
+        ),
+        migrations.AddIndex(
+            model_name="chatsession",
+            index=models.Index(
+                fields=["user", "is_archived", "-updated_at"],
+                name="chat_session_list_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-19 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_chat", "0006_session_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatsession",
+            name="cold_archive",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Ruta relativa a CHAT_ARCHIVE_DIR; vacío si los mensajes están en la base de datos",
+                max_length=255,
+                verbose_name="Archivo en frío",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatsession",
+            name="cold_archived_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Archivada en frío en"
+            ),
+        ),
+    ]
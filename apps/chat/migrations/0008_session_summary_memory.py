@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-19 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_chat", "0007_session_cold_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatsession",
+            name="summary",
+            field=models.TextField(
+                blank=True,
+                default="",
+                help_text="Resumen incremental de los mensajes antiguos que se envía al agente",
+                verbose_name="Resumen",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chatsession",
+            name="summary_until",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Fecha del último mensaje incluido en el resumen",
+                null=True,
+                verbose_name="Resumido hasta",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 02:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_chat", "0008_session_summary_memory"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatturn",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="El worker lo refresca mientras procesa el turno; sin latido el turno se reencola",
+                null=True,
+                verbose_name="Último latido",
+            ),
+        ),
+    ]
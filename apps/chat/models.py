@@ -1,5 +1,62 @@
 from django.db import models
 from django.conf import settings
+from django.utils.safestring import mark_safe
+
+from .rendering import render_key, render_markdown
+
+
+# Metadatos ligeros que se guardan en ChatMessage.metadata y viajan con cada carga de
+# página o respuesta AJAX; el resto (resultados de tools, trazas, issues y sugerencias
+# de la revisión...) va a ChatMessageDetail y se pide bajo demanda.
+SUMMARY_METADATA_KEYS = {
+    'provider', 'model', 'route', 'iterations', 'tools_used', 'improvement_applied',
+    'total_tokens', 'input_tokens', 'output_tokens', 'cost_eur', 'error', 'error_type',
+}
+SUMMARY_REVIEW_KEYS = {'score', 'status'}
+
+
+def split_metadata(metadata):
+    """
+    Separa los metadatos de un mensaje en (resumen, detalles).
+
+    La revisión se parte en dos: score y status en el resumen, issues y suggestions
+    en los detalles.
+    """
+    summary, details = {}, {}
+    for key, value in (metadata or {}).items():
+        if key == 'review' and isinstance(value, dict):
+            summary['review'] = {k: v for k, v in value.items() if k in SUMMARY_REVIEW_KEYS}
+            heavy_review = {k: v for k, v in value.items() if k not in SUMMARY_REVIEW_KEYS}
+            if heavy_review:
+                details['review'] = heavy_review
+        elif key in SUMMARY_METADATA_KEYS or key == 'has_details':
+            summary[key] = value
+        else:
+            details[key] = value
+    return summary, details
+
+
+def merge_metadata(base, extra):
+    """Une dos diccionarios de metadatos (los sub-diccionarios se fusionan por claves)."""
+    merged = dict(base or {})
+    for key, value in (extra or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+PREVIEW_LENGTH = 200
+TITLE_LENGTH = 50
+
+
+def title_from_message(content):
+    """Título de la sesión a partir del primer mensaje del usuario (primeros 50 caracteres)."""
+    title = content[:TITLE_LENGTH]
+    if len(content) > TITLE_LENGTH:
+        title += '...'
+    return title
 
 
 class ChatSession(models.Model):
@@ -21,22 +78,101 @@ class ChatSession(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Actualizado en')
     is_archived = models.BooleanField(default=False, verbose_name='Archivada')
 
+    # Contadores denormalizados: se actualizan al insertar cada mensaje para que la
+    # lista de sesiones no tenga que contar ni buscar el último mensaje
+    message_count = models.PositiveIntegerField(default=0, verbose_name='Mensajes')
+    last_message_at = models.DateTimeField(null=True, blank=True, verbose_name='Último mensaje')
+    last_message_preview = models.CharField(
+        max_length=PREVIEW_LENGTH,
+        blank=True,
+        default='',
+        verbose_name='Vista previa del último mensaje'
+    )
+
+    # Almacenamiento en frío (ver apps/chat/archive.py): ruta del fichero con los mensajes
+    cold_archive = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        verbose_name='Archivo en frío',
+        help_text='Ruta relativa a CHAT_ARCHIVE_DIR; vacío si los mensajes están en la base de datos'
+    )
+    cold_archived_at = models.DateTimeField(null=True, blank=True, verbose_name='Archivada en frío en')
+
+    # Memoria de la conversación (ver apps/chat/memory.py)
+    summary = models.TextField(
+        blank=True,
+        default='',
+        verbose_name='Resumen',
+        help_text='Resumen incremental de los mensajes antiguos que se envía al agente'
+    )
+    summary_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Resumido hasta',
+        help_text='Fecha del último mensaje incluido en el resumen'
+    )
+
     class Meta:
         verbose_name = 'Sesión de chat'
         verbose_name_plural = 'Sesiones de chat'
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['user', 'is_archived', '-updated_at'], name='chat_session_list_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.title or 'Nueva conversación'} ({self.created_at.strftime('%Y-%m-%d')})"
 
     def get_message_count(self):
         """Retorna el número de mensajes en la sesión"""
-        return self.messages.count()
+        return self.message_count
+
+    def refresh_counters(self):
+        """Recalcula message_count y el último mensaje desde la tabla de mensajes."""
+        last = self.messages.order_by('-created_at', '-pk').only('content', 'created_at').first()
+        self.message_count = self.messages.count()
+        self.last_message_at = last.created_at if last else None
+        self.last_message_preview = last.content[:PREVIEW_LENGTH] if last else ''
+        ChatSession.objects.filter(pk=self.pk).update(
+            message_count=self.message_count,
+            last_message_at=self.last_message_at,
+            last_message_preview=self.last_message_preview
+        )
 
     def get_last_message(self):
         """Retorna el último mensaje de la sesión"""
         return self.messages.order_by('-created_at').first()
 
+    def message_window(self, limit, before=None):
+        """
+        Últimos `limit` mensajes (en orden cronológico) anteriores al mensaje `before`.
+
+        Paginación por cursor sobre el índice (session, created_at): el coste no
+        depende de la longitud de la sesión ni de la página pedida.
+
+        Args:
+            limit: Número máximo de mensajes
+            before: ChatMessage (o su id) que hace de cursor; None = los más recientes
+
+        Returns:
+            Tupla (mensajes, has_more)
+        """
+        queryset = self.messages.all()
+        if before is not None:
+            if not isinstance(before, models.Model):
+                before = self.messages.filter(pk=before).only('pk', 'created_at').first()
+                if before is None:
+                    return [], False
+            queryset = queryset.filter(
+                models.Q(created_at__lt=before.created_at)
+                | models.Q(created_at=before.created_at, pk__lt=before.pk)
+            )
+
+        window = list(queryset.order_by('-created_at', '-pk')[:limit + 1])
+        has_more = len(window) > limit
+        return window[:limit][::-1], has_more
+
     @property
     def last_message_optimized(self):
         """
@@ -49,22 +185,19 @@ class ChatSession(models.Model):
 
     @property
     def message_count_optimized(self):
-        """
-        Usa el annotate si está disponible (desde queryset con annotate),
-        de lo contrario usa el método tradicional.
-        """
-        if hasattr(self, 'message_count'):
-            return self.message_count
-        return self.get_message_count()
+        """Número de mensajes (contador denormalizado, sin consulta)."""
+        return self.message_count
 
     def generate_title(self):
-        """Genera un título basado en el primer mensaje del usuario"""
+        """
+        Genera un título basado en el primer mensaje del usuario.
+
+        Al insertar mensajes el título ya se asigna junto con los contadores;
+        esto solo hace falta para sesiones con mensajes creados sin save().
+        """
         first_message = self.messages.filter(role='user').first()
         if first_message:
-            # Tomar las primeras 50 caracteres del contenido
-            self.title = first_message.content[:50]
-            if len(first_message.content) > 50:
-                self.title += '...'
+            self.title = title_from_message(first_message.content)
             self.save(update_fields=['title'])
 
 
@@ -93,7 +226,22 @@ class ChatMessage(models.Model):
         default=dict,
         blank=True,
         verbose_name='Metadatos',
-        help_text='Documentos usados, campos verificados, tokens, etc.'
+        help_text='Resumen: proveedor, tools usadas, tokens, coste (el resto en ChatMessageDetail)'
+    )
+    rendered_html = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='HTML renderizado',
+        help_text='Contenido convertido a HTML (se regenera al cambiar el renderer)'
+    )
+    rendered_key = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Clave del HTML',
+        help_text='Versión del renderer + hash del contenido del HTML guardado'
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Creado en')
 
@@ -101,19 +249,113 @@ class ChatMessage(models.Model):
         verbose_name = 'Mensaje de chat'
         verbose_name_plural = 'Mensajes de chat'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['session', 'created_at'], name='chat_message_session_time_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.get_role_display()}] {self.content[:50]}..."
 
+    def save(self, *args, **kwargs):
+        # El HTML se calcula al crear (o editar) el mensaje, no en cada carga de página
+        if self.rendered_key != render_key(self.content):
+            self.render_html()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'rendered_html', 'rendered_key'}
+
+        # Los metadatos pesados se guardan aparte para no cargarlos en cada consulta
+        summary, details = split_metadata(self.metadata)
+        if details:
+            summary['has_details'] = True
+        self.metadata = summary
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        if adding:
+            self._update_session_counters()
+
+        if details:
+            detail, _ = ChatMessageDetail.objects.get_or_create(message=self)
+            detail.payload = merge_metadata(detail.payload, details)
+            detail.save(update_fields=['payload'])
+
+    def delete(self, *args, **kwargs):
+        session = self.session
+        result = super().delete(*args, **kwargs)
+        session.refresh_counters()
+        return result
+
+    def _update_session_counters(self):
+        """
+        Actualiza los contadores de la sesión en un único UPDATE atómico (F() evita
+        perder incrementos con escrituras concurrentes). El primer mensaje del usuario
+        fija también el título si la sesión aún no lo tiene.
+        """
+        preview = self.content[:PREVIEW_LENGTH]
+        updates = {
+            'message_count': models.F('message_count') + 1,
+            'last_message_at': self.created_at,
+            'last_message_preview': preview,
+            'updated_at': self.created_at,
+        }
+        title = title_from_message(self.content) if self.role == 'user' else ''
+        if title:
+            updates['title'] = models.Case(
+                models.When(title='', then=models.Value(title)),
+                default=models.F('title')
+            )
+        ChatSession.objects.filter(pk=self.session_id).update(**updates)
+
+        # Reflejar el cambio en la instancia de sesión ya cargada (si la hay)
+        if ChatMessage.session.is_cached(self):
+            session = self.session
+            session.message_count += 1
+            session.last_message_at = session.updated_at = self.created_at
+            session.last_message_preview = preview
+            if title and not session.title:
+                session.title = title
+
+    def render_html(self):
+        """Renderiza el contenido y actualiza rendered_html/rendered_key (sin guardar)."""
+        self.rendered_html = render_markdown(self.content)
+        self.rendered_key = render_key(self.content)
+
+    @property
+    def html(self):
+        """
+        HTML del mensaje. Los mensajes anteriores a la versión actual del renderer se
+        renderizan la primera vez que se muestran y se guardan para las siguientes.
+        """
+        if self.rendered_key != render_key(self.content):
+            self.render_html()
+            if self.pk:
+                ChatMessage.objects.filter(pk=self.pk).update(
+                    rendered_html=self.rendered_html,
+                    rendered_key=self.rendered_key
+                )
+        return mark_safe(self.rendered_html)
+
+    @property
+    def full_metadata(self):
+        """Resumen + detalles del mensaje (una consulta extra si tiene detalles)."""
+        if not self.metadata.get('has_details'):
+            return dict(self.metadata)
+        try:
+            payload = self.detail.payload
+        except ChatMessageDetail.DoesNotExist:
+            payload = {}
+        return merge_metadata(self.metadata, payload)
+
     @property
     def documents_used(self):
         """Retorna los documentos utilizados en la respuesta"""
-        return self.metadata.get('documents_used', [])
+        return self.full_metadata.get('documents_used', [])
 
     @property
     def verified_fields(self):
         """Retorna los campos verificados con XPath"""
-        return self.metadata.get('verified_fields', [])
+        return self.full_metadata.get('verified_fields', [])
 
     @property
     def route_used(self):
@@ -139,3 +381,113 @@ class ChatMessage(models.Model):
     def cost_eur(self):
         """Retorna el coste en EUR"""
         return self.metadata.get('cost_eur', 0.0)
+
+
+class ChatMessageDetail(models.Model):
+    """Metadatos pesados de un mensaje (resultados de tools, trazas, revisión completa)"""
+
+    message = models.OneToOneField(
+        ChatMessage,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='detail',
+        verbose_name='Mensaje'
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Detalles',
+        help_text='Metadatos que no se cargan con el mensaje; se piden bajo demanda'
+    )
+
+    class Meta:
+        verbose_name = 'Detalle de mensaje'
+        verbose_name_plural = 'Detalles de mensajes'
+
+    def __str__(self):
+        return f"Detalles de {self.message}"
+
+
+class ChatTurn(models.Model):
+    """Turno de conversación (mensaje del usuario -> respuesta del agente) en la cola de ejecución"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_RUNNING, 'En ejecución'),
+        (STATUS_DONE, 'Completado'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+
+    session = models.ForeignKey(
+        ChatSession,
+        on_delete=models.CASCADE,
+        related_name='turns',
+        verbose_name='Sesión'
+    )
+    user_message = models.OneToOneField(
+        ChatMessage,
+        on_delete=models.CASCADE,
+        related_name='turn',
+        verbose_name='Mensaje del usuario'
+    )
+    assistant_message = models.OneToOneField(
+        ChatMessage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='answered_turn',
+        verbose_name='Respuesta'
+    )
+    client_token = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        verbose_name='Token del cliente',
+        help_text='Identificador del envío para que los reintentos no dupliquen el turno'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name='Estado'
+    )
+    progress = models.CharField(max_length=100, blank=True, default='', verbose_name='Progreso')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')
+    error = models.TextField(blank=True, default='', verbose_name='Error')
+    worker = models.CharField(max_length=100, blank=True, default='', verbose_name='Worker')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Creado en')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Iniciado en')
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Último latido',
+        help_text='El worker lo refresca mientras procesa el turno; sin latido el turno se reencola'
+    )
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Terminado en')
+
+    class Meta:
+        verbose_name = 'Turno de chat'
+        verbose_name_plural = 'Turnos de chat'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='chat_turn_status_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'client_token'],
+                condition=~models.Q(client_token=''),
+                name='unique_chat_turn_client_token'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Turno {self.pk} ({self.get_status_display()}) - {self.session}"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
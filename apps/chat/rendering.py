@@ -0,0 +1,88 @@
+"""
+Renderizado markdown -> HTML de los mensajes del chat.
+
+El HTML se calcula una sola vez por mensaje y se guarda en ChatMessage.rendered_html
+junto con su clave (versión del renderer + hash del contenido). Subir RENDERER_VERSION
+(o actualizar la librería markdown) invalida todas las copias, que se regeneran al
+mostrarse de nuevo.
+"""
+import hashlib
+import re
+
+import markdown
+
+# Cambiar al modificar render_markdown() para regenerar el HTML guardado
+RENDERER_VERSION = f'1-md{markdown.__version__}'
+
+
+def render_key(content):
+    """Clave del HTML de un contenido: versión del renderer + hash del texto."""
+    digest = hashlib.sha256((content or '').encode('utf-8')).hexdigest()[:16]
+    return f'{RENDERER_VERSION}:{digest}'
+
+
+def render_markdown(text):
+    """
+    Convert markdown text to HTML with support for citations and formatting.
+
+    Supports:
+    - Standard markdown (bold, italic, lists, headers, code blocks)
+    - Citations in format [ID | section | file] -> styled as badges
+    - Line breaks preserved
+    """
+    if not text:
+        return ""
+
+    # Convert citations [ID | section | file] to styled HTML badges
+    citation_pattern = r'\[([^\|\]]+)\s*\|\s*([^\|\]]+)\s*\|\s*([^\]]+)\]'
+
+    def replace_citation(match):
+        doc_id = match.group(1).strip()
+        section = match.group(2).strip()
+        filename = match.group(3).strip()
+        return (
+            f'<span class="citation-badge" title="Fuente: {filename} - Sección: {section}">'
+            f'<i class="bi bi-file-earmark-text"></i> {doc_id}'
+            f'</span>'
+        )
+
+    text = re.sub(citation_pattern, replace_citation, text)
+
+    # PRE-PROCESSING: Arreglar problemas comunes de formato markdown
+    # 1. Asegurar líneas en blanco ANTES de títulos (###)
+    text = re.sub(r'([^\n])\n(#{1,6} )', r'\1\n\n\2', text)
+
+    # 2. Asegurar líneas en blanco DESPUÉS de títulos
+    text = re.sub(r'(#{1,6} [^\n]+)\n([^\n#])', r'\1\n\n\2', text)
+
+    # 3. Asegurar líneas en blanco ANTES de listas
+    text = re.sub(r'([^\n])\n([-*+] |\d+\. )', r'\1\n\n\2', text)
+
+    # 4. Asegurar líneas en blanco DESPUÉS de listas (final de lista)
+    # Detecta cuando una lista termina y viene texto normal
+    text = re.sub(r'((?:[-*+] |\d+\. )[^\n]+)\n([^\n\-*+\d])', r'\1\n\n\2', text)
+
+    # 5. Eliminar múltiples líneas en blanco consecutivas (más de 2)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+
+    # Convert markdown to HTML
+    html = markdown.markdown(
+        text,
+        extensions=['extra', 'codehilite', 'nl2br', 'md_in_html'],
+        extension_configs={
+            'codehilite': {
+                'css_class': 'highlight',
+                'linenums': False
+            }
+        }
+    )
+
+    # POST-PROCESSING: Agregar target="_blank" a todos los enlaces
+    # Esto hace que todos los enlaces se abran en una nueva pestaña
+    html = re.sub(
+        r'<a\s+([^>]*?)href=(["\'])([^"\']+)\2([^>]*?)>',
+        r'<a \1href=\2\3\2 target="_blank" rel="noopener noreferrer"\4>',
+        html
+    )
+
+    return html
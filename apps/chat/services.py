@@ -173,12 +173,13 @@ class ChatAgentService:
                 env_var = env_var_map.get(self.provider, 'GOOGLE_API_KEY')
                 os.environ[env_var] = self.api_key
 
-            # Prepare conversation history
+            # Prepare conversation history (the rolling summary, a leading system entry, is always kept)
             formatted_history = []
             if conversation_history and len(conversation_history) > 0:
                 max_history = int(os.getenv('MAX_CONVERSATION_HISTORY', '10'))
-                recent_history = conversation_history[-max_history:]
-                for msg in recent_history:
+                summary = [msg for msg in conversation_history[:1] if msg['role'] == 'system']
+                recent_history = conversation_history[len(summary):][-max_history:]
+                for msg in summary + recent_history:
                     formatted_history.append({
                         'role': msg['role'],
                         'content': msg['content']
@@ -287,6 +288,24 @@ class ChatAgentService:
                 }
             }
 
+    def summarize(self, prompt: str) -> str:
+        """
+        Run a plain (tool-less) LLM call, used to update the conversation summary
+
+        Args:
+            prompt: Full summarization prompt
+
+        Returns:
+            Text returned by the LLM
+        """
+        agent = self._get_agent()
+        if self.provider != 'ollama':
+            env_var = {'google': 'GOOGLE_API_KEY', 'openai': 'OPENAI_API_KEY'}.get(self.provider, 'GOOGLE_API_KEY')
+            os.environ[env_var] = self.api_key
+
+        response = agent.llm.invoke(prompt)
+        return getattr(response, 'content', response) or ''
+
     def reset_agent(self):
         """Reset the cached agent instance"""
         self._agent = None
@@ -14,7 +14,8 @@
         typingIndicatorDelay: 300,
         messageAnimationDelay: 100,
         maxInputHeight: 120,
-        autoResizeEnabled: true
+        autoResizeEnabled: true,
+        loadOlderThreshold: 80
     };
 
     // ============================================
@@ -173,6 +174,46 @@
         }
     }
 
+    // ============================================
+    // Infinite Scroll (older messages)
+    // ============================================
+    let loadingOlder = false;
+
+    async function loadOlderMessages() {
+        const container = elements.chatMessages;
+        if (!container || loadingOlder || container.dataset.hasMore !== 'true') return;
+
+        const oldest = container.querySelector('.message-group[data-message-id]');
+        if (!oldest) return;
+
+        loadingOlder = true;
+        try {
+            const url = `${container.dataset.historyUrl}?before=${encodeURIComponent(oldest.dataset.messageId)}`;
+            const response = await fetch(url, {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            });
+            const data = await response.json();
+            if (!data.success) return;
+
+            // Mantener la posición de lectura al insertar por arriba
+            const previousHeight = container.scrollHeight;
+            oldest.insertAdjacentHTML('beforebegin', data.html);
+            container.scrollTop += container.scrollHeight - previousHeight;
+
+            container.dataset.hasMore = data.has_more ? 'true' : 'false';
+        } catch (error) {
+            console.error('Error loading older messages:', error);
+        } finally {
+            loadingOlder = false;
+        }
+    }
+
+    function handleMessagesScroll() {
+        if (elements.chatMessages.scrollTop <= CONFIG.loadOlderThreshold) {
+            loadOlderMessages();
+        }
+    }
+
     // ============================================
     // AJAX Form Submission
     // ============================================
@@ -200,20 +241,20 @@
         showTypingIndicator();
 
         try {
-            // Send message via AJAX
+            // Send message via AJAX (el token evita duplicar el turno si se reenvía)
             const formData = new FormData();
             formData.append('message', message);
+            formData.append('client_token', generateClientToken());
             formData.append('csrfmiddlewaretoken', elements.csrfToken.value);
 
-            const response = await fetch(elements.messageForm.action, {
-                method: 'POST',
-                headers: {
-                    'X-Requested-With': 'XMLHttpRequest'
-                },
-                body: formData
-            });
+            const response = await postWithRetry(elements.messageForm.action, formData);
 
-            const data = await response.json();
+            let data = await response.json();
+
+            // Turno en cola: consultar su estado hasta que termine
+            if (data.success && data.turn && !data.turn.finished) {
+                data = await waitForTurn(data.turn.status_url);
+            }
 
             // Hide typing indicator
             hideTypingIndicator();
@@ -225,6 +266,9 @@
                 // Display assistant message with rendered HTML from server
                 if (data.assistant_message) {
                     createMessageElement(data.assistant_message, 'assistant');
+                } else {
+                    // Turno terminado sin respuesta (p. ej. la petición que lo procesaba murió)
+                    showError((data.turn && data.turn.error) || 'No se pudo generar la respuesta. Intenta de nuevo.');
                 }
             } else {
                 showError(data.error || 'Error al enviar el mensaje');
@@ -241,6 +285,68 @@
         }
     }
 
+    // ============================================
+    // Chat Turns (cola de ejecución)
+    // ============================================
+    const TURN_POLL_INTERVAL = 1500;
+    // Espera máxima a un turno (cubre CHAT_TURN_TIMEOUT con un reintento en la cola)
+    const TURN_MAX_WAIT = 25 * 60 * 1000;
+    const SUBMIT_RETRIES = 2;
+
+    function generateClientToken() {
+        if (window.crypto && window.crypto.randomUUID) {
+            return window.crypto.randomUUID();
+        }
+        return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+    }
+
+    async function postWithRetry(url, formData) {
+        // Reenviar con el mismo client_token es seguro: el servidor devuelve el turno existente
+        for (let attempt = 0; ; attempt++) {
+            try {
+                return await fetch(url, {
+                    method: 'POST',
+                    headers: {
+                        'X-Requested-With': 'XMLHttpRequest'
+                    },
+                    body: formData
+                });
+            } catch (error) {
+                if (attempt >= SUBMIT_RETRIES) throw error;
+                await new Promise(resolve => setTimeout(resolve, TURN_POLL_INTERVAL));
+            }
+        }
+    }
+
+    async function waitForTurn(statusUrl) {
+        const deadline = Date.now() + TURN_MAX_WAIT;
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, TURN_POLL_INTERVAL));
+
+            const response = await fetch(statusUrl, {
+                headers: {
+                    'X-Requested-With': 'XMLHttpRequest'
+                }
+            });
+            const data = await response.json();
+
+            if (!data.success || data.turn.finished) {
+                return data;
+            }
+            updateTypingProgress(data.turn.progress);
+        }
+        return {
+            success: false,
+            error: 'La respuesta está tardando demasiado. Recarga la conversación en unos minutos.'
+        };
+    }
+
+    function updateTypingProgress(progress) {
+        const indicator = document.getElementById('typingIndicator');
+        if (!indicator || !progress) return;
+        indicator.setAttribute('title', progress);
+    }
+
     // ============================================
     // Input State Management
     // ============================================
@@ -368,6 +474,10 @@
             elements.messageInput.addEventListener('keydown', handleKeyDown);
         }
 
+        if (elements.chatMessages) {
+            elements.chatMessages.addEventListener('scroll', handleMessagesScroll);
+        }
+
         // Initial scroll to bottom
         scrollToBottom(false);
 
@@ -390,6 +500,7 @@
         showTypingIndicator,
         hideTypingIndicator,
         createMessageElement,
+        loadOlderMessages,
         initialize
     };
 
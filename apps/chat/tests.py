@@ -6,7 +6,7 @@ Tests para las nuevas funcionalidades del chat:
 - Carga automática del perfil
 """
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.contrib.auth import get_user_model
 from unittest.mock import patch, MagicMock
 import json
@@ -464,3 +464,692 @@ class ReviewMetadataTestCase(TestCase):
         self.assertEqual(review['status'], 'APPROVED')
         self.assertEqual(len(review['issues']), 1)
         self.assertEqual(len(review['suggestions']), 2)
+
+
+class MessageRenderingTestCase(TestCase):
+    """Tests for the pre-rendered HTML of chat messages"""
+
+    def setUp(self):
+        from apps.chat.models import ChatSession
+        self.user = User.objects.create_user(username='renderuser', password='testpass123')
+        self.session = ChatSession.objects.create(user=self.user)
+
+    def test_html_rendered_on_create(self):
+        """Test that the HTML is computed once when the message is created"""
+        from apps.chat.models import ChatMessage
+        from apps.chat.rendering import render_key
+
+        msg = ChatMessage.objects.create(session=self.session, role='assistant', content='**Hola** [mundo](https://a.es)')
+
+        stored = ChatMessage.objects.get(pk=msg.pk)
+        self.assertIn('<strong>Hola</strong>', stored.rendered_html)
+        self.assertIn('target="_blank"', stored.rendered_html)
+        self.assertEqual(stored.rendered_key, render_key(stored.content))
+
+        with patch('apps.chat.models.render_markdown') as mock_render:
+            self.assertIn('<strong>Hola</strong>', stored.html)
+        mock_render.assert_not_called()
+
+    def test_stale_html_rerendered_lazily(self):
+        """Test that messages rendered by an older renderer are refreshed on first view"""
+        from apps.chat.models import ChatMessage
+
+        msg = ChatMessage.objects.create(session=self.session, role='assistant', content='# Titulo')
+        ChatMessage.objects.filter(pk=msg.pk).update(rendered_html='<p>old</p>', rendered_key='0:old')
+
+        stored = ChatMessage.objects.get(pk=msg.pk)
+        self.assertIn('<h1>Titulo</h1>', stored.html)
+        self.assertIn('<h1>Titulo</h1>', ChatMessage.objects.get(pk=msg.pk).rendered_html)
+
+
+class MessagePaginationTestCase(TestCase):
+    """Tests for windowed message loading in long chat sessions"""
+
+    def setUp(self):
+        from apps.chat.models import ChatSession, ChatMessage
+        self.user = User.objects.create_user(username='pageuser', password='testpass123')
+        self.session = ChatSession.objects.create(user=self.user)
+        self.messages = [
+            ChatMessage.objects.create(session=self.session, role='user' if i % 2 == 0 else 'assistant', content=f'msg {i}')
+            for i in range(7)
+        ]
+        self.client.login(username='pageuser', password='testpass123')
+
+    def test_message_window_cursor(self):
+        """Test that message_window walks back through the session with a cursor"""
+        window, has_more = self.session.message_window(3)
+        self.assertEqual([m.content for m in window], ['msg 4', 'msg 5', 'msg 6'])
+        self.assertTrue(has_more)
+
+        window, has_more = self.session.message_window(3, before=window[0].id)
+        self.assertEqual([m.content for m in window], ['msg 1', 'msg 2', 'msg 3'])
+        self.assertTrue(has_more)
+
+        window, has_more = self.session.message_window(3, before=window[0])
+        self.assertEqual([m.content for m in window], ['msg 0'])
+        self.assertFalse(has_more)
+
+    def test_detail_and_older_messages_endpoint(self):
+        """Test that the detail page shows the last page and the endpoint returns older ones"""
+        from django.urls import reverse
+
+        with patch('apps.chat.views.MESSAGES_PAGE_SIZE', 4):
+            response = self.client.get(reverse('apps_chat:session_detail', args=[self.session.id]))
+            self.assertEqual([m.content for m in response.context['messages']], ['msg 3', 'msg 4', 'msg 5', 'msg 6'])
+            self.assertTrue(response.context['has_more_messages'])
+
+            response = self.client.get(
+                reverse('apps_chat:message_list', args=[self.session.id]),
+                {'before': self.messages[3].id}
+            )
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['count'], 3)
+        self.assertFalse(data['has_more'])
+        self.assertEqual(data['next_cursor'], self.messages[0].id)
+        self.assertIn(f'data-message-id="{self.messages[2].id}"', data['html'])
+
+    def test_history_is_bounded(self):
+        """Test that only the last MAX_CONVERSATION_HISTORY messages are sent to the service"""
+        from django.urls import reverse
+
+        with patch.dict('os.environ', {'MAX_CONVERSATION_HISTORY': '2'}), \
+                self.settings(CHAT_MEMORY_ENABLED=False), \
+                patch('apps.chat.turns.ChatAgentService') as mock_service:
+            mock_service.return_value.process_message.return_value = {'content': 'ok', 'metadata': {}}
+            self.client.post(
+                reverse('apps_chat:message_create', args=[self.session.id]),
+                {'message': 'nuevo'},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+
+        history = mock_service.return_value.process_message.call_args.kwargs['conversation_history']
+        self.assertEqual([m['content'] for m in history], ['msg 5', 'msg 6'])
+
+
+class MessageMetadataSplitTestCase(TestCase):
+    """Tests for keeping heavy message metadata out of routine queries"""
+
+    def setUp(self):
+        from apps.chat.models import ChatSession
+        self.user = User.objects.create_user(username='metauser', email='meta@example.com', password='testpass123')
+        self.session = ChatSession.objects.create(user=self.user)
+        self.client.login(username='metauser', password='testpass123')
+
+    def _create_message(self):
+        from apps.chat.models import ChatMessage
+        return ChatMessage.objects.create(
+            session=self.session,
+            role='assistant',
+            content='Respuesta',
+            metadata={
+                'provider': 'openai',
+                'tools_used': ['search_jobs'],
+                'total_tokens': 1200,
+                'cost_eur': 0.002,
+                'tool_results': [{'tool': 'search_jobs', 'data': 'x' * 1000}],
+                'review': {'score': 80, 'status': 'NEEDS_IMPROVEMENT', 'issues': ['a'], 'suggestions': ['b']},
+            }
+        )
+
+    def test_heavy_metadata_stored_separately(self):
+        """Test that only the summary stays on the message row"""
+        from apps.chat.models import ChatMessage, ChatMessageDetail
+
+        message = ChatMessage.objects.get(pk=self._create_message().pk)
+
+        self.assertEqual(message.metadata['tools_used'], ['search_jobs'])
+        self.assertEqual(message.metadata['review'], {'score': 80, 'status': 'NEEDS_IMPROVEMENT'})
+        self.assertTrue(message.metadata['has_details'])
+        self.assertNotIn('tool_results', message.metadata)
+
+        payload = ChatMessageDetail.objects.get(message=message).payload
+        self.assertEqual(payload['review'], {'issues': ['a'], 'suggestions': ['b']})
+        self.assertEqual(message.full_metadata['review']['issues'], ['a'])
+        self.assertEqual(message.full_metadata['tool_results'][0]['tool'], 'search_jobs')
+
+    def test_details_endpoint(self):
+        """Test that the full metadata is served on demand and only to the owner"""
+        from django.urls import reverse
+
+        message = self._create_message()
+        url = reverse('apps_chat:message_detail', args=[self.session.id, message.id])
+
+        data = self.client.get(url).json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['metadata']['review']['suggestions'], ['b'])
+        self.assertEqual(data['metadata']['total_tokens'], 1200)
+
+        User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        self.client.login(username='other', password='testpass123')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class ChatTurnQueueTestCase(TestCase):
+    """Tests for the chat turn queue (enqueue, claim, worker, status endpoint)"""
+
+    def setUp(self):
+        from apps.chat.models import ChatSession
+        self.user = User.objects.create_user(username='turnuser', email='turn@example.com', password='testpass123')
+        self.session = ChatSession.objects.create(user=self.user, title='Turnos')
+        self.client.login(username='turnuser', password='testpass123')
+
+    def _post(self, message='Hola', token='tok-1'):
+        from django.urls import reverse
+        return self.client.post(
+            reverse('apps_chat:message_create', args=[self.session.id]),
+            {'message': message, 'client_token': token},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+
+    @staticmethod
+    def _agent_reply(content='Respuesta'):
+        service = MagicMock()
+        service.process_message.return_value = {'content': content, 'metadata': {'tools_used': []}}
+        return service
+
+    def test_queue_mode_returns_immediately(self):
+        """Test that in queue mode the request only enqueues the turn"""
+        from apps.chat.models import ChatTurn
+
+        with self.settings(CHAT_TURN_MODE='queue'), \
+                patch('apps.chat.turns.ChatAgentService') as service_cls:
+            response = self._post()
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data['turn']['status'], 'pending')
+        self.assertNotIn('assistant_message', data)
+        service_cls.assert_not_called()
+        self.assertEqual(ChatTurn.objects.get().user_message.content, 'Hola')
+
+    def test_resubmission_is_idempotent(self):
+        """Test that posting again with the same client token reuses the turn"""
+        from apps.chat.models import ChatMessage, ChatTurn
+
+        with self.settings(CHAT_TURN_MODE='queue'):
+            first = self._post().json()
+            second = self._post().json()
+
+        self.assertEqual(first['turn']['id'], second['turn']['id'])
+        self.assertEqual(ChatTurn.objects.count(), 1)
+        self.assertEqual(ChatMessage.objects.filter(role='user').count(), 1)
+
+    def test_worker_processes_turn_and_status_reports_it(self):
+        """Test that the worker command runs queued turns and the status endpoint returns the answer"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        with self.settings(CHAT_TURN_MODE='queue'):
+            status_url = self._post().json()['turn']['status_url']
+
+        with patch('apps.chat.turns.ChatAgentService', return_value=self._agent_reply('Hecho')):
+            call_command('run_chat_worker', '--once', stdout=StringIO())
+
+        data = self.client.get(status_url).json()
+        self.assertEqual(data['turn']['status'], 'done')
+        self.assertTrue(data['turn']['finished'])
+        self.assertEqual(data['assistant_message']['content'], 'Hecho')
+        self.assertIn('Hecho', data['assistant_message']['rendered_html'])
+
+    def test_claim_is_exclusive(self):
+        """Test that a pending turn can only be claimed once"""
+        from apps.chat.turns import claim_next_turn, enqueue_turn
+
+        turn, _ = enqueue_turn(self.session, 'Hola')
+        claimed = claim_next_turn('worker-a')
+
+        self.assertEqual(claimed.pk, turn.pk)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(claim_next_turn('worker-b'))
+
+    def test_stale_turns_are_requeued_then_failed(self):
+        """Test that turns abandoned by a dead worker go back to the queue"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.chat.models import ChatTurn
+        from apps.chat.turns import claim_next_turn, enqueue_turn, requeue_stale_turns
+
+        turn, _ = enqueue_turn(self.session, 'Hola')
+        claim_next_turn('worker-a')
+        ChatTurn.objects.filter(pk=turn.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale_turns(timeout=60, max_attempts=2), 1)
+        turn.refresh_from_db()
+        self.assertEqual(turn.status, ChatTurn.STATUS_PENDING)
+
+        claim_next_turn('worker-b')
+        ChatTurn.objects.filter(pk=turn.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        requeue_stale_turns(timeout=60, max_attempts=2)
+        turn.refresh_from_db()
+        self.assertEqual(turn.status, ChatTurn.STATUS_FAILED)
+
+    def test_slow_turns_are_not_requeued_and_dead_inline_turns_fail(self):
+        """Test that staleness is judged by the heartbeat and dead inline turns are marked failed"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.chat.models import ChatTurn
+        from apps.chat.turns import claim_next_turn, enqueue_turn, requeue_stale_turns
+
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        slow, _ = enqueue_turn(self.session, 'Lento')
+        claim_next_turn('worker-a')
+        ChatTurn.objects.filter(pk=slow.pk).update(started_at=an_hour_ago)
+        alive, _ = enqueue_turn(self.session, 'Inline vivo', run_inline=True)
+        ChatTurn.objects.filter(pk=alive.pk).update(started_at=an_hour_ago)
+        dead, _ = enqueue_turn(self.session, 'Inline muerto', run_inline=True)
+        ChatTurn.objects.filter(pk=dead.pk).update(started_at=an_hour_ago, heartbeat_at=an_hour_ago)
+
+        self.assertEqual(requeue_stale_turns(timeout=60, max_attempts=2), 0)
+        statuses = dict(ChatTurn.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[slow.pk], ChatTurn.STATUS_RUNNING)
+        self.assertEqual(statuses[alive.pk], ChatTurn.STATUS_RUNNING)
+        self.assertEqual(statuses[dead.pk], ChatTurn.STATUS_FAILED)
+
+    def test_status_and_resubmit_report_dead_inline_turn(self):
+        """Test that polling or resubmitting a turn whose request died ends with an error"""
+        from datetime import timedelta
+        from django.urls import reverse
+        from django.utils import timezone
+        from apps.chat.models import ChatTurn
+        from apps.chat.turns import enqueue_turn
+
+        turn, _ = enqueue_turn(self.session, 'Hola', client_token='tok-1', run_inline=True)
+        status_url = reverse('apps_chat:turn_status', args=[self.session.id, turn.id])
+        self.assertFalse(self.client.get(status_url).json()['turn']['finished'])
+
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        ChatTurn.objects.filter(pk=turn.pk).update(heartbeat_at=an_hour_ago)
+        with self.settings(CHAT_TURN_TIMEOUT=60):
+            response = self._post(token='tok-1')
+            polled = self.client.get(status_url).json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['turn']['status'], ChatTurn.STATUS_FAILED)
+        self.assertTrue(polled['turn']['finished'])
+        self.assertIn('dejó de responder', polled['turn']['error'])
+        self.assertNotIn('assistant_message', polled)
+
+    def test_requeued_turn_result_is_discarded(self):
+        """Test that a worker that lost its turn does not save a second answer"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.chat.models import ChatMessage, ChatTurn
+        from apps.chat.turns import claim_next_turn, enqueue_turn, requeue_stale_turns, run_turn
+
+        enqueue_turn(self.session, 'Hola')
+        slow = claim_next_turn('worker-a')
+        ChatTurn.objects.filter(pk=slow.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        requeue_stale_turns(timeout=60, max_attempts=2)
+        fast = claim_next_turn('worker-b')
+
+        with patch('apps.chat.turns.ChatAgentService', return_value=self._agent_reply('Rápido')):
+            self.assertIsNotNone(run_turn(fast))
+        with patch('apps.chat.turns.ChatAgentService', return_value=self._agent_reply('Lento')):
+            self.assertIsNone(run_turn(slow))
+
+        self.assertEqual(
+            list(ChatMessage.objects.filter(role='assistant').values_list('content', flat=True)), ['Rápido']
+        )
+        slow.refresh_from_db()
+        self.assertEqual(slow.worker, 'worker-b')
+        self.assertEqual(slow.assistant_message.content, 'Rápido')
+
+    def test_inline_mode_answers_in_request(self):
+        """Test that the default inline mode keeps answering within the request"""
+        with patch('apps.chat.turns.ChatAgentService', return_value=self._agent_reply('Inline')):
+            response = self._post()
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['turn']['status'], 'done')
+        self.assertEqual(data['assistant_message']['content'], 'Inline')
+
+    def test_agent_error_marks_turn_failed(self):
+        """Test that agent errors are shown as the answer and recorded on the turn"""
+        service = MagicMock()
+        service.process_message.side_effect = RuntimeError('boom')
+
+        with patch('apps.chat.turns.ChatAgentService', return_value=service):
+            data = self._post().json()
+
+        self.assertEqual(data['turn']['status'], 'failed')
+        self.assertIn('boom', data['assistant_message']['content'])
+
+
+class SessionCountersTestCase(TestCase):
+    """Tests for the denormalized message counters on ChatSession"""
+
+    def setUp(self):
+        from apps.chat.models import ChatSession
+        self.user = User.objects.create_user(username='countuser', email='count@example.com', password='testpass123')
+        self.session = ChatSession.objects.create(user=self.user)
+        self.client.login(username='countuser', password='testpass123')
+
+    def test_counters_updated_on_insert(self):
+        """Test that each new message updates count, preview and title in the session row"""
+        from apps.chat.models import ChatMessage, ChatSession
+
+        first = ChatMessage.objects.create(session=self.session, role='user', content='Busco trabajo de Python en Madrid con buen salario y teletrabajo')
+        ChatMessage.objects.create(session=self.session, role='assistant', content='Aquí tienes ofertas')
+
+        session = ChatSession.objects.get(pk=self.session.pk)
+        self.assertEqual(session.message_count, 2)
+        self.assertEqual(session.last_message_preview, 'Aquí tienes ofertas')
+        self.assertEqual(session.title, 'Busco trabajo de Python en Madrid con buen salario...')
+        self.assertGreaterEqual(session.last_message_at, first.created_at)
+
+        # La instancia cargada también se actualiza
+        self.assertEqual(self.session.message_count, 2)
+        self.assertEqual(self.session.title, session.title)
+
+    def test_title_kept_after_first_message(self):
+        """Test that later user messages do not overwrite the title"""
+        from apps.chat.models import ChatMessage, ChatSession
+
+        ChatMessage.objects.create(session=self.session, role='user', content='Primero')
+        ChatMessage.objects.create(session=self.session, role='user', content='Segundo')
+
+        self.assertEqual(ChatSession.objects.get(pk=self.session.pk).title, 'Primero')
+
+    def test_delete_recounts(self):
+        """Test that deleting a message recomputes the counters"""
+        from apps.chat.models import ChatMessage, ChatSession
+
+        ChatMessage.objects.create(session=self.session, role='user', content='Hola')
+        last = ChatMessage.objects.create(session=self.session, role='assistant', content='Respuesta')
+        last.delete()
+
+        session = ChatSession.objects.get(pk=self.session.pk)
+        self.assertEqual(session.message_count, 1)
+        self.assertEqual(session.last_message_preview, 'Hola')
+
+    def test_session_list_single_query(self):
+        """Test that the session list query does not grow with the number of sessions"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from apps.chat.models import ChatMessage, ChatSession
+
+        for i in range(5):
+            session = ChatSession.objects.create(user=self.user)
+            ChatMessage.objects.create(session=session, role='user', content=f'Mensaje {i}')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('apps_chat:session_list'))
+
+        self.assertContains(response, 'Mensaje 4')
+        session_queries = [q for q in queries.captured_queries if 'apps_chat_chatmessage' in q['sql']]
+        self.assertEqual(session_queries, [])
+
+
+class ColdArchiveTestCase(TestCase):
+    """Tests for moving old sessions to compressed cold storage and back"""
+
+    def setUp(self):
+        import tempfile
+        from apps.chat.models import ChatMessage, ChatSession
+
+        self.archive_dir = tempfile.mkdtemp()
+        self.settings_override = self.settings(CHAT_ARCHIVE_DIR=self.archive_dir)
+        self.settings_override.enable()
+
+        self.user = User.objects.create_user(username='colduser', email='cold@example.com', password='testpass123')
+        self.session = ChatSession.objects.create(user=self.user)
+        self.question = ChatMessage.objects.create(session=self.session, role='user', content='Busco **Python**')
+        self.answer = ChatMessage.objects.create(
+            session=self.session,
+            role='assistant',
+            content='Ofertas encontradas',
+            metadata={'tools_used': ['search_jobs'], 'tool_results': [{'tool': 'search_jobs'}]}
+        )
+        self.client.login(username='colduser', password='testpass123')
+
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+
+    def _archive_and_rehydrate(self):
+        from pathlib import Path
+        from apps.chat.archive import archive_session, rehydrate_session
+        from apps.chat.models import ChatMessage, ChatMessageDetail, ChatSession
+
+        created_at = {m.pk: m.created_at for m in ChatMessage.objects.all()}
+        self.assertEqual(archive_session(self.session), 2)
+
+        path = Path(self.archive_dir) / self.session.cold_archive
+        self.assertTrue(path.exists())
+        self.assertFalse(ChatMessage.objects.exists())
+        self.assertFalse(ChatMessageDetail.objects.exists())
+        session = ChatSession.objects.get(pk=self.session.pk)
+        self.assertEqual(session.message_count, 2)
+        self.assertEqual(session.last_message_preview, 'Ofertas encontradas')
+
+        # El fichero se borra al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(rehydrate_session(session), 2)
+        self.assertFalse(path.exists())
+        self.assertEqual({m.pk: m.created_at for m in ChatMessage.objects.all()}, created_at)
+        answer = ChatMessage.objects.get(pk=self.answer.pk)
+        self.assertEqual(answer.full_metadata['tool_results'], [{'tool': 'search_jobs'}])
+        self.assertIn('<strong>Python</strong>', ChatMessage.objects.get(pk=self.question.pk).rendered_html)
+        return path
+
+    def test_round_trip_gzip(self):
+        """Test archive and rehydration with gzip"""
+        with self.settings(CHAT_ARCHIVE_COMPRESSION='gzip'):
+            self.assertTrue(self._archive_and_rehydrate().name.endswith('.jsonl.gz'))
+
+    def test_round_trip_zstd(self):
+        """Test archive and rehydration with zstd when zstandard is installed"""
+        from apps.chat import archive
+        if archive.zstandard is None:
+            self.skipTest('zstandard no instalado')
+        with self.settings(CHAT_ARCHIVE_COMPRESSION='zstd'):
+            self.assertTrue(self._archive_and_rehydrate().name.endswith('.jsonl.zst'))
+
+    def test_opening_session_rehydrates(self):
+        """Test that opening a cold session brings its messages back transparently"""
+        from django.urls import reverse
+        from apps.chat.archive import archive_session
+
+        archive_session(self.session)
+        response = self.client.get(reverse('apps_chat:session_detail', args=[self.session.pk]))
+
+        self.assertContains(response, 'Ofertas encontradas')
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.cold_archive, '')
+
+    def test_message_posted_during_archive_is_kept(self):
+        """Test that a message written while the file is being built keeps the session hot"""
+        from apps.chat import archive
+        from apps.chat.models import ChatMessage
+
+        real_open = archive._open_archive
+
+        def open_and_post(*args, **kwargs):
+            ChatMessage.objects.create(session=self.session, role='user', content='Llega tarde')
+            return real_open(*args, **kwargs)
+
+        with patch('apps.chat.archive._open_archive', side_effect=open_and_post):
+            self.assertEqual(archive.archive_session(self.session), 0)
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.cold_archive, '')
+        self.assertEqual(ChatMessage.objects.filter(session=self.session).count(), 3)
+        self.assertEqual(list(__import__('pathlib').Path(self.archive_dir).rglob('*.*')), [])
+
+    def test_turn_status_and_details_rehydrate(self):
+        """Test that turn status and message detail URLs keep working for cold sessions"""
+        from django.urls import reverse
+        from apps.chat.archive import archive_session
+        from apps.chat.models import ChatTurn
+
+        turn = ChatTurn.objects.create(
+            session=self.session,
+            user_message=self.question,
+            assistant_message=self.answer,
+            status=ChatTurn.STATUS_DONE
+        )
+        archive_session(self.session)
+        self.assertFalse(ChatTurn.objects.exists())
+
+        data = self.client.get(reverse('apps_chat:message_detail', args=[self.session.pk, self.answer.pk])).json()
+        self.assertEqual(data['metadata']['tool_results'], [{'tool': 'search_jobs'}])
+
+        data = self.client.get(reverse('apps_chat:turn_status', args=[self.session.pk, turn.pk])).json()
+        self.assertEqual(data['turn']['status'], 'done')
+        self.assertEqual(data['assistant_message']['content'], 'Ofertas encontradas')
+
+    def test_command_selects_old_or_archived_sessions(self):
+        """Test that the command moves inactive and archived sessions only"""
+        from io import StringIO
+        from django.core.management import call_command
+        from apps.chat.models import ChatMessage, ChatSession
+
+        recent = ChatSession.objects.create(user=self.user)
+        ChatMessage.objects.create(session=recent, role='user', content='Reciente')
+        archived = ChatSession.objects.create(user=self.user, is_archived=True)
+        ChatMessage.objects.create(session=archived, role='user', content='Archivada')
+        ChatSession.objects.filter(pk=self.session.pk).update(
+            updated_at=self.session.updated_at - __import__('datetime').timedelta(days=200)
+        )
+
+        call_command('archive_chat_sessions', '--days', '90', '--archived', stdout=StringIO())
+
+        cold = set(ChatSession.objects.exclude(cold_archive='').values_list('pk', flat=True))
+        self.assertEqual(cold, {self.session.pk, archived.pk})
+        self.assertEqual(list(ChatMessage.objects.values_list('content', flat=True)), ['Reciente'])
+
+
+class ConversationMemoryTestCase(TestCase):
+    """Tests for the rolling conversation summary"""
+
+    def setUp(self):
+        from apps.chat.models import ChatMessage, ChatSession
+        self.user = User.objects.create_user(username='memuser', email='mem@example.com', password='testpass123')
+        self.session = ChatSession.objects.create(user=self.user)
+        for i in range(5):
+            ChatMessage.objects.create(session=self.session, role='user', content=f'pregunta {i}')
+            ChatMessage.objects.create(session=self.session, role='assistant', content=f'respuesta {i} ' + 'x' * 5000)
+
+    def test_summary_folds_old_messages(self):
+        """Test that messages leaving the recent window are folded into the summary"""
+        from apps.chat.memory import update_summary
+        from apps.chat.models import ChatSession
+
+        summarize = MagicMock(return_value='- Busca Python en Madrid')
+        with self.settings(CHAT_MEMORY_RECENT_MESSAGES=4, CHAT_MEMORY_FOLD_BATCH=4, CHAT_MEMORY_MESSAGE_MAX_CHARS=100):
+            self.assertTrue(update_summary(self.session, summarize))
+            # Nada más que resumir hasta que se acumule otro lote
+            self.assertFalse(update_summary(self.session, summarize))
+
+        prompt = summarize.call_args.args[0]
+        self.assertIn('pregunta 0', prompt)
+        self.assertIn('respuesta 2', prompt)
+        self.assertNotIn('pregunta 3', prompt)
+        self.assertLess(len(prompt), 3000)
+
+        session = ChatSession.objects.get(pk=self.session.pk)
+        self.assertEqual(session.summary, '- Busca Python en Madrid')
+        self.assertEqual(session.summary_until, session.messages.get(content__startswith='respuesta 2').created_at)
+
+    def test_history_uses_summary_and_recent_messages(self):
+        """Test that the agent receives the summary plus only the unsummarized messages"""
+        from apps.chat.memory import build_history, update_summary
+        from apps.chat.models import ChatMessage
+
+        with self.settings(CHAT_MEMORY_RECENT_MESSAGES=4, CHAT_MEMORY_FOLD_BATCH=4, CHAT_MEMORY_MESSAGE_MAX_CHARS=100):
+            update_summary(self.session, MagicMock(return_value='- Resumen'))
+            new_message = ChatMessage.objects.create(session=self.session, role='user', content='nueva')
+            history = build_history(self.session, new_message)
+
+        self.assertEqual(history[0]['role'], 'system')
+        self.assertIn('- Resumen', history[0]['content'])
+        self.assertEqual([m['content'][:11] for m in history[1:]], ['pregunta 3', 'respuesta 3', 'pregunta 4', 'respuesta 4'])
+        self.assertTrue(all(len(m['content']) < 200 for m in history[1:]))
+
+    def test_turn_updates_summary(self):
+        """Test that a queued turn refreshes the memory after saving the answer"""
+        from apps.chat.models import ChatSession
+        from apps.chat.turns import claim_next_turn, enqueue_turn, run_turn
+
+        service = MagicMock()
+        service.process_message.return_value = {'content': 'ok', 'metadata': {}}
+        service.summarize.return_value = '- Resumen del turno'
+
+        enqueue_turn(self.session, 'otra')
+        turn = claim_next_turn(worker='worker-1')
+        with self.settings(CHAT_MEMORY_RECENT_MESSAGES=6, CHAT_MEMORY_FOLD_BATCH=4), \
+                patch('apps.chat.turns.ChatAgentService', return_value=service):
+            run_turn(turn)
+
+        self.assertEqual(ChatSession.objects.get(pk=self.session.pk).summary, '- Resumen del turno')
+        history = service.process_message.call_args.kwargs['conversation_history']
+        self.assertEqual(len(history), 10)
+
+    @patch('apps.chat.services.ChatAgentService._create_agent')
+    @patch('apps.chat.services.ChatAgentService._get_reviewer', return_value=None)
+    def test_service_keeps_summary_when_truncating(self, mock_get_reviewer, mock_create_agent):
+        """Test that MAX_CONVERSATION_HISTORY never drops the leading summary entry"""
+        from apps.chat.services import ChatAgentService
+
+        mock_agent = MagicMock()
+        mock_agent.query.return_value = {'answer': 'ok', 'tools_used': []}
+        mock_create_agent.return_value = mock_agent
+
+        history = [{'role': 'system', 'content': 'resumen'}] + [
+            {'role': 'user', 'content': f'm{i}'} for i in range(5)
+        ]
+        self.user.llm_provider, self.user.llm_api_key = 'google', 'test-api-key'
+        with patch.dict('os.environ', {'MAX_CONVERSATION_HISTORY': '2'}):
+            ChatAgentService(self.user).process_message('hola', conversation_history=history)
+
+        sent = mock_agent.query.call_args.kwargs['conversation_history']
+        self.assertEqual([m['content'] for m in sent], ['resumen', 'm3', 'm4'])
+
+
+class InlineMemoryFoldTestCase(TransactionTestCase):
+    """Tests for the conversation summary of inline turns (committed data, background thread)"""
+
+    def test_inline_turn_does_not_wait_for_summary(self):
+        """Test that an inline turn returns before the summary LLM call finishes"""
+        import threading
+        from apps.chat.models import ChatMessage, ChatSession
+        from apps.chat.turns import enqueue_turn, run_turn
+
+        user = User.objects.create_user(username='inlinemem', email='inlinemem@example.com', password='testpass123')
+        session = ChatSession.objects.create(user=user)
+        for i in range(5):
+            ChatMessage.objects.create(session=session, role='user', content=f'pregunta {i}')
+            ChatMessage.objects.create(session=session, role='assistant', content=f'respuesta {i}')
+
+        release, started = threading.Event(), threading.Event()
+
+        def summarize(prompt):
+            started.set()
+            release.wait(5)
+            return '- Resumen en segundo plano'
+
+        service = MagicMock()
+        service.process_message.return_value = {'content': 'ok', 'metadata': {}}
+        service.summarize.side_effect = summarize
+
+        turn, _ = enqueue_turn(session, 'otra', run_inline=True)
+        with self.settings(CHAT_MEMORY_RECENT_MESSAGES=6, CHAT_MEMORY_FOLD_BATCH=4), \
+                patch('apps.chat.turns.ChatAgentService', return_value=service):
+            reply = run_turn(turn)
+
+            # La respuesta está guardada mientras el resumen sigue esperando al LLM
+            self.assertEqual(reply.content, 'ok')
+            self.assertTrue(started.wait(5))
+            self.assertEqual(ChatSession.objects.get(pk=session.pk).summary, '')
+
+            release.set()
+            for thread in threading.enumerate():
+                if thread.name == f'chat-memory-{session.pk}':
+                    thread.join(5)
+
+        self.assertEqual(ChatSession.objects.get(pk=session.pk).summary, '- Resumen en segundo plano')
+
@@ -0,0 +1,397 @@
+"""
+Cola de turnos del chat.
+
+Cada mensaje del usuario genera un ChatTurn. El turno lo ejecuta la propia petición
+(CHAT_TURN_MODE='inline') o un worker independiente (CHAT_TURN_MODE='queue',
+`python manage.py run_chat_worker`), que lo reclama de la tabla con un UPDATE
+condicional, de modo que varios workers pueden compartir la cola sin broker externo.
+
+El cliente envía un client_token por mensaje: si reintenta el envío con el mismo token
+se devuelve el turno existente en lugar de crear otro.
+
+Mientras procesa un turno, el worker refresca heartbeat_at; un turno sin latido durante
+CHAT_TURN_TIMEOUT segundos vuelve a la cola. La respuesta solo se guarda si el turno
+sigue perteneciendo al mismo worker e intento, así que un worker lento al que le
+reencolaron el turno no duplica la respuesta.
+
+Tras guardar la respuesta se actualiza el resumen de la sesión (memory.update_summary).
+En modo inline la petición HTTP espera a run_turn, así que el resumen se hace en un
+hilo aparte para no sumar una llamada al LLM a la latencia del usuario.
+"""
+from datetime import timedelta
+import logging
+import os
+import socket
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from .memory import build_history, update_summary
+from .models import ChatMessage, ChatTurn
+from .services import ChatAgentService
+
+logger = logging.getLogger(__name__)
+
+# Sesiones con un resumen en curso en este proceso (un hilo de resumen por sesión)
+_folding = set()
+_folding_lock = threading.Lock()
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_turn(session, content, client_token='', run_inline=False):
+    """
+    Crea el mensaje del usuario y su turno.
+
+    Args:
+        session: ChatSession donde se escribe el mensaje
+        content: Texto del mensaje
+        client_token: Identificador del envío generado por el cliente (idempotencia)
+        run_inline: Si True, el turno se crea ya reclamado por la petición actual
+            para que ningún worker lo tome
+
+    Returns:
+        (turn, created): created es False si el token ya tenía un turno
+    """
+    client_token = (client_token or '')[:64]
+    if client_token:
+        existing = ChatTurn.objects.filter(session=session, client_token=client_token).first()
+        if existing:
+            return existing, False
+
+    status = ChatTurn.STATUS_RUNNING if run_inline else ChatTurn.STATUS_PENDING
+    try:
+        with transaction.atomic():
+            user_message = ChatMessage.objects.create(session=session, role='user', content=content)
+            turn = ChatTurn.objects.create(
+                session=session,
+                user_message=user_message,
+                client_token=client_token,
+                status=status,
+                progress='' if run_inline else 'En cola',
+                attempts=1 if run_inline else 0,
+                started_at=timezone.now() if run_inline else None,
+                heartbeat_at=timezone.now() if run_inline else None,
+                worker='inline' if run_inline else '',
+            )
+    except IntegrityError:
+        # Dos envíos simultáneos con el mismo token: gana el primero
+        if not client_token:
+            raise
+        return ChatTurn.objects.get(session=session, client_token=client_token), False
+
+    return turn, True
+
+
+def requeue_stale_turns(timeout=None, max_attempts=None):
+    """
+    Devuelve a la cola los turnos 'running' cuyo worker lleva más de timeout segundos
+    sin dar señales de vida (worker caído); tras max_attempts intentos se marcan como
+    fallidos. Los turnos 'inline' los ejecuta una petición HTTP que ya no existe (p. ej.
+    timeout de gunicorn): no hay nadie que los reintente y se marcan como fallidos.
+
+    Returns:
+        Número de turnos recuperados
+    """
+    timeout = settings.CHAT_TURN_TIMEOUT if timeout is None else timeout
+    max_attempts = settings.CHAT_TURN_MAX_ATTEMPTS if max_attempts is None else max_attempts
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = ChatTurn.objects.filter(
+        # Turnos reclamados antes de existir heartbeat_at: se juzgan por started_at
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=ChatTurn.STATUS_RUNNING
+    )
+
+    failed_inline = stale.filter(worker='inline').update(
+        status=ChatTurn.STATUS_FAILED,
+        progress='',
+        error=f'La petición que procesaba el turno dejó de responder durante {timeout}s',
+        finished_at=timezone.now()
+    )
+    stale = stale.exclude(worker='inline')
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=ChatTurn.STATUS_FAILED,
+        progress='',
+        error=f'El turno no terminó en {timeout}s tras {max_attempts} intentos',
+        finished_at=timezone.now()
+    )
+    requeued = stale.filter(attempts__lt=max_attempts).update(
+        status=ChatTurn.STATUS_PENDING,
+        progress='En cola',
+        worker='',
+        started_at=None,
+        heartbeat_at=None
+    )
+    if failed or requeued or failed_inline:
+        logger.warning(
+            f"[CHAT_TURNS] Turnos abandonados: {requeued} reencolados, {failed} fallidos, "
+            f"{failed_inline} inline fallidos"
+        )
+    return requeued
+
+
+def refresh_if_stale(turn):
+    """
+    Aplica requeue_stale_turns si el turno sigue 'running' y lo recarga.
+
+    En modo inline no hay worker que revise la cola: lo hacen las consultas de estado,
+    para que el cliente no espere para siempre a un turno cuya petición murió.
+    """
+    if turn.status == ChatTurn.STATUS_RUNNING:
+        requeue_stale_turns()
+        turn.refresh_from_db()
+    return turn
+
+
+def claim_next_turn(worker=None):
+    """
+    Reclama el turno pendiente más antiguo para este worker.
+
+    El UPDATE condicionado a status='pending' garantiza que un turno solo lo
+    reclama un worker aunque varios consulten la cola a la vez.
+
+    Returns:
+        ChatTurn reclamado o None si la cola está vacía
+    """
+    worker = (worker or default_worker_id())[:100]
+    while True:
+        turn_id = ChatTurn.objects.filter(
+            status=ChatTurn.STATUS_PENDING
+        ).order_by('created_at', 'pk').values_list('pk', flat=True).first()
+        if turn_id is None:
+            return None
+
+        now = timezone.now()
+        claimed = ChatTurn.objects.filter(pk=turn_id, status=ChatTurn.STATUS_PENDING).update(
+            status=ChatTurn.STATUS_RUNNING,
+            progress='Iniciando',
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F('attempts') + 1
+        )
+        if claimed:
+            return ChatTurn.objects.select_related('session__user', 'user_message').get(pk=turn_id)
+        # Otro worker lo reclamó antes: probar con el siguiente
+
+
+def _owned(turn):
+    """El turno mientras siga reclamado por este worker en este intento."""
+    return ChatTurn.objects.filter(
+        pk=turn.pk,
+        status=ChatTurn.STATUS_RUNNING,
+        worker=turn.worker,
+        attempts=turn.attempts
+    )
+
+
+def _set_progress(turn, progress):
+    turn.progress = progress
+    _owned(turn).update(progress=progress, heartbeat_at=timezone.now())
+
+
+class _Heartbeat:
+    """Refresca heartbeat_at en un hilo mientras el agente procesa el turno."""
+
+    def __init__(self, turn, interval):
+        self.turn = turn
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f'chat-turn-{turn.pk}', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _beat(self):
+        try:
+            while not self._stop.wait(self.interval):
+                if not _owned(self.turn).update(heartbeat_at=timezone.now()):
+                    return
+        except Exception as e:
+            logger.warning(f"[CHAT_TURNS] Error refrescando el latido del turno {self.turn.pk}: {e}")
+        finally:
+            # El hilo no pasa por el ciclo de petición de Django
+            connection.close()
+
+
+def _fold_memory(session, summarize):
+    try:
+        update_summary(session, summarize)
+    except Exception as e:
+        logger.warning(f"[CHAT_TURNS] No se pudo actualizar la memoria de la sesión {session.pk}: {e}")
+
+
+def _fold_memory_in_background(session, summarize):
+    """Lanza _fold_memory en un hilo (salvo que la sesión ya tenga uno en curso)."""
+    with _folding_lock:
+        if session.pk in _folding:
+            return None
+        _folding.add(session.pk)
+
+    def fold():
+        try:
+            _fold_memory(session, summarize)
+        finally:
+            with _folding_lock:
+                _folding.discard(session.pk)
+            # El hilo no pasa por el ciclo de petición de Django
+            connection.close()
+
+    thread = threading.Thread(target=fold, name=f'chat-memory-{session.pk}', daemon=True)
+    thread.start()
+    return thread
+
+
+def error_reply(exc):
+    """Texto que se muestra al usuario cuando el agente falla."""
+    error_msg = str(exc)
+    if 'ollama' in error_msg.lower() or 'connection' in error_msg.lower():
+        return (
+            "❌ **Error de conexión con Ollama**\n\n"
+            "Por favor verifica:\n"
+            "1. Ollama está ejecutándose: `ollama serve`\n"
+            "2. El modelo está descargado: `ollama list`\n\n"
+            f"Error técnico: {error_msg}"
+        )
+    if 'API key' in error_msg or 'api_key' in error_msg:
+        return (
+            "🔑 **Falta configurar tu API key**\n\n"
+            "Ve a tu perfil y configura tu API key del proveedor que estás usando."
+        )
+    return f"Lo siento, ocurrió un error: {error_msg}"
+
+
+def run_turn(turn):
+    """
+    Ejecuta el agente para un turno ya reclamado y guarda la respuesta.
+
+    Los errores del agente no se propagan: se guardan como respuesta del asistente
+    (igual que se mostraban antes en la vista) y el turno queda como 'failed'.
+
+    Returns:
+        ChatMessage con la respuesta del asistente, o None si entretanto el turno se
+        reencoló y lo reclamó otro worker (la respuesta se descarta)
+    """
+    session = turn.session
+    user_message = turn.user_message
+
+    try:
+        _set_progress(turn, 'Preparando el agente')
+        chat_service = ChatAgentService(session.user, session_id=session.id)
+
+        # Resumen de los mensajes antiguos + los recientes literales
+        conversation_history = build_history(session, user_message)
+
+        _set_progress(turn, 'Procesando mensaje')
+        with _Heartbeat(turn, interval=max(1, settings.CHAT_TURN_TIMEOUT // 4)):
+            response = chat_service.process_message(
+                message=user_message.content,
+                conversation_history=conversation_history
+            )
+
+        _set_progress(turn, 'Guardando respuesta')
+        content, metadata = response['content'], response['metadata']
+        status, error = ChatTurn.STATUS_DONE, ''
+
+    except Exception as e:
+        logger.error(f"[CHAT_TURNS] Error en el turno {turn.pk}: {traceback.format_exc()}")
+        content = error_reply(e)
+        metadata = {
+            'error': str(e),
+            'error_type': type(e).__name__,
+            'tools_used': [],
+            'iterations': 0
+        }
+        status, error = ChatTurn.STATUS_FAILED, str(e)
+
+    finished_at = timezone.now()
+    with transaction.atomic():
+        assistant_message = ChatMessage.objects.create(
+            session=session,
+            role='assistant',
+            content=content,
+            metadata=metadata
+        )
+        # Solo el worker que tiene el turno reclamado guarda la respuesta
+        owned = _owned(turn).update(
+            status=status,
+            error=error,
+            progress='',
+            assistant_message=assistant_message,
+            finished_at=finished_at
+        )
+        if not owned:
+            transaction.set_rollback(True)
+
+    if not owned:
+        logger.warning(
+            f"[CHAT_TURNS] El turno {turn.pk} ya no pertenece a {turn.worker} "
+            f"(intento {turn.attempts}): se descarta la respuesta"
+        )
+        turn.refresh_from_db()
+        return None
+
+    turn.status = status
+    turn.error = error
+    turn.progress = ''
+    turn.assistant_message = assistant_message
+    turn.finished_at = finished_at
+
+    # Con la respuesta guardada se resumen los mensajes que salen de la ventana; en modo
+    # inline la petición espera a run_turn, así que se hace fuera de la respuesta
+    if status == ChatTurn.STATUS_DONE:
+        if turn.worker == 'inline':
+            _fold_memory_in_background(session, chat_service.summarize)
+        else:
+            _fold_memory(session, chat_service.summarize)
+
+    return assistant_message
+
+
+def _message_payload(message):
+    return {
+        'id': message.id,
+        'content': message.content,
+        'created_at': message.created_at.isoformat(),
+        'rendered_html': render_to_string('chat/partials/_message_bubble.html', {'msg': message}),
+    }
+
+
+def turn_payload(turn):
+    """Respuesta JSON de un turno: estado, progreso y, al terminar, los mensajes renderizados."""
+    payload = {
+        'success': True,
+        'turn': {
+            'id': turn.id,
+            'status': turn.status,
+            'progress': turn.progress,
+            'finished': turn.is_finished,
+            'error': turn.error,
+            'status_url': reverse('apps_chat:turn_status', args=[turn.session_id, turn.id]),
+        },
+        'user_message': _message_payload(turn.user_message),
+    }
+
+    assistant_message = turn.assistant_message
+    if assistant_message is not None:
+        payload['assistant_message'] = {
+            **_message_payload(assistant_message),
+            'metadata': assistant_message.metadata,
+            'details_url': reverse(
+                'apps_chat:message_detail', args=[turn.session_id, assistant_message.id]
+            ) if assistant_message.metadata.get('has_details') else None,
+        }
+    return payload
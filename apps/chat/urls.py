@@ -13,9 +13,18 @@ urlpatterns = [
     # Vista de sesión específica
     path('<int:session_id>/', views.ChatSessionDetailView.as_view(), name='session_detail'),
 
+    # Mensajes anteriores (scroll infinito)
+    path('<int:session_id>/mensajes/', views.ChatMessageListView.as_view(), name='message_list'),
+
+    # Metadatos completos de un mensaje
+    path('<int:session_id>/mensaje/<int:message_id>/detalles/', views.ChatMessageDetailView.as_view(), name='message_detail'),
+
     # Enviar mensaje
     path('<int:session_id>/mensaje/', views.ChatMessageCreateView.as_view(), name='message_create'),
 
+    # Estado de un turno en cola
+    path('<int:session_id>/turno/<int:turn_id>/', views.ChatTurnStatusView.as_view(), name='turn_status'),
+
     # Archivar sesión
     path('<int:session_id>/archivar/', views.ChatSessionArchiveView.as_view(), name='session_archive'),
 
@@ -3,15 +3,19 @@ from django.views.generic import ListView, DetailView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import JsonResponse
 from django.contrib import messages
-from django.urls import reverse
 from django.template.loader import render_to_string
-from django.db.models import Count, Prefetch
-from .models import ChatSession, ChatMessage
-from .services import ChatAgentService
+from django.conf import settings
+from .models import ChatSession, ChatMessage, ChatTurn
+from .turns import enqueue_turn, refresh_if_stale, run_turn, turn_payload
+from .archive import ensure_hot
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Mensajes por página en el detalle de sesión (el resto se carga con scroll infinito)
+MESSAGES_PAGE_SIZE = int(os.getenv('CHAT_MESSAGES_PAGE_SIZE', '30'))
+
 
 class ChatSessionListView(LoginRequiredMixin, ListView):
     """Vista de lista de sesiones de chat del usuario"""
@@ -21,19 +25,11 @@ class ChatSessionListView(LoginRequiredMixin, ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        last_message_prefetch = Prefetch(
-            'messages',
-            queryset=ChatMessage.objects.order_by('-created_at')[:1],
-            to_attr='last_message_cached'
-        )
-
+        # Contadores y último mensaje denormalizados en ChatSession: una sola consulta
+        # sobre el índice (user, is_archived, -updated_at)
         return ChatSession.objects.filter(
             user=self.request.user,
             is_archived=False
-        ).annotate(
-            message_count=Count('messages')
-        ).prefetch_related(
-            last_message_prefetch
         ).order_by('-updated_at')
 
 
@@ -65,10 +61,58 @@ class ChatSessionDetailView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['messages'] = self.object.messages.all().order_by('created_at')
+        # Las sesiones en almacenamiento en frío se rehidratan al abrirlas
+        ensure_hot(self.object)
+        window, has_more = self.object.message_window(MESSAGES_PAGE_SIZE)
+        context['messages'] = window
+        context['has_more_messages'] = has_more
         return context
 
 
+class ChatMessageListView(LoginRequiredMixin, View):
+    """Página de mensajes anteriores a un cursor (scroll infinito del detalle)"""
+
+    def get(self, request, session_id):
+        session = get_object_or_404(ChatSession, id=session_id, user=request.user)
+
+        before = request.GET.get('before')
+        if before is not None and not before.isdigit():
+            return JsonResponse({'success': False, 'error': 'Cursor invalide.'}, status=400)
+
+        ensure_hot(session)
+        window, has_more = session.message_window(MESSAGES_PAGE_SIZE, before=int(before) if before else None)
+        html = ''.join(
+            render_to_string('chat/partials/_message_bubble.html', {'msg': msg})
+            for msg in window
+        )
+
+        return JsonResponse({
+            'success': True,
+            'html': html,
+            'count': len(window),
+            'has_more': has_more,
+            'next_cursor': window[0].id if window else None
+        })
+
+
+class ChatMessageDetailView(LoginRequiredMixin, View):
+    """Metadatos completos de un mensaje (resultados de tools, revisión...) bajo demanda"""
+
+    def get(self, request, session_id, message_id):
+        session = get_object_or_404(ChatSession, id=session_id, user=request.user)
+        ensure_hot(session)
+        message = get_object_or_404(
+            ChatMessage.objects.select_related('detail'),
+            id=message_id,
+            session=session
+        )
+        return JsonResponse({
+            'success': True,
+            'id': message.id,
+            'metadata': message.full_metadata
+        })
+
+
 class ChatMessageCreateView(LoginRequiredMixin, View):
     """Vista para crear un nuevo mensaje en una sesión de chat"""
 
@@ -92,111 +136,48 @@ class ChatMessageCreateView(LoginRequiredMixin, View):
         print(f"[CHAT REQUEST] Mensaje: {user_message_content[:80]}{'...' if len(user_message_content) > 80 else ''}", file=sys.stderr)
         print("="*70, file=sys.stderr)
 
-        # Crear mensaje del usuario
-        user_message = ChatMessage.objects.create(
-            session=session,
-            role='user',
-            content=user_message_content
-        )
-
-        # Generar título automáticamente
-        if not session.title:
-            session.generate_title()
+        is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+        run_inline = settings.CHAT_TURN_MODE != 'queue'
 
-        try:
-            print(f"[CHAT] Inicializando servicio de chat...", file=sys.stderr)
-            chat_service = ChatAgentService(request.user, session_id=session.id)
+        ensure_hot(session)
 
-            # Get conversation history
-            previous_messages = session.messages.filter(
-                created_at__lt=user_message.created_at
-            ).order_by('created_at')
-
-            conversation_history = [
-                {
-                    'role': msg.role,
-                    'content': msg.content
-                }
-                for msg in previous_messages
-            ]
+        # Crear mensaje del usuario y su turno (un reintento con el mismo token devuelve el existente)
+        turn, created = enqueue_turn(
+            session,
+            user_message_content,
+            client_token=request.POST.get('client_token', ''),
+            run_inline=run_inline
+        )
 
-            # Process message
+        if created and run_inline:
             print(f"[CHAT] Procesando mensaje...", file=sys.stderr)
-            response = chat_service.process_message(
-                message=user_message_content,
-                conversation_history=conversation_history
-            )
-
-            print(f"[CHAT] ✓ Respuesta generada: {len(response['content'])} caracteres", file=sys.stderr)
+            run_turn(turn)
             print("="*70 + "\n", file=sys.stderr)
+        elif created:
+            print(f"[CHAT] Turno {turn.id} en cola", file=sys.stderr)
+        else:
+            # Reenvío de un turno existente: si su petición murió, se marca como fallido
+            refresh_if_stale(turn)
 
-            assistant_message = ChatMessage.objects.create(
-                session=session,
-                role='assistant',
-                content=response['content'],
-                metadata=response['metadata']
-            )
-
-        except Exception as e:
-            import traceback
-            error_trace = traceback.format_exc()
-            print(f"[CHAT ERROR] {error_trace}")
-
-            error_msg = str(e)
-            if 'ollama' in error_msg.lower() or 'connection' in error_msg.lower():
-                assistant_content = (
-                    "❌ **Error de conexión con Ollama**\n\n"
-                    "Por favor verifica:\n"
-                    "1. Ollama está ejecutándose: `ollama serve`\n"
-                    "2. El modelo está descargado: `ollama list`\n\n"
-                    f"Error técnico: {error_msg}"
-                )
-            elif 'API key' in error_msg or 'api_key' in error_msg:
-                assistant_content = (
-                    "🔑 **Falta configurar tu API key**\n\n"
-                    "Ve a tu perfil y configura tu API key del proveedor que estás usando."
-                )
-            else:
-                assistant_content = f"Lo siento, ocurrió un error: {error_msg}"
-
-            assistant_message = ChatMessage.objects.create(
-                session=session,
-                role='assistant',
-                content=assistant_content,
-                metadata={
-                    'error': str(e),
-                    'error_type': type(e).__name__,
-                    'tools_used': [],
-                    'iterations': 0
-                }
-            )
+        if is_ajax:
+            # 202 mientras el turno no ha terminado: el cliente consulta status_url
+            return JsonResponse(turn_payload(turn), status=200 if turn.is_finished else 202)
 
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            user_html = render_to_string('chat/partials/_message_bubble.html', {
-                'msg': user_message
-            })
-            assistant_html = render_to_string('chat/partials/_message_bubble.html', {
-                'msg': assistant_message
-            })
+        return redirect('apps_chat:session_detail', session_id=session_id)
 
-            return JsonResponse({
-                'success': True,
-                'user_message': {
-                    'id': user_message.id,
-                    'content': user_message.content,
-                    'created_at': user_message.created_at.isoformat(),
-                    'rendered_html': user_html
-                },
-                'assistant_message': {
-                    'id': assistant_message.id,
-                    'content': assistant_message.content,
-                    'created_at': assistant_message.created_at.isoformat(),
-                    'metadata': assistant_message.metadata,
-                    'rendered_html': assistant_html
-                }
-            })
 
-        return redirect('apps_chat:session_detail', session_id=session_id)
+class ChatTurnStatusView(LoginRequiredMixin, View):
+    """Estado y progreso de un turno; incluye la respuesta cuando ha terminado"""
+
+    def get(self, request, session_id, turn_id):
+        session = get_object_or_404(ChatSession, id=session_id, user=request.user)
+        ensure_hot(session)
+        turn = get_object_or_404(
+            ChatTurn.objects.select_related('user_message', 'assistant_message'),
+            id=turn_id,
+            session=session
+        )
+        return JsonResponse(turn_payload(refresh_if_stale(turn)))
 
 
 class ChatSessionArchiveView(LoginRequiredMixin, View):
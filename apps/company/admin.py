@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile
+from .models import Company, CompanyAlias, CompanyRecruiter, UserProfile
 
 
 @admin.register(UserProfile)
@@ -17,7 +17,7 @@ class UserProfileAdmin(admin.ModelAdmin):
             'fields': ('curriculum_text', 'curriculum_file', 'professional_summary')
         }),
         ('Datos Extraídos por IA', {
-            'fields': ('skills', 'experience', 'education', 'languages'),
+            'fields': ('skills', 'experience', 'education', 'languages', 'ranking_positions'),
             'classes': ('collapse',)
         }),
         ('Preferencias de Búsqueda', {
@@ -31,3 +31,25 @@ class UserProfileAdmin(admin.ModelAdmin):
             'fields': ('is_complete', 'cv_analyzed', 'created_at', 'updated_at')
         }),
     )
+
+
+class CompanyRecruiterInline(admin.TabularInline):
+    model = CompanyRecruiter
+    extra = 0
+    fields = ['name', 'linkedin_url', 'email', 'verified', 'last_seen_at']
+    readonly_fields = ['last_seen_at']
+
+
+@admin.register(Company)
+class CompanyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'sector', 'website', 'last_checked_at']
+    list_filter = ['sector', 'last_checked_at']
+    search_fields = ['name', 'normalized_name']
+    readonly_fields = ['checked_sections', 'last_checked_at', 'created_at', 'updated_at']
+    inlines = [CompanyRecruiterInline]
+
+
+@admin.register(CompanyAlias)
+class CompanyAliasAdmin(admin.ModelAdmin):
+    list_display = ['alias', 'canonical', 'created_at']
+    search_fields = ['alias', 'canonical']
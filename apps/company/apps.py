@@ -5,3 +5,7 @@ class CompanyConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.company"
     label = "apps_company"
+
+    def ready(self):
+        # Registra las señales que invalidan el snapshot cacheado del perfil
+        from . import profile_cache  # noqa: F401
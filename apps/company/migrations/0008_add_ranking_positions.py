@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 00:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_company', '0007_change_cv_summary_to_textfield'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='ranking_positions',
+            field=models.JSONField(blank=True, default=list, help_text='Ej: ["Desarrollador Backend", "Data Engineer"]', verbose_name='Puestos del ranking'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='ranking_positions_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 del cv_summary usado para extraer ranking_positions', max_length=64, verbose_name='Hash del resumen CV'),
+        ),
+    ]
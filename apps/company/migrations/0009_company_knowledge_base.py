@@ -0,0 +1,134 @@
+# Generated by Django 5.1.6 on 2026-10-19 01:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_company", "0008_add_ranking_positions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Company",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=200, verbose_name="Nombre")),
+                (
+                    "normalized_name",
+                    models.CharField(
+                        max_length=200, unique=True, verbose_name="Nombre normalizado"
+                    ),
+                ),
+                (
+                    "aliases",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text='Ej: ["telefonica sa", "telefonica espana"]',
+                        verbose_name="Alias",
+                    ),
+                ),
+                ("website", models.URLField(blank=True, verbose_name="Web")),
+                (
+                    "linkedin_url",
+                    models.URLField(blank=True, verbose_name="Página de LinkedIn"),
+                ),
+                (
+                    "sector",
+                    models.CharField(blank=True, max_length=100, verbose_name="Sector"),
+                ),
+                (
+                    "info",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Información recopilada"
+                    ),
+                ),
+                (
+                    "checked_sections",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Secciones comprobadas"
+                    ),
+                ),
+                (
+                    "last_checked_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Última comprobación"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Empresa",
+                "verbose_name_plural": "Empresas",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CompanyRecruiter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=200, verbose_name="Nombre")),
+                (
+                    "linkedin_url",
+                    models.URLField(max_length=500, verbose_name="Perfil de LinkedIn"),
+                ),
+                (
+                    "role",
+                    models.TextField(blank=True, verbose_name="Rol / descripción"),
+                ),
+                (
+                    "email",
+                    models.EmailField(blank=True, max_length=254, verbose_name="Email"),
+                ),
+                (
+                    "verified",
+                    models.BooleanField(default=False, verbose_name="Verificado"),
+                ),
+                (
+                    "last_seen_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Visto por última vez"
+                    ),
+                ),
+                (
+                    "company",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recruiters",
+                        to="apps_company.company",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Reclutador",
+                "verbose_name_plural": "Reclutadores",
+                "ordering": ["-verified", "id"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("company", "linkedin_url"),
+                        name="unique_company_recruiter",
+                    )
+                ],
+            },
+        ),
+    ]
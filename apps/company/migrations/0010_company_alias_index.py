@@ -0,0 +1,115 @@
+# Generated by Django 5.1.6 on 2026-10-19 01:28
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Copia congelada de agent_ia_core.tools.core.company_names.company_key tal como era al
+# crear esta migración: si la canonicalización cambia, la migración sigue dando el mismo
+# resultado (y no depende de importar agent_ia_core).
+LEGAL_SUFFIXES = {
+    "sa", "sl", "slu", "sau", "sll", "slp", "scoop", "sccl", "coop", "cb", "sc", "srl", "spa",
+    "inc", "incorporated", "ltd", "limited", "llc", "llp", "plc", "gmbh", "ag", "bv", "nv", "sas",
+    "corp", "corporation", "co", "company", "cia", "compania",
+}
+QUALIFIER_WORDS = {
+    "espana", "spain", "iberia", "iberica", "europe", "europa", "emea", "international",
+    "internacional", "global", "group", "grupo", "holding", "holdings",
+}
+TRAILING_PARTICLES = {"de", "del", "y", "and", "&"}
+
+
+def normalize_text(text):
+    text = "".join(
+        c for c in unicodedata.normalize("NFKD", text or "") if not unicodedata.combining(c)
+    ).lower()
+    text = re.sub(
+        r"\b((?:[a-z]\.){1,3}[a-z]?)(?=\s|$|,)", lambda m: m.group(1).replace(".", ""), text
+    )
+    text = re.sub(r"[^\w\s&]", " ", text)
+    return " ".join(text.split())
+
+
+def company_key(name):
+    words = normalize_text(name).split()
+    if not words:
+        return ""
+
+    key_words = list(words)
+    while len(key_words) > 1:
+        last = key_words[-1]
+        if last in LEGAL_SUFFIXES or last in TRAILING_PARTICLES:
+            key_words.pop()
+        elif last in QUALIFIER_WORDS and key_words[-2] not in TRAILING_PARTICLES:
+            key_words.pop()
+        else:
+            break
+    while len(key_words) > 1 and key_words[0] in QUALIFIER_WORDS:
+        key_words.pop(0)
+
+    return " ".join(key_words)
+
+
+def move_aliases_to_index(apps, schema_editor):
+    """Recalcula las claves canónicas y pasa los alias JSON a CompanyAlias."""
+    Company = apps.get_model("apps_company", "Company")
+    CompanyAlias = apps.get_model("apps_company", "CompanyAlias")
+
+    for company in Company.objects.all():
+        canonical = company_key(company.name) or company.normalized_name
+        if canonical != company.normalized_name:
+            if Company.objects.filter(normalized_name=canonical).exists():
+                canonical = company.normalized_name
+            else:
+                company.normalized_name = canonical
+                company.save(update_fields=["normalized_name"])
+
+        for alias in company.aliases or []:
+            alias_key = company_key(alias)
+            if alias_key and alias_key != canonical:
+                CompanyAlias.objects.get_or_create(alias=alias_key, defaults={"canonical": canonical})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("apps_company", "0009_company_knowledge_base"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompanyAlias",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "alias",
+                    models.CharField(max_length=200, unique=True, verbose_name="Alias"),
+                ),
+                (
+                    "canonical",
+                    models.CharField(
+                        db_index=True, max_length=200, verbose_name="Clave canónica"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Alias de empresa",
+                "verbose_name_plural": "Alias de empresas",
+            },
+        ),
+        migrations.RunPython(move_aliases_to_index, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="company",
+            name="aliases",
+        ),
+    ]
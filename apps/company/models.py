@@ -1,3 +1,5 @@
+import hashlib
+
 from django.db import models
 from django.conf import settings
 
@@ -109,6 +111,22 @@ class UserProfile(models.Model):
         help_text='Resumen optimizado para búsqueda de empleo'
     )
 
+    # Puestos del ranking extraídos del cv_summary (cache estructurada)
+    ranking_positions = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Puestos del ranking',
+        help_text='Ej: ["Desarrollador Backend", "Data Engineer"]'
+    )
+
+    # Hash del cv_summary del que se extrajeron los puestos
+    ranking_positions_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='Hash del resumen CV',
+        help_text='SHA-256 del cv_summary usado para extraer ranking_positions'
+    )
+
     # ============================================
     # PREFERENCIAS DE BÚSQUEDA
     # ============================================
@@ -260,6 +278,31 @@ class UserProfile(models.Model):
 
         return context
 
+    @staticmethod
+    def hash_cv_summary(cv_summary: str) -> str:
+        """
+        Devuelve el hash SHA-256 del cv_summary.
+        """
+        return hashlib.sha256((cv_summary or '').encode('utf-8')).hexdigest()
+
+    def get_ranking_positions(self):
+        """
+        Devuelve los puestos del ranking cacheados, o None si el cv_summary ha cambiado
+        desde que se extrajeron.
+        """
+        if not self.cv_summary or not self.ranking_positions:
+            return None
+        if self.ranking_positions_hash != self.hash_cv_summary(self.cv_summary):
+            return None
+        return self.ranking_positions
+
+    def set_ranking_positions(self, positions):
+        """
+        Guarda los puestos del ranking asociados al cv_summary actual (no llama a save()).
+        """
+        self.ranking_positions = list(positions or [])
+        self.ranking_positions_hash = self.hash_cv_summary(self.cv_summary) if self.ranking_positions else ''
+
     def check_completeness(self):
         """
         Verifica si el perfil tiene la información mínima necesaria.
@@ -271,3 +314,146 @@ class UserProfile(models.Model):
         ]
         self.is_complete = all(required_fields)
         return self.is_complete
+
+
+class Company(models.Model):
+    """
+    Empresa de la base de conocimiento compartida por las tools (recomendaciones,
+    reclutadores, info de LinkedIn). Evita redescubrir la misma empresa vía Google.
+    """
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name='Nombre'
+    )
+
+    # Clave canónica del nombre (ver agent_ia_core/tools/core/company_names.py)
+    normalized_name = models.CharField(
+        max_length=200,
+        unique=True,
+        verbose_name='Nombre normalizado'
+    )
+
+    website = models.URLField(
+        blank=True,
+        verbose_name='Web'
+    )
+
+    linkedin_url = models.URLField(
+        blank=True,
+        verbose_name='Página de LinkedIn'
+    )
+
+    sector = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Sector'
+    )
+
+    # Datos recopilados por las tools (resultados de búsqueda, emails, opiniones...)
+    info = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Información recopilada'
+    )
+
+    # Última comprobación de cada sección: {"recruiters": "2025-01-01T10:00:00+00:00", ...}
+    checked_sections = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Secciones comprobadas'
+    )
+
+    last_checked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Última comprobación'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Empresa'
+        verbose_name_plural = 'Empresas'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class CompanyRecruiter(models.Model):
+    """Reclutador o contacto de RRHH de una empresa encontrado en LinkedIn"""
+
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='recruiters'
+    )
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name='Nombre'
+    )
+
+    linkedin_url = models.URLField(
+        max_length=500,
+        verbose_name='Perfil de LinkedIn'
+    )
+
+    role = models.TextField(
+        blank=True,
+        verbose_name='Rol / descripción'
+    )
+
+    email = models.EmailField(
+        blank=True,
+        verbose_name='Email'
+    )
+
+    # El snippet confirma que trabaja en la empresa y en selección
+    verified = models.BooleanField(
+        default=False,
+        verbose_name='Verificado'
+    )
+
+    last_seen_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Visto por última vez'
+    )
+
+    class Meta:
+        verbose_name = 'Reclutador'
+        verbose_name_plural = 'Reclutadores'
+        ordering = ['-verified', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'linkedin_url'], name='unique_company_recruiter'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.company.name})"
+
+
+class CompanyAlias(models.Model):
+    """Índice alias -> clave canónica de empresa ("telefonica tech" -> "telefonica")"""
+
+    alias = models.CharField(
+        max_length=200,
+        unique=True,
+        verbose_name='Alias'
+    )
+
+    canonical = models.CharField(
+        max_length=200,
+        db_index=True,
+        verbose_name='Clave canónica'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Alias de empresa'
+        verbose_name_plural = 'Alias de empresas'
+
+    def __str__(self):
+        return f"{self.alias} -> {self.canonical}"
@@ -0,0 +1,119 @@
+"""
+Snapshot cacheado del perfil de cada usuario para el agente.
+
+El agente consulta el perfil en cada mensaje (registro de tools, get_user_profile).
+En lugar de leer User y UserProfile cada vez, se guarda en la cache de Django un
+snapshot con los campos que usa el agente, bajo una clave versionada por usuario:
+
+    profile_snapshot:<esquema>:<user_id>:<versión>
+
+Guardar el User o su UserProfile cambia la versión (señales post_save/post_delete),
+de modo que el siguiente acceso reconstruye el snapshot; las entradas antiguas
+simplemente caducan. Si la cache falla se lee directamente de la base de datos.
+
+Solo se usa la cache con PROFILE_SNAPSHOT_CACHE (activado por defecto con una cache
+compartida): con una cache por proceso, la invalidación de un proceso no llegaría a
+los demás y servirían el perfil antiguo hasta PROFILE_SNAPSHOT_TIMEOUT.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+# Subir al cambiar los campos del snapshot para no leer entradas con el formato anterior
+SNAPSHOT_SCHEMA = 1
+
+
+def _version_key(user_id):
+    return f'profile_snapshot_version:{user_id}'
+
+
+def _snapshot_key(user_id, version):
+    return f'profile_snapshot:{SNAPSHOT_SCHEMA}:{user_id}:{version}'
+
+
+def get_profile_version(user_id):
+    """Versión actual del perfil del usuario (se crea si la cache no la tiene)."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_profile_snapshot(user_id):
+    """Cambia la versión del perfil: el snapshot anterior deja de usarse."""
+    try:
+        cache.set(_version_key(user_id), time.time_ns(), timeout=None)
+    except Exception as e:
+        logger.warning(f"[PROFILE_CACHE] No se pudo invalidar el perfil de {user_id}: {e}")
+
+
+def build_profile_snapshot(user):
+    """Lee de la base de datos los campos del usuario y del perfil que usa el agente."""
+    profile = UserProfile.objects.filter(user_id=user.pk).first()
+
+    snapshot = {
+        'user': {
+            'city': getattr(user, 'city', '') or '',
+            'work_mode': getattr(user, 'work_mode', '') or '',
+        },
+        'profile': None,
+    }
+    if profile:
+        snapshot['profile'] = {
+            'full_name': profile.full_name,
+            'location': profile.location,
+            # El ranking de puestos (cv_summary) es la info principal; si no hay, el contexto clásico
+            'summary': profile.cv_summary or profile.get_chat_context(),
+            'preferred_locations': profile.preferred_locations,
+            'preferred_sectors': profile.preferred_sectors,
+            'salary_min': profile.salary_min,
+            'salary_max': profile.salary_max,
+            'availability': profile.availability,
+            'cv_analyzed': profile.cv_analyzed,
+            'is_complete': profile.is_complete,
+        }
+    return snapshot
+
+
+def get_profile_snapshot(user):
+    """
+    Devuelve el snapshot del perfil del usuario, desde la cache si está vigente.
+
+    Returns:
+        Dict con 'version', 'user' (city, work_mode) y 'profile' (None si no tiene perfil)
+    """
+    if not settings.PROFILE_SNAPSHOT_CACHE:
+        return {'version': None, **build_profile_snapshot(user)}
+
+    try:
+        version = get_profile_version(user.pk)
+        key = _snapshot_key(user.pk, version)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = {'version': version, **build_profile_snapshot(user)}
+            cache.set(key, snapshot, timeout=settings.PROFILE_SNAPSHOT_TIMEOUT)
+        return snapshot
+    except Exception as e:
+        logger.warning(f"[PROFILE_CACHE] Cache no disponible, leyendo el perfil de la base de datos: {e}")
+        return {'version': None, **build_profile_snapshot(user)}
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def _profile_changed(sender, instance, **kwargs):
+    invalidate_profile_snapshot(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def _user_changed(sender, instance, **kwargs):
+    invalidate_profile_snapshot(instance.pk)
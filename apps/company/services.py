@@ -3,9 +3,14 @@ Service layer for Company Profile operations
 Includes AI-powered auto-completion of profile fields using centralized prompts configuration
 """
 import os
+import re
+import json
+import logging
 from typing import Dict, Any, List
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 
 class CompanyProfileAIService:
     """Service to extract company information from free text using LLM"""
@@ -162,3 +167,104 @@ class CompanyProfileAIService:
             data['preferred_cpv_codes'] = list(set(valid_cpv_codes))
 
         return data
+
+
+# Top-level numbered lines of the ranking: "1. **Puesto**", "### 2. Puesto", "3) Puesto: ..."
+RANKING_LINE_PATTERN = re.compile(
+    r'^(?:#{1,6}[ \t]*)?(?:\*\*)?\d+[\.\)][ \t]*(?:\*\*)?[ \t]*([^\n:*(–—]+)',
+    re.MULTILINE
+)
+
+
+def _ranking_text_from_html(cv_summary: str) -> str:
+    """
+    Rebuild numbered lines from an HTML CV summary (markdown output loses the
+    numbers of <ol> items). Only top-level lists and headings are kept.
+    """
+    try:
+        from lxml import html as lxml_html
+        root = lxml_html.fragment_fromstring(cv_summary, create_parent='div')
+    except Exception:
+        return cv_summary
+
+    lines = []
+    for element in root.iter('h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ol'):
+        ancestors = [ancestor.tag for ancestor in element.iterancestors()]
+        if any(tag in ('ol', 'ul', 'li') for tag in ancestors):
+            continue
+        if element.tag == 'ol':
+            # Position names are the bold part of each item
+            for i, item in enumerate(element.findall('li'), start=1):
+                strong = item.find('.//strong')
+                if strong is not None and strong.text_content().strip():
+                    lines.append(f"{i}. {strong.text_content().strip()}")
+        else:
+            lines.append(element.text_content().strip())
+
+    return '\n'.join(lines)
+
+
+def extract_ranking_positions(cv_summary: str, llm=None) -> List[str]:
+    """
+    Extract the ranked job positions from a CV summary (markdown or HTML).
+
+    Tries the numbered-line pattern first, then the legacy "ranking" section
+    pattern, and only falls back to the LLM when neither finds anything.
+
+    Args:
+        cv_summary: CV summary text as generated by _generate_cv_summary
+        llm: Optional LangChain LLM used as a last resort
+
+    Returns:
+        List of position names in ranking order (empty if none found)
+    """
+    if not cv_summary:
+        return []
+
+    ranking_text = _ranking_text_from_html(cv_summary) if '<' in cv_summary else cv_summary
+
+    positions = []
+    for match in RANKING_LINE_PATTERN.finditer(ranking_text):
+        position = match.group(1).strip(' -*')
+        if position and position not in positions:
+            positions.append(position)
+    if positions:
+        return positions
+
+    ranking_section = re.search(
+        r'(?:ranking|puestos recomendados|posiciones recomendadas)[:\s]*(.+?)(?:\n\n|\Z)',
+        cv_summary,
+        re.IGNORECASE | re.DOTALL
+    )
+    if ranking_section:
+        positions = re.findall(
+            r'(?:\d+[\.\)]\s*|\-\s*|\*\s*)([A-Za-záéíóúñÁÉÍÓÚÑ\s]+?)(?:\n|$|:|\()',
+            ranking_section.group(1)
+        )
+        positions = [p.strip() for p in positions if p.strip()]
+        if positions:
+            return positions
+
+    if llm is None:
+        return []
+
+    prompt = f"""Extrae los nombres de los puestos del ranking de puestos recomendados de este CV summary:
+
+{cv_summary[:2000]}
+
+Devuelve SOLO una lista JSON con los nombres de los puestos.
+Formato: ["Puesto 1", "Puesto 2", "Puesto 3"]
+
+Si no hay ranking, devuelve: []"""
+
+    try:
+        response = llm.invoke(prompt)
+        response_text = response.content if hasattr(response, 'content') else str(response)
+
+        json_match = re.search(r'\[.*?\]', response_text, re.DOTALL)
+        if json_match:
+            return [str(p).strip() for p in json.loads(json_match.group()) if str(p).strip()]
+    except Exception as e:
+        logger.warning(f"Error extracting ranking positions with LLM: {e}")
+
+    return []
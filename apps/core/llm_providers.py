@@ -5,6 +5,8 @@ Supports: Google Gemini, OpenAI, NVIDIA NIM
 import os
 from typing import Optional, Dict, Any
 
+from agent_ia_core.tools.core.rate_limiter import langchain_rate_limiter
+
 
 class LLMProviderFactory:
     """Factory for creating LLM instances based on provider type"""
@@ -46,6 +48,7 @@ class LLMProviderFactory:
             model=model,
             google_api_key=api_key,
             temperature=kwargs.get('temperature', 0),
+            rate_limiter=kwargs.pop('rate_limiter', None) or langchain_rate_limiter('google', api_key),
             **{k: v for k, v in kwargs.items() if k != 'temperature'}
         )
 
@@ -61,6 +64,7 @@ class LLMProviderFactory:
             model=model,
             api_key=api_key,
             temperature=kwargs.get('temperature', 0),
+            rate_limiter=kwargs.pop('rate_limiter', None) or langchain_rate_limiter('openai', api_key),
             **{k: v for k, v in kwargs.items() if k != 'temperature'}
         )
 
@@ -76,6 +80,7 @@ class LLMProviderFactory:
             model=model,
             api_key=api_key,
             temperature=kwargs.get('temperature', 0),
+            rate_limiter=kwargs.pop('rate_limiter', None) or langchain_rate_limiter('openai', api_key),
             **{k: v for k, v in kwargs.items() if k != 'temperature'}
         )
 
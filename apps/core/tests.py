@@ -253,3 +253,41 @@ class SaveSocialTestCase(TestCase):
         self.assertEqual(response.status_code, 302)
         self.user.job_profile.refresh_from_db()
         self.assertEqual(self.user.job_profile.linkedin_url, 'https://linkedin.com/in/test')
+
+
+class QuotaDashboardTestCase(TestCase):
+    """Tests for the external API quota dashboard"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='quotauser',
+            password='testpass123',
+            llm_provider='openai',
+            llm_api_key='sk-secret',
+            google_search_api_key='google-secret'
+        )
+
+    def test_quota_requires_login(self):
+        """Test that the quota dashboard requires authentication"""
+        response = self.client.get(reverse('apps_core:quota_dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_quota_reports_remaining_budget(self):
+        """Test that the dashboard reports today's usage per user key without exposing it"""
+        from agent_ia_core.tools.core.rate_limiter import get_shared_rate_limiter
+
+        get_shared_rate_limiter().acquire('google_search', 'google-secret')
+        self.client.login(username='quotauser', password='testpass123')
+
+        response = self.client.get(reverse('apps_core:quota_dashboard'))
+        data = response.json()
+
+        self.assertTrue(data['success'])
+        quotas = {quota['provider']: quota for quota in data['quotas']}
+        self.assertEqual(quotas['google_search']['used'], 1)
+        self.assertEqual(quotas['google_search']['remaining'], quotas['google_search']['daily_quota'] - 1)
+        self.assertIn('openai', quotas)
+        self.assertNotIn('secret', response.content.decode())
@@ -14,6 +14,7 @@ urlpatterns = [
     path('ollama/check/', views.ollama_check_view, name='ollama_check'),
     path('ollama/test/', views.ollama_test_api, name='ollama_test'),
     path('ollama/models/', views.ollama_models_api, name='ollama_models'),
+    path('quota/', views.quota_dashboard_api, name='quota_dashboard'),
     # CV Analysis
     path('profile/analyze-cv/', views.analyze_cv_image_view, name='analyze_cv'),
     path('profile/analyze-cv/ajax/', views.analyze_cv_ajax_view, name='analyze_cv_ajax'),
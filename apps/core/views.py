@@ -236,6 +236,29 @@ def ollama_models_api(request):
         })
 
 
+@login_required
+def quota_dashboard_api(request):
+    """
+    API endpoint with today's external API usage for the user's own keys
+    (Google Search and LLM provider). Raw keys are never returned.
+    """
+    from agent_ia_core.tools.core.rate_limiter import get_shared_rate_limiter
+
+    limiter = get_shared_rate_limiter()
+    user = request.user
+    quotas = []
+
+    if getattr(user, 'google_search_api_key', None):
+        quotas.append(limiter.usage('google_search', user.google_search_api_key))
+
+    # The limiter names Gemini 'google', like the agent does
+    llm_provider = {'gemini': 'google'}.get(user.llm_provider, user.llm_provider)
+    if llm_provider in limiter.limits and getattr(user, 'llm_api_key', None):
+        quotas.append(limiter.usage(llm_provider, user.llm_api_key))
+
+    return JsonResponse({'success': True, 'quotas': quotas})
+
+
 @login_required
 def analyze_cv_image_view(request):
     """
@@ -547,10 +570,11 @@ def save_cv_text_view(request):
         profile.curriculum_text = curriculum_text
         profile.cv_analyzed = True
 
-        # Generar resumen estructurado del CV
-        cv_summary = _generate_cv_summary(curriculum_text, request.user)
+        # Generar resumen estructurado del CV (y cachear los puestos del ranking)
+        cv_summary, ranking_positions = _generate_cv_summary(curriculum_text, request.user)
         if cv_summary:
             profile.cv_summary = cv_summary
+            profile.set_ranking_positions(ranking_positions)
 
         profile.save()
 
@@ -560,9 +584,14 @@ def save_cv_text_view(request):
     return redirect('apps_core:profile')
 
 
-def _generate_cv_summary(curriculum_text: str, user) -> dict:
+def _generate_cv_summary(curriculum_text: str, user) -> tuple:
     """
     Genera un resumen estructurado del CV usando LLM.
+
+    Returns:
+        Tupla (html del resumen, lista de puestos del ranking). Los puestos se
+        extraen aquí una sola vez para que search_jobs_by_ranking no tenga que
+        volver a derivarlos del HTML en cada búsqueda.
     """
     try:
         # Obtener LLM del usuario
@@ -574,7 +603,7 @@ def _generate_cv_summary(curriculum_text: str, user) -> dict:
         )
 
         if not llm:
-            return {}
+            return "", []
 
         # Extraer puestos recomendados basados en el CV
         extraction_prompt = f"""Analiza este CV y genera un RANKING de puestos de trabajo en los que encajarías, ordenados del más adecuado al menos.
@@ -595,15 +624,19 @@ CV:
         response = llm.invoke(extraction_prompt)
         response_text = response.content if hasattr(response, 'content') else str(response)
 
+        # Extraer los puestos del ranking del markdown (antes de perder la numeración)
+        from apps.company.services import extract_ranking_positions
+        ranking_positions = extract_ranking_positions(response_text, llm=llm)
+
         # Convertir markdown a HTML
         import markdown
         html_content = markdown.markdown(response_text.strip())
 
-        return html_content
+        return html_content, ranking_positions
 
     except Exception as e:
         logger.error(f"Error generando resumen CV: {e}")
-        return ""
+        return "", []
 
 
 @login_required
@@ -0,0 +1,534 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Prueba de carga del endpoint de mensajes del chat (ChatMessageCreateView).
+
+N usuarios simulados envían mensajes a la vez a través del stack real de Django
+(middleware, sesiones, vistas, turnos, agente y tools) con django.test.Client. El LLM,
+Google Custom Search y los portales se sustituyen por los dobles de chat_fakes, con
+latencias configurables, así que no se hace ninguna llamada externa.
+
+Los usuarios se reparten entre --workers subprocesos (como los workers de gunicorn) que
+comparten una base de datos de test creada para la ocasión. Con --mode queue los POST
+devuelven 202, cada subproceso ejecuta además --turn-workers hilos de run_chat_worker y
+el cliente consulta status_url hasta que el turno termina, como chat.js.
+
+Se mide por turno (del POST a la respuesta final) la latencia p50/p95/p99, el
+throughput, las consultas SQL (las de las peticiones y, en modo cola, las del worker) y
+la memoria de cada subproceso. --output guarda el resultado en JSON y --compare lo
+compara con uno anterior (sale con código 1 si algo empeora más de --tolerance).
+
+Uso:
+    python benchmarks/bench_chat_load.py --users 8 --turns 5
+    python benchmarks/bench_chat_load.py --users 32 --workers 4 --mode queue \\
+        --llm-latency lognormal:0.8,0.5 --search-latency uniform:0.1,0.4 --portal-latency 0.3
+    python benchmarks/bench_chat_load.py --output resultados/base.json
+    python benchmarks/bench_chat_load.py --compare resultados/base.json --tolerance 15
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+PROMPTS = [
+    'Busca ofertas de desarrollador Python en Madrid',
+    'Hola, ¿qué puedes hacer por mí?',
+    '¿Qué empresas me recomiendas según mi perfil?',
+    'Busca ofertas de programador backend en remoto',
+    '¿Qué debería mejorar de mi CV para estas ofertas?',
+    'Resume lo que hemos hablado hasta ahora',
+]
+
+# Límites de las APIs externas: con los dobles se levantan salvo --real-rate-limits
+UNLIMITED_RATES = {
+    name: '1000000' for name in (
+        'GOOGLE_SEARCH_PER_MINUTE', 'GOOGLE_SEARCH_BURST', 'OPENAI_PER_MINUTE', 'OPENAI_BURST',
+        'GEMINI_PER_MINUTE', 'GEMINI_BURST', 'PORTAL_PER_MINUTE', 'PORTAL_BURST',
+    )
+}
+UNLIMITED_RATES.update({'GOOGLE_SEARCH_DAILY_QUOTA': '0', 'OPENAI_DAILY_QUOTA': '0', 'GEMINI_DAILY_QUOTA': '0'})
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def rss_mb():
+    """(rss actual, pico de rss) del proceso en MB; None si la plataforma no lo permite."""
+    current = peak = None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux lo da en KB y macOS en bytes
+        peak = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as fh:
+            current = int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    return (
+        round(current, 1) if current is not None else None,
+        round(peak, 1) if peak is not None else None,
+    )
+
+
+class QueryCounter:
+    """execute_wrapper que cuenta las consultas SQL de la conexión del hilo."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+# ----------------------------------------------------------------------
+# Subproceso: usuarios simulados
+# ----------------------------------------------------------------------
+def run_worker(args) -> dict:
+    """Ejecuta los usuarios asignados a este subproceso contra la base de datos de test."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    from django.conf import settings
+
+    # Antes de django.setup(): ninguna conexión ha leído todavía la configuración
+    settings.DATABASES['default']['NAME'] = os.environ['BENCH_DB_NAME']
+
+    import django
+    django.setup()
+
+    from django.db import close_old_connections, connection
+    from django.test import Client
+    from django.urls import reverse
+
+    from benchmarks.chat_fakes import install_fakes
+    from apps.chat.models import ChatSession, ChatTurn
+    from apps.chat.turns import claim_next_turn, default_worker_id, run_turn
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    fake_stats = install_fakes(
+        llm_latency=args.llm_latency,
+        search_latency=args.search_latency,
+        portal_latency=args.portal_latency,
+        seed=args.seed + args.worker_index,
+    )
+
+    session_ids = [int(pk) for pk in args.sessions.split(',') if pk]
+    sessions = list(ChatSession.objects.filter(pk__in=session_ids).select_related('user'))
+    connection.close()
+    rss_start, _ = rss_mb()
+
+    queue_mode = settings.CHAT_TURN_MODE == 'queue'
+    lock = threading.Lock()
+    turns = []
+    worker_turns = []
+    stop = threading.Event()
+
+    def simulated_user(index, session):
+        client = Client()
+        client.force_login(session.user)
+        url = reverse('apps_chat:message_create', args=[session.pk])
+        results = []
+        for n in range(args.turns):
+            prompt = PROMPTS[(index + n) % len(PROMPTS)]
+            counter = QueryCounter()
+            requests_made = 1
+            started = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                response = client.post(
+                    url,
+                    {'message': prompt, 'client_token': uuid.uuid4().hex},
+                    HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+                )
+                payload = response.json() if response.status_code in (200, 202) else {}
+                while response.status_code in (200, 202) and not payload.get('turn', {}).get('finished'):
+                    if time.perf_counter() - started > args.turn_timeout:
+                        break
+                    time.sleep(args.poll_interval)
+                    response = client.get(payload['turn']['status_url'])
+                    requests_made += 1
+                    payload = response.json() if response.status_code == 200 else {}
+            elapsed = time.perf_counter() - started
+
+            assistant = payload.get('assistant_message') or {}
+            error = None
+            if response.status_code not in (200, 202):
+                error = f'HTTP {response.status_code}'
+            elif not payload.get('turn', {}).get('finished'):
+                error = 'timeout'
+            elif payload.get('turn', {}).get('status') != ChatTurn.STATUS_DONE:
+                error = payload['turn'].get('status')
+            elif (assistant.get('metadata') or {}).get('error'):
+                error = str(assistant['metadata']['error'])[:200]
+            results.append({
+                'latency_s': elapsed,
+                'queries': counter.count,
+                'requests': requests_made,
+                'error': error,
+            })
+            if args.think_time:
+                time.sleep(args.think_time)
+        connection.close()
+        with lock:
+            turns.extend(results)
+
+    def turn_worker():
+        worker = f'{default_worker_id()}-{threading.get_ident()}'
+        while not stop.is_set():
+            close_old_connections()
+            turn = claim_next_turn(worker)
+            if turn is None:
+                time.sleep(args.poll_interval)
+                continue
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                run_turn(turn)
+            with lock:
+                worker_turns.append(counter.count)
+        connection.close()
+
+    # Todos los subprocesos empiezan a la vez
+    time.sleep(max(0.0, args.start_at - time.time()))
+
+    started = time.perf_counter()
+    background = [threading.Thread(target=turn_worker) for _ in range(args.turn_workers if queue_mode else 0)]
+    users = [threading.Thread(target=simulated_user, args=(i, s)) for i, s in enumerate(sessions)]
+    for t in background + users:
+        t.start()
+    for t in users:
+        t.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for t in background:
+        t.join()
+
+    rss_end, rss_peak = rss_mb()
+    return {
+        'pid': os.getpid(),
+        'users': len(sessions),
+        'elapsed_s': round(elapsed, 3),
+        'rss_start_mb': rss_start,
+        'rss_end_mb': rss_end,
+        'rss_peak_mb': rss_peak,
+        'fake_calls': fake_stats.snapshot(),
+        'worker_queries': worker_turns,
+        'turns': turns,
+    }
+
+
+# ----------------------------------------------------------------------
+# Proceso principal
+# ----------------------------------------------------------------------
+def setup_database(args):
+    """Crea la base de datos de test con un usuario y una sesión por usuario simulado."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+
+    db = settings.DATABASES['default']
+    if db['ENGINE'] == 'django.db.backends.sqlite3':
+        # Base de datos de test en fichero: la comparten los subprocesos
+        db.setdefault('TEST', {})['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench_chat_load.sqlite3')
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    from django.contrib.auth import get_user_model
+    from apps.chat.models import ChatSession
+    from apps.company.models import UserProfile
+
+    User = get_user_model()
+    session_ids = []
+    for i in range(args.users):
+        user = User.objects.create_user(
+            username=f'load{i}',
+            email=f'load{i}@example.com',
+            password='x',
+            llm_provider='openai',
+            llm_api_key=f'fake-openai-{i}',
+            use_web_search=True,
+            google_search_api_key=f'fake-search-{i}',
+            google_search_engine_id='fake-cx',
+            city='Madrid',
+        )
+        UserProfile.objects.create(
+            user=user,
+            full_name=f'Usuario de carga {i}',
+            location='Madrid',
+            cv_summary='Desarrollador backend con 5 años de experiencia en Python, Django y PostgreSQL.',
+        )
+        session_ids.append(ChatSession.objects.create(user=user, title=f'Carga {i}').pk)
+    connection.close()
+
+    return connection, old_name, db['ENGINE'], connection.settings_dict['NAME'], session_ids
+
+
+def run_load(args) -> dict:
+    connection, old_name, engine, test_name, session_ids = setup_database(args)
+    # Las caches del proyecto (Django y páginas descargadas) no se mezclan con las
+    # páginas falsas de la prueba
+    temp_dirs = [tempfile.mkdtemp(prefix='bench-cache-'), tempfile.mkdtemp(prefix='bench-pages-')]
+    try:
+        env = {
+            **os.environ,
+            'BENCH_DB_NAME': str(test_name),
+            'CHAT_TURN_MODE': args.mode,
+            'CACHE_LOCATION': temp_dirs[0],
+            'BROWSE_CACHE_DIR': temp_dirs[1],
+            **({} if args.real_rate_limits else UNLIMITED_RATES),
+        }
+        start_at = time.time() + 2 + args.workers
+        procs = []
+        for index in range(args.workers):
+            assigned = session_ids[index::args.workers]
+            command = [
+                sys.executable, os.path.abspath(__file__), '--worker',
+                '--worker-index', str(index),
+                '--sessions', ','.join(str(pk) for pk in assigned),
+                '--start-at', str(start_at),
+                '--turns', str(args.turns),
+                '--turn-workers', str(args.turn_workers),
+                '--think-time', str(args.think_time),
+                '--poll-interval', str(args.poll_interval),
+                '--turn-timeout', str(args.turn_timeout),
+                '--llm-latency', args.llm_latency,
+                '--search-latency', args.search_latency,
+                '--portal-latency', args.portal_latency,
+                '--seed', str(args.seed),
+            ]
+            log = tempfile.TemporaryFile(mode='w+')
+            procs.append((subprocess.Popen(command, env=env, cwd=PROJECT_ROOT, stdout=subprocess.PIPE,
+                                           stderr=log, text=True), log))
+
+        workers = []
+        for proc, log in procs:
+            stdout, _ = proc.communicate()
+            if proc.returncode != 0:
+                log.seek(0)
+                raise RuntimeError(f"El subproceso {proc.pid} falló: {log.read().strip().splitlines()[-1:]}")
+            workers.append(json.loads(stdout.strip().splitlines()[-1]))
+    finally:
+        from django.db import connections
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        for path in temp_dirs:
+            shutil.rmtree(path, ignore_errors=True)
+
+    return summarize(args, engine, workers)
+
+
+def summarize(args, engine, workers) -> dict:
+    turns = [t for w in workers for t in w['turns']]
+    ok = [t for t in turns if not t['error']]
+    latencies = [t['latency_s'] * 1000 for t in ok]
+    queries = [t['queries'] for t in turns]
+    worker_queries = [q for w in workers for q in w['worker_queries']]
+    elapsed = max((w['elapsed_s'] for w in workers), default=0.0)
+
+    errors = {}
+    for t in turns:
+        if t['error']:
+            errors[t['error']] = errors.get(t['error'], 0) + 1
+
+    def stats(values):
+        if not values:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0, 'mean': 0.0}
+        return {
+            'p50': round(percentile(values, 0.50), 1),
+            'p95': round(percentile(values, 0.95), 1),
+            'p99': round(percentile(values, 0.99), 1),
+            'max': round(max(values), 1),
+            'mean': round(statistics.fmean(values), 1),
+        }
+
+    fake_calls = {}
+    for w in workers:
+        for name, count in w['fake_calls'].items():
+            fake_calls[name] = fake_calls.get(name, 0) + count
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        'benchmark': 'chat_load',
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'engine': engine.rsplit('.', 1)[-1],
+        'config': {
+            'mode': args.mode,
+            'users': args.users,
+            'workers': args.workers,
+            'turns_per_user': args.turns,
+            'turn_workers': args.turn_workers if args.mode == 'queue' else 0,
+            'think_time_s': args.think_time,
+            'llm_latency': args.llm_latency,
+            'search_latency': args.search_latency,
+            'portal_latency': args.portal_latency,
+            'real_rate_limits': args.real_rate_limits,
+            'seed': args.seed,
+        },
+        'summary': {
+            'turns': len(turns),
+            'ok': len(ok),
+            'errors': len(turns) - len(ok),
+            'error_kinds': errors,
+            'elapsed_s': round(elapsed, 3),
+            'turns_per_s': round(len(ok) / elapsed, 2) if elapsed else 0.0,
+            'latency_ms': stats(latencies),
+            'queries_per_turn': stats(queries),
+            'worker_queries_per_turn': stats(worker_queries),
+            'http_requests_per_turn': round(statistics.fmean(t['requests'] for t in turns), 2) if turns else 0.0,
+            'rss_peak_mb_max': max((w['rss_peak_mb'] or 0 for w in workers), default=0),
+            'fake_calls': fake_calls,
+        },
+        'workers': [
+            {k: v for k, v in w.items() if k not in ('turns', 'worker_queries')}
+            | {'turns': len(w['turns']), 'errors': sum(1 for t in w['turns'] if t['error'])}
+            for w in workers
+        ],
+    }
+
+
+# Métricas comparadas con --compare: (ruta en summary, True si más alto es peor)
+COMPARED_METRICS = [
+    (('latency_ms', 'p50'), True),
+    (('latency_ms', 'p95'), True),
+    (('latency_ms', 'p99'), True),
+    (('turns_per_s',), False),
+    (('queries_per_turn', 'mean'), True),
+    (('worker_queries_per_turn', 'mean'), True),
+    (('rss_peak_mb_max',), True),
+    (('errors',), True),
+]
+
+
+def compare(result: dict, baseline: dict, tolerance: float):
+    """Devuelve [(métrica, base, actual, variación %, empeora)] frente al resultado base."""
+    rows = []
+    for path, higher_is_worse in COMPARED_METRICS:
+        base, current = baseline['summary'], result['summary']
+        for key in path:
+            base, current = (base or {}).get(key), (current or {}).get(key)
+        if base is None or current is None:
+            continue
+        change = ((current - base) / base * 100) if base else (0.0 if current == base else float('inf'))
+        worse = change > tolerance if higher_is_worse else change < -tolerance
+        rows.append(('.'.join(path), base, current, change, worse))
+    return rows
+
+
+def print_report(result: dict):
+    s = result['summary']
+    c = result['config']
+    print(f"{c['users']} usuarios x {c['turns_per_user']} turnos, {c['workers']} subprocesos, "
+          f"modo {c['mode']}, {result['engine']}")
+    print(f"LLM {c['llm_latency']} | búsqueda {c['search_latency']} | portales {c['portal_latency']}")
+    print()
+    print(f"turnos: {s['ok']}/{s['turns']} correctos en {s['elapsed_s']} s -> {s['turns_per_s']} turnos/s")
+    lat = s['latency_ms']
+    print(f"latencia ms: p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  max {lat['max']}")
+    q = s['queries_per_turn']
+    print(f"consultas SQL por turno (peticiones): media {q['mean']}  p95 {q['p95']}  max {q['max']}")
+    if c['mode'] == 'queue':
+        wq = s['worker_queries_per_turn']
+        print(f"consultas SQL por turno (worker): media {wq['mean']}  p95 {wq['p95']}  max {wq['max']}")
+    print(f"llamadas a los dobles: {s['fake_calls']}")
+    if s['error_kinds']:
+        print(f"errores: {s['error_kinds']}")
+    print()
+    print(f"{'subproceso':>10} {'usuarios':>8} {'turnos':>7} {'errores':>8} {'RSS ini MB':>11} {'RSS pico MB':>12}")
+    for w in result['workers']:
+        print(f"{w['pid']:>10} {w['users']:>8} {w['turns']:>7} {w['errors']:>8} "
+              f"{str(w['rss_start_mb']):>11} {str(w['rss_peak_mb']):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=8, help='Usuarios simulados concurrentes')
+    parser.add_argument('--workers', type=int, default=2, help='Subprocesos entre los que se reparten')
+    parser.add_argument('--turns', type=int, default=5, help='Mensajes que envía cada usuario')
+    parser.add_argument('--mode', choices=['inline', 'queue'], default='inline', help='CHAT_TURN_MODE')
+    parser.add_argument('--turn-workers', type=int, default=4,
+                        help='Hilos de worker de turnos por subproceso (modo queue)')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Segundos entre mensajes de un usuario')
+    parser.add_argument('--poll-interval', type=float, default=0.2, help='Segundos entre consultas de estado')
+    parser.add_argument('--turn-timeout', type=float, default=300, help='Segundos máximos por turno')
+    parser.add_argument('--llm-latency', default='lognormal:0.6,0.4', help='Latencia de cada llamada al LLM')
+    parser.add_argument('--search-latency', default='uniform:0.1,0.3', help='Latencia de Google Custom Search')
+    parser.add_argument('--portal-latency', default='lognormal:0.3,0.6', help='Latencia de las páginas de portal')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla de las latencias')
+    parser.add_argument('--real-rate-limits', action='store_true',
+                        help='Mantiene los límites de las APIs externas (por defecto se levantan)')
+    parser.add_argument('--output', help='Guarda el resultado en este fichero JSON')
+    parser.add_argument('--compare', help='Resultado JSON anterior con el que comparar')
+    parser.add_argument('--tolerance', type=float, default=10.0, help='Empeoramiento admitido en %% (--compare)')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--worker-index', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--sessions', default='', help=argparse.SUPPRESS)
+    parser.add_argument('--start-at', type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    args.workers = max(1, min(args.workers, args.users))
+    result = run_load(args)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(result, fh, indent=2, ensure_ascii=False)
+
+    rows = []
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        rows = compare(result, baseline, args.tolerance)
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_report(result)
+        if rows:
+            print()
+            print(f"comparación con {args.compare} (tolerancia {args.tolerance:g}%)")
+            if baseline['config'] != result['config']:
+                print("aviso: la configuración de la prueba no coincide con la del resultado base")
+            print(f"{'métrica':<32} {'base':>10} {'actual':>10} {'cambio':>9}")
+            for name, base, current, change, worse in rows:
+                print(f"{name:<32} {base:>10} {current:>10} {change:>+8.1f}% {'EMPEORA' if worse else ''}")
+
+    if any(worse for *_, worse in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark de tokens de entrada del recorrido secuencial de BrowseWebpageTool.
+
+Recorre las páginas de benchmarks/pages/ (o sintéticas) fragmento a fragmento con un
+LLM simulado que responde 'NO' hasta el último fragmento, y suma los tokens de entrada
+enviados con cada modo de historial ('full' = comportamiento anterior, 'window', 'summary').
+
+Uso:
+    python benchmarks/bench_extraction_tokens.py
+    python benchmarks/bench_extraction_tokens.py --max-chars 50000 --chunk-size 1250 --budget 1200
+    python benchmarks/bench_extraction_tokens.py --json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_ia_core.tools.agent_tools.browse_webpage import BrowseWebpageTool
+from agent_ia_core.tools.core.html_extractors import LxmlExtractor
+from apps.core.token_pricing import estimate_tokens
+from benchmarks.saved_pages import PAGES_DIR, load_pages
+
+HISTORY_MODES = ('full', 'window', 'summary')
+
+
+class FakeLLM:
+    """LLM simulado: 'NO' (con una nota breve en modo summary) hasta el fragmento objetivo."""
+
+    def __init__(self, provider, answer_at_end=True):
+        self.provider = provider
+        self.answer_at_end = answer_at_end
+        self.calls = 0
+        self.input_tokens = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        self.input_tokens += sum(estimate_tokens(m['content'], self.provider) for m in messages)
+
+        current, total = map(int, re.search(r'Fragmento (\d+)/(\d+)', messages[-1]['content']).groups())
+        if self.answer_at_end and current == total:
+            content = 'El salario es de 35.000 € brutos anuales.'
+        elif "'NO | '" in messages[-1]['content']:
+            content = f'NO | Fragmento {current}: datos de la empresa, sin salario'
+        else:
+            content = 'NO'
+        return type('Response', (), {'content': content})()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de tokens de la extracción progresiva')
+    parser.add_argument('--pages-dir', default=str(PAGES_DIR), help='Carpeta con páginas .html guardadas')
+    parser.add_argument('--max-chars', type=int, default=50000, help='Caracteres procesados por página')
+    parser.add_argument('--chunk-size', type=int, default=1250, help='Tamaño de fragmento')
+    parser.add_argument('--budget', type=int, default=1200, help='Presupuesto de contexto (tokens) de window/summary')
+    parser.add_argument('--provider', default='google', help="Estimación de tokens ('openai' usa tiktoken)")
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    args = parser.parse_args()
+
+    extractor = LxmlExtractor()
+    pages = load_pages(args.pages_dir)
+
+    totals = {mode: {'input_tokens': 0, 'llm_calls': 0} for mode in HISTORY_MODES}
+    per_page = []
+
+    for page_name, html in pages:
+        _, text, _ = extractor.extract(html, max_chars=args.max_chars)
+        row = {'page': page_name, 'chars': min(len(text), args.max_chars)}
+
+        for mode in HISTORY_MODES:
+            tool = BrowseWebpageTool(
+                extractor=extractor,
+                extraction_mode='sequential', history_mode=mode, history_budget=args.budget
+            )
+            llm = FakeLLM(args.provider)
+            tool._progressive_extraction(
+                url=page_name, title=page_name, full_text=text, user_query='¿Cuál es el salario?',
+                max_chars=args.max_chars, chunk_size=args.chunk_size, llm=llm, mode='sequential'
+            )
+            row[mode] = llm.input_tokens
+            totals[mode]['input_tokens'] += llm.input_tokens
+            totals[mode]['llm_calls'] += llm.calls
+
+        per_page.append(row)
+
+    full_tokens = totals['full']['input_tokens'] or 1
+    summary = {
+        'pages': len(pages),
+        'max_chars': args.max_chars,
+        'chunk_size': args.chunk_size,
+        'budget_tokens': args.budget,
+        'totals': totals,
+        'reduction_vs_full': {
+            mode: f"{(1 - totals[mode]['input_tokens'] / full_tokens) * 100:.1f}%"
+            for mode in HISTORY_MODES if mode != 'full'
+        },
+        'per_page': per_page,
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return
+
+    print('\n' + '=' * 70)
+    print(f"  Tokens de entrada: {len(pages)} páginas, max_chars={args.max_chars}, "
+          f"chunk_size={args.chunk_size}, presupuesto={args.budget}")
+    print('=' * 70)
+    print(f"  {'Modo':<10}{'tokens entrada':>18}{'llamadas':>12}{'reducción':>14}")
+    for mode in HISTORY_MODES:
+        reduction = summary['reduction_vs_full'].get(mode, '-')
+        print(f"  {mode:<10}{totals[mode]['input_tokens']:>18}{totals[mode]['llm_calls']:>12}{reduction:>14}")
+    print('=' * 70 + '\n')
+
+
+if __name__ == '__main__':
+    main()
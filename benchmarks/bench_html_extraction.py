@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark de los extractores HTML → texto de BrowseWebpageTool.
+
+Compara el extractor lxml (con y sin corte en max_chars) con el de BeautifulSoup
+sobre las páginas de benchmarks/pages/ (o sintéticas si la carpeta está vacía).
+
+Uso:
+    python benchmarks/bench_html_extraction.py
+    python benchmarks/bench_html_extraction.py --max-chars 10000 --repeat 10
+    python benchmarks/bench_html_extraction.py --pages-dir /ruta/a/paginas --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_ia_core.tools.core.html_extractors import BeautifulSoupExtractor, LxmlExtractor
+from benchmarks.saved_pages import PAGES_DIR, load_pages
+
+
+def time_extractor(extractor, html, max_chars, repeat):
+    """Devuelve (lista de tiempos en ms, último resultado)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extractor.extract(html, max_chars=max_chars)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de extractores HTML')
+    parser.add_argument('--pages-dir', default=str(PAGES_DIR), help='Carpeta con páginas .html guardadas')
+    parser.add_argument('--max-chars', type=int, default=10000, help='Límite de caracteres (como BrowseWebpageTool)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por página y extractor')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_dir)
+    backends = [
+        ('bs4', BeautifulSoupExtractor(), None),
+        ('lxml', LxmlExtractor(), None),
+        ('lxml+max_chars', LxmlExtractor(), args.max_chars),
+    ]
+
+    timings = {name: [] for name, _, _ in backends}
+    mismatches = []
+
+    for page_name, html in pages:
+        texts = {}
+        for name, extractor, max_chars in backends:
+            page_timings, (_, text, _) = time_extractor(extractor, html, max_chars, args.repeat)
+            timings[name].append(statistics.median(page_timings))
+            texts[name] = text
+
+        # Las tres variantes deben entregar el mismo texto a la tool (primeros max_chars)
+        reference = texts['bs4'][:args.max_chars]
+        for name in ('lxml', 'lxml+max_chars'):
+            if texts[name][:args.max_chars] != reference:
+                mismatches.append({'page': page_name, 'backend': name})
+
+    summary = {
+        'pages': len(pages),
+        'total_kb': round(sum(len(html) for _, html in pages) / 1024, 1),
+        'max_chars': args.max_chars,
+        'ms_per_page': {
+            name: {
+                'mean': round(statistics.mean(values), 2),
+                'p50': round(statistics.median(values), 2),
+                'max': round(max(values), 2),
+            }
+            for name, values in timings.items()
+        },
+        'speedup_vs_bs4': {
+            name: round(statistics.mean(timings['bs4']) / statistics.mean(values), 1)
+            for name, values in timings.items() if name != 'bs4'
+        },
+        'mismatches': mismatches,
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return
+
+    print('\n' + '=' * 70)
+    print(f"  Extracción HTML: {summary['pages']} páginas, {summary['total_kb']} KB, max_chars={args.max_chars}")
+    print('=' * 70)
+    print(f"  {'Backend':<18}{'media ms':>12}{'p50 ms':>12}{'max ms':>12}{'speedup':>12}")
+    for name, stats in summary['ms_per_page'].items():
+        speedup = summary['speedup_vs_bs4'].get(name, 1.0)
+        print(f"  {name:<18}{stats['mean']:>12}{stats['p50']:>12}{stats['max']:>12}{speedup:>11}x")
+    print('=' * 70)
+    if mismatches:
+        print(f"  AVISO: {len(mismatches)} diferencias de texto respecto a bs4: {mismatches}")
+    else:
+        print('  Texto idéntico en todos los backends (primeros max_chars)')
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark de los perfiles de carga de browse_interactive.
+
+Sirve en local páginas de prueba con imágenes, fuentes, vídeo y scripts de tracking
+(los dominios de tracking se resuelven al servidor local con --host-resolver-rules)
+y mide, por perfil, el tiempo hasta que la página está lista y los bytes servidos.
+
+Requiere: pip install playwright && playwright install chromium
+
+Uso:
+    python benchmarks/bench_interactive_loading.py
+    python benchmarks/bench_interactive_loading.py --pages 5 --repeat 3 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_ia_core.tools.core.browser_pool import BrowserPool
+from agent_ia_core.tools.core.loading_profiles import (
+    LOADING_PROFILES, apply_loading_profile, get_loading_profile, wait_until_ready
+)
+
+TRACKER_HOSTS = ['www.google-analytics.com', 'www.googletagmanager.com', 'static.hotjar.com']
+
+# Tamaño y latencia simulados de cada tipo de recurso
+RESOURCES = {
+    '/img/': ('image/jpeg', 40 * 1024, 0.03),
+    '/font/': ('font/woff2', 60 * 1024, 0.05),
+    '/media/': ('video/mp4', 1024 * 1024, 0.2),
+    '/css/': ('text/css', 20 * 1024, 0.02),
+}
+
+
+def fixture_page(index: int) -> bytes:
+    images = ''.join(f'<img src="/img/{index}-{i}.jpg" width="300" height="200">' for i in range(25))
+    trackers = ''.join(f'<script async src="http://{host}/t.js?p={index}"></script>' for host in TRACKER_HOSTS)
+    paragraphs = ''.join(f'<p>Descripción de la oferta {index}, párrafo {i}. Requisitos y condiciones.</p>' for i in range(40))
+    return (
+        f'<!DOCTYPE html><html><head><title>Oferta {index}</title>'
+        f'<link rel="stylesheet" href="/css/site.css">'
+        f'<style>@font-face {{ font-family: F; src: url("/font/f{index}.woff2"); }} body {{ font-family: F; }}</style>'
+        f'{trackers}</head><body><header>Portal</header>'
+        f'<main><h1>Oferta {index}: Desarrollador Python</h1>{paragraphs}</main>'
+        f'<section>{images}</section><video src="/media/{index}.mp4" preload="auto"></video>'
+        f'</body></html>'
+    ).encode('utf-8')
+
+
+class FixtureServer:
+    """Servidor local que cuenta los bytes servidos."""
+
+    def __init__(self):
+        self.bytes_served = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                host = (self.headers.get('Host') or '').split(':')[0]
+                if host in TRACKER_HOSTS:
+                    # Tracker lento que envía unos cuantos beacons tras cargar (retrasa networkidle
+                    # sin impedirlo: un sondeo sin fin haría que 'full' agotase siempre el timeout)
+                    time.sleep(0.5)
+                    body = (
+                        b"var sent = 0; var beacon = setInterval(function(){"
+                        b"fetch('/beacon?' + Date.now()); if (++sent >= 3) clearInterval(beacon);}, 300);"
+                    )
+                    content_type = 'application/javascript'
+                elif self.path.startswith('/page/'):
+                    body = fixture_page(int(self.path.split('/')[2]))
+                    content_type = 'text/html; charset=utf-8'
+                elif self.path.startswith('/beacon'):
+                    time.sleep(0.2)
+                    body = b'{}'
+                    content_type = 'application/json'
+                else:
+                    prefix = next((p for p in RESOURCES if self.path.startswith(p)), None)
+                    if prefix is None:
+                        self.send_error(404)
+                        return
+                    content_type, size, delay = RESOURCES[prefix]
+                    time.sleep(delay)
+                    body = b'\0' * size
+
+                with server.lock:
+                    server.bytes_served += len(body)
+                    server.requests += 1
+
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.httpd.server_port
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def reset(self):
+        with self.lock:
+            served, requests = self.bytes_served, self.requests
+            self.bytes_served = 0
+            self.requests = 0
+        return served, requests
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+async def load_page(pool, profile, url, timeout):
+    """Carga una página con el perfil y devuelve (segundos, peticiones bloqueadas)."""
+    async with pool.page(viewport=profile['viewport'], locale='es-ES') as page:
+        stats = await apply_loading_profile(page, profile)
+        start = time.perf_counter()
+        await page.goto(url, wait_until=profile['wait_until'], timeout=timeout)
+        await wait_until_ready(page, profile, timeout)
+        return time.perf_counter() - start, stats['blocked']
+
+
+def _reduction(value, baseline):
+    if value is None or not baseline:
+        return 'n/a'
+    return f"{(1 - value / baseline) * 100:.1f}%"
+
+
+def _cell(value):
+    return '-' if value is None else value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de perfiles de carga de browse_interactive')
+    parser.add_argument('--pages', type=int, default=5, help='Páginas de prueba distintas')
+    parser.add_argument('--repeat', type=int, default=2, help='Repeticiones por página y perfil')
+    parser.add_argument('--timeout', type=int, default=30000, help='Timeout por página (ms)')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    args = parser.parse_args()
+
+    try:
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    except ImportError:
+        print('Playwright no está instalado. Ejecuta: pip install playwright && playwright install chromium')
+        sys.exit(1)
+
+    server = FixtureServer()
+    rules = ', '.join(f'MAP {host} 127.0.0.1:{server.port}' for host in TRACKER_HOSTS)
+    pool = BrowserPool(size=1, max_pages=1, launch_options={
+        'headless': True,
+        'args': [f'--host-resolver-rules={rules}'],
+    })
+
+    results = {}
+    try:
+        # Calentar el navegador para no medir su arranque
+        try:
+            pool.run(load_page(pool, get_loading_profile('minimal'), f'http://127.0.0.1:{server.port}/page/0', args.timeout))
+        except PlaywrightTimeoutError:
+            print('Aviso: timeout en la carga de calentamiento')
+        server.reset()
+
+        for name in LOADING_PROFILES:
+            profile = get_loading_profile(name)
+            times, served, requests, blocked = [], [], [], []
+            timeouts = 0
+            for index in range(args.pages):
+                for _ in range(args.repeat):
+                    url = f'http://127.0.0.1:{server.port}/page/{index}'
+                    try:
+                        elapsed, blocked_requests = pool.run(load_page(pool, profile, url, args.timeout))
+                    except PlaywrightTimeoutError:
+                        # Un timeout no invalida el resto de la comparación: se cuenta aparte
+                        timeouts += 1
+                        print(f'Aviso: timeout cargando {url} con el perfil {name}')
+                        time.sleep(0.3)
+                        server.reset()
+                        continue
+                    time.sleep(0.3)  # dejar terminar las descargas en vuelo antes de contar
+                    page_bytes, page_requests = server.reset()
+                    times.append(elapsed * 1000)
+                    served.append(page_bytes)
+                    requests.append(page_requests)
+                    blocked.append(blocked_requests)
+
+            results[name] = {
+                'load_ms_p50': round(statistics.median(times), 1) if times else None,
+                'load_ms_mean': round(statistics.mean(times), 1) if times else None,
+                'kb_per_page': round(statistics.mean(served) / 1024, 1) if served else None,
+                'requests_per_page': round(statistics.mean(requests), 1) if requests else None,
+                'blocked_per_page': round(statistics.mean(blocked), 1) if blocked else None,
+                'timeouts': timeouts,
+            }
+    finally:
+        pool.close()
+        server.close()
+
+    full = results['full']
+    for name, row in results.items():
+        row['load_time_reduction'] = _reduction(row['load_ms_mean'], full['load_ms_mean'])
+        row['bytes_reduction'] = _reduction(row['kb_per_page'], full['kb_per_page'])
+
+    if args.json:
+        print(json.dumps({'pages': args.pages, 'repeat': args.repeat, 'profiles': results}, indent=2))
+        return
+
+    print('\n' + '=' * 84)
+    print(f"  Perfiles de carga: {args.pages} páginas x {args.repeat} repeticiones")
+    print('=' * 84)
+    print(f"  {'Perfil':<10}{'p50 ms':>10}{'media ms':>10}{'KB/pág':>10}{'peticiones':>12}"
+          f"{'-tiempo':>10}{'-bytes':>10}{'timeouts':>10}")
+    for name, row in results.items():
+        print(f"  {name:<10}{_cell(row['load_ms_p50']):>10}{_cell(row['load_ms_mean']):>10}"
+              f"{_cell(row['kb_per_page']):>10}{_cell(row['requests_per_page']):>12}"
+              f"{row['load_time_reduction']:>10}{row['bytes_reduction']:>10}{row['timeouts']:>10}")
+    print('=' * 84 + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+Dobles locales y deterministas de los servicios externos del chat, para pruebas de carga.
+
+- FakeChatModel: sustituye al LLM (OpenAI/Gemini/Ollama). Implementa bind_tools() e
+  invoke() como los chat models de LangChain: pide search_jobs o recommend_companies
+  según el mensaje del usuario, responde a los prompts internos (ranking, análisis JSON
+  de ofertas, revisión, resumen de memoria) con el formato que esperan y redacta la
+  respuesta final a partir de los resultados de las tools.
+- FakeCustomSearch: sustituye a googleapiclient.discovery.build("customsearch", ...).
+  Devuelve resultados estables para cada consulta con URLs de oferta de cada portal.
+- FakePortalAdapter: adaptador de requests que sirve las páginas de saved_pages para
+  cualquier URL, montado en la Session del PageFetcher compartido (pasan por el
+  limitador, el circuit breaker y el hedging reales).
+
+Cada doble espera un tiempo sacado de una LatencyModel ("fixed:0.4", "uniform:0.1,0.6",
+"normal:0.8,0.2", "lognormal:0.8,0.5" o "0"). El contenido depende solo de la entrada;
+las esperas, de la semilla.
+"""
+
+from typing import Dict, List, Optional
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+
+from benchmarks.saved_pages import WORDS, load_pages
+
+COMPANIES = [
+    'Acme Software', 'Datalia', 'Nubetec', 'Grupo Levante', 'Innova Sistemas', 'Pixel Factory',
+    'Bitwise Labs', 'Mediterránea Digital', 'Orbital Data', 'Kronos IT', 'Lumen Analytics', 'Verdia',
+]
+
+ROLES = [
+    'Desarrollador Python', 'Backend Engineer', 'Desarrollador Django', 'Data Engineer',
+    'Programador Full Stack', 'DevOps Engineer', 'Ingeniero de Software', 'Analista Programador',
+]
+
+
+def _digest(*parts) -> int:
+    """Entero estable (entre procesos, a diferencia de hash()) para un conjunto de valores."""
+    return int(hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:12], 16)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def _role(message) -> str:
+    """Rol de un mensaje de LangChain ('human', 'ai', 'tool'...) o de un dict {'role': ...}."""
+    if isinstance(message, dict):
+        return {'user': 'human', 'assistant': 'ai'}.get(message.get('role'), message.get('role', ''))
+    return getattr(message, 'type', '')
+
+
+def _content(message) -> str:
+    if isinstance(message, dict):
+        return message.get('content') or ''
+    return getattr(message, 'content', '') or ''
+
+
+class LatencyModel:
+    """Distribución de latencias configurable desde la línea de comandos."""
+
+    KINDS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, spec: str = '0', seed: int = 0):
+        self.spec = spec
+        kind, _, params = spec.partition(':')
+        if kind not in self.KINDS:
+            # Un número solo equivale a fixed:<número>
+            kind, params = 'fixed', spec
+        values = [float(v) for v in params.split(',') if v.strip()] or [0.0]
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}[kind]
+        if len(values) != expected:
+            raise ValueError(f"Latencia '{spec}': {kind} necesita {expected} valor(es)")
+        self.kind = kind
+        self.values = values
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        """Segundos de espera (nunca negativos)."""
+        a = self.values[0]
+        b = self.values[1] if len(self.values) > 1 else 0.0
+        with self._lock:
+            if self.kind == 'fixed':
+                value = a
+            elif self.kind == 'uniform':
+                value = self._rng.uniform(a, b)
+            elif self.kind == 'normal':
+                value = self._rng.gauss(a, b)
+            else:
+                # lognormal:<mediana>,<sigma>
+                value = a * self._rng.lognormvariate(0.0, b) if a > 0 else 0.0
+        return max(0.0, value)
+
+    def wait(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+    def __repr__(self):
+        return f"LatencyModel({self.spec!r})"
+
+
+class FakeStats:
+    """Contadores de llamadas a los dobles (compartidos por los hilos del proceso)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def incr(self, name: str):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+# ----------------------------------------------------------------------
+# LLM
+# ----------------------------------------------------------------------
+class FakeChatModel:
+    """LLM determinista con la interfaz que usan el agente, las tools y el revisor."""
+
+    def __init__(self, latency: LatencyModel, stats: Optional[FakeStats] = None, tools: Optional[List] = None):
+        self.latency = latency
+        self.stats = stats or FakeStats()
+        self.tools = tools or []
+
+    def bind_tools(self, tools, **kwargs):
+        return FakeChatModel(self.latency, self.stats, tools=tools)
+
+    def invoke(self, messages, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        self.latency.wait()
+        if isinstance(messages, str):
+            messages = [{'role': 'user', 'content': messages}]
+
+        if self.tools:
+            self.stats.incr('llm_tool_calls')
+            tool_call = self._next_tool_call(messages)
+            if tool_call:
+                return AIMessage(content='', tool_calls=[tool_call])
+            return AIMessage(content=self._final_answer(messages))
+
+        self.stats.incr('llm_completions')
+        return AIMessage(content=self._completion(_content(messages[-1]) if messages else ''))
+
+    def _tool_names(self) -> List[str]:
+        names = []
+        for tool in self.tools:
+            function = tool.get('function', tool) if isinstance(tool, dict) else {}
+            if function.get('name'):
+                names.append(function['name'])
+        return names
+
+    def _next_tool_call(self, messages) -> Optional[dict]:
+        """Pide una tool si el último mensaje del usuario aún no tiene resultados."""
+        last_user = None
+        for index, message in enumerate(messages):
+            if _role(message) == 'human':
+                last_user = index
+        if last_user is None:
+            return None
+        if any(_role(m) == 'tool' for m in messages[last_user + 1:]):
+            return None
+
+        text = _content(messages[last_user]).lower()
+        names = self._tool_names()
+        call_id = f"call_{_digest(text, len(messages)):x}"
+        if 'busca' in text and 'search_jobs' in names:
+            query = re.sub(r'^.*?ofertas de\s+', '', text).split(' en ')[0].strip(' ?.¿!') or 'python'
+            return {'name': 'search_jobs', 'args': {'query': query}, 'id': call_id}
+        if 'empresa' in text and 'recommend_companies' in names:
+            return {'name': 'recommend_companies', 'args': {}, 'id': call_id}
+        return None
+
+    def _final_answer(self, messages) -> str:
+        question = next(
+            (_content(m) for m in reversed(messages) if _role(m) == 'human'), ''
+        )
+        jobs = []
+        for message in messages:
+            if _role(message) != 'tool':
+                continue
+            try:
+                payload = json.loads(_content(message))
+            except (TypeError, ValueError):
+                continue
+            data = (payload.get('result') or payload).get('data') or {}
+            jobs.extend(data.get('jobs') or data.get('companies') or [])
+
+        rng = random.Random(_digest(question, len(jobs)))
+        lines = [f"Sobre tu consulta «{question[:80]}»:", '']
+        for job in jobs[:10]:
+            title = job.get('title') or job.get('name') or 'Oferta'
+            url = job.get('url', '')
+            lines.append(f"- **{title}**" + (f" — [ver oferta]({url})" if url else ''))
+            lines.append(f"  {' '.join(rng.choice(WORDS) for _ in range(18)).capitalize()}.")
+        if not jobs:
+            lines.extend(' '.join(rng.choice(WORDS) for _ in range(25)).capitalize() + '.' for _ in range(3))
+        lines.extend(['', '¿Quieres que profundice en alguna de ellas?'])
+        return '\n'.join(lines)
+
+    def _completion(self, prompt: str) -> str:
+        """Respuestas a los prompts internos, con el formato que parsea cada llamador."""
+        rng = random.Random(_digest(prompt))
+        if 'RESUMEN ACTUAL' in prompt:
+            return '\n'.join(f"- {' '.join(rng.choice(WORDS) for _ in range(12))}" for _ in range(6))
+        if 'SELECCIÓN' in prompt:
+            count = len(re.findall(r'^\s*\d+\.', prompt, re.MULTILINE)) or 15
+            indices = list(range(1, count + 1))
+            rng.shuffle(indices)
+            return ','.join(str(i) for i in indices[:15])
+        if 'STATUS:' in prompt and 'SCORE:' in prompt:
+            return 'STATUS: APPROVED\nSCORE: 88\nFEEDBACK:\nRespuesta correcta'
+        if '"is_active"' in prompt:
+            return json.dumps({
+                'is_active': True,
+                'confidence': 'alta',
+                'reason': 'La oferta tiene botón de inscripción',
+                'job_details': {
+                    'title': rng.choice(ROLES),
+                    'company': rng.choice(COMPANIES),
+                    'location': 'Madrid',
+                    'salary': f"{rng.randint(28, 60)}.000 €",
+                    'contract_type': 'Indefinido',
+                    'requirements': ['Python', 'Django', 'PostgreSQL'],
+                    'publish_date': None,
+                },
+                'fit_analysis': ' '.join(rng.choice(WORDS) for _ in range(60)),
+            }, ensure_ascii=False)
+        return ' '.join(rng.choice(WORDS) for _ in range(80)).capitalize() + '.'
+
+
+# ----------------------------------------------------------------------
+# Google Custom Search
+# ----------------------------------------------------------------------
+class _FakeRequest:
+    def __init__(self, search: 'FakeCustomSearch', q: str, num: int):
+        self.search, self.q, self.num = search, q, num
+
+    def execute(self):
+        return self.search.results(self.q, self.num)
+
+
+class FakeCustomSearch:
+    """Servicio "customsearch v1": build(...).cse().list(q=..., cx=..., num=...).execute()."""
+
+    def __init__(self, latency: LatencyModel, stats: Optional[FakeStats] = None):
+        self.latency = latency
+        self.stats = stats or FakeStats()
+
+    def build(self, service_name, version, developerKey=None, **kwargs):
+        return self
+
+    def cse(self):
+        return self
+
+    def list(self, q='', cx=None, num=10, **kwargs):
+        return _FakeRequest(self, q, num)
+
+    def results(self, query: str, num: int) -> dict:
+        self.latency.wait()
+        self.stats.incr('search_queries')
+
+        site = re.search(r'(?<!-)site:(\S+)', query)
+        base = site.group(1).strip('/') if site else None
+        items = []
+        for i in range(max(1, min(num, 10))):
+            n = _digest(query, i)
+            title = f"{ROLES[n % len(ROLES)]} - {COMPANIES[(n >> 8) % len(COMPANIES)]}"
+            job_id = n % 10_000_000
+            if base:
+                url = f"https://www.{base}/oferta/{_slug(title)}-{job_id}"
+            else:
+                url = f"https://empresa{n % 500}.example.com/careers/{_slug(title)}-{job_id}"
+            items.append({
+                'title': title,
+                'link': url,
+                'displayLink': url.split('/')[2],
+                'snippet': f"{title}. {' '.join(WORDS[(n >> k) % len(WORDS)] for k in range(20))}",
+            })
+        return {'items': items}
+
+
+# ----------------------------------------------------------------------
+# Portales
+# ----------------------------------------------------------------------
+class FakePortalAdapter(BaseAdapter):
+    """Adaptador de requests que responde cualquier GET con una página de portal guardada."""
+
+    def __init__(self, latency: LatencyModel, stats: Optional[FakeStats] = None, pages=None):
+        super().__init__()
+        self.latency = latency
+        self.stats = stats or FakeStats()
+        self.pages = [html.encode('utf-8') for _, html in (pages or load_pages())]
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.latency.wait()
+        self.stats.incr('portal_pages')
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = request.url
+        response.request = request
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        response.encoding = 'utf-8'
+        response._content = self.pages[_digest(request.url) % len(self.pages)]
+        return response
+
+    def close(self):
+        pass
+
+
+# ----------------------------------------------------------------------
+# Instalación
+# ----------------------------------------------------------------------
+def install_fakes(llm_latency: str = '0', search_latency: str = '0', portal_latency: str = '0',
+                  seed: int = 0) -> FakeStats:
+    """
+    Sustituye en el proceso actual el LLM, Google Custom Search y la descarga de páginas
+    por los dobles locales. Debe llamarse tras django.setup() y antes de la primera petición.
+
+    Returns:
+        FakeStats con las llamadas que recibe cada doble
+    """
+    import googleapiclient.discovery
+    from agent_ia_core.agent_function_calling import FunctionCallingAgent
+    from agent_ia_core.tools.core.http_fetcher import get_shared_fetcher
+
+    stats = FakeStats()
+    llm_model = LatencyModel(llm_latency, seed)
+    search = FakeCustomSearch(LatencyModel(search_latency, seed + 1), stats)
+    adapter = FakePortalAdapter(LatencyModel(portal_latency, seed + 2), stats)
+
+    FunctionCallingAgent._create_llm = lambda agent: FakeChatModel(llm_model, stats)
+    googleapiclient.discovery.build = search.build
+
+    session = get_shared_fetcher().session
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return stats
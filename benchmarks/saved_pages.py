@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Páginas de prueba para los benchmarks de navegación web.
+
+Carga los .html guardados en benchmarks/pages/ (p.ej. guardados desde el navegador
+con "Guardar como → Solo HTML"). Si no hay ninguno, genera páginas sintéticas con la
+estructura típica de un portal de empleo: cabecera y menú enormes, scripts inline,
+listado de ofertas relacionadas y la oferta en <main>.
+"""
+
+from pathlib import Path
+from typing import List, Tuple
+import random
+
+PAGES_DIR = Path(__file__).parent / 'pages'
+
+WORDS = (
+    'desarrollador backend python django experiencia equipo proyecto cliente salario '
+    'remoto híbrido valencia madrid barcelona contrato indefinido jornada completa '
+    'requisitos conocimientos valorable inglés formación beneficios seguro médico '
+    'vacaciones flexibilidad horario empresa tecnología producto datos nube docker'
+).split()
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + '.'
+
+
+def synthetic_portal_page(seed: int, n_related: int = 300) -> str:
+    """Genera una página de oferta de ~200-400 KB con la estructura de un portal real."""
+    rng = random.Random(seed)
+
+    menu = ''.join(f'<li><a href="/categoria/{i}">{_sentence(rng, 2)}</a></li>' for i in range(200))
+    scripts = ''.join(f'<script>window.__state_{i} = {{"k": "{"x" * 2000}"}};</script>' for i in range(20))
+    related = ''.join(
+        f'<div class="card"><h3>{_sentence(rng, 4)}</h3><p>{_sentence(rng, 25)}</p>'
+        f'<span class="salary">{rng.randint(18, 70)}.000 €</span></div>'
+        for _ in range(n_related)
+    )
+    description = ''.join(f'<p>{_sentence(rng, 40)}</p>' for _ in range(30))
+    requirements = ''.join(f'<li>{_sentence(rng, 8)}</li>' for _ in range(15))
+
+    return (
+        f'<!DOCTYPE html><html><head><title>Oferta {seed} - Portal de Empleo</title>'
+        f'<style>{"body{margin:0} " * 500}</style>{scripts}</head><body>'
+        f'<header><nav><ul>{menu}</ul></nav></header>'
+        f'<main><article><h1>Oferta {seed}: {_sentence(rng, 3)}</h1>'
+        f'<div class="salary">Salario: {rng.randint(25, 60)}.000 € brutos/año</div>'
+        f'{description}<h2>Requisitos</h2><ul>{requirements}</ul></article>'
+        f'<section class="related">{related}</section></main>'
+        f'<aside>{_sentence(rng, 50)}</aside><footer>{menu}</footer></body></html>'
+    )
+
+
+def load_pages(pages_dir: Path = PAGES_DIR, synthetic: int = 5) -> List[Tuple[str, str]]:
+    """
+    Devuelve [(nombre, html)] de las páginas guardadas o, si no hay, sintéticas.
+    """
+    pages = [
+        (path.name, path.read_text(encoding='utf-8', errors='replace'))
+        for path in sorted(Path(pages_dir).glob('*.htm*'))
+    ]
+    if pages:
+        return pages
+    return [(f'synthetic_{i}.html', synthetic_portal_page(i)) for i in range(synthetic)]
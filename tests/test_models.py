@@ -4,7 +4,7 @@ Tests para los modelos de la plataforma.
 Ejecutar con: python manage.py test tests.test_models
 """
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from apps.company.models import UserProfile
 
@@ -206,6 +206,76 @@ class UserProfileModelTest(TestCase):
         profile.refresh_from_db()
         self.assertTrue(profile.cv_analyzed)
 
+    def test_ranking_positions_cache(self):
+        """Test cache de puestos del ranking ligada al cv_summary"""
+        profile = UserProfile.objects.create(
+            user=self.user,
+            full_name='Test User',
+            cv_summary='<h3>1. Desarrollador Backend</h3>'
+        )
+
+        self.assertIsNone(profile.get_ranking_positions())
+
+        profile.set_ranking_positions(['Desarrollador Backend'])
+        profile.save()
+        profile.refresh_from_db()
+        self.assertEqual(profile.get_ranking_positions(), ['Desarrollador Backend'])
+
+        # Si cambia el resumen, la cache deja de ser válida
+        profile.cv_summary = '<h3>1. Data Engineer</h3>'
+        self.assertIsNone(profile.get_ranking_positions())
+
+    @override_settings(PROFILE_SNAPSHOT_CACHE=True)
+    def test_profile_snapshot_cache(self):
+        """Test snapshot del perfil cacheado e invalidado al guardar el perfil"""
+        from apps.company.profile_cache import get_profile_snapshot
+
+        profile = UserProfile.objects.create(
+            user=self.user,
+            full_name='Test User',
+            cv_summary='<h3>1. Desarrollador Backend</h3>'
+        )
+
+        snapshot = get_profile_snapshot(self.user)
+        self.assertEqual(snapshot['profile']['summary'], '<h3>1. Desarrollador Backend</h3>')
+
+        # Segunda lectura desde la cache, sin consultas
+        with self.assertNumQueries(0):
+            self.assertEqual(get_profile_snapshot(self.user), snapshot)
+
+        profile.full_name = 'Otro Nombre'
+        profile.save()
+
+        updated = get_profile_snapshot(self.user)
+        self.assertNotEqual(updated['version'], snapshot['version'])
+        self.assertEqual(updated['profile']['full_name'], 'Otro Nombre')
+
+    @override_settings(PROFILE_SNAPSHOT_CACHE=True)
+    def test_profile_snapshot_user_changes(self):
+        """Test que guardar el usuario también invalida el snapshot"""
+        from apps.company.profile_cache import get_profile_snapshot
+
+        self.assertIsNone(get_profile_snapshot(self.user)['profile'])
+
+        self.user.city = 'Valencia'
+        self.user.save()
+        self.assertEqual(get_profile_snapshot(self.user)['user']['city'], 'Valencia')
+
+        UserProfile.objects.create(user=self.user, full_name='Test User')
+        self.assertEqual(get_profile_snapshot(self.user)['profile']['full_name'], 'Test User')
+
+    @override_settings(PROFILE_SNAPSHOT_CACHE=False)
+    def test_profile_snapshot_without_shared_cache(self):
+        """Test que sin cache compartida el snapshot se lee siempre de la base de datos"""
+        from apps.company.profile_cache import get_profile_snapshot
+
+        UserProfile.objects.create(user=self.user, full_name='Test User')
+        self.assertIsNone(get_profile_snapshot(self.user)['version'])
+
+        # Un cambio hecho sin señales (otro proceso, update()) se ve en la siguiente lectura
+        UserProfile.objects.filter(user=self.user).update(full_name='Otro Nombre')
+        self.assertEqual(get_profile_snapshot(self.user)['profile']['full_name'], 'Otro Nombre')
+
 
 class UserModelTest(TestCase):
     """Tests para el modelo User personalizado"""
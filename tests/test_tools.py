@@ -5,6 +5,7 @@ Ejecutar con: python manage.py test tests.test_tools
 """
 
 import json
+import shutil
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from unittest.mock import Mock, patch, MagicMock
@@ -301,3 +302,1489 @@ class ToolRegistryTest(TestCase):
             self.assertIn('name', schema)
             self.assertIn('description', schema)
             self.assertIn('parameters', schema)
+
+
+class SearchJobsByRankingToolTest(TestCase):
+    """Tests para la búsqueda paralela por ranking de puestos"""
+
+    def _make_web_search(self):
+        """Web search falso: devuelve 5 ofertas individuales por consulta"""
+        def fake_search(query, limit=5):
+            position = query.split('"')[1]
+            return {
+                'success': True,
+                'data': {
+                    'results': [
+                        {
+                            'title': f'{position} {i}',
+                            'snippet': f'Oferta {i} de {position}',
+                            'url': f'https://www.linkedin.com/jobs/view/{abs(hash((query, i)))}'
+                        }
+                        for i in range(5)
+                    ]
+                }
+            }
+
+        web_search = Mock()
+        web_search.run.side_effect = fake_search
+        return web_search
+
+    def test_results_keep_ranking_order(self):
+        """Test que los resultados vuelven en el orden del ranking"""
+        from agent_ia_core.tools.agent_tools.search_jobs import SearchJobsByRankingTool
+
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(content='{"1": [2, 1], "2": [3], "3": [1, 4]}')
+
+        positions = ['Data Scientist', 'Backend Developer', 'ML Engineer']
+        tool = SearchJobsByRankingTool(llm=mock_llm, web_search_tool=self._make_web_search(), max_workers=3)
+
+        with patch.object(tool, '_extract_ranking_positions', return_value=positions):
+            result = tool.run(location='Madrid', top_n=2)
+
+        self.assertTrue(result['success'])
+        self.assertEqual([r['position'] for r in result['data']['ranking_jobs']], positions)
+        for position_result in result['data']['ranking_jobs']:
+            self.assertEqual(len(position_result['jobs']), 2)
+            self.assertNotIn('candidates', position_result)
+
+    def test_batched_selection_uses_single_llm_call(self):
+        """Test que la selección de todos los puestos se hace en una sola llamada"""
+        from agent_ia_core.tools.agent_tools.search_jobs import SearchJobsByRankingTool
+
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(content='{"1": [2, 1], "2": [3, 5]}')
+
+        tool = SearchJobsByRankingTool(llm=mock_llm, web_search_tool=self._make_web_search())
+
+        with patch.object(tool, '_extract_ranking_positions', return_value=['Data Scientist', 'ML Engineer']):
+            result = tool.run(top_n=2)
+
+        self.assertEqual(mock_llm.invoke.call_count, 1)
+        first = result['data']['ranking_jobs'][0]['jobs']
+        self.assertEqual([job['title'] for job in first], ['Data Scientist 1', 'Data Scientist 0'])
+
+    def test_invalid_batch_response_falls_back_per_position(self):
+        """Test que una respuesta agrupada inválida recurre a la selección por puesto"""
+        from agent_ia_core.tools.agent_tools.search_jobs import SearchJobsByRankingTool
+
+        mock_llm = Mock()
+        mock_llm.invoke.side_effect = [Mock(content='no sé'), Mock(content='1,2'), Mock(content='3,4')]
+
+        tool = SearchJobsByRankingTool(llm=mock_llm, web_search_tool=self._make_web_search())
+
+        with patch.object(tool, '_extract_ranking_positions', return_value=['Data Scientist', 'ML Engineer']):
+            result = tool.run(top_n=2)
+
+        self.assertEqual(mock_llm.invoke.call_count, 3)
+        self.assertEqual(result['data']['total_selected'], 4)
+
+    def test_ranking_positions_read_from_profile_cache(self):
+        """Test que los puestos cacheados en el perfil se leen sin llamar al LLM"""
+        from agent_ia_core.tools.agent_tools.search_jobs import SearchJobsByRankingTool
+        from apps.company.models import UserProfile
+
+        user = User.objects.create_user(username='ranking', email='ranking@example.com', password='testpass123')
+        profile = UserProfile.objects.create(user=user, full_name='Ranking User', cv_summary='<p>Resumen</p>')
+        profile.set_ranking_positions(['Data Scientist', 'ML Engineer'])
+        profile.save()
+
+        mock_llm = Mock()
+        tool = SearchJobsByRankingTool(llm=mock_llm, web_search_tool=Mock(), user=user)
+
+        self.assertEqual(tool._extract_ranking_positions(), ['Data Scientist', 'ML Engineer'])
+        mock_llm.invoke.assert_not_called()
+
+    def test_ranking_positions_reextracted_when_summary_changes(self):
+        """Test que los puestos se vuelven a extraer y cachear si cambia el cv_summary"""
+        from agent_ia_core.tools.agent_tools.search_jobs import SearchJobsByRankingTool
+        from apps.company.models import UserProfile
+
+        user = User.objects.create_user(username='ranking', email='ranking@example.com', password='testpass123')
+        profile = UserProfile.objects.create(user=user, full_name='Ranking User', cv_summary='<p>Antiguo</p>')
+        profile.set_ranking_positions(['Puesto antiguo'])
+        profile.save()
+
+        profile.cv_summary = '<h3>1. Desarrollador Backend</h3><h3>2. Ingeniero DevOps</h3>'
+        profile.save()
+
+        mock_llm = Mock()
+        tool = SearchJobsByRankingTool(llm=mock_llm, web_search_tool=Mock(), user=user)
+
+        self.assertEqual(tool._extract_ranking_positions(), ['Desarrollador Backend', 'Ingeniero DevOps'])
+        mock_llm.invoke.assert_not_called()
+
+        profile.refresh_from_db()
+        self.assertEqual(profile.get_ranking_positions(), ['Desarrollador Backend', 'Ingeniero DevOps'])
+
+
+class PageFetcherTest(TestCase):
+    """Tests para el cliente HTTP compartido de las tools de navegación"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import threading
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = f'<html><title>{self.path}</title><body><main>Pagina {self.path}</main></body></html>'.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_get_many_keeps_order(self):
+        """Test que get_many devuelve las respuestas en el orden de las URLs"""
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+
+        fetcher = PageFetcher(max_per_host=2)
+        urls = [f'{self.base_url}/oferta/{i}' for i in range(6)]
+        responses = fetcher.get_many(urls)
+
+        self.assertEqual([r.status_code for r in responses], [200] * 6)
+        for i, response in enumerate(responses):
+            self.assertIn(f'/oferta/{i}', response.text)
+        fetcher.close()
+
+    def test_aget_many(self):
+        """Test de la variante async"""
+        import asyncio
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+
+        fetcher = PageFetcher(max_per_host=2)
+        urls = [f'{self.base_url}/async/{i}' for i in range(4)]
+
+        async def fetch_all():
+            try:
+                return await fetcher.aget_many(urls)
+            finally:
+                await fetcher.aclose()
+
+        responses = asyncio.run(fetch_all())
+        self.assertEqual([r.status_code for r in responses], [200] * 4)
+        self.assertIn('/async/3', responses[3].text)
+
+    def test_browse_tool_uses_fetcher(self):
+        """Test que BrowseWebpageTool descarga a través del fetcher compartido"""
+        from agent_ia_core.tools.agent_tools.browse_webpage import BrowseWebpageTool
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+
+        import tempfile
+        from agent_ia_core.tools.core.page_cache import PageCache
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        fetcher = PageFetcher()
+        tool = BrowseWebpageTool(fetcher=fetcher, page_cache=PageCache(path))
+
+        results = tool.run_many([f'{self.base_url}/a', f'{self.base_url}/b'])
+
+        self.assertTrue(all(r['success'] for r in results))
+        self.assertIn('Pagina /a', results[0]['data']['content'])
+        self.assertIn('Pagina /b', results[1]['data']['content'])
+        fetcher.close()
+
+
+class PageCacheTest(TestCase):
+    """Tests para la cache en disco de páginas de browse_webpage"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import threading
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        cls.requests_seen = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                cls.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+                etag = '"v1"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                body = f'<html><title>Oferta</title><body><main>Contenido {self.path}</main></body></html>'.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        import tempfile
+        from agent_ia_core.tools.agent_tools.browse_webpage import BrowseWebpageTool
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+        from agent_ia_core.tools.core.page_cache import PageCache
+
+        self.requests_seen.clear()
+        self.fetcher = PageFetcher()
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        self.cache = PageCache(path, default_max_age=3600)
+        self.tool = BrowseWebpageTool(fetcher=self.fetcher, page_cache=self.cache)
+
+    def tearDown(self):
+        self.fetcher.close()
+
+    def test_canonicalize_url(self):
+        """Test que variantes de la misma URL comparten clave"""
+        from agent_ia_core.tools.core.page_cache import canonicalize_url
+
+        self.assertEqual(
+            canonicalize_url('HTTPS://Example.com:443/oferta?b=2&a=1&utm_source=x#detalle'),
+            'https://example.com/oferta?a=1&b=2'
+        )
+
+    def test_fresh_entry_served_without_network(self):
+        """Test que una página reciente se sirve desde disco"""
+        first = self.tool.run(f'{self.base_url}/oferta/1')
+        second = self.tool.run(f'{self.base_url}/oferta/1?utm_source=google')
+
+        self.assertEqual(first['data']['cache'], 'miss')
+        self.assertEqual(second['data']['cache'], 'hit')
+        self.assertEqual(second['data']['content'], first['data']['content'])
+        self.assertEqual(len(self.requests_seen), 1)
+
+    def test_stale_entry_revalidated_with_etag(self):
+        """Test que una copia caducada se revalida con If-None-Match y un 304"""
+        self.tool.run(f'{self.base_url}/oferta/2')
+        result = self.tool.run(f'{self.base_url}/oferta/2', max_age=0)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data']['cache'], 'revalidated')
+        self.assertIn('Contenido /oferta/2', result['data']['content'])
+        self.assertEqual(self.requests_seen[-1], ('/oferta/2', '"v1"'))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['misses'], stats['revalidated']), (1, 1))
+
+    def test_lru_eviction(self):
+        """Test que al superar max_bytes se expulsan las entradas menos usadas"""
+        import os
+        import time
+
+        self.cache.set('https://example.com/a', 'A', 'x' * 500)
+        self.cache.set('https://example.com/b', 'B', 'y' * 500)
+        # 'a' usada más recientemente que 'b'
+        old = time.time() - 100
+        os.utime(self.cache._path('https://example.com/b'), (old, old))
+        os.utime(self.cache._path('https://example.com/a'), (old - 10, old - 10))
+        self.cache.get('https://example.com/a')
+
+        # Caben dos entradas: la tercera obliga a expulsar una
+        self.cache.max_bytes = self.cache._path('https://example.com/a').stat().st_size * 2 + 50
+        self.cache.set('https://example.com/c', 'C', 'z' * 500)
+
+        self.assertIsNotNone(self.cache.get('https://example.com/a'))
+        self.assertIsNone(self.cache.get('https://example.com/b'))
+        self.assertIsNotNone(self.cache.get('https://example.com/c'))
+
+    def test_eviction_scans_directory_only_when_needed(self):
+        """Test que set() no recorre el directorio en cada escritura mientras no se supera max_bytes"""
+        from pathlib import Path
+
+        original_glob = Path.glob
+        with patch.object(Path, 'glob', autospec=True, side_effect=original_glob) as glob:
+            for i in range(10):
+                self.cache.set(f'https://example.com/{i}', 'T', 'x' * 100)
+
+        self.assertEqual(glob.call_count, 1)
+
+    def test_eviction_skips_vanished_files(self):
+        """Test que un fichero borrado por otro proceso durante la expulsión no la aborta"""
+        import os
+        import time
+        from pathlib import Path
+
+        self.cache.set('https://example.com/a', 'A', 'x' * 500)
+        old = time.time() - 100
+        os.utime(self.cache._path('https://example.com/a'), (old, old))
+        self.cache.max_bytes = self.cache._path('https://example.com/a').stat().st_size + 50
+
+        original_glob = Path.glob
+        gone = self.cache.cache_dir / 'gone.json'
+        with patch.object(Path, 'glob', autospec=True,
+                          side_effect=lambda path, pattern: [gone] + list(original_glob(path, pattern))):
+            self.cache.set('https://example.com/b', 'B', 'y' * 500)
+
+        self.assertIsNone(self.cache.get('https://example.com/a'))
+        self.assertIsNotNone(self.cache.get('https://example.com/b'))
+
+
+class HtmlExtractorTest(TestCase):
+    """Tests para los backends de extracción HTML → texto"""
+
+    HTML = (
+        '<html><head><title> Oferta Backend </title><script>var x = 1;</script></head><body>'
+        '<header class="content">Cabecera</header><nav>Menu</nav>'
+        '<div class="page content"><h1>Desarrollador</h1><p>Salario:   30.000 &euro; <b>brutos</b></p>'
+        '<!-- comentario --> tras comentario <aside>lateral</aside>'
+        '<ul><li>Python</li><li>\tDjango\t</li></ul></div><footer>Pie</footer></body></html>'
+    )
+
+    def test_lxml_matches_beautifulsoup(self):
+        """Test que ambos backends extraen el mismo título y texto"""
+        from agent_ia_core.tools.core.html_extractors import BeautifulSoupExtractor, LxmlExtractor
+
+        expected = BeautifulSoupExtractor().extract(self.HTML)
+        self.assertEqual(LxmlExtractor().extract(self.HTML), expected)
+        self.assertEqual(expected[1], 'Desarrollador\nSalario: 30.000 €\nbrutos\ntras comentario\nPython\nDjango')
+
+    def test_lxml_stops_at_max_chars(self):
+        """Test que el recorrido lxml se detiene al superar max_chars"""
+        from agent_ia_core.tools.core.html_extractors import LxmlExtractor
+
+        title, text, complete = LxmlExtractor().extract(self.HTML, max_chars=20)
+
+        self.assertEqual(title, 'Oferta Backend')
+        self.assertFalse(complete)
+        self.assertEqual(text, 'Desarrollador\nSalario: 30.000 €')
+
+    def test_browse_tool_falls_back_to_beautifulsoup(self):
+        """Test que si el extractor configurado falla se usa BeautifulSoup"""
+        import tempfile
+        from agent_ia_core.tools.agent_tools.browse_webpage import BrowseWebpageTool
+        from agent_ia_core.tools.core.page_cache import PageCache
+
+        broken = Mock()
+        broken.name = 'broken'
+        broken.extract.side_effect = ValueError('parser error')
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        tool = BrowseWebpageTool(fetcher=Mock(), page_cache=PageCache(path), extractor=broken)
+
+        title, text, complete = tool._extract_text(self.HTML)
+
+        self.assertEqual(title, 'Oferta Backend')
+        self.assertIn('Salario: 30.000 €', text)
+        self.assertTrue(complete)
+
+
+class ProgressiveExtractionTest(TestCase):
+    """Tests para la selección de fragmentos por relevancia en browse_webpage"""
+
+    def setUp(self):
+        import tempfile
+        from agent_ia_core.tools.agent_tools.browse_webpage import BrowseWebpageTool
+        from agent_ia_core.tools.core.page_cache import PageCache
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        self.tool = BrowseWebpageTool(fetcher=Mock(), page_cache=PageCache(path))
+        filler = 'Texto de relleno sobre la empresa y su cultura de trabajo. '
+        self.chunks = [filler * 4 for _ in range(8)]
+        self.chunks[5] = 'El salario de la oferta es de 35.000 euros brutos anuales. ' + filler * 3
+        self.text = ''.join(chunk[:250].ljust(250) for chunk in self.chunks)
+
+    def test_rank_chunks(self):
+        """Test que BM25 prioriza el fragmento con los términos de la consulta"""
+        from agent_ia_core.tools.core.text_ranking import rank_chunks
+
+        ranked = rank_chunks('¿Cuál es el salario?', self.chunks, top_n=3)
+        self.assertEqual(ranked[0][0], 5)
+        self.assertEqual(rank_chunks('bitcoin', self.chunks), [])
+
+    def test_retrieval_single_llm_call(self):
+        """Test que en modo retrieval basta una llamada al LLM"""
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(content='35.000 euros brutos anuales')
+
+        result = self.tool._progressive_extraction(
+            url='https://example.com', title='Oferta', full_text=self.text,
+            user_query='¿Cuál es el salario?', max_chars=10000, chunk_size=250, llm=mock_llm,
+            mode='retrieval'
+        )
+
+        self.assertTrue(result['data']['found'])
+        self.assertEqual(result['data']['strategy'], 'retrieval')
+        self.assertEqual(result['data']['llm_calls'], 1)
+        self.assertEqual(result['data']['llm_calls_saved'], 7)
+        self.assertEqual(mock_llm.invoke.call_count, 1)
+        self.assertIn('Fragmento 6/8', mock_llm.invoke.call_args[0][0][1]['content'])
+
+    def test_retrieval_falls_back_to_sequential(self):
+        """Test que si el LLM no responde con los fragmentos elegidos se recorre el resto"""
+        mock_llm = Mock()
+        mock_llm.invoke.side_effect = [Mock(content='NO'), Mock(content='NO'), Mock(content='Respuesta')]
+
+        result = self.tool._progressive_extraction(
+            url='https://example.com', title='Oferta', full_text=self.text,
+            user_query='¿Cuál es el salario?', max_chars=10000, chunk_size=250, llm=mock_llm,
+            mode='retrieval'
+        )
+
+        self.assertTrue(result['data']['found'])
+        self.assertEqual(result['data']['strategy'], 'retrieval+sequential')
+        self.assertEqual(result['data']['llm_calls'], 3)
+
+    def test_sequential_mode(self):
+        """Test del recorrido secuencial clásico"""
+        mock_llm = Mock()
+        mock_llm.invoke.side_effect = [Mock(content='NO')] * 8
+
+        result = self.tool._progressive_extraction(
+            url='https://example.com', title='Oferta', full_text=self.text,
+            user_query='¿Cuál es el salario?', max_chars=10000, chunk_size=250, llm=mock_llm,
+            mode='sequential'
+        )
+
+        self.assertFalse(result['data']['found'])
+        self.assertEqual(result['data']['llm_calls'], 8)
+        self.assertEqual(result['data']['llm_calls_saved'], 0)
+
+    def _run_sequential(self, history_mode, answers, history_budget=200):
+        import tempfile
+        from agent_ia_core.tools.agent_tools.browse_webpage import BrowseWebpageTool
+        from agent_ia_core.tools.core.page_cache import PageCache
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        tool = BrowseWebpageTool(
+            fetcher=Mock(), page_cache=PageCache(path),
+            history_mode=history_mode, history_budget=history_budget
+        )
+        mock_llm = Mock()
+        mock_llm.invoke.side_effect = [Mock(content=answer) for answer in answers]
+        result = tool._progressive_extraction(
+            url='https://example.com', title='Oferta', full_text=self.text,
+            user_query='¿Cuál es el salario?', max_chars=10000, chunk_size=250, llm=mock_llm,
+            mode='sequential'
+        )
+        return result, [call[0][0] for call in mock_llm.invoke.call_args_list]
+
+    def test_full_history_grows(self):
+        """Test que el modo 'full' reenvía todos los fragmentos anteriores"""
+        _, calls = self._run_sequential('full', ['NO'] * 8)
+        self.assertEqual([len(messages) for messages in calls], [2, 4, 6, 8, 10, 12, 14, 16])
+
+    def test_window_history_is_bounded(self):
+        """Test que el modo 'window' limita el contexto al presupuesto de tokens"""
+        result, calls = self._run_sequential('window', ['NO'] * 7 + ['35.000 euros'], history_budget=300)
+
+        self.assertTrue(result['data']['found'])
+        # Cada intercambio ocupa ~130 tokens: caben dos en el presupuesto
+        self.assertEqual(max(len(messages) for messages in calls), 6)
+        self.assertIn('Fragmento 8/8', calls[-1][-1]['content'])
+
+    def test_summary_history_keeps_notes(self):
+        """Test que el modo 'summary' sustituye los fragmentos previos por notas"""
+        answers = ['NO | La empresa es de Valencia', 'NO'] + ['NO'] * 5 + ['35.000 euros']
+        result, calls = self._run_sequential('summary', answers)
+
+        self.assertTrue(result['data']['found'])
+        self.assertTrue(all(len(messages) == 2 for messages in calls))
+        self.assertIn('La empresa es de Valencia', calls[2][1]['content'])
+        self.assertNotIn('La empresa es de Valencia', calls[0][1]['content'])
+
+
+class BrowserPoolTest(TestCase):
+    """Tests para el pool de navegadores de browse_interactive (con un navegador simulado)"""
+
+    def _make_pool(self, **kwargs):
+        from agent_ia_core.tools.core.browser_pool import BrowserPool
+
+        class FakeContext:
+            def __init__(self, tracker):
+                self.tracker = tracker
+                tracker['open'] += 1
+
+            async def new_page(self):
+                return Mock(url='about:blank')
+
+            async def close(self):
+                self.tracker['open'] -= 1
+
+        class FakeBrowser:
+            def __init__(self, tracker):
+                self.tracker = tracker
+                self.connected = True
+
+            def is_connected(self):
+                return self.connected
+
+            async def new_context(self, **options):
+                return FakeContext(self.tracker)
+
+            async def close(self):
+                self.connected = False
+
+        class FakePool(BrowserPool):
+            tracker = {'open': 0}
+
+            async def _launch_browser(self):
+                return FakeBrowser(self.tracker)
+
+        pool = FakePool(**kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_browser_reused_with_isolated_contexts(self):
+        """Test que las llamadas reutilizan el navegador y cierran su contexto"""
+        pool = self._make_pool(size=2)
+
+        async def use_page():
+            async with pool.page(locale='es-ES') as page:
+                return page.url
+
+        for _ in range(5):
+            self.assertEqual(pool.run(use_page()), 'about:blank')
+
+        self.assertEqual(pool.stats['launched'], 1)
+        self.assertEqual(pool.stats['contexts'], 5)
+        self.assertEqual(pool.tracker['open'], 0)
+
+    def test_browser_recycled_after_max_uses(self):
+        """Test que un navegador se recicla tras max_uses contextos"""
+        pool = self._make_pool(size=1, max_uses=2)
+
+        async def use_page():
+            async with pool.page():
+                pass
+
+        for _ in range(5):
+            pool.run(use_page())
+
+        self.assertEqual(pool.stats['launched'], 3)
+        self.assertEqual(pool.stats['recycled'], 2)
+
+    def test_run_timeout_cancels_navigation(self):
+        """Test que run corta la espera al vencer el timeout y cancela la corrutina con su página"""
+        import asyncio
+        pool = self._make_pool(size=1)
+        state = {}
+
+        async def hang():
+            async with pool.page():
+                try:
+                    await asyncio.sleep(30)
+                except asyncio.CancelledError:
+                    state['cancelled'] = True
+                    raise
+
+        with self.assertRaises(TimeoutError):
+            pool.run(hang(), timeout=0.2)
+
+        # La cancelación llega a la tarea del loop y el contexto se cierra
+        pool.run(asyncio.sleep(0.05))
+        self.assertTrue(state.get('cancelled'))
+        self.assertEqual(pool.tracker['open'], 0)
+
+    def test_tool_reports_total_timeout(self):
+        """Test que browse_interactive acota la navegación a timeout * (max_steps + 1)"""
+        from agent_ia_core.tools.agent_tools.browse_interactive import BrowseInteractiveTool
+
+        tool = BrowseInteractiveTool.__new__(BrowseInteractiveTool)
+        tool.pool = Mock()
+        tool.pool.run.side_effect = TimeoutError
+        tool._validate = Mock(return_value=(None, 'https://example.com'))
+        tool._navigate = Mock(return_value=None)
+
+        result = tool.run('https://example.com', 'query', max_steps=3, timeout=10000)
+
+        self.assertFalse(result['success'])
+        self.assertIn('timed out after 40s', result['error'])
+        self.assertEqual(tool.pool.run.call_args[0][1], 40.0)
+
+    def test_max_pages_limit(self):
+        """Test que no hay más de max_pages páginas abiertas a la vez"""
+        import asyncio
+
+        pool = self._make_pool(size=2, max_pages=2)
+        peak = {'current': 0, 'max': 0}
+
+        async def use_page():
+            async with pool.page():
+                peak['current'] += 1
+                peak['max'] = max(peak['max'], peak['current'])
+                await asyncio.sleep(0.02)
+                peak['current'] -= 1
+
+        async def many():
+            await asyncio.gather(*(use_page() for _ in range(6)))
+
+        pool.run(many())
+        self.assertEqual(peak['max'], 2)
+        self.assertLessEqual(pool.stats['launched'], 2)
+
+    def test_tool_without_playwright(self):
+        """Test que la tool informa si Playwright no está instalado (sync y async)"""
+        import asyncio
+        import importlib.util
+        from agent_ia_core.tools.agent_tools.browse_interactive import BrowseInteractiveTool
+
+        tool = BrowseInteractiveTool(pool=self._make_pool())
+
+        with patch.object(importlib.util, 'find_spec', return_value=None):
+            result = tool.run('https://example.com', 'salario')
+            async_result = asyncio.run(tool.arun('https://example.com', 'salario'))
+
+        self.assertFalse(result['success'])
+        self.assertIn('Playwright not installed', result['error'])
+        self.assertEqual(async_result, result)
+
+
+class LoadingProfileTest(TestCase):
+    """Tests para los perfiles de carga de browse_interactive"""
+
+    def test_should_block(self):
+        """Test de qué peticiones aborta cada perfil"""
+        from agent_ia_core.tools.core.loading_profiles import get_loading_profile, should_block
+
+        light = get_loading_profile('light')
+        full = get_loading_profile('full')
+
+        self.assertTrue(should_block('image', 'https://portal.es/logo.png', light))
+        self.assertTrue(should_block('script', 'https://www.google-analytics.com/analytics.js', light))
+        self.assertFalse(should_block('script', 'https://portal.es/app.js', light))
+        self.assertFalse(should_block('stylesheet', 'https://portal.es/site.css', light))
+        self.assertTrue(should_block('stylesheet', 'https://portal.es/site.css', get_loading_profile('minimal')))
+        self.assertFalse(should_block('document', 'https://www.googletagmanager.com/ns.html', light))
+        self.assertFalse(should_block('image', 'https://portal.es/logo.png', full))
+
+    def test_apply_loading_profile_routes_requests(self):
+        """Test que el handler instalado aborta o deja pasar cada petición"""
+        import asyncio
+        from agent_ia_core.tools.core.loading_profiles import apply_loading_profile, get_loading_profile
+
+        class FakeRoute:
+            def __init__(self, resource_type, url):
+                self.request = Mock(resource_type=resource_type, url=url)
+                self.outcome = None
+
+            async def abort(self):
+                self.outcome = 'abort'
+
+            async def continue_(self):
+                self.outcome = 'continue'
+
+        class FakePage:
+            async def route(self, pattern, handler):
+                self.handler = handler
+
+        async def scenario():
+            page = FakePage()
+            stats = await apply_loading_profile(page, get_loading_profile('light'))
+            routes = [
+                FakeRoute('document', 'https://portal.es/oferta'),
+                FakeRoute('font', 'https://portal.es/f.woff2'),
+                FakeRoute('xhr', 'https://stats.hotjar.com/collect'),
+            ]
+            for route in routes:
+                await page.handler(route)
+            return stats, [route.outcome for route in routes]
+
+        stats, outcomes = asyncio.run(scenario())
+
+        self.assertEqual(outcomes, ['continue', 'abort', 'abort'])
+        self.assertEqual(stats, {'blocked': 2, 'allowed': 1})
+
+
+class PageSnapshotTest(TestCase):
+    """Tests para la navegación guiada por elementos numerados"""
+
+    def test_format_and_parse(self):
+        """Test del formato del snapshot y del número elegido por el LLM"""
+        from agent_ia_core.tools.core.page_snapshot import element_selector, format_snapshot, parse_element_index
+
+        elements = [
+            {'index': 1, 'role': 'link', 'name': 'Ofertas'},
+            {'index': 2, 'role': 'searchbox', 'name': 'Buscar puesto'},
+        ]
+
+        self.assertEqual(format_snapshot(elements), '[1] link "Ofertas"\n[2] searchbox "Buscar puesto"')
+        self.assertEqual(format_snapshot([]), '(ningún elemento interactivo visible)')
+        self.assertEqual(parse_element_index('ACTION: CLICK\nELEMENT: [12]'), 12)
+        self.assertEqual(parse_element_index('ACTION: CLICK\nELEMENT: 3'), 3)
+        self.assertIsNone(parse_element_index('ACTION: CLICK\nSELECTOR: botón'))
+        self.assertEqual(element_selector(4), '[data-agent-idx="4"]')
+
+    @staticmethod
+    def _fake_page():
+        from agent_ia_core.tools.core.page_snapshot import SNAPSHOT_SCRIPT
+
+        class FakeLocator:
+            def __init__(self, page, selector):
+                self.page = page
+                self.selector = selector
+                self.first = self
+
+            async def click(self, timeout=None):
+                self.page.clicked.append(self.selector)
+
+            async def is_visible(self, timeout=None):
+                return True
+
+        class FakePage:
+            url = 'https://empresa.es'
+
+            def __init__(self):
+                self.clicked = []
+
+            async def evaluate(self, script, *args):
+                if script == SNAPSHOT_SCRIPT:
+                    return [{'index': 1, 'role': 'link', 'name': 'Detalles'}]
+                return 'Salario: 40.000 €'
+
+            def locator(self, selector):
+                return FakeLocator(self, selector)
+
+            async def wait_for_load_state(self, state, timeout=None):
+                pass
+
+            async def wait_for_selector(self, selector, state=None, timeout=None):
+                pass
+
+        return FakePage()
+
+    def _navigate(self, decisions, page):
+        import asyncio
+        from agent_ia_core.tools.agent_tools.browse_interactive import BrowseInteractiveTool
+
+        llm = Mock()
+        llm.invoke.side_effect = [Mock(content=decision) for decision in decisions]
+        tool = BrowseInteractiveTool(llm=llm, pool=Mock(), loading_profile='light')
+        actions = []
+
+        result = asyncio.run(tool._smart_navigation(
+            page=page, query='salario', initial_content='Oferta de empleo', max_steps=3,
+            actions_taken=actions, timeout=1000,
+            elements=[{'index': 1, 'role': 'link', 'name': 'Inicio'},
+                      {'index': 2, 'role': 'tab', 'name': 'Condiciones'}]
+        ))
+        return result, actions, llm
+
+    def test_smart_navigation_clicks_numbered_element(self):
+        """Test que el click se hace sobre el elemento elegido por número"""
+        page = self._fake_page()
+        result, actions, llm = self._navigate(
+            ['ACTION: CLICK\nELEMENT: 2', 'ACTION: EXTRACT\nANSWER: 40.000 €'], page
+        )
+
+        self.assertEqual(page.clicked, ['[data-agent-idx="2"]'])
+        self.assertEqual(result['answer'], '40.000 €')
+        self.assertIn('Clicked on: [2] tab "Condiciones"', actions)
+        # El segundo prompt incluye el snapshot de la página nueva
+        second_prompt = llm.invoke.call_args_list[1][0][0]
+        self.assertIn('[1] link "Detalles"', second_prompt)
+
+    def test_smart_navigation_element_by_name(self):
+        """Test que 'ELEMENT: <nombre>' se resuelve contra el snapshot"""
+        page = self._fake_page()
+        result, actions, _ = self._navigate(
+            ['ACTION: CLICK\nELEMENT: condiciones', 'ACTION: EXTRACT\nANSWER: 40.000 €'], page
+        )
+
+        self.assertEqual(page.clicked, ['[data-agent-idx="2"]'])
+        self.assertIn('Clicked on: [2] tab "Condiciones"', actions)
+
+    def test_smart_navigation_invalid_element_is_not_found(self):
+        """Test que un número inexistente no provoca clicks a ciegas"""
+        page = self._fake_page()
+        result, actions, _ = self._navigate(['ACTION: CLICK\nELEMENT: 9'], page)
+
+        self.assertEqual(page.clicked, [])
+        self.assertIn('Information not found', result['answer'])
+
+    def test_answer_stops_at_element_line(self):
+        """Test que ANSWER no se traga la línea ELEMENT"""
+        from agent_ia_core.tools.agent_tools.browse_interactive import BrowseInteractiveTool
+
+        tool = BrowseInteractiveTool(llm=Mock(), pool=Mock())
+        answer = tool._extract_answer_from_llm_response('ACTION: NOT_FOUND\nANSWER: No está\nELEMENT: 3')
+        self.assertEqual(answer, 'No está')
+
+
+class CompanyRecommendationToolTest(TestCase):
+    """Tests para la investigación paralela de empresas"""
+
+    def test_companies_researched_in_parallel_and_kept_in_order(self):
+        """Test que las empresas y sus búsquedas corren en paralelo y vuelven en orden"""
+        import threading
+        import time
+        from agent_ia_core.tools.agent_tools.recommend_companies import CompanyRecommendationTool
+
+        lock = threading.Lock()
+        running = {'now': 0, 'max': 0}
+
+        def fake_search(query, limit=5):
+            with lock:
+                running['now'] += 1
+                running['max'] = max(running['max'], running['now'])
+            # La primera empresa es la más lenta
+            time.sleep(0.05 if '"Indra"' in query else 0.01)
+            with lock:
+                running['now'] -= 1
+            return {
+                'success': True,
+                'data': {'results': [{
+                    'title': 'Ana García | LinkedIn',
+                    'url': f'https://www.linkedin.com/in/{abs(hash(query))}',
+                    'snippet': 'Talent Acquisition - ana@empresa.es'
+                }]}
+            }
+
+        web_search = Mock()
+        web_search.run.side_effect = fake_search
+        # Sin base de conocimiento: los hilos no pueden escribir en la BD de test
+        with patch('agent_ia_core.tools.agent_tools.recommend_companies.get_shared_company_store', return_value=None):
+            tool = CompanyRecommendationTool(web_search_tool=web_search, max_workers=3)
+
+        result = tool.run(specific_companies='Indra, Glovo, Cabify')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(
+            [r['company_name'] for r in result['data']['recommendations']],
+            ['Indra', 'Glovo', 'Cabify']
+        )
+        self.assertEqual(web_search.run.call_count, 15)
+        self.assertGreater(running['max'], 5)
+        indra = result['data']['recommendations'][0]
+        self.assertEqual(len(indra['recruiters']), 2)
+        self.assertEqual(indra['recruiters'][0]['email'], 'ana@empresa.es')
+        self.assertEqual(indra['company_info']['contact_emails'], ['ana@empresa.es'])
+
+    def test_failed_search_does_not_drop_company(self):
+        """Test que una búsqueda fallida deja vacía su sección sin perder la empresa"""
+        from agent_ia_core.tools.agent_tools.recommend_companies import CompanyRecommendationTool
+
+        def fake_search(query, limit=5):
+            if 'site:linkedin.com/jobs' in query:
+                raise ConnectionError('timeout')
+            return {'success': True, 'data': {'results': []}}
+
+        web_search = Mock()
+        web_search.run.side_effect = fake_search
+        with patch('agent_ia_core.tools.agent_tools.recommend_companies.get_shared_company_store', return_value=None):
+            tool = CompanyRecommendationTool(web_search_tool=web_search)
+
+        result = tool.run(specific_companies='Indra')
+
+        self.assertEqual(result['data']['total_companies'], 1)
+        self.assertEqual(result['data']['recommendations'][0]['job_openings'], [])
+
+
+class CompanyStoreTest(TestCase):
+    """Tests para la base de conocimiento de empresas"""
+
+    def test_lookup_reads_through_and_caches(self):
+        """Test que la primera lectura busca y guarda y la segunda sale de la base de datos"""
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from agent_ia_core.tools.core.company_store import CompanyStore
+
+        store = CompanyStore(ttl=3600, names=CompanyNameIndex())
+        fetch = Mock(return_value={
+            'sector': 'Tecnología',
+            'info': {'contact_emails': ['rrhh@indra.es']},
+            'recruiters': [{'name': 'Ana', 'linkedin_url': 'https://linkedin.com/in/ana', 'verified': True}]
+        })
+
+        first = store.lookup('Indra', 'profile', fetch)
+        second = store.lookup('  INDRA ', 'profile', fetch)
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(second['sector'], 'Tecnología')
+        self.assertEqual(second['recruiters'][0]['linkedin_url'], 'https://linkedin.com/in/ana')
+        self.assertTrue(store.is_fresh(second, 'profile'))
+        self.assertFalse(store.is_fresh(second, 'linkedin'))
+
+    def test_sections_accumulate_on_same_company(self):
+        """Test que cada sección se comprueba por separado y los datos se fusionan"""
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from agent_ia_core.tools.core.company_store import CompanyStore
+        from apps.company.models import Company
+
+        store = CompanyStore(names=CompanyNameIndex())
+        store.save('Glovo', 'profile', info={'contact_emails': ['jobs@glovo.com']})
+        entry = store.save('Glovo', 'linkedin', linkedin_url='https://www.linkedin.com/company/glovo',
+                           info={'employee_reviews': []})
+
+        self.assertEqual(Company.objects.count(), 1)
+        self.assertEqual(set(entry['checked_sections']), {'profile', 'linkedin'})
+        self.assertEqual(entry['info']['contact_emails'], ['jobs@glovo.com'])
+        self.assertEqual(entry['linkedin_url'], 'https://www.linkedin.com/company/glovo')
+
+    def test_alias_lookup(self):
+        """Test que una empresa se encuentra también por sus alias"""
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from agent_ia_core.tools.core.company_store import CompanyStore
+        from apps.company.models import Company, CompanyAlias
+
+        Company.objects.create(name='Telefónica', normalized_name='telefonica')
+        CompanyAlias.objects.create(alias='movistar', canonical='telefonica')
+        store = CompanyStore(names=CompanyNameIndex())
+
+        self.assertEqual(store.get('Telefonica S.A.')['name'], 'Telefónica')
+        self.assertEqual(store.get('Movistar')['name'], 'Telefónica')
+        self.assertEqual(store.get('Telefónica Tech')['aliases'], ['movistar', 'telefonica tech'])
+
+    def test_save_never_downgrades_recruiter(self):
+        """Test que guardar el mismo perfil sin verificar ni email no pierde lo ya conocido"""
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from agent_ia_core.tools.core.company_store import CompanyStore
+
+        store = CompanyStore(names=CompanyNameIndex())
+        url = 'https://linkedin.com/in/maria-garcia'
+        store.save('Indra', 'verified_recruiter', recruiters=[
+            {'name': 'María García', 'linkedin_url': url, 'role': 'Talent Acquisition',
+             'email': 'maria@indra.es', 'verified': True}
+        ])
+        entry = store.save('Indra', 'recruiters', recruiters=[
+            {'name': 'María García', 'linkedin_url': url, 'role': 'Recruiter en Indra'}
+        ])
+
+        recruiter = entry['recruiters'][0]
+        self.assertTrue(recruiter['verified'])
+        self.assertEqual(recruiter['email'], 'maria@indra.es')
+        self.assertEqual(recruiter['role'], 'Recruiter en Indra')
+
+    def test_stale_section_served_and_refreshed_in_background(self):
+        """Test que una sección caducada se sirve y se programa su refresco"""
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from agent_ia_core.tools.core.company_store import CompanyStore
+
+        store = CompanyStore(ttl=0, names=CompanyNameIndex())
+        store.save('Cabify', 'recruiters', recruiters=[])
+        fetch = Mock(return_value={})
+
+        with patch.object(store, 'refresh_async') as refresh_async:
+            entry = store.lookup('Cabify', 'recruiters', fetch)
+
+        self.assertEqual(entry['name'], 'Cabify')
+        fetch.assert_not_called()
+        refresh_async.assert_called_once_with('Cabify', 'recruiters', fetch)
+
+    def test_verified_recruiter_lookups_hit_knowledge_base(self):
+        """Test que _find_verified_recruiter solo busca en Google la primera vez (también sin resultados)"""
+        from agent_ia_core.tools.agent_tools.search_jobs import JobSearchTool
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from agent_ia_core.tools.core.company_store import CompanyStore
+
+        def fake_search(query, limit=5):
+            results = []
+            if '"Indra"' in query:
+                results = [{
+                    'title': 'María García - Talent Acquisition | LinkedIn',
+                    'snippet': 'Talent Acquisition en Indra',
+                    'url': 'https://linkedin.com/in/maria-garcia'
+                }]
+            return {'success': True, 'data': {'results': results}}
+
+        web_search = Mock()
+        web_search.run.side_effect = fake_search
+        tool = JobSearchTool(web_search_tool=web_search, company_store=CompanyStore(names=CompanyNameIndex()))
+
+        first = tool._find_verified_recruiter('Indra', 'Madrid')
+        calls = web_search.run.call_count
+        second = tool._find_verified_recruiter('Indra', 'Madrid')
+
+        self.assertEqual(first, second)
+        self.assertEqual(second['linkedin_url'], 'https://linkedin.com/in/maria-garcia')
+        self.assertEqual(web_search.run.call_count, calls)
+
+        self.assertIsNone(tool._find_verified_recruiter('Acme', 'Madrid'))
+        calls = web_search.run.call_count
+        self.assertIsNone(tool._find_verified_recruiter('Acme', 'Madrid'))
+        self.assertEqual(web_search.run.call_count, calls)
+
+    def test_failed_searches_are_not_stored(self):
+        """Test que una búsqueda fallida (cuota agotada) no se guarda como empresa sin reclutadores"""
+        from agent_ia_core.tools.agent_tools.linkedin import LinkedInRecruiterTool
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from agent_ia_core.tools.core.company_store import CompanyStore
+        from apps.company.models import Company
+
+        web_search = Mock()
+        web_search.run.return_value = {'success': False, 'error': 'Google Search API daily budget reached'}
+        store = CompanyStore(names=CompanyNameIndex())
+        tool = LinkedInRecruiterTool(web_search_tool=web_search, company_store=store)
+
+        result = tool.run(company_name='Indra')
+        self.assertEqual(result['data']['recruiters'], [])
+        self.assertFalse(Company.objects.exists())
+
+        web_search.run.return_value = {'success': True, 'data': {'results': [{
+            'title': 'Ana García | LinkedIn',
+            'url': 'https://www.linkedin.com/in/ana-garcia',
+            'snippet': 'Recruiter en Indra'
+        }]}}
+        result = tool.run(company_name='Indra')
+        self.assertEqual(result['data']['recruiters'][0]['profile_url'], 'https://www.linkedin.com/in/ana-garcia')
+        self.assertIn('recruiters', store.get('Indra')['checked_sections'])
+
+    def test_recommend_companies_reuses_company_profile(self):
+        """Test que al repetir la recomendación solo se buscan las ofertas"""
+        from agent_ia_core.tools.agent_tools.recommend_companies import CompanyRecommendationTool
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from agent_ia_core.tools.core.company_store import CompanyStore
+
+        web_search = Mock()
+        web_search.run.return_value = {'success': True, 'data': {'results': [{
+            'title': 'Ana García | LinkedIn',
+            'url': 'https://www.linkedin.com/in/ana-garcia',
+            'snippet': 'Recruiter - ana@indra.es'
+        }]}}
+        tool = CompanyRecommendationTool(web_search_tool=web_search, company_store=CompanyStore(names=CompanyNameIndex()))
+
+        tool.run(specific_companies='Indra')
+        self.assertEqual(web_search.run.call_count, 5)
+
+        result = tool.run(specific_companies='Indra')
+        self.assertEqual(web_search.run.call_count, 6)
+        recommendation = result['data']['recommendations'][0]
+        self.assertEqual(recommendation['recruiters'][0]['email'], 'ana@indra.es')
+        self.assertEqual(recommendation['company_info']['contact_emails'], ['ana@indra.es'])
+
+
+class CompanyNamesTest(TestCase):
+    """Tests para la canonicalización de nombres de empresa"""
+
+    def test_company_key(self):
+        """Test de acentos, formas jurídicas y calificativos"""
+        from agent_ia_core.tools.core.company_names import company_key
+
+        self.assertEqual(company_key('Telefónica'), 'telefonica')
+        self.assertEqual(company_key('Telefonica S.A.'), 'telefonica')
+        self.assertEqual(company_key('TELEFÓNICA ESPAÑA, S.L.U.'), 'telefonica')
+        self.assertEqual(company_key('Grupo Santander'), 'santander')
+        self.assertEqual(company_key('Banco de España'), 'banco de espana')
+        self.assertEqual(company_key('El Corte Inglés S.A.'), 'el corte ingles')
+        self.assertEqual(company_key('  '), '')
+
+    def test_mentions_company(self):
+        """Test de detección de la empresa en snippets"""
+        from agent_ia_core.tools.core.company_names import mentions_company
+
+        self.assertTrue(mentions_company('Talent Acquisition en Telefónica España', 'Telefonica S.A.'))
+        self.assertTrue(mentions_company('Recruiter @ elcorteingles', 'El Corte Inglés'))
+        self.assertFalse(mentions_company('Recruiter en Indra', 'Telefónica'))
+
+    def test_index_learns_business_units_and_persists(self):
+        """Test que una unidad de negocio de una empresa conocida se guarda como alias"""
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from apps.company.models import CompanyAlias
+
+        index = CompanyNameIndex()
+        self.assertEqual(index.resolve('Telefónica Tech'), 'telefonica tech')
+
+        index.register('Telefónica')
+        self.assertEqual(index.resolve('Telefónica Tech'), 'telefonica')
+        self.assertTrue(index.same_company('Telefonica S.A.', 'Telefónica Tech'))
+        self.assertEqual(CompanyAlias.objects.get(alias='telefonica tech').canonical, 'telefonica')
+
+        # Otro proceso carga el alias de la base de datos
+        self.assertEqual(CompanyNameIndex().resolve('TELEFÓNICA TECH'), 'telefonica')
+
+    def test_index_reloads_aliases_from_other_processes(self):
+        """Test que el índice recarga los alias guardados por otros procesos"""
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+        from apps.company.models import Company, CompanyAlias
+
+        index = CompanyNameIndex(reload_interval=3600)
+        self.assertEqual(index.resolve('Indra Minsait'), 'indra minsait')
+
+        Company.objects.create(name='Indra', normalized_name='indra')
+        CompanyAlias.objects.create(alias='indra minsait', canonical='indra')
+        # Dentro del intervalo se sigue usando la copia en memoria
+        self.assertEqual(index.resolve('Indra Minsait'), 'indra minsait')
+
+        index.reload_interval = 0
+        self.assertEqual(index.resolve('Indra Minsait'), 'indra')
+        self.assertEqual(index.aliases_of('indra'), ['indra minsait'])
+
+    def test_index_writes_database_before_memory(self):
+        """Test que un alias que no se pudo guardar no queda solo en memoria"""
+        from agent_ia_core.tools.core.company_names import CompanyNameIndex
+
+        index = CompanyNameIndex()
+        index.register('Telefónica')
+        with patch('apps.company.models.CompanyAlias.objects.update_or_create', side_effect=Exception('bloqueada')):
+            index.add_alias('Movistar', 'Telefónica')
+        self.assertEqual(index.resolve('Movistar'), 'movistar')
+        self.assertEqual(index.aliases_of('telefonica'), [])
+
+        index.add_alias('Movistar', 'Telefónica')
+        index.add_alias('Telefónica Tech', 'Telefónica')
+        self.assertEqual(index.aliases_of('telefonica'), ['movistar', 'telefonica tech'])
+
+        # Mover un alias a otra empresa lo quita del índice inverso de la anterior
+        index.add_alias('Movistar', 'Orange')
+        self.assertEqual(index.aliases_of('telefonica'), ['telefonica tech'])
+        self.assertEqual(index.aliases_of('orange'), ['movistar'])
+
+    def test_deduplicate_jobs_uses_canonical_company(self):
+        """Test que la deduplicación reconoce la misma empresa con nombres distintos"""
+        from agent_ia_core.tools.agent_tools.search_jobs import JobSearchTool
+
+        tool = JobSearchTool(company_store=Mock())
+        jobs = [
+            {'title': 'Desarrollador Python - Telefónica', 'url': 'https://a.es/1'},
+            {'title': 'Desarrollador Python - Telefonica S.A.', 'url': 'https://b.es/2'},
+            {'title': 'Desarrollador Python - Indra', 'url': 'https://c.es/3'},
+        ]
+
+        unique = tool._deduplicate_jobs(jobs)
+
+        self.assertEqual([job['url'] for job in unique], ['https://a.es/1', 'https://c.es/3'])
+
+
+class RateLimiterTest(TestCase):
+    """Tests para el limitador de peticiones y cuotas diarias"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def _limiter(self, **limits):
+        from agent_ia_core.tools.core.rate_limiter import RateLimiter
+        return RateLimiter(limits={'api': limits}, background_reserve=0.2, wait_timeout=0)
+
+    def test_bucket_keeps_reserve_for_interactive_requests(self):
+        """Test que las peticiones de fondo no agotan la ráfaga"""
+        from agent_ia_core.tools.core.rate_limiter import PRIORITY_BACKGROUND, request_priority
+
+        limiter = self._limiter(per_minute=1, burst=5)
+
+        with request_priority(PRIORITY_BACKGROUND):
+            granted = [limiter.acquire('api', 'key-1') for _ in range(5)]
+        self.assertEqual(granted, [True, True, True, True, False])
+
+        # La última petición de la ráfaga queda para el chat
+        self.assertTrue(limiter.acquire('api', 'key-1'))
+        self.assertFalse(limiter.acquire('api', 'key-1'))
+        # Otra key tiene su propio bucket
+        self.assertTrue(limiter.acquire('api', 'key-2'))
+
+    def test_daily_quota_and_usage(self):
+        """Test que la cuota diaria se cuenta en la cache y se informa sin exponer la key"""
+        from agent_ia_core.tools.core.rate_limiter import PRIORITY_BACKGROUND
+
+        limiter = self._limiter(per_minute=600, burst=100, daily_quota=5)
+
+        for _ in range(4):
+            self.assertTrue(limiter.acquire('api', 'secret'))
+        self.assertFalse(limiter.acquire('api', 'secret', priority=PRIORITY_BACKGROUND))
+        self.assertTrue(limiter.acquire('api', 'secret'))
+        self.assertFalse(limiter.acquire('api', 'secret'))
+
+        usage = limiter.usage('api', 'secret')
+        self.assertEqual((usage['used'], usage['daily_quota'], usage['remaining']), (5, 5, 0))
+        self.assertNotIn('secret', str(usage))
+
+        # Otro proceso con la misma cache ve la cuota agotada
+        self.assertFalse(self._limiter(per_minute=600, burst=100, daily_quota=5).acquire('api', 'secret'))
+
+    def test_daily_quota_without_atomic_incr(self):
+        """Test que sin incr() atómico los hilos del proceso no superan la cuota"""
+        import threading
+        from django.test import override_settings
+
+        limiter = self._limiter(per_minute=6000, burst=1000, daily_quota=20)
+        granted = []
+
+        def worker():
+            for _ in range(10):
+                granted.append(limiter.acquire('api', 'key'))
+
+        with override_settings(CACHE_ATOMIC_INCR=False):
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(granted.count(True), 20)
+        self.assertEqual(limiter.usage('api', 'key')['used'], 20)
+
+    def test_web_search_stops_when_quota_is_exhausted(self):
+        """Test que web_search no llama a Google con la cuota agotada"""
+        from agent_ia_core.tools.agent_tools.web_search import GoogleWebSearchTool
+        from agent_ia_core.tools.core.rate_limiter import RateLimiter
+
+        limiter = RateLimiter(limits={'google_search': {'per_minute': 60, 'burst': 10, 'daily_quota': 100}})
+        limiter.record_exhausted('google_search', 'user-key')
+        tool = GoogleWebSearchTool(api_key='user-key', engine_id='cx', rate_limiter=limiter)
+
+        with patch('googleapiclient.discovery.build', create=True) as build:
+            result = tool.run('python jobs')
+
+        build.assert_not_called()
+        self.assertFalse(result['success'])
+        self.assertIn('daily budget', result['error'])
+        self.assertEqual(result['quota']['remaining'], 0)
+
+    def test_daily_denial_keeps_bucket_tokens(self):
+        """Test que una petición rechazada por la cuota diaria no gasta un token del bucket"""
+        limiter = self._limiter(per_minute=1, burst=2, daily_quota=1)
+
+        self.assertTrue(limiter.acquire('api', 'key'))
+        for _ in range(3):
+            self.assertFalse(limiter.acquire('api', 'key'))
+        self.assertGreaterEqual(limiter._bucket('api', 'key', limiter.limits['api']).tokens, 1)
+
+    def test_quota_day_follows_provider_timezone(self):
+        """Test que el día de la cuota de Google se cuenta en hora del Pacífico"""
+        from datetime import datetime, timezone as dt_timezone
+        from agent_ia_core.tools.core import rate_limiter
+
+        class FixedDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                utc = datetime(2026, 10, 20, 5, 0, tzinfo=dt_timezone.utc)
+                return utc.astimezone(tz) if tz else utc.replace(tzinfo=None)
+
+        limiter = rate_limiter.RateLimiter(limits={
+            'google_search': {'daily_quota': 100, 'quota_timezone': 'America/Los_Angeles'},
+            'api': {'daily_quota': 100},
+        })
+        with patch.object(rate_limiter, 'datetime', FixedDatetime):
+            self.assertTrue(limiter._daily_key('google_search', 'k').endswith(':20261019'))
+            self.assertTrue(limiter._daily_key('api', 'k').endswith(':20261020'))
+            self.assertEqual(limiter.usage('google_search', 'k')['resets_at'], '2026-10-20T00:00:00-07:00')
+
+    def test_web_search_only_daily_errors_block_the_day(self):
+        """Test que el 429 por minuto de Google no bloquea las búsquedas hasta medianoche"""
+        from agent_ia_core.tools.agent_tools.web_search import GoogleWebSearchTool
+        from agent_ia_core.tools.core.rate_limiter import RateLimiter
+
+        limiter = RateLimiter(limits={'google_search': {'per_minute': 600, 'burst': 100, 'daily_quota': 100}})
+        tool = GoogleWebSearchTool(api_key='user-key', engine_id='cx', rate_limiter=limiter)
+
+        with patch('googleapiclient.discovery.build', create=True) as build:
+            build.return_value.cse.return_value.list.return_value.execute.side_effect = Exception(
+                '<HttpError 429 "Rate Limit Exceeded". Details: "[{\'reason\': \'rateLimitExceeded\'}]">'
+            )
+            result = tool.run('python jobs')
+        self.assertIn('Try again in a minute', result['error'])
+        self.assertEqual(limiter.usage('google_search', 'user-key')['remaining'], 99)
+
+        with patch('googleapiclient.discovery.build', create=True) as build:
+            build.return_value.cse.return_value.list.return_value.execute.side_effect = Exception(
+                '<HttpError 429 "Quota exceeded for quota metric \'Queries\' and limit \'Queries per day\'". '
+                'Details: "[{\'reason\': \'dailyLimitExceeded\'}]">'
+            )
+            result = tool.run('python jobs')
+        self.assertIn('daily quota', result['error'])
+        self.assertEqual(limiter.usage('google_search', 'user-key')['remaining'], 0)
+
+    def test_fetcher_throttles_per_host(self):
+        """Test que el PageFetcher pide un token por host antes de descargar"""
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+        from agent_ia_core.tools.core.rate_limiter import RateLimiter, RateLimitExceeded
+
+        limiter = RateLimiter(limits={'portal': {'per_minute': 1, 'burst': 1}}, wait_timeout=0)
+        fetcher = PageFetcher(rate_limiter=limiter)
+        fetcher._session = Mock()
+
+        fetcher.get('https://portal.es/oferta/1')
+        with self.assertRaises(RateLimitExceeded):
+            fetcher.get('https://portal.es/oferta/2')
+        fetcher.get('https://otro-portal.es/oferta/1')
+
+        self.assertEqual(fetcher._session.get.call_count, 2)
+
+
+class HostHealthTest(TestCase):
+    """Tests para el circuit breaker y el hedging por host del PageFetcher"""
+
+    def _response(self, status_code=200, text='<html><body><main>Oferta</main></body></html>'):
+        response = Mock(status_code=status_code, text=text, encoding='utf-8', headers={})
+        return response
+
+    def test_breaker_opens_after_failures_and_recovers(self):
+        """Test que un host que falla seguido se salta durante el cooldown"""
+        import time
+        from agent_ia_core.tools.core.host_health import HostHealth, HostUnavailable
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+
+        health = HostHealth(failure_threshold=2, cooldown=0.2)
+        fetcher = PageFetcher(health=health)
+        fetcher._session = Mock()
+        fetcher._session.get.return_value = self._response(403)
+
+        fetcher.get('https://lento.es/1')
+        fetcher.get('https://lento.es/2')
+        with self.assertRaises(HostUnavailable):
+            fetcher.get('https://lento.es/3')
+        self.assertEqual(fetcher._session.get.call_count, 2)
+        # Otros hosts no se ven afectados
+        fetcher.get('https://rapido.es/1')
+
+        # Pasado el cooldown se prueba una vez y, si responde, se cierra el circuito
+        time.sleep(0.25)
+        fetcher._session.get.return_value = self._response(200)
+        fetcher.get('https://lento.es/4')
+        fetcher.get('https://lento.es/5')
+        self.assertEqual(health.snapshot()['lento.es']['state'], 'closed')
+
+    def test_lost_probe_does_not_block_host_forever(self):
+        """Test que una prueba half_open que nunca informa no bloquea el host para siempre"""
+        import time
+        from agent_ia_core.tools.core.host_health import HostHealth
+
+        health = HostHealth(failure_threshold=1, cooldown=0.1)
+        health.record_failure('https://portal.es/')
+        time.sleep(0.15)
+
+        self.assertTrue(health.allow('https://portal.es/1'))
+        # La prueba se pierde (p. ej. tarea cancelada): mientras tanto no pasa nadie más
+        self.assertFalse(health.allow('https://portal.es/2'))
+        time.sleep(0.15)
+        self.assertTrue(health.allow('https://portal.es/3'))
+
+    def test_hedged_request_when_p95_is_exceeded(self):
+        """Test que se lanza una petición de respaldo cuando la primera supera el p95"""
+        import threading
+        import time
+        from agent_ia_core.tools.core.host_health import HostHealth
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+
+        health = HostHealth(min_samples=3, min_hedge_delay=0.05)
+        for _ in range(3):
+            health.record_success('https://portal.es/', 0.05)
+
+        slow, fast = self._response(200, 'lenta'), self._response(200, 'rapida')
+        release = threading.Event()
+        calls = []
+
+        def get(url, **kwargs):
+            calls.append(url)
+            if len(calls) == 1:
+                release.wait(2)
+                return slow
+            return fast
+
+        fetcher = PageFetcher(health=health)
+        fetcher._session = Mock()
+        fetcher._session.get.side_effect = get
+
+        start = time.monotonic()
+        response = fetcher.get('https://portal.es/oferta')
+        release.set()
+
+        self.assertIs(response, fast)
+        self.assertEqual(len(calls), 2)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_losing_hedge_failure_is_not_recorded(self):
+        """Test que el fallo tardío de la petición perdedora no cuenta contra el host"""
+        import threading
+        import requests
+        from agent_ia_core.tools.core.host_health import HostHealth
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+
+        health = HostHealth(failure_threshold=1, min_samples=3, min_hedge_delay=0.05)
+        for _ in range(3):
+            health.record_success('https://portal.es/', 0.05)
+
+        release, lost = threading.Event(), threading.Event()
+        calls = []
+
+        def get(url, **kwargs):
+            calls.append(url)
+            if len(calls) == 1:
+                release.wait(2)
+                lost.set()
+                raise requests.exceptions.ReadTimeout('lenta')
+            return self._response(200)
+
+        fetcher = PageFetcher(health=health)
+        fetcher._session = Mock()
+        fetcher._session.get.side_effect = get
+
+        fetcher.get('https://portal.es/oferta')
+        release.set()
+        self.assertTrue(lost.wait(2))
+        fetcher._hedge_executor.shutdown(wait=True)
+
+        self.assertEqual(health.snapshot()['portal.es']['consecutive_failures'], 0)
+        self.assertEqual(health.snapshot()['portal.es']['state'], 'closed')
+
+    def test_job_check_reaches_fetcher(self):
+        """Test que la verificación de ofertas descarga la página a través del fetcher"""
+        import tempfile
+        from agent_ia_core.tools.agent_tools.browse_webpage import BrowseWebpageTool
+        from agent_ia_core.tools.agent_tools.search_jobs import JobSearchTool
+        from agent_ia_core.tools.core.host_health import HostHealth
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+        from agent_ia_core.tools.core.page_cache import PageCache
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        fetcher = PageFetcher(health=HostHealth())
+        fetcher._session = Mock()
+        response = self._response(200, (
+            '<html><body><main><h1>Desarrollador Python</h1>'
+            '<p>Esta oferta ya no está disponible. Consulta otras ofertas de desarrollo '
+            'backend en Madrid con experiencia en Django.</p></main></body></html>'
+        ))
+        response.content = response.text.encode('utf-8')
+        fetcher._session.get.return_value = response
+        browse = BrowseWebpageTool(fetcher=fetcher, page_cache=PageCache(path))
+        tool = JobSearchTool(browse_tool=browse, company_store=Mock())
+
+        result = tool._check_job_active('https://www.infojobs.net/oferta/1')
+
+        fetcher._session.get.assert_called_once()
+        self.assertFalse(result['is_active'])
+        self.assertNotIn('Error', result['reason'])
+
+    def test_browse_reports_skipped_host(self):
+        """Test que browse_webpage informa de que el portal se está saltando"""
+        import tempfile
+        from agent_ia_core.tools.agent_tools.browse_webpage import BrowseWebpageTool
+        from agent_ia_core.tools.core.host_health import HostHealth
+        from agent_ia_core.tools.core.http_fetcher import PageFetcher
+        from agent_ia_core.tools.core.page_cache import PageCache
+
+        health = HostHealth(failure_threshold=1, cooldown=60)
+        health.record_failure('https://www.infojobs.net/')
+        fetcher = PageFetcher(health=health)
+        fetcher._session = Mock()
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        tool = BrowseWebpageTool(fetcher=fetcher, page_cache=PageCache(path))
+
+        result = tool.run('https://www.infojobs.net/oferta/1')
+
+        self.assertFalse(result['success'])
+        self.assertIn('failing repeatedly', result['error'])
+        fetcher._session.get.assert_not_called()